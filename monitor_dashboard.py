@@ -11,6 +11,10 @@ import psutil
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.core.vault_index import get_vault_index
+
 # Try to import rich for better UI, fallback to standard print
 try:
     from rich.console import Console
@@ -53,11 +57,7 @@ def get_folder_counts():
         'Failed': 0
     }
     
-    for folder in folders:
-        path = Path(folder)
-        if path.exists():
-            folders[folder] = len(list(path.glob('*.*')))
-            
+    folders.update(get_vault_index(os.getcwd()).counts(folders))
     return folders
 
 def get_recent_logs(lines=5):
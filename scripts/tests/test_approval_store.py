@@ -0,0 +1,47 @@
+"""
+Tests for the approval decision store's import of the legacy text log
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.approval_store import ApprovalStore, TOTAL
+
+LINE = ("2024-05-01 10:00:0{second} - APPROVAL_CHECKER - Manager Approval - Request: {request}... "
+        "- Amount: $250.0 - Status: pending - Reason: Amount exceeds auto-approval threshold\n")
+
+
+def _import(tmp_path, lines):
+    log_file = tmp_path / 'approval_logs.log'
+    log_file.write_text(''.join(lines), encoding='utf-8')
+    store = ApprovalStore(tmp_path / 'approval_logs.sqlite')
+    try:
+        return store.import_log(log_file), store.count(TOTAL, '')
+    finally:
+        store.close()
+
+
+def test_import_skips_audit_copy(tmp_path):
+    lines = [LINE.format(second=0, request='REQ_1'), LINE.format(second=0, request='REQ_1'),
+             LINE.format(second=1, request='REQ_2'), LINE.format(second=1, request='REQ_2')]
+    assert _import(tmp_path, lines) == (2, 2)
+
+
+def test_import_keeps_identical_decisions(tmp_path):
+    # Two real decisions with the same text, each logged with its audit copy
+    lines = [LINE.format(second=second, request='REQ_1') for second in (0, 0, 5, 5)]
+    assert _import(tmp_path, lines) == (2, 2)
+
+
+def test_import_only_into_empty_store(tmp_path):
+    lines = [LINE.format(second=0, request='REQ_1'), LINE.format(second=0, request='REQ_1')]
+    log_file = tmp_path / 'approval_logs.log'
+    log_file.write_text(''.join(lines), encoding='utf-8')
+    store = ApprovalStore(tmp_path / 'approval_logs.sqlite')
+    try:
+        assert store.import_log(log_file) == 1
+        assert store.import_log(log_file) == 0
+        assert store.count(TOTAL, '') == 1
+    finally:
+        store.close()
@@ -0,0 +1,40 @@
+"""
+Tests for the activity ring log: appends from several processes survive
+compaction
+"""
+import sys
+import json
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.dashboard_logger import ActivityRingLog
+
+
+def _append(path, writer, count):
+    log = ActivityRingLog(path, max_entries=50)
+    for n in range(count):
+        log.append({'platform': 'twitter', 'status': 'success', 'writer': writer, 'n': n})
+    if log._compactor:
+        log._compactor.join(30)
+
+
+def test_compaction_keeps_concurrent_appends(tmp_path):
+    path = tmp_path / 'activity.jsonl'
+    context = multiprocessing.get_context('spawn')
+    writers = [context.Process(target=_append, args=(path, writer, 400)) for writer in range(3)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(60)
+        assert writer.exitcode == 0
+
+    # Compaction drops the oldest lines only: what remains of each writer is
+    # its latest run of entries, with none missing in between
+    kept = {}
+    for line in path.read_text(encoding='utf-8').splitlines():
+        entry = json.loads(line)
+        kept.setdefault(entry['writer'], []).append(entry['n'])
+    for numbers in kept.values():
+        assert numbers == list(range(numbers[0], 400))
@@ -0,0 +1,55 @@
+"""
+Tests for the shared fingerprint index that deduplicates action files
+"""
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.fingerprint_index import FingerprintIndex, fingerprint
+from src.platforms.whatsapp import whatsapp_watcher
+
+
+def test_claim_once_then_release(tmp_path):
+    index = FingerprintIndex(tmp_path / 'index.sqlite')
+    key = fingerprint('email', '<abc@example.com>')
+
+    assert index.claim(key, tmp_path / 'EMAIL_1.md')
+    assert not index.claim(key, tmp_path / 'EMAIL_2.md')
+    assert index.get(key)['path'] == str(tmp_path / 'EMAIL_1.md')
+
+    index.release(key)
+    assert not index.seen(key)
+    assert index.claim(key)
+
+
+def test_claim_is_shared_between_instances(tmp_path):
+    first = FingerprintIndex(tmp_path / 'index.sqlite')
+    second = FingerprintIndex(tmp_path / 'index.sqlite')
+    key = fingerprint('twitter', '1234567890')
+
+    assert first.claim(key)
+    assert second.seen(key)
+    assert not second.claim(key)
+    assert second.stats()['duplicates_skipped'] == 1
+
+
+def test_content_fingerprint_ignores_case_and_whitespace():
+    assert fingerprint('whatsapp', '+1 555', 'Hello  there') == fingerprint('whatsapp', '+1 555', 'hello there ')
+    assert fingerprint('whatsapp', '+1 555', 'Hello') != fingerprint('whatsapp', '+1 555', 'Goodbye')
+
+
+def test_whatsapp_message_polled_twice_is_captured_once(tmp_path, monkeypatch):
+    pending = tmp_path / 'Output' / 'WhatsApp'
+    pending.mkdir(parents=True)
+    (tmp_path / 'Needs_Action').mkdir()
+    # No timestamp in the file, so each poll reports a different one
+    (pending / 'msg1.json').write_text(json.dumps({'status': 'pending', 'phone': '+1555', 'message': 'Hi'}))
+    monkeypatch.setenv('ACTION_INDEX_DB', str(tmp_path / 'index.sqlite'))
+    monkeypatch.chdir(tmp_path)
+
+    watcher = whatsapp_watcher.WhatsAppWatcher(str(tmp_path))
+    created = [watcher.create_action_file(item) for _ in range(2) for item in watcher.check_pending_messages()]
+
+    assert len([path for path in created if path is not None]) == 1
@@ -0,0 +1,43 @@
+"""
+Tests for the IMAP watcher's NOOP polling fallback
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.imap_pool import IdleWatcher, PooledConnection
+
+
+class FakeImap:
+    """Keeps untagged responses the way imaplib does: collected until response() pops them"""
+
+    def __init__(self, exists):
+        self.untagged_responses = {'EXISTS': [str(exists).encode()]}
+        self.arrivals = []
+
+    def noop(self):
+        if self.arrivals:
+            self.untagged_responses.setdefault('EXISTS', []).append(str(self.arrivals.pop(0)).encode())
+        return 'OK', [None]
+
+    def response(self, code):
+        return code, self.untagged_responses.pop(code, [None])
+
+
+def test_poll_reports_only_a_growing_message_count():
+    imap = FakeImap(exists=4)
+    conn = PooledConnection(imap, 7, 10, exists=4)
+    watcher = IdleWatcher(pool=None, on_new_mail=lambda: None, poll_interval=0)
+
+    # The SELECT's EXISTS is still collected: not new mail
+    assert not watcher._poll(conn)
+    assert not watcher._poll(conn)
+
+    # Collected while the connection was used elsewhere, count unchanged
+    imap.untagged_responses['EXISTS'] = [b'4']
+    assert not watcher._poll(conn)
+
+    imap.arrivals.append(5)
+    assert watcher._poll(conn)
+    assert not watcher._poll(conn)
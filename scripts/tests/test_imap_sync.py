@@ -0,0 +1,89 @@
+"""
+Tests for the incremental IMAP sync's high-water mark
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.imap_sync import ImapSync
+
+
+class FakeMailbox:
+    """Answers the UID SEARCH and UID FETCH commands ImapSync sends"""
+
+    def __init__(self, uids):
+        self.uids = list(uids)
+
+    def uid(self, command, *args):
+        if command == 'SEARCH':
+            criteria = args[1]
+            if criteria.startswith('UID '):
+                low = int(criteria[4:].split(':')[0])
+                found = [uid for uid in self.uids if uid >= low] or self.uids[-1:]
+            else:
+                found = self.uids
+            return 'OK', [' '.join(map(str, found)).encode()]
+        if command == 'FETCH':
+            data = []
+            for n, uid in enumerate(int(uid) for part in args[0].split(',') for uid in _expand(part)):
+                header = f"Subject: message {uid}\r\nFrom: a@example.com\r\n\r\n".encode()
+                data.append((f'{n + 1} (UID {uid} FLAGS () BODY[HEADER] {{{len(header)}}}'.encode(), header))
+                data.append((b' BODY[TEXT]<0> {5}', b'hello'))
+                data.append(b')')
+            return 'OK', data
+        raise AssertionError(command)
+
+
+def _expand(part):
+    if ':' in part:
+        low, high = map(int, part.split(':'))
+        return range(low, high + 1)
+    return [int(part)]
+
+
+def _sync(tmp_path, mailbox):
+    sync = ImapSync('imap.example.com', 'user', 'secret', tmp_path / 'state.json', initial_days=3)
+    sync._conn = mailbox
+    sync._uidvalidity = 7
+    return sync
+
+
+def _new_uids(sync):
+    return [message.uid for message in sync._fetch_new(None)]
+
+
+def test_failed_message_is_fetched_again(tmp_path):
+    mailbox = FakeMailbox([3, 5, 6, 9])
+    sync = _sync(tmp_path, mailbox)
+    assert _new_uids(sync) == [3, 5, 6, 9]
+
+    # 5 fails; the others are handled
+    for uid in (3, 6, 9):
+        sync.mark_seen(uid)
+    assert sync.state.get(sync.key)['last_uid'] == 4
+    assert _new_uids(sync) == [5]
+
+    sync.mark_seen(5)
+    assert sync.state.get(sync.key)['last_uid'] == 9
+    assert _new_uids(sync) == []
+
+
+def test_gap_survives_restart(tmp_path):
+    mailbox = FakeMailbox([10, 11, 12])
+    sync = _sync(tmp_path, mailbox)
+    assert _new_uids(sync) == [10, 11, 12]
+    sync.mark_seen(12)
+
+    restarted = _sync(tmp_path, mailbox)
+    assert _new_uids(restarted) == [10, 11]
+
+
+def test_limit_leaves_rest_for_next_sync(tmp_path):
+    mailbox = FakeMailbox([1, 2, 3, 4])
+    sync = _sync(tmp_path, mailbox)
+    first = [message.uid for message in sync._fetch_new(2)]
+    for uid in first:
+        sync.mark_seen(uid)
+    assert first == [1, 2]
+    assert _new_uids(sync) == [3, 4]
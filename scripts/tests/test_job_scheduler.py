@@ -0,0 +1,55 @@
+"""
+Tests for one-shot jobs across scheduler restarts
+"""
+import sys
+import time
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.job_scheduler import JobScheduler
+
+
+def test_date_job_does_not_fire_again_after_restart(tmp_path):
+    state_path = tmp_path / 'state.json'
+    run_at = datetime.now() + timedelta(seconds=0.2)
+    ran = threading.Event()
+    calls = []
+
+    def job():
+        calls.append(time.time())
+        ran.set()
+
+    scheduler = JobScheduler('first', state_path=state_path)
+    scheduler.add_job('once', job, at=run_at)
+    scheduler.start()
+    try:
+        assert ran.wait(5)
+        time.sleep(0.2)
+    finally:
+        scheduler.stop()
+    assert len(calls) == 1
+
+    restarted = JobScheduler('second', state_path=state_path)
+    restarted.add_job('once', job, at=run_at)
+    assert restarted.get_job('once') is None
+    restarted.start()
+    try:
+        time.sleep(0.5)
+    finally:
+        restarted.stop()
+    assert len(calls) == 1
+
+
+def test_date_job_with_new_time_is_scheduled(tmp_path):
+    state_path = tmp_path / 'state.json'
+    scheduler = JobScheduler('first', state_path=state_path)
+    scheduler._state['once'] = {'trigger': f"at:{datetime(2020, 1, 1).isoformat()}",
+                                'next_run': None, 'completed': True}
+
+    run_at = datetime.now() + timedelta(hours=1)
+    job = scheduler.add_job('once', lambda: None, at=run_at)
+    assert scheduler.get_job('once') is job
+    assert job.next_run == run_at
@@ -0,0 +1,94 @@
+"""
+Tests for the publish ledger: one key per note across publishers, and one
+claim per key across processes
+"""
+import sys
+import importlib
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.publish_ledger import PublishLedger, PUBLISHED, content_key
+
+NOTE = """---
+type: linkedin_post
+platform: linkedin
+---
+
+# LinkedIn Post
+
+## Post Content
+
+Shipping the new onboarding flow today.
+
+## Notes
+
+- Approved by marketing
+"""
+
+
+def test_publishers_share_content_key(tmp_path, monkeypatch):
+    vault = tmp_path / 'vault'
+    (vault / 'Done').mkdir(parents=True)
+    note_path = vault / 'Done' / 'LINKEDIN_POST_1.md'
+    note_path.write_text(NOTE, encoding='utf-8')
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('VAULT_PATH', str(vault))
+    poster = importlib.import_module('src.core.safe_platform_poster')
+    processor = importlib.import_module('src.core.auto_processor')
+    from src.core.vault_notes import load_note
+
+    note = load_note(note_path)
+    processor_text = processor.ApprovedFileHandler.extract_post_content(None, note.content)
+    item = poster.extract_content(note_path)
+
+    assert processor_text == 'Shipping the new onboarding flow today.'
+    assert content_key('linkedin', processor_text, note.frontmatter) == \
+        content_key(item['platform'], item['ledger_content'], item['metadata'])
+
+
+def _claim(path, results):
+    results.put(PublishLedger(path).begin('same-key', 'linkedin', source='race') is None)
+
+
+def test_begin_claims_once_across_processes(tmp_path):
+    path = tmp_path / '.publish_ledger.jsonl'
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    workers = [context.Process(target=_claim, args=(path, results)) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    claims = [results.get(timeout=5) for _ in workers]
+    assert claims.count(True) == 1
+
+
+def _publish(path, start, count):
+    ledger = PublishLedger(path)
+    for n in range(start, start + count):
+        key = f"key-{n}"
+        assert ledger.begin(key, 'twitter') is None
+        ledger.complete(key, {'platform': 'twitter', 'tweet_id': n})
+
+
+def test_compaction_keeps_concurrent_appends(tmp_path):
+    path = tmp_path / '.publish_ledger.jsonl'
+    context = multiprocessing.get_context('spawn')
+    writers = [context.Process(target=_publish, args=(path, start, 300)) for start in (0, 1000)]
+    for writer in writers:
+        writer.start()
+
+    ledger = PublishLedger(path)
+    while any(writer.is_alive() for writer in writers):
+        ledger.compact()
+    for writer in writers:
+        writer.join(30)
+        assert writer.exitcode == 0
+
+    fresh = PublishLedger(path)
+    for n in list(range(300)) + list(range(1000, 1300)):
+        entry = fresh.lookup(f"key-{n}")
+        assert entry is not None and entry['status'] == PUBLISHED
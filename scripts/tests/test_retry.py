@@ -0,0 +1,25 @@
+"""
+Tests for the blocking retry bridge
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.retry import RetryPolicy, retry_sync
+
+
+def test_timeout_error_from_func_is_raised_with_cancel_event():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise TimeoutError("read timed out")
+
+    policy = RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01)
+    with pytest.raises(TimeoutError, match="read timed out"):
+        retry_sync(fetch, policy=policy, cancel_event=threading.Event())
+    assert len(calls) == 2
@@ -1,9 +1,14 @@
 import json
 import psutil
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.vault_index import get_vault_index
+
 # Paths
 ROOT_DIR = Path(__file__).parent.parent
 LOGS_DIR = ROOT_DIR / "Logs"
@@ -19,14 +24,7 @@ def get_system_stats():
 def get_workflow_counts():
     """Count files in workflow directories."""
     folders = ['Inbox', 'Needs_Action', 'Pending_Approval', 'Approved', 'Done', 'Failed']
-    counts = {}
-    for folder in folders:
-        path = ROOT_DIR / folder
-        if path.exists():
-            counts[folder] = len(list(path.glob('*.*')))
-        else:
-            counts[folder] = 0
-    return counts
+    return get_vault_index(ROOT_DIR).counts(folders)
 
 def get_schedule_status():
     """Get the latest schedule status from Logs."""
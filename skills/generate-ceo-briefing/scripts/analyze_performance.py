@@ -19,6 +19,10 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core.vault_index import get_vault_index
+
 
 class PerformanceAnalyzer:
     """Analyzes business performance across financial, operational, social, and goal dimensions."""
@@ -26,6 +30,14 @@ class PerformanceAnalyzer:
     def __init__(self, vault_path: str = "Vault"):
         self.vault_path = Path(vault_path)
         self.today = datetime.now()
+        self._vault_index = None
+
+    @property
+    def vault_index(self):
+        """Vault index, synced on first use when no indexer is running."""
+        if self._vault_index is None:
+            self._vault_index = get_vault_index(self.vault_path)
+        return self._vault_index
 
     def analyze(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
                 period: str = "weekly") -> Dict[str, Any]:
@@ -149,15 +161,11 @@ class PerformanceAnalyzer:
             print(f"    Warning: {done_folder} not found")
             return self._empty_operational_data()
 
-        # Count completed tasks in period
+        # Count completed tasks in period (by modification time, from the vault index)
         completed_tasks = []
         if done_folder.exists():
-            for task_file in done_folder.glob("*.md"):
-                # Check file modification time or parse metadata
-                mtime = datetime.fromtimestamp(task_file.stat().st_mtime)
-                if start_date <= mtime <= end_date:
-                    task_data = self._parse_task_metadata(task_file)
-                    completed_tasks.append(task_data)
+            for note in self.vault_index.query("Done", ext=".md", modified_after=start_date, modified_before=end_date):
+                completed_tasks.append(self._parse_task_metadata(note))
 
         completed_count = len(completed_tasks)
 
@@ -166,7 +174,7 @@ class PerformanceAnalyzer:
         avg_cycle_time = sum(cycle_times) / len(cycle_times) if cycle_times else 0
 
         # Count active and overdue tasks
-        active_count = len(list(active_folder.glob("*.md"))) if active_folder.exists() else 0
+        active_count = self.vault_index.count("Tasks/Active", ext=".md") if active_folder.exists() else 0
         overdue_tasks = self._count_overdue_tasks(active_folder) if active_folder.exists() else {"high": 0, "medium": 0, "low": 0}
 
         # Completion rate
@@ -200,11 +208,9 @@ class PerformanceAnalyzer:
 
         # Find processed emails in period
         processed_emails = []
-        for email_file in done_folder.glob("EMAIL_*.md"):
-            mtime = datetime.fromtimestamp(email_file.stat().st_mtime)
-            if start_date <= mtime <= end_date:
-                email_data = self._parse_email_metadata(email_file)
-                processed_emails.append(email_data)
+        for note in self.vault_index.query("Done", prefix="EMAIL_", ext=".md",
+                                           modified_after=start_date, modified_before=end_date):
+            processed_emails.append(self._parse_email_metadata(note))
 
         processed_count = len(processed_emails)
 
@@ -224,10 +230,7 @@ class PerformanceAnalyzer:
         needs_action_folder = self.vault_path / "Needs_Action"
         pending_high_priority = 0
         if needs_action_folder.exists():
-            for email_file in needs_action_folder.glob("EMAIL_*.md"):
-                metadata = self._parse_email_metadata(email_file)
-                if metadata.get("priority") == "high":
-                    pending_high_priority += 1
+            pending_high_priority = self.vault_index.count("Needs_Action", prefix="EMAIL_", ext=".md", priority="high")
 
         print(f"    ✓ Processed: {processed_count} emails")
         print(f"    ✓ Avg response time: {avg_response_time:.1f} hours")
@@ -496,14 +499,14 @@ class PerformanceAnalyzer:
                 categories[category] = categories.get(category, 0) + abs(t["amount"])
         return categories
 
-    def _parse_task_metadata(self, task_file: Path) -> Dict:
-        """Parse task metadata from task file."""
-        content = task_file.read_text(encoding='utf-8')
-        # Would parse YAML frontmatter
-        return {
-            "title": task_file.stem,
+    def _parse_task_metadata(self, note: Dict) -> Dict:
+        """Parse task metadata from a vault index entry."""
+        metadata = {
+            "title": Path(note["name"]).stem,
             "actual_duration": 3  # Placeholder
         }
+        metadata.update(note["frontmatter"])
+        return metadata
 
     def _count_overdue_tasks(self, active_folder: Path) -> Dict:
         """Count overdue tasks by priority."""
@@ -511,12 +514,13 @@ class PerformanceAnalyzer:
         # Would parse each task and check due_date
         return overdue
 
-    def _parse_email_metadata(self, email_file: Path) -> Dict:
-        """Parse email metadata."""
-        # Would parse YAML frontmatter
-        return {
+    def _parse_email_metadata(self, note: Dict) -> Dict:
+        """Parse email metadata from a vault index entry."""
+        metadata = {
             "response_time": 12  # Placeholder (hours)
         }
+        metadata.update(note["frontmatter"])
+        return metadata
 
     def _aggregate_social_summary(self, platform_data: Dict) -> Dict:
         """Aggregate social media summary across platforms."""
@@ -19,6 +19,10 @@ from pathlib import Path
 from typing import Dict, List, Any
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core import vault_notes
+
 
 class BottleneckDetector:
     """Detects bottlenecks across process, financial, and communication dimensions."""
@@ -278,14 +282,15 @@ class BottleneckDetector:
     def _parse_task_metadata(self, task_file: Path) -> Dict:
         """Parse task metadata from file."""
         try:
-            content = task_file.read_text(encoding='utf-8')
-            # Simplified - would parse YAML frontmatter
-            return {
+            note = vault_notes.load_note(task_file)
+            metadata = {
                 "title": task_file.stem,
                 "expected_duration": 3,  # Placeholder
                 "actual_duration": 5,  # Placeholder
-                "notes": content[:200]  # First 200 chars
+                "notes": note.content[:200]  # First 200 chars
             }
+            metadata.update(note.frontmatter)
+            return metadata
         except:
             return {}
 
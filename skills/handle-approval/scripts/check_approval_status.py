@@ -25,32 +25,24 @@ from datetime import datetime, timezone
 from typing import Dict, List, Any
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
 
-def parse_frontmatter(content: str) -> Dict[str, Any]:
-    """Extract YAML frontmatter from markdown file."""
-    if not content.startswith('---'):
-        return {}
+from src.core import vault_notes
 
-    try:
-        # Find the second ---
-        end_index = content.find('---', 3)
-        if end_index == -1:
-            return {}
-
-        frontmatter_text = content[3:end_index].strip()
-
-        # Simple YAML parser (basic key: value pairs)
-        metadata = {}
-        for line in frontmatter_text.split('\n'):
-            line = line.strip()
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip()
-
-        return metadata
-    except Exception as e:
-        print(f"Warning: Error parsing frontmatter: {e}", file=sys.stderr)
-        return {}
+
+def _as_text(value: Any) -> str:
+    """Render a frontmatter value the way it was written."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def parse_frontmatter(content: str) -> Dict[str, Any]:
+    """Extract YAML frontmatter from markdown file (values as strings)."""
+    metadata = vault_notes.parse_frontmatter(content)
+    return {str(key): _as_text(value) for key, value in metadata.items()}
 
 
 def is_expired(expires_str: str) -> bool:
@@ -100,11 +92,12 @@ def scan_folder(folder_path: Path) -> List[Dict[str, Any]]:
 
     for file_path in folder_path.glob("APPROVAL_*.md"):
         try:
-            content = file_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
+            # Cached parse; unchanged approvals are not re-read
+            note = vault_notes.load_note(file_path)
+            metadata = {str(key): _as_text(value) for key, value in note.frontmatter.items()}
 
             # Extract action summary (first heading after frontmatter)
-            summary_match = re.search(r'## Action Summary\s+(.+?)(?:\n|$)', content)
+            summary_match = re.search(r'## Action Summary\s+(.+?)(?:\n|$)', note.body)
             summary = summary_match.group(1).strip() if summary_match else "No summary"
 
             approval_info = {
@@ -6,19 +6,29 @@ Monitors logs for errors and implements recovery procedures
 
 import json
 import os
+import sys
 import time
+import asyncio
 import subprocess
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 import requests
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core.retry import backoff_delay
+from src.core.retry_queue import RetryQueue
+
 
 # Configuration
 VAULT_PATH = Path(os.getenv('VAULT_PATH', 'D:/AI_Employee_Vault'))
 LOG_DIR = VAULT_PATH / 'Logs'
 INCIDENT_LOG_DIR = LOG_DIR / 'system' / 'incidents'
 
+# Seconds one error's recovery may take before it is abandoned
+RECOVERY_DEADLINE = float(os.getenv('RECOVERY_DEADLINE', '300'))
+
 # Error classification
 ERROR_CATALOG = {
     'PROC_CRASH': {'severity': 'HIGH', 'category': 'process', 'max_attempts': 3},
@@ -75,8 +85,8 @@ class ErrorHandler:
                 'max_attempts': 1
             }
 
-    def attempt_recovery(self, error: Dict) -> bool:
-        """Attempt to recover from error"""
+    async def attempt_recovery(self, error: Dict) -> bool:
+        """Attempt to recover from error (waits yield to other recoveries)"""
         error_type = error.get('error_code', error.get('event_type', 'UNKNOWN'))
         classification = self.classify_error(error)
 
@@ -99,14 +109,18 @@ class ErrorHandler:
         success = False
         recovery_method = None
 
-        if classification['category'] == 'process':
-            success, recovery_method = self.recover_process_error(error)
-        elif classification['category'] == 'api':
-            success, recovery_method = self.recover_api_error(error)
-        elif classification['category'] == 'network':
-            success, recovery_method = self.recover_network_error(error)
-        elif classification['category'] == 'filesystem':
-            success, recovery_method = self.recover_filesystem_error(error)
+        recover = {
+            'process': self.recover_process_error,
+            'api': self.recover_api_error,
+            'network': self.recover_network_error,
+            'filesystem': self.recover_filesystem_error,
+        }.get(classification['category'])
+
+        if recover:
+            try:
+                success, recovery_method = await asyncio.wait_for(recover(error), timeout=RECOVERY_DEADLINE)
+            except asyncio.TimeoutError:
+                success, recovery_method = False, 'recovery_deadline_exceeded'
 
         # Update attempt tracking
         attempt_info['count'] += 1
@@ -126,17 +140,16 @@ class ErrorHandler:
 
         return success
 
-    def recover_process_error(self, error: Dict) -> tuple:
+    async def recover_process_error(self, error: Dict) -> tuple:
         """Recover from process errors"""
         component = error.get('component', '')
 
-        # Wait for exponential backoff
+        # Wait for exponential backoff (full jitter, max 60 seconds)
         attempt_num = self.recovery_attempts.get(
             f"{error.get('error_code', '')}_{component}",
             {'count': 0}
         )['count']
-        wait_time = min(5 * (2 ** attempt_num), 60)  # Max 60 seconds
-        time.sleep(wait_time)
+        await asyncio.sleep(backoff_delay(attempt_num, 5, 60))
 
         # Attempt to restart process
         try:
@@ -144,7 +157,7 @@ class ErrorHandler:
             script_path = f"{component}.py"
             if os.path.exists(script_path):
                 subprocess.Popen(['python3', script_path])
-                time.sleep(5)  # Wait for startup
+                await asyncio.sleep(5)  # Wait for startup
 
                 # Verify process started
                 pid_file = f'/tmp/{component}.pid'
@@ -156,7 +169,7 @@ class ErrorHandler:
 
         return False, 'auto_restart_failed'
 
-    def recover_api_error(self, error: Dict) -> tuple:
+    async def recover_api_error(self, error: Dict) -> tuple:
         """Recover from API errors"""
         error_code = error.get('error_code', '')
 
@@ -173,22 +186,26 @@ class ErrorHandler:
             return True, 'queued_for_retry'
 
         elif error_code == 'API_TIMEOUT':
-            # Retry with exponential backoff
+            # Retry with exponential backoff (full jitter, max 30 seconds),
+            # or as long as the API asked for
             attempt_num = self.recovery_attempts.get(
                 f"API_TIMEOUT_{error.get('component', '')}",
                 {'count': 0}
             )['count']
-            wait_time = min(2 ** attempt_num, 30)
-            time.sleep(wait_time)
+            wait_time = backoff_delay(attempt_num, 1, 30)
+            retry_after = error.get('metadata', {}).get('retry_after_seconds')
+            if retry_after:
+                wait_time = max(wait_time, min(float(retry_after), RECOVERY_DEADLINE))
+            await asyncio.sleep(wait_time)
             return True, 'retry_with_backoff'
 
         return False, 'no_recovery_method'
 
-    def recover_network_error(self, error: Dict) -> tuple:
+    async def recover_network_error(self, error: Dict) -> tuple:
         """Recover from network errors"""
         # Test connectivity
         try:
-            response = requests.get('https://www.google.com', timeout=5)
+            response = await asyncio.to_thread(requests.get, 'https://www.google.com', timeout=5)
             if response.status_code == 200:
                 return True, 'network_restored'
         except:
@@ -198,7 +215,7 @@ class ErrorHandler:
         self.queue_operation(error, retry_after=300)  # Retry in 5 minutes
         return False, 'network_still_down_queued'
 
-    def recover_filesystem_error(self, error: Dict) -> tuple:
+    async def recover_filesystem_error(self, error: Dict) -> tuple:
         """Recover from filesystem errors"""
         error_code = error.get('error_code', '')
 
@@ -209,7 +226,7 @@ class ErrorHandler:
 
         elif error_code == 'FS_VAULT_LOCKED':
             # Wait and retry
-            time.sleep(60)
+            await asyncio.sleep(60)
             try:
                 test_file = VAULT_PATH / '.access_test'
                 test_file.write_text('test')
@@ -238,7 +255,37 @@ class ErrorHandler:
             return False
 
     def queue_operation(self, error: Dict, retry_after: int):
-        """Queue failed operation for retry later"""
+        """
+        Queue failed operation for retry later
+
+        Failed posts (metadata names a file or platform) are deferred in the
+        vault's retry queue, which the auto processor replays; anything else
+        is appended to the operation queue log for manual follow-up.
+        """
+        metadata = error.get('metadata', {}) or {}
+        filename = metadata.get('file') or metadata.get('filename')
+        platform = metadata.get('platform')
+
+        if filename or platform:
+            queue = RetryQueue(VAULT_PATH)
+            try:
+                if filename:
+                    name = Path(filename).name
+                    if queue.defer(name, retry_after):
+                        return
+                    failed_path = VAULT_PATH / 'Failed' / name
+                    if failed_path.exists():
+                        queue.record_failure(name, failed_path, {
+                            'error': error.get('message') or error.get('error_code', 'unknown error'),
+                            'retryable': True,
+                            'retry_after': retry_after
+                        }, platform=platform)
+                        return
+                elif queue.defer_platform(platform, retry_after):
+                    return
+            finally:
+                queue.close()
+
         queue_file = VAULT_PATH / 'Logs' / 'system' / 'operation_queue.json'
 
         operation = {
@@ -361,26 +408,38 @@ def main():
 
     print(f"Found {len(errors)} errors to process")
 
-    # Process each error
+    # Errors for different components recover concurrently; errors sharing a
+    # component are handled in order so their attempt counts stay consistent
+    groups: Dict[str, List[Dict]] = {}
     for error in errors:
-        print(f"Processing: {error.get('error_code', 'UNKNOWN')} - {error.get('component', 'unknown')}")
-
-        # Attempt recovery
-        success = handler.attempt_recovery(error)
+        error_key = f"{error.get('error_code', '')}_{error.get('component', '')}"
+        groups.setdefault(error_key, []).append(error)
+
+    async def process_group(group: List[Dict]):
+        for error in group:
+            label = f"{error.get('error_code', 'UNKNOWN')} - {error.get('component', 'unknown')}"
+
+            # Attempt recovery
+            success = await handler.attempt_recovery(error)
+
+            if not success:
+                # Check if we should escalate
+                error_key = f"{error.get('error_code', '')}_{error.get('component', '')}"
+                attempt_info = handler.recovery_attempts.get(error_key, {'count': 0})
+                classification = handler.classify_error(error)
+
+                if attempt_info['count'] >= classification['max_attempts']:
+                    print(f"{label}: Escalating - max recovery attempts exceeded")
+                    handler.escalate_error(error, 'Max recovery attempts exceeded')
+                else:
+                    print(f"{label}: Recovery failed, will retry (attempt {attempt_info['count']}/{classification['max_attempts']})")
+            else:
+                print(f"{label}: Recovery successful")
 
-        if not success:
-            # Check if we should escalate
-            error_key = f"{error.get('error_code', '')}_{error.get('component', '')}"
-            attempt_info = handler.recovery_attempts.get(error_key, {'count': 0})
-            classification = handler.classify_error(error)
+    async def process_all():
+        await asyncio.gather(*(process_group(group) for group in groups.values()))
 
-            if attempt_info['count'] >= classification['max_attempts']:
-                print(f"  Escalating: Max recovery attempts exceeded")
-                handler.escalate_error(error, 'Max recovery attempts exceeded')
-            else:
-                print(f"  Recovery failed: Will retry (attempt {attempt_info['count']}/{classification['max_attempts']})")
-        else:
-            print(f"  Recovery successful")
+    asyncio.run(process_all())
 
 
 if __name__ == '__main__':
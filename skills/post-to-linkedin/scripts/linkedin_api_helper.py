@@ -29,6 +29,10 @@ from datetime import datetime
 from typing import Dict, Optional, Tuple
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core import vault_notes
+
 # Configure logging
 # Use absolute path or create logs directory if needed
 import os
@@ -115,23 +119,14 @@ class LinkedInAPIHelper:
         if not file_path.exists():
             raise FileNotFoundError(f"Approval file not found: {file_path}")
 
-        content = file_path.read_text(encoding='utf-8')
+        # Extract YAML frontmatter (shared cached parser)
+        note = vault_notes.load_note(file_path)
 
-        # Extract YAML frontmatter
-        yaml_match = re.match(r'^---\s*\n(.*?)\n---\s*\n(.*)$', content, re.DOTALL)
-
-        if not yaml_match:
+        if not note.has_frontmatter:
             raise ValueError("Invalid approval file format: Missing YAML frontmatter")
 
-        yaml_content = yaml_match.group(1)
-        body_content = yaml_match.group(2)
-
-        # Parse YAML manually (simple key: value parsing)
-        metadata = {}
-        for line in yaml_content.split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip()
+        metadata = note.frontmatter
+        body_content = note.body
 
         # Extract post content from body
         # Look for "## Post Content" section
@@ -252,7 +247,7 @@ class LinkedInAPIHelper:
             logger.info(f"Platform: {metadata.get('platform', 'unknown')}")
 
             # Validate it's a LinkedIn post
-            if metadata.get('platform', '').lower() != 'linkedin':
+            if str(metadata.get('platform') or '').lower() != 'linkedin':
                 raise ValueError(f"Invalid platform: {metadata.get('platform')} (expected 'linkedin')")
 
             # Publish post
@@ -338,7 +333,7 @@ Examples:
 
         # Output results
         if args.json:
-            print(json.dumps(result, indent=2))
+            print(json.dumps(result, indent=2, default=str))
         else:
             # Human-readable output
             print("\n" + "=" * 60)
@@ -6,7 +6,7 @@ Publishes approved posts to Facebook Business Pages via Facebook Graph API.
 Supports text posts, image posts, and dry-run mode for testing.
 
 Requirements:
-    pip install requests python-dotenv pyyaml
+    pip install requests python-dotenv
 
 Setup:
     1. Create Facebook App: https://developers.facebook.com/apps/
@@ -29,13 +29,16 @@ from pathlib import Path
 from typing import Dict, Optional, Tuple
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core import vault_notes
+
 try:
     import requests
-    import yaml
     from dotenv import load_dotenv
 except ImportError:
     print("ERROR: Required packages not installed.")
-    print("Install with: pip install requests python-dotenv pyyaml")
+    print("Install with: pip install requests python-dotenv")
     sys.exit(1)
 
 # Load environment variables
@@ -78,20 +81,14 @@ class FacebookAPIHelper:
             Dict containing post content and metadata
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Split frontmatter and body
-            if content.startswith('---'):
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
-                    frontmatter = yaml.safe_load(parts[1])
-                    body = parts[2].strip()
-                else:
-                    raise ValueError("Invalid frontmatter format")
-            else:
+            # Split frontmatter and body (shared cached parser)
+            note = vault_notes.load_note(file_path)
+            if not note.has_frontmatter:
                 raise ValueError("No frontmatter found in approval file")
 
+            frontmatter = note.frontmatter
+            body = note.body.strip()
+
             # Extract Facebook post content from body
             fb_content = None
             lines = body.split('\n')
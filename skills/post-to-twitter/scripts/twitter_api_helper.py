@@ -52,6 +52,10 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core import vault_notes
+
 try:
     import tweepy
     from dotenv import load_dotenv
@@ -268,18 +272,13 @@ class TwitterAPIHelper:
         if not file_path.exists():
             raise FileNotFoundError(f"Approval file not found: {file_path}")
 
-        content = file_path.read_text(encoding='utf-8')
-
-        # Extract frontmatter
-        frontmatter_match = re.search(r'^---\s*\n(.*?)\n---', content, re.DOTALL | re.MULTILINE)
-        if not frontmatter_match:
+        # Extract frontmatter (shared cached parser)
+        note = vault_notes.load_note(file_path)
+        if not note.has_frontmatter:
             raise ValueError("Invalid approval file format (missing frontmatter)")
 
-        frontmatter = {}
-        for line in frontmatter_match.group(1).split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                frontmatter[key.strip()] = value.strip()
+        content = note.content
+        frontmatter = note.frontmatter
 
         # Validate frontmatter
         if frontmatter.get('platform') != 'twitter':
@@ -21,6 +21,10 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core import vault_notes
+
 
 class EmailMetadataParser:
     """Parser for EMAIL_*.md files with YAML frontmatter."""
@@ -74,17 +78,14 @@ class EmailMetadataParser:
 
     def _parse_frontmatter(self, content: str) -> None:
         """Extract YAML frontmatter from email file."""
-        # Match YAML frontmatter pattern
-        frontmatter_pattern = r'^---\s*\n(.*?)\n---\s*\n'
-        match = re.search(frontmatter_pattern, content, re.DOTALL)
+        frontmatter_text, _ = vault_notes.split_frontmatter(content)
 
-        if not match:
+        if frontmatter_text is None:
             raise ValueError("No YAML frontmatter found in email file")
 
-        yaml_content = match.group(1)
-
         try:
-            self.metadata = yaml.safe_load(yaml_content)
+            # Shared parser caches by frontmatter content
+            self.metadata = vault_notes.parse_frontmatter(content, strict=True)
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML frontmatter: {e}")
 
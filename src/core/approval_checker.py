@@ -5,10 +5,25 @@ import os
 import json
 import datetime
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from enum import Enum
+from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.approval_rules import ApprovalRuleEngine, RequestFeatures
+from src.core.approval_store import ApprovalStore, LEVEL, STATUS, CATEGORY
+
+# Batches smaller than this are evaluated in-process (a pool costs more than it saves)
+BATCH_PARALLEL_MIN = int(os.getenv('APPROVAL_BATCH_PARALLEL_MIN', '200'))
+
+# Requests sent to a worker process at a time
+BATCH_CHUNK_SIZE = int(os.getenv('APPROVAL_BATCH_CHUNK_SIZE', '100'))
+
 class ApprovalLevel(Enum):
     AUTO_APPROVE = "Auto-approve"
     MANAGER_APPROVAL = "Manager approval"
@@ -46,79 +61,117 @@ class ApprovalChecker:
             'vendor payments', 'subscription renewals', 'equipment purchases',
             'service contracts', 'travel expenses', 'marketing expenditures'
         ]
+        # Default categories, checked in order after the special ones
+        self.CATEGORY_KEYWORDS = [
+            ('Financial Transaction', ['invoice', 'payment', 'bill']),
+            ('Purchase Request', ['purchase', 'buy', 'acquire', 'equipment']),
+            ('Travel Expense', ['travel', 'trip', 'flight', 'hotel', 'expense']),
+            ('Subscription', ['subscription', 'renewal', 'membership']),
+            ('Marketing Expenditure', ['marketing', 'advertising', 'promotion']),
+            ('Service Contract', ['service', 'contract', 'consultant']),
+        ]
+        self.JUSTIFICATION_INDICATORS = [
+            'business need', 'justification', 'reason for', 'purpose of',
+            'required for', 'needed for', 'benefit of', 'ROI', 'return on investment'
+        ]
+        # Common phishing/fraud indicators
+        self.FRAUD_INDICATORS = [
+            'urgent action required', 'verify account', 'suspicious activity',
+            'click here', 'act now', 'limited time', 'wire transfer immediately'
+        ]
+        self.REGULATORY_KEYWORDS = ['international', 'foreign', 'overseas']
         self.APPROVED_VENDORS_FILE = "approved_vendors.json"
         self.APPROVAL_LOGS_FILE = "Logs/approval_logs.log"
 
+        self._approved_vendors_cache = None
+        self.compile_rules()
+
         # Ensure logs directory exists
         os.makedirs("Logs", exist_ok=True)
 
-    def analyze_request_for_monetary_value(self, content: str) -> List[float]:
+        # Seed the store from the text log before this checker appends to it,
+        # so no decision is both imported and recorded
+        self._approval_store: Optional[ApprovalStore] = ApprovalStore.beside_log(self.APPROVAL_LOGS_FILE)
+        self._approval_store.import_log(self.APPROVAL_LOGS_FILE)
+
+    def __getstate__(self):
+        # Batch workers get a copy of the checker; the store's connection stays here
+        state = self.__dict__.copy()
+        state['_approval_store'] = None
+        return state
+
+    @property
+    def approval_store(self) -> ApprovalStore:
+        """Structured decision store next to the text log (reopened in batch workers)"""
+        if self._approval_store is None:
+            self._approval_store = ApprovalStore.beside_log(self.APPROVAL_LOGS_FILE)
+        return self._approval_store
+
+    def compile_rules(self):
         """
-        Extract monetary amounts from text
+        Build the rule engine from the keyword lists above
+
+        Every keyword list goes into one automaton, so a request is scanned
+        once however many rules use it. Call again after changing a list.
         """
-        # Pattern to match currency amounts like $100, $1,000.50, €50, etc.
-        currency_pattern = r'(?:[$€£¥]\s*)?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)(?:\s*[a-zA-Z]{0,3})?|(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:[$€£¥])'
-        matches = re.findall(currency_pattern, content)
+        groups = {'special': [category.lower() for category in self.SPECIAL_CATEGORIES]}
+        for category, words in self.CATEGORY_KEYWORDS:
+            groups[category] = words
+        groups['justification'] = self.JUSTIFICATION_INDICATORS
+        groups['fraud'] = self.FRAUD_INDICATORS
+        groups['policy'] = ['cash advance', 'large amount']
+        groups['regulatory'] = self.REGULATORY_KEYWORDS
 
-        amounts = []
-        for match_group in matches:
-            for match in match_group:
-                if match:  # Skip empty strings
-                    try:
-                        amount = float(match.replace(',', ''))
-                        amounts.append(amount)
-                    except ValueError:
-                        continue
+        self.rules = ApprovalRuleEngine(groups, justification_group='justification')
+        self._last_features: Optional[Tuple[str, RequestFeatures]] = None
 
-        return amounts
+    def extract_features(self, content: str) -> RequestFeatures:
+        """
+        Signals for a request, extracted once
+
+        The checks below all read from this; the last request's features are
+        kept so calling several checks on the same text does not rescan it.
+        """
+        cached = self._last_features
+        if cached is not None and cached[0] == content:
+            return cached[1]
+        features = self.rules.extract(content)
+        self._last_features = (content, features)
+        return features
+
+    def analyze_request_for_monetary_value(self, content: str) -> List[float]:
+        """
+        Extract monetary amounts from text
+        """
+        # Currency amounts like $100, $1,000.50, €50, etc.
+        return list(self.extract_features(content).amounts)
 
     def identify_request_category(self, content: str) -> str:
         """
         Identify request type and category
         """
-        content_lower = content.lower()
+        features = self.extract_features(content)
 
         # Check for special categories
-        for category in self.SPECIAL_CATEGORIES:
-            if category.lower() in content_lower:
-                return category.title()
+        special = features.first('special', [category.lower() for category in self.SPECIAL_CATEGORIES])
+        if special:
+            return special.title()
 
         # Default categories
-        if any(word in content_lower for word in ['invoice', 'payment', 'bill']):
-            return 'Financial Transaction'
-        elif any(word in content_lower for word in ['purchase', 'buy', 'acquire', 'equipment']):
-            return 'Purchase Request'
-        elif any(word in content_lower for word in ['travel', 'trip', 'flight', 'hotel', 'expense']):
-            return 'Travel Expense'
-        elif any(word in content_lower for word in ['subscription', 'renewal', 'membership']):
-            return 'Subscription'
-        elif any(word in content_lower for word in ['marketing', 'advertising', 'promotion']):
-            return 'Marketing Expenditure'
-        elif any(word in content_lower for word in ['service', 'contract', 'consultant']):
-            return 'Service Contract'
-        else:
-            return 'General Request'
+        for category, _ in self.CATEGORY_KEYWORDS:
+            if features.has(category):
+                return category
+        return 'General Request'
 
     def cross_reference_with_vendor(self, content: str) -> Dict[str, Any]:
         """
         Cross-reference with vendor/recipient
         """
-        # Extract potential vendor names
-        vendor_patterns = [
-            r'from\s+([A-Z][a-zA-Z\s]+)',  # "from Company Name"
-            r'to\s+([A-Z][a-zA-Z\s]+)',    # "to Company Name"
-            r'payment\s+to\s+([A-Z][a-zA-Z\s]+)',  # "payment to Company Name"
-        ]
-
-        vendors = []
-        for pattern in vendor_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            vendors.extend(matches)
-
-        vendors = list(set(vendors))  # Remove duplicates
+        # Potential vendor names ("from X", "to X", "payment to X")
+        vendors = list(self.extract_features(content).vendors)
 
         # Check if vendors are approved
-        approved_vendors = self.get_approved_vendors()
+        approved_vendors = self._approved_vendor_set()
         result = {
             'mentioned_vendors': vendors,
             'all_approved': all(vendor in approved_vendors for vendor in vendors) if vendors else True,
@@ -144,21 +197,11 @@ class ApprovalChecker:
         """
         Verify business justification
         """
-        justification_indicators = [
-            'business need', 'justification', 'reason for', 'purpose of',
-            'required for', 'needed for', 'benefit of', 'ROI', 'return on investment'
-        ]
-
-        content_lower = content.lower()
-        has_justification = any(indicator in content_lower for indicator in justification_indicators)
+        features = self.extract_features(content)
+        has_justification = features.has('justification')
 
-        # Extract potential justification text
-        justification_text = ""
-        sentences = content.split('.')
-        for sentence in sentences:
-            if any(indicator in sentence.lower() for indicator in justification_indicators):
-                justification_text = sentence.strip()
-                break
+        # First sentence containing an indicator
+        justification_text = features.justification_text
 
         return {
             'has_justification': has_justification,
@@ -245,13 +288,7 @@ class ApprovalChecker:
         Verify request authenticity
         """
         # Check for common phishing/fraud indicators
-        fraud_indicators = [
-            'urgent action required', 'verify account', 'suspicious activity',
-            'click here', 'act now', 'limited time', 'wire transfer immediately'
-        ]
-
-        content_lower = content.lower()
-        has_fraud_indicators = any(indicator in content_lower for indicator in fraud_indicators)
+        has_fraud_indicators = self.extract_features(content).has('fraud')
 
         if has_fraud_indicators:
             return False
@@ -268,8 +305,7 @@ class ApprovalChecker:
         Validate expense codes
         """
         # Look for expense codes in the format EC-XXXX or EXP-XXXX
-        expense_code_pattern = r'(EC-\w+|EXP-\w+|EXPENSE-\w+)'
-        expense_codes = re.findall(expense_code_pattern, content, re.IGNORECASE)
+        expense_codes = list(self.extract_features(content).expense_codes)
 
         # In a real system, validate against known expense codes
         return expense_codes
@@ -278,12 +314,31 @@ class ApprovalChecker:
         """
         Maintain approval logs
         """
+        self._write_log_entries([self._format_log_entry(request_id, approval_result)])
+
+    def _format_log_entry(self, request_id: str, approval_result: ApprovalResult) -> str:
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"""{timestamp} - APPROVAL_CHECKER - {approval_result.approval_level.value} - Request: {request_id[:20]}... - Amount: ${approval_result.amount} - Status: {approval_result.status.value} - Reason: {approval_result.reason}
+        return f"""{timestamp} - APPROVAL_CHECKER - {approval_result.approval_level.value} - Request: {request_id[:20]}... - Amount: ${approval_result.amount} - Status: {approval_result.status.value} - Reason: {approval_result.reason}
 """
 
+    def _write_log_entries(self, log_entries: List[str]):
+        """Append log lines with a single write"""
+        if not log_entries:
+            return
         with open(self.APPROVAL_LOGS_FILE, 'a', encoding='utf-8') as log_file:
-            log_file.write(log_entry)
+            log_file.write(''.join(log_entries))
+
+    def _decision_record(self, request_id: str, approval_result: ApprovalResult, category: str) -> Dict[str, Any]:
+        return {
+            'request_id': request_id,
+            'level': approval_result.approval_level.value,
+            'status': approval_result.status.value,
+            'category': category,
+            'amount': approval_result.amount,
+            'requires_approval': approval_result.requires_approval,
+            'approver': approval_result.approver,
+            'reason': approval_result.reason
+        }
 
     def ensure_segregation_of_duties(self, approval_result: ApprovalResult) -> bool:
         """
@@ -299,8 +354,8 @@ class ApprovalChecker:
         # Check against common policy violations
         policy_violations = []
 
-        content_lower = content.lower()
-        if 'cash advance' in content_lower and 'large amount' in content_lower:
+        features = self.extract_features(content)
+        if features.has('policy', 'cash advance') and features.has('policy', 'large amount'):
             policy_violations.append('Large cash advance request - violates policy')
 
         # Add more policy checks as needed
@@ -314,8 +369,7 @@ class ApprovalChecker:
         # Check for regulatory compliance issues
         regulatory_issues = []
 
-        content_lower = content.lower()
-        if any(word in content_lower for word in ['international', 'foreign', 'overseas']):
+        if self.extract_features(content).has('regulatory'):
             regulatory_issues.append('International transaction - may require additional compliance')
 
         return regulatory_issues
@@ -335,18 +389,22 @@ class ApprovalChecker:
         # For this demo, we'll just log to the same file
         self.maintain_approval_logs(request_id, approval_result, content)
 
-    def send_approval_notification(self, approval_result: ApprovalResult, content: str, request_id: str) -> bool:
+    def send_approval_notification(self, approval_result: ApprovalResult, content: str, request_id: str,
+                                   category: Optional[str] = None) -> bool:
         """
         Send approval requests to appropriate authority
         """
         try:
+            if category is None:
+                category = self.identify_request_category(content)
+
             # Create approval request notification
             notification_content = f"""
 APPROVAL REQUEST
 
 Request ID: {request_id}
 Amount: ${approval_result.amount}
-Category: {self.identify_request_category(content)}
+Category: {category}
 Requested by: System
 Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
@@ -371,23 +429,29 @@ Please review and approve or reject this request.
         """
         Update dashboard with approval status
         """
+        self._add_dashboard_activity([self._dashboard_activity_entry(approval_result)])
+
+    def _dashboard_activity_entry(self, approval_result: ApprovalResult) -> str:
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        return f"- {timestamp}: Approval request for ${approval_result.amount} ({approval_result.approval_level.value})\n"
+
+    def _add_dashboard_activity(self, activity_entries: List[str]):
+        """Put entries at the top of the recent activity log (newest first) in one rewrite"""
         # Read current dashboard
         dashboard_path = "Dashboard.md"
-        if os.path.exists(dashboard_path):
+        if activity_entries and os.path.exists(dashboard_path):
             with open(dashboard_path, 'r', encoding='utf-8') as f:
                 dashboard_content = f.read()
 
             # Update the appropriate section
             # For this demo, we'll just append to the recent activity log
-            import re
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-            activity_entry = f"- {timestamp}: Approval request for ${approval_result.amount} ({approval_result.approval_level.value})\n"
+            new_entries = ''.join(reversed(activity_entries))
 
             # Find and update the recent activity section
             pattern = r'(## 📅 Recent Activity Log\n)(.*?)(\n\n|$)'
             updated_content = re.sub(
                 pattern,
-                rf'\g<1>{activity_entry}\g<2>\g<3>',
+                lambda match: match.group(1) + new_entries + match.group(2) + match.group(3),
                 dashboard_content,
                 flags=re.DOTALL
             )
@@ -417,6 +481,17 @@ Please review and approve or reject this request.
                 "PayPal", "Stripe", "Bank of America", "Chase", "Wells Fargo"
             ]
 
+    def _approved_vendor_set(self) -> set:
+        """Approved vendors as a set, re-read only when the vendors file changes"""
+        try:
+            mtime = os.path.getmtime(self.APPROVED_VENDORS_FILE)
+        except OSError:
+            mtime = None
+        cache_key = (self.APPROVED_VENDORS_FILE, mtime)
+        if self._approved_vendors_cache is None or self._approved_vendors_cache[0] != cache_key:
+            self._approved_vendors_cache = (cache_key, set(self.get_approved_vendors()))
+        return self._approved_vendors_cache[1]
+
     def check_compliance(self, content: str) -> Dict[str, Any]:
         """
         Perform comprehensive compliance check
@@ -443,6 +518,35 @@ Please review and approve or reject this request.
         if request_id is None:
             request_id = f"REQ_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
+        result, approval_result = self.evaluate_request(content, request_id)
+        if approval_result is None:
+            return result
+
+        try:
+            # Step 4: Generate approval notification if needed (from approval workflow)
+            self._send_notification_for(result, approval_result, content)
+
+            # Step 5: Update dashboard with approval status
+            self.update_dashboard_with_status(request_id, approval_result)
+
+            # Step 6: Log approval requirement in system
+            self.maintain_approval_logs(request_id, approval_result, content)
+            self.maintain_audit_trail(request_id, approval_result, content)
+            self.approval_store.record_many([self._decision_record(request_id, approval_result, result['category'])])
+
+            return result
+
+        except Exception as e:
+            return self._error_result(request_id, e)
+
+    def evaluate_request(self, content: str, request_id: str) -> Tuple[Dict[str, Any], Optional[ApprovalResult]]:
+        """
+        Run the checks and approval rules for a request without side effects
+
+        Returns:
+            (result, approval_result); approval_result is None when the
+            request was blocked or failed, and result says why
+        """
         try:
             # Step 1: Analyze request for monetary value
             amounts = self.analyze_request_for_monetary_value(content)
@@ -470,7 +574,7 @@ Please review and approve or reject this request.
                     'amounts_found': amounts,
                     'category': category,
                     'status': 'Blocked - Authentication Failed'
-                }
+                }, None
 
             # Apply approval rules
             approval_result = self.apply_approval_rules(amounts, category, vendor_info)
@@ -484,19 +588,6 @@ Please review and approve or reject this request.
                 approval_result.approval_level = ApprovalLevel.SPECIAL_APPROVAL
                 approval_result.reason += " (Compliance issues detected)"
 
-            # Step 4: Generate approval notification if needed (from approval workflow)
-            notification_sent = False
-            if approval_result.requires_approval:
-                notification_sent = self.send_approval_notification(approval_result, content, request_id)
-                approval_result.notification_sent = notification_sent
-
-            # Step 5: Update dashboard with approval status
-            self.update_dashboard_with_status(request_id, approval_result)
-
-            # Step 6: Log approval requirement in system
-            self.maintain_approval_logs(request_id, approval_result, content)
-            self.maintain_audit_trail(request_id, approval_result, content)
-
             result = {
                 'success': True,
                 'request_id': request_id,
@@ -510,7 +601,7 @@ Please review and approve or reject this request.
                     'approver': approval_result.approver,
                     'status': approval_result.status.value,
                     'reason': approval_result.reason,
-                    'notification_sent': notification_sent
+                    'notification_sent': False
                 },
                 'vendor_info': vendor_info,
                 'budget_info': budget_info,
@@ -519,60 +610,144 @@ Please review and approve or reject this request.
                 'message': f"Approval check completed. Level: {approval_result.approval_level.value}"
             }
 
-            return result
+            return result, approval_result
 
         except Exception as e:
-            return {
-                'success': False,
-                'request_id': request_id,
-                'error': str(e),
-                'message': 'Approval check failed due to error'
-            }
+            return self._error_result(request_id, e), None
+
+    def _send_notification_for(self, result: Dict[str, Any], approval_result: ApprovalResult, content: str):
+        if approval_result.requires_approval:
+            notification_sent = self.send_approval_notification(
+                approval_result, content, result['request_id'], category=result['category']
+            )
+            approval_result.notification_sent = notification_sent
+            result['approval_result']['notification_sent'] = notification_sent
+
+    def _error_result(self, request_id: str, error: Exception) -> Dict[str, Any]:
+        return {
+            'success': False,
+            'request_id': request_id,
+            'error': str(error),
+            'message': 'Approval check failed due to error'
+        }
 
-    def batch_process_requests(self, requests: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    def batch_process_requests(self, requests: List[Dict[str, str]], workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Process multiple requests in batch
+
+        Requests are evaluated in a process pool (each worker gets a copy of
+        this checker, with its compiled rules and vendor cache, once), then
+        notifications are sent and the dashboard, approval log and audit
+        trail are each written once for the whole batch.
+
+        Args:
+            requests: Dicts with 'content' and optional 'id'
+            workers: Worker processes (default: CPU count; 1 evaluates in-process)
         """
-        results = []
+        items = []
         for request in requests:
-            content = request.get('content', '')
             req_id = request.get('id', None)
-            result = self.process_approval_request(content, req_id)
+            if req_id is None:
+                req_id = f"REQ_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            items.append((request.get('content', ''), req_id))
+
+        # Load reference data before workers copy the checker
+        self._approved_vendor_set()
+        evaluated = self._evaluate_batch(items, workers)
+
+        results = []
+        log_entries = []
+        activity_entries = []
+        decisions = []
+        for (content, req_id), (result, approval_result) in zip(items, evaluated):
+            if approval_result is not None:
+                try:
+                    self._send_notification_for(result, approval_result, content)
+                    activity_entries.append(self._dashboard_activity_entry(approval_result))
+                    # Approval log line, then the audit trail line
+                    log_entries.append(self._format_log_entry(req_id, approval_result))
+                    log_entries.append(self._format_log_entry(req_id, approval_result))
+                    decisions.append(self._decision_record(req_id, approval_result, result['category']))
+                except Exception as e:
+                    result = self._error_result(req_id, e)
             results.append(result)
 
+        try:
+            self._add_dashboard_activity(activity_entries)
+        except Exception:
+            pass  # The dashboard is informational; the logs below are the record
+        self._write_log_entries(log_entries)
+        if decisions:
+            self.approval_store.record_many(decisions)
+
         return results
 
+    def _evaluate_batch(self, items: List[Tuple[str, str]], workers: Optional[int]) -> List[Tuple[Dict[str, Any], Optional[ApprovalResult]]]:
+        workers = workers or os.cpu_count() or 1
+        chunks = [items[start:start + BATCH_CHUNK_SIZE] for start in range(0, len(items), BATCH_CHUNK_SIZE)]
+        workers = min(workers, len(chunks))
+
+        if workers > 1 and len(items) >= BATCH_PARALLEL_MIN:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                         initargs=(self,)) as pool:
+                    evaluated = []
+                    for chunk_results in pool.map(_evaluate_batch_chunk, chunks):
+                        evaluated.extend(chunk_results)
+                    return evaluated
+            except (OSError, BrokenProcessPool):
+                pass  # No usable process pool here; evaluate in-process
+
+        return [self.evaluate_request(content, req_id) for content, req_id in items]
+
     def get_approval_statistics(self) -> Dict[str, Any]:
         """
         Get approval statistics for reporting
-        """
-        if not os.path.exists(self.APPROVAL_LOGS_FILE):
-            return {
-                'total_requests': 0,
-                'auto_approved': 0,
-                'manager_approved': 0,
-                'executive_approved': 0,
-                'rejected': 0
-            }
 
-        with open(self.APPROVAL_LOGS_FILE, 'r', encoding='utf-8') as f:
-            logs = f.read()
+        Read from the approval store's running counters, so the cost does
+        not grow with the length of the approval history.
+        """
+        counters = self.approval_store.counters()
+        levels = counters[LEVEL]
+        statuses = counters[STATUS]
 
-        total_requests = logs.count('APPROVAL_CHECKER')
-        auto_approved = logs.count('Auto-approve')
-        manager_approved = logs.count('Manager approval')
-        executive_approved = logs.count('Executive approval')
-        rejected = logs.count('Rejected')
+        def count(values: Dict[str, Dict[str, float]], key: str) -> int:
+            return values.get(key, {}).get('count', 0)
 
         return {
-            'total_requests': total_requests,
-            'auto_approved': auto_approved,
-            'manager_approved': manager_approved,
-            'executive_approved': executive_approved,
-            'rejected': rejected,
+            'total_requests': count(counters['total'], ''),
+            'auto_approved': count(levels, ApprovalLevel.AUTO_APPROVE.value),
+            'manager_approved': count(levels, ApprovalLevel.MANAGER_APPROVAL.value),
+            'executive_approved': count(levels, ApprovalLevel.EXECUTIVE_APPROVAL.value),
+            'rejected': count(statuses, ApprovalStatus.REJECTED.value),
+            'by_level': {value: entry['count'] for value, entry in levels.items()},
+            'by_status': {value: entry['count'] for value, entry in statuses.items()},
+            'by_category': {value: entry['count'] for value, entry in counters[CATEGORY].items()},
             'last_updated': datetime.datetime.now().isoformat()
         }
 
+    def get_approval_trend(self, granularity: str = 'day', limit: int = 30, by: str = None) -> List[Dict[str, Any]]:
+        """
+        Decisions per hour/day/month bucket, newest first, from the store's rollups
+
+        Args:
+            by: Split each bucket by 'level', 'status' or 'category'
+        """
+        return self.approval_store.trend(granularity, limit=limit, dimension=by)
+
+
+# Batch worker state: each pool process evaluates with its own copy of the checker
+_batch_checker: Optional[ApprovalChecker] = None
+
+
+def _init_batch_worker(checker: ApprovalChecker):
+    global _batch_checker
+    _batch_checker = checker
+
+
+def _evaluate_batch_chunk(items: List[Tuple[str, str]]) -> List[Tuple[Dict[str, Any], Optional[ApprovalResult]]]:
+    return [_batch_checker.evaluate_request(content, req_id) for content, req_id in items]
+
 
 # Example usage:
 if __name__ == "__main__":
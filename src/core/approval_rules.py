@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Approval Rules - Precompiled signal extraction for the approval checker
+Compiles every keyword list into one trie-shaped regex (an Aho-Corasick
+style automaton run by the re engine) and the structural patterns once, so
+a request's text is scanned a fixed number of times however many rules
+consume the result
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Regex matching the longest of words at a position, with shared prefixes factored out"""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            # Greedy optional: the longer keyword is preferred
+            return '(?:' + body + ')?'
+        return body
+
+    return emit(trie)
+
+
+class KeywordAutomaton:
+    """
+    Finds every occurrence of many keywords, grouped by purpose, in one scan
+
+    A zero-width lookahead lets matches overlap; at each position the
+    longest keyword matches, and shorter keywords that are its prefixes are
+    added from a precomputed table, which is what an Aho-Corasick output
+    function gives. Keywords match as plain substrings of the text.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.groups: Dict[str, List[str]] = {name: list(words) for name, words in groups.items()}
+        self._keyword_groups: Dict[str, List[str]] = {}
+        for name, words in self.groups.items():
+            for word in words:
+                if word:
+                    self._keyword_groups.setdefault(word, []).append(name)
+
+        keywords = list(self._keyword_groups)
+        self._prefixes: Dict[str, List[str]] = {
+            word: [other for other in keywords if other != word and word.startswith(other)]
+            for word in keywords
+        }
+        self._pattern = re.compile('(?=(' + _trie_regex(keywords) + '))') if keywords else None
+
+    def scan(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        Returns:
+            {group: {keyword: position of its first occurrence}} for the
+            keywords found in text
+        """
+        hits: Dict[str, Dict[str, int]] = {name: {} for name in self.groups}
+        if self._pattern is None:
+            return hits
+
+        # findall keeps the scan in C; positions are looked up only for the
+        # (few) distinct keywords that occur
+        found = set()
+        for longest in set(self._pattern.findall(text)):
+            if longest:
+                found.add(longest)
+                found.update(self._prefixes[longest])
+        for word in found:
+            position = text.find(word)
+            for name in self._keyword_groups[word]:
+                hits[name][word] = position
+        return hits
+
+
+@dataclass
+class RequestFeatures:
+    """Everything the approval rules need from one request's text"""
+    amounts: List[float] = field(default_factory=list)
+    # {group: {keyword: first position}} from the keyword automaton
+    keywords: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    vendors: List[str] = field(default_factory=list)
+    expense_codes: List[str] = field(default_factory=list)
+    justification_text: str = ''
+
+    def has(self, group: str, keyword: str = None) -> bool:
+        found = self.keywords.get(group, {})
+        return keyword in found if keyword is not None else bool(found)
+
+    def first(self, group: str, order: Iterable[str]) -> Optional[str]:
+        """First keyword of order (not of the text) that was found in group"""
+        found = self.keywords.get(group, {})
+        return next((word for word in order if word in found), None)
+
+
+# Structural patterns, compiled once
+CURRENCY_PATTERN = re.compile(
+    r'(?:[$€£¥]\s*)?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)(?:\s*[a-zA-Z]{0,3})?|(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:[$€£¥])'
+)
+VENDOR_PATTERNS = [
+    re.compile(r'from\s+([A-Z][a-zA-Z\s]+)', re.IGNORECASE),        # "from Company Name"
+    re.compile(r'to\s+([A-Z][a-zA-Z\s]+)', re.IGNORECASE),          # "to Company Name"
+    re.compile(r'payment\s+to\s+([A-Z][a-zA-Z\s]+)', re.IGNORECASE),  # "payment to Company Name"
+]
+EXPENSE_CODE_PATTERN = re.compile(r'(EC-\w+|EXP-\w+|EXPENSE-\w+)', re.IGNORECASE)
+
+
+class ApprovalRuleEngine:
+    """Compiled keyword groups and patterns; extract() builds a request's features"""
+
+    def __init__(self, keyword_groups: Dict[str, Iterable[str]], justification_group: str = None):
+        """
+        Args:
+            keyword_groups: Keyword lists by group name (matched against lowercased text)
+            justification_group: Group whose first hit marks the justification sentence
+        """
+        self.automaton = KeywordAutomaton(keyword_groups)
+        self.justification_group = justification_group
+
+    def extract(self, content: str) -> RequestFeatures:
+        features = RequestFeatures()
+
+        for match_group in CURRENCY_PATTERN.findall(content):
+            for match in match_group:
+                if match:  # Skip empty strings
+                    try:
+                        features.amounts.append(float(match.replace(',', '')))
+                    except ValueError:
+                        continue
+
+        content_lower = content.lower()
+        features.keywords = self.automaton.scan(content_lower)
+
+        vendors = []
+        for pattern in VENDOR_PATTERNS:
+            vendors.extend(pattern.findall(content))
+        features.vendors = list(set(vendors))
+
+        features.expense_codes = EXPENSE_CODE_PATTERN.findall(content)
+
+        if self.justification_group:
+            features.justification_text = self._justification_sentence(
+                content, content_lower, features.keywords.get(self.justification_group, {})
+            )
+        return features
+
+    def _justification_sentence(self, content: str, content_lower: str, hits: Dict[str, int]) -> str:
+        """The first '.'-separated sentence containing a justification keyword"""
+        if not hits:
+            return ''
+        if len(content_lower) != len(content):
+            # Lowercasing changed offsets (rare Unicode); fall back to a sentence scan
+            for sentence in content.split('.'):
+                if any(word in sentence.lower() for word in hits):
+                    return sentence.strip()
+            return ''
+        position = min(hits.values())
+        start = content.rfind('.', 0, position) + 1
+        end = content.find('.', position)
+        return content[start:end if end != -1 else len(content)].strip()
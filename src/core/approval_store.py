@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Approval Store - Structured, append-only record of approval decisions
+Each decision is one SQLite row; running counters per level, status and
+category and hourly/daily rollups are updated in the same transaction, so
+statistics and trend queries do not depend on how long the history is
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+STORE_FILENAME = 'approval_logs.sqlite'
+
+# Counter dimensions
+TOTAL = 'total'
+LEVEL = 'level'
+STATUS = 'status'
+CATEGORY = 'category'
+
+# Rollup granularities and their bucket formats
+GRANULARITIES = {
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d',
+    'month': '%Y-%m',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS approvals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    level TEXT NOT NULL,
+    status TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL DEFAULT 0,
+    requires_approval INTEGER NOT NULL DEFAULT 0,
+    approver TEXT,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_approvals_request ON approvals (request_id);
+CREATE TABLE IF NOT EXISTS approval_counters (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    amount REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value)
+);
+CREATE TABLE IF NOT EXISTS approval_rollups (
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    level TEXT NOT NULL,
+    status TEXT NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    amount REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket, level, status, category)
+);
+"""
+
+# A line of the legacy text log written by ApprovalChecker
+_LOG_LINE = re.compile(
+    r'^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - APPROVAL_CHECKER - (?P<level>.+?) - '
+    r'Request: (?P<request>.*?)\.\.\. - Amount: \$(?P<amount>[\d.]+) - Status: (?P<status>.+?) - Reason: (?P<reason>.*)$'
+)
+
+
+class ApprovalStore:
+    """SQLite-backed approval history with running counters and time rollups"""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    @classmethod
+    def beside_log(cls, log_file) -> 'ApprovalStore':
+        """Store at APPROVAL_STORE_DB or next to the text approval log"""
+        return cls(os.getenv('APPROVAL_STORE_DB') or Path(log_file).with_name(STORE_FILENAME))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -- writing ------------------------------------------------------------
+
+    def record(self, request_id: str, level: str, status: str, category: str, amount: float = 0.0,
+               requires_approval: bool = False, approver: str = None, reason: str = None,
+               ts: float = None) -> int:
+        """Record one decision; returns its row id"""
+        return self.record_many([{
+            'request_id': request_id, 'level': level, 'status': status, 'category': category,
+            'amount': amount, 'requires_approval': requires_approval, 'approver': approver,
+            'reason': reason, 'ts': ts
+        }])[0]
+
+    def record_many(self, decisions: Iterable[Dict[str, Any]]) -> List[int]:
+        """Record decisions (dicts with record()'s arguments) in one transaction"""
+        ids = []
+        with self._lock:
+            try:
+                self._conn.execute('BEGIN IMMEDIATE')
+                for decision in decisions:
+                    ids.append(self._insert(decision))
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return ids
+
+    def _insert(self, decision: Dict[str, Any]) -> int:
+        """Insert a row and bump its counters and rollups (inside a transaction)"""
+        ts = decision.get('ts') or time.time()
+        level = decision['level']
+        status = decision['status']
+        category = decision.get('category') or 'Unknown'
+        amount = float(decision.get('amount') or 0)
+
+        cursor = self._conn.execute("""
+            INSERT INTO approvals (request_id, ts, level, status, category, amount, requires_approval, approver, reason)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (decision['request_id'], ts, level, status, category, amount,
+              1 if decision.get('requires_approval') else 0, decision.get('approver'), decision.get('reason')))
+
+        for dimension, value in ((TOTAL, ''), (LEVEL, level), (STATUS, status), (CATEGORY, category)):
+            self._conn.execute("""
+                INSERT INTO approval_counters (dimension, value, count, amount) VALUES (?, ?, 1, ?)
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1, amount = amount + excluded.amount
+            """, (dimension, value, amount))
+
+        moment = datetime.fromtimestamp(ts)
+        for granularity, fmt in GRANULARITIES.items():
+            self._conn.execute("""
+                INSERT INTO approval_rollups (granularity, bucket, level, status, category, count, amount)
+                VALUES (?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT (granularity, bucket, level, status, category)
+                DO UPDATE SET count = count + 1, amount = amount + excluded.amount
+            """, (granularity, moment.strftime(fmt), level, status, category, amount))
+
+        return cursor.lastrowid
+
+    def import_log(self, log_file) -> int:
+        """
+        Load a legacy text approval log into an empty store
+
+        The checker wrote each decision twice (approval log, then audit
+        trail); the second line of each identical pair is skipped. Categories were not logged and
+        are recorded as 'Unknown'.
+        """
+        log_file = Path(log_file)
+        if not log_file.exists() or not self.is_empty():
+            return 0
+
+        decisions = []
+        previous = None
+        with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                match = _LOG_LINE.match(line.rstrip('\n'))
+                if not match:
+                    continue
+                key = match.group('level', 'request', 'amount', 'status', 'reason')
+                if key == previous:
+                    # The audit copy of the line before; a third identical
+                    # line starts the next decision's pair
+                    previous = None
+                    continue
+                previous = key
+                try:
+                    ts = datetime.strptime(match.group('ts'), '%Y-%m-%d %H:%M:%S').timestamp()
+                    amount = float(match.group('amount'))
+                except ValueError:
+                    continue
+                decisions.append({
+                    'request_id': match.group('request'), 'level': match.group('level'),
+                    'status': match.group('status'), 'category': 'Unknown', 'amount': amount,
+                    'reason': match.group('reason'), 'ts': ts
+                })
+
+        if decisions:
+            self.record_many(decisions)
+            logger.info(f"[APPROVALS] Imported {len(decisions)} decision(s) from {log_file}")
+        return len(decisions)
+
+    # -- reading ------------------------------------------------------------
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM approvals LIMIT 1').fetchone() is None
+
+    def counters(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{dimension: {value: {'count', 'amount'}}} from the running counters"""
+        with self._lock:
+            rows = self._conn.execute('SELECT dimension, value, count, amount FROM approval_counters').fetchall()
+        counters: Dict[str, Dict[str, Dict[str, float]]] = {TOTAL: {}, LEVEL: {}, STATUS: {}, CATEGORY: {}}
+        for row in rows:
+            counters.setdefault(row['dimension'], {})[row['value']] = {'count': row['count'], 'amount': row['amount']}
+        return counters
+
+    def count(self, dimension: str = TOTAL, value: str = '') -> int:
+        with self._lock:
+            row = self._conn.execute('SELECT count FROM approval_counters WHERE dimension = ? AND value = ?',
+                                     (dimension, value)).fetchone()
+        return row['count'] if row else 0
+
+    def trend(self, granularity: str = 'day', since: str = None, limit: int = 30,
+              dimension: str = None) -> List[Dict[str, Any]]:
+        """
+        Totals per time bucket, newest first
+
+        Args:
+            granularity: 'hour', 'day' or 'month'
+            since: Oldest bucket to include (same format as the buckets)
+            limit: Max buckets
+            dimension: Also split each bucket by LEVEL, STATUS or CATEGORY
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if dimension not in (None, LEVEL, STATUS, CATEGORY):
+            raise ValueError(f"Unknown dimension: {dimension}")
+
+        with self._lock:
+            buckets = [row['bucket'] for row in self._conn.execute("""
+                SELECT DISTINCT bucket FROM approval_rollups
+                WHERE granularity = ? AND bucket >= ? ORDER BY bucket DESC LIMIT ?
+            """, (granularity, since or '', limit)).fetchall()]
+            if not buckets:
+                return []
+            split = f', {dimension}' if dimension else ''
+            rows = self._conn.execute(f"""
+                SELECT bucket{split}, SUM(count) AS count, SUM(amount) AS amount FROM approval_rollups
+                WHERE granularity = ? AND bucket BETWEEN ? AND ?
+                GROUP BY bucket{split} ORDER BY bucket DESC{split}
+            """, (granularity, buckets[-1], buckets[0])).fetchall()
+        return [dict(row) for row in rows]
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM approvals ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def main():
+    """CLI for approval statistics and trends"""
+    parser = argparse.ArgumentParser(description='Approval decision store')
+    parser.add_argument('action', choices=['stats', 'trend', 'recent', 'import'], help='What to do')
+    parser.add_argument('--db', default=os.getenv('APPROVAL_STORE_DB') or str(Path('Logs') / STORE_FILENAME),
+                        help='Store path')
+    parser.add_argument('--granularity', choices=sorted(GRANULARITIES), default='day', help='Trend bucket size')
+    parser.add_argument('--by', choices=[LEVEL, STATUS, CATEGORY], help='Split trend buckets by')
+    parser.add_argument('--log', default=str(Path('Logs') / 'approval_logs.log'), help='Text log to import')
+    parser.add_argument('--limit', type=int, default=30, help='Max rows')
+    args = parser.parse_args()
+
+    store = ApprovalStore(args.db)
+
+    if args.action == 'stats':
+        print(json.dumps(store.counters(), indent=2))
+    elif args.action == 'trend':
+        for row in store.trend(args.granularity, limit=args.limit, dimension=args.by):
+            split = f"  {row[args.by]:<24}" if args.by else ''
+            print(f"{row['bucket']:<16}{split} {row['count']:>6}  ${row['amount']:,.2f}")
+    elif args.action == 'recent':
+        for row in store.recent(args.limit):
+            when = datetime.fromtimestamp(row['ts']).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"{when}  {row['level']:<18} {row['status']:<9} ${row['amount']:<10} {row['category']}  {row['request_id']}")
+    elif args.action == 'import':
+        print(f"Imported {store.import_log(args.log)} decision(s)")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
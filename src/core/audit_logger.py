@@ -9,11 +9,16 @@ import sys
 import json
 import logging
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any, Optional, List, Union
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Union, Iterator, Tuple
 import traceback
 import codecs
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.audit_sink import get_audit_writer
+from src.core.audit_summary import iter_lines, on_audit_write, summary_path, update_summary
+
 # Register custom codec for reading files with emoji content
 try:
     codecs.lookup('cp15040')
@@ -48,6 +53,18 @@ class AuditLogger:
 
         self.logger = logging.getLogger(__name__)
 
+        # Shared background writer: batches lines and flushes at exit
+        self.writer = get_audit_writer()
+        self.writer.add_listener(on_audit_write)
+
+    def flush(self, timeout: float = 10) -> bool:
+        """Write and fsync every queued audit line"""
+        return self.writer.flush(timeout)
+
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Queued, written and dropped line counters for monitoring"""
+        return self.writer.stats()
+
     def log_action(self, action_type: str, actor: str, details: Dict[str, Any], status: str = "success"):
         """
         Log a specific action
@@ -58,8 +75,9 @@ class AuditLogger:
             details: Additional details about the action
             status: Status of the action (success, failed, pending)
         """
+        now = datetime.now()
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "action_type": action_type,
             "actor": actor,
             "status": status,
@@ -67,8 +85,9 @@ class AuditLogger:
         }
 
         try:
-            with open(self.daily_log_file, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            # Serialize now so later changes to details can't leak into the log
+            log_file = self.logs_path / f"audit_{now.strftime('%Y%m%d')}.jsonl"
+            self.writer.write(log_file, json.dumps(log_entry, default=str))
 
             self.logger.info(f"{action_type}: {status}")
         except Exception as e:
@@ -172,8 +191,7 @@ class AuditLogger:
         }
 
         try:
-            with open(self.error_log_file, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            self.writer.write(self.error_log_file, json.dumps(log_entry, default=str))
 
             self.logger.error(f"{error_type}: {error_message}")
         except Exception as e:
@@ -225,48 +243,145 @@ class AuditLogger:
                 "shutdown_time": datetime.now().isoformat()
             }
         )
+        self.flush()
 
     def get_daily_summary(self, date: datetime = None) -> Dict[str, Any]:
-        """Get daily activity summary"""
+        """Get daily activity summary (from the day's summary sidecar)"""
         if date is None:
             date = datetime.now()
 
         log_file = self.logs_path / f"audit_{date.strftime('%Y%m%d')}.jsonl"
+        self.flush()
 
         if not log_file.exists():
             return {"error": "No logs found for date"}
 
-        summary = {
+        try:
+            daily = update_summary(log_file)
+        except Exception as e:
+            self.logger.error(f"Failed to generate daily summary: {e}")
+            daily = {}
+
+        return {
             "date": date.strftime("%Y-%m-%d"),
-            "total_actions": 0,
-            "actions_by_type": {},
-            "actions_by_status": {},
-            "errors": 0
+            "total_actions": daily.get("total_actions", 0),
+            "actions_by_type": daily.get("actions_by_type", {}),
+            "actions_by_status": daily.get("actions_by_status", {}),
+            "actions_by_actor": daily.get("actions_by_actor", {}),
+            "errors": daily.get("errors", 0)
         }
 
-        try:
-            with open(log_file, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        entry = json.loads(line)
-                        summary["total_actions"] += 1
+    def _daily_files(self, start_date: datetime, end_date: datetime):
+        """Yield (date, log file) for each day in range that has a log"""
+        current_date = datetime(start_date.year, start_date.month, start_date.day)
+        while current_date <= end_date:
+            daily_file = self.logs_path / f"audit_{current_date.strftime('%Y%m%d')}.jsonl"
+            if daily_file.exists():
+                yield current_date, daily_file
+            current_date += timedelta(days=1)
 
-                        action_type = entry.get("action_type", "unknown")
-                        summary["actions_by_type"][action_type] = summary["actions_by_type"].get(action_type, 0) + 1
+    def iter_actions(self, start_date: datetime, end_date: datetime, action_type: str = None,
+                     actor: str = None, status: str = None, since: datetime = None,
+                     until: datetime = None, cursor: str = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream audit entries in date order without loading whole files
 
-                        status = entry.get("status", "unknown")
-                        summary["actions_by_status"][status] = summary["actions_by_status"].get(status, 0) + 1
+        Days whose summary shows no matching entries are skipped unread.
 
-                        if action_type == "error" or status == "failed":
-                            summary["errors"] += 1
+        Args:
+            start_date: First day to read
+            end_date: Last day to read
+            action_type: Only entries of this action type
+            actor: Only entries from this actor
+            status: Only entries with this status
+            since: Only entries at or after this time
+            until: Only entries at or before this time
+            cursor: Resume after a cursor returned by query_actions()
+
+        Yields:
+            (cursor, entry) - the cursor points just past the entry
+        """
+        self.flush()
+        resume_day, resume_offset = None, 0
+        if cursor:
+            resume_day, _, offset_str = cursor.partition(':')
+            resume_offset = int(offset_str or 0)
+
+        since_str = since.isoformat() if since else None
+        until_str = until.isoformat() if until else None
+
+        # Cheap substring checks before json.loads (entries are written with json.dumps)
+        needles = [json.dumps(value) for value in (action_type, actor, status) if value]
+
+        for day, log_file in self._daily_files(start_date, end_date):
+            day_key = day.strftime('%Y%m%d')
+            if resume_day and day_key < resume_day:
+                continue
+
+            daily = update_summary(log_file)
+            if ((action_type and not daily["actions_by_type"].get(action_type)) or
+                    (status and not daily["actions_by_status"].get(status)) or
+                    (actor and not daily["actions_by_actor"].get(actor))):
+                continue
+
+            offset = resume_offset if day_key == resume_day else 0
+            for position, line in iter_lines(log_file, offset):
+                if not line.strip() or any(needle.encode() not in line for needle in needles):
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
 
-        except Exception as e:
-            self.logger.error(f"Failed to generate daily summary: {e}")
+                if action_type and entry.get("action_type") != action_type:
+                    continue
+                if actor and entry.get("actor") != actor:
+                    continue
+                if status and entry.get("status") != status:
+                    continue
+                timestamp = entry.get("timestamp", "")
+                if since_str and timestamp < since_str:
+                    continue
+                if until_str and timestamp > until_str:
+                    continue
+
+                yield f"{day_key}:{position}", entry
+
+    def query_actions(self, start_date: datetime, end_date: datetime, limit: int = 100,
+                      cursor: str = None, **filters) -> Dict[str, Any]:
+        """
+        Get one page of audit entries
+
+        Args:
+            start_date: First day to read
+            end_date: Last day to read
+            limit: Max entries in the page
+            cursor: next_cursor from the previous page
+            **filters: action_type, actor, status, since, until (see iter_actions)
+
+        Returns:
+            Dict with the entries and next_cursor (None on the last page)
+        """
+        entries = []
+        next_cursor = None
+        for position, entry in self.iter_actions(start_date, end_date, cursor=cursor, **filters):
+            if len(entries) == limit:
+                break
+            entries.append(entry)
+            next_cursor = position
+        else:
+            next_cursor = None
 
-        return summary
+        return {"entries": entries, "count": len(entries), "next_cursor": next_cursor}
 
-    def get_audit_report(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
-        """Generate comprehensive audit report for date range"""
+    def get_audit_report(self, start_date: datetime, end_date: datetime, detail_limit: int = 100) -> Dict[str, Any]:
+        """
+        Generate comprehensive audit report for date range
+
+        Totals come from the daily summary sidecars; detailed_logs holds the
+        first detail_limit entries, with a cursor for query_actions() to page
+        through the rest.
+        """
         report = {
             "period_start": start_date.strftime("%Y-%m-%d"),
             "period_end": end_date.strftime("%Y-%m-%d"),
@@ -280,53 +395,43 @@ class AuditLogger:
                 "tasks_completed": 0,
                 "posts_created": 0
             },
-            "detailed_logs": []
+            "detailed_logs": [],
+            "next_cursor": None
         }
 
-        current_date = start_date
-        while current_date <= end_date:
-            daily_file = self.logs_path / f"audit_{current_date.strftime('%Y%m%d')}.jsonl"
-
-            if daily_file.exists():
-                try:
-                    with open(daily_file, 'r') as f:
-                        for line in f:
-                            if line.strip():
-                                entry = json.loads(line)
-                                report["summary"]["total_actions"] += 1
-
-                                action_type = entry.get("action_type")
-                                report["summary"]["actions_by_type"][action_type] = report["summary"]["actions_by_type"].get(action_type, 0) + 1
-
-                                # Count specific action types
-                                if action_type == "email_processed":
-                                    report["summary"]["emails_processed"] += 1
-                                elif action_type == "task_completed":
-                                    report["summary"]["tasks_completed"] += 1
-                                elif action_type == "social_media_posted":
-                                    report["summary"]["posts_created"] += 1
-                                elif action_type == "mcp_action":
-                                    report["summary"]["mcp_actions"] += 1
-
-                                if entry.get("status") == "failed":
-                                    report["summary"]["errors"] += 1
-
-                                # Add to detailed logs
-                                report["detailed_logs"].append({
-                                    "date": current_date.strftime("%Y-%m-%d"),
-                                    "action": entry
-                                })
-
-                except Exception as e:
-                    self.logger.error(f"Failed to process {daily_file}: {e}")
-
-            current_date += datetime.timedelta(days=1)
+        self.flush()
+        summary = report["summary"]
+        for day, daily_file in self._daily_files(start_date, end_date):
+            try:
+                daily = update_summary(daily_file)
+            except Exception as e:
+                self.logger.error(f"Failed to process {daily_file}: {e}")
+                continue
+
+            summary["total_actions"] += daily["total_actions"]
+            for action_type, count in daily["actions_by_type"].items():
+                summary["actions_by_type"][action_type] = summary["actions_by_type"].get(action_type, 0) + count
+            summary["errors"] += daily["actions_by_status"].get("failed", 0)
+
+        by_type = summary["actions_by_type"]
+        summary["emails_processed"] = by_type.get("email_processed", 0)
+        summary["tasks_completed"] = by_type.get("task_completed", 0)
+        summary["posts_created"] = by_type.get("social_media_posted", 0)
+        summary["mcp_actions"] = by_type.get("mcp_action", 0)
+
+        if detail_limit:
+            page = self.query_actions(start_date, end_date, limit=detail_limit)
+            report["detailed_logs"] = [
+                {"date": entry.get("timestamp", "")[:10], "action": entry}
+                for entry in page["entries"]
+            ]
+            report["next_cursor"] = page["next_cursor"]
 
         return report
 
     def cleanup_old_logs(self, days_to_keep: int = 30):
         """Clean up old log files"""
-        cutoff_date = datetime.now() - datetime.timedelta(days=days_to_keep)
+        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
 
         try:
             for log_file in self.logs_path.glob("audit_*.jsonl"):
@@ -338,6 +443,7 @@ class AuditLogger:
                     file_date = datetime.strptime(date_str, "%Y%m%d")
                     if file_date < cutoff_date:
                         log_file.unlink()
+                        summary_path(log_file).unlink(missing_ok=True)
                         self.logger.info(f"Deleted old log file: {log_file}")
                 except ValueError:
                     continue
@@ -354,6 +460,7 @@ def main():
     parser.add_argument('action', choices=[
         'daily_summary',
         'audit_report',
+        'query',
         'cleanup'
     ], help='Action to perform')
 
@@ -361,6 +468,11 @@ def main():
     parser.add_argument('--start-date', help='Start date for report (YYYY-MM-DD)')
     parser.add_argument('--end-date', help='End date for report (YYYY-MM-DD)')
     parser.add_argument('--days-to-keep', type=int, default=30, help='Days to keep logs')
+    parser.add_argument('--action-type', help='Filter query by action type')
+    parser.add_argument('--actor', help='Filter query by actor')
+    parser.add_argument('--status', help='Filter query by status')
+    parser.add_argument('--limit', type=int, default=100, help='Entries per page')
+    parser.add_argument('--cursor', help='Cursor from the previous page')
 
     args = parser.parse_args()
 
@@ -368,23 +480,30 @@ def main():
 
     if args.action == 'daily_summary':
         if args.date:
-            date = datetime.datetime.strptime(args.date, "%Y-%m-%d")
+            date = datetime.strptime(args.date, "%Y-%m-%d")
         else:
-            date = datetime.datetime.now()
+            date = datetime.now()
 
         summary = logger.get_daily_summary(date)
         print(json.dumps(summary, indent=2))
 
-    elif args.action == 'audit_report':
+    elif args.action in ('audit_report', 'query'):
         if not args.start_date or not args.end_date:
             print(json.dumps({"error": "--start-date and --end-date required"}))
             sys.exit(1)
 
-        start_date = datetime.datetime.strptime(args.start_date, "%Y-%m-%d")
-        end_date = datetime.datetime.strptime(args.end_date, "%Y-%m-%d")
+        start_date = datetime.strptime(args.start_date, "%Y-%m-%d")
+        end_date = datetime.strptime(args.end_date, "%Y-%m-%d")
 
-        report = logger.get_audit_report(start_date, end_date)
-        print(json.dumps(report, indent=2))
+        if args.action == 'audit_report':
+            report = logger.get_audit_report(start_date, end_date, detail_limit=args.limit)
+            print(json.dumps(report, indent=2))
+        else:
+            page = logger.query_actions(
+                start_date, end_date, limit=args.limit, cursor=args.cursor,
+                action_type=args.action_type, actor=args.actor, status=args.status
+            )
+            print(json.dumps(page, indent=2))
 
     elif args.action == 'cleanup':
         logger.cleanup_old_logs(args.days_to_keep)
@@ -392,5 +511,4 @@ def main():
 
 
 if __name__ == '__main__':
-    import datetime
     main()
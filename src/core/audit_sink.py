@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Audit Sink - Buffered, group-committed JSONL writer
+Queues audit lines in memory and appends them from a background thread in
+batches, keeping log files open between batches instead of opening and
+closing a file for every event
+"""
+
+import os
+import time
+import queue
+import atexit
+import signal
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+logger = logging.getLogger(__name__)
+
+
+# fsync policies:
+#   always   - fsync after every batch (survives power loss, slowest)
+#   interval - fsync at most every fsync_interval seconds
+#   never    - leave it to the OS (survives process crashes only)
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+# Open file handles kept between batches (one per active daily file)
+MAX_OPEN_FILES = 8
+
+
+class BufferedJSONLWriter:
+    """Background writer that appends queued lines to JSONL files in batches"""
+
+    def __init__(
+        self,
+        max_queue: int = None,
+        batch_size: int = None,
+        flush_interval: float = None,
+        fsync: str = None,
+        fsync_interval: float = None,
+        block_timeout: float = None
+    ):
+        """
+        Args:
+            max_queue: Max lines buffered in memory before writes are dropped
+            batch_size: Write a batch once this many lines are waiting
+            flush_interval: Write a batch at least this often (seconds)
+            fsync: One of FSYNC_POLICIES
+            fsync_interval: Seconds between fsyncs for the 'interval' policy
+            block_timeout: Seconds write() waits for room in a full queue
+                before dropping the line (0 drops immediately)
+        """
+        self.max_queue = max_queue or int(os.getenv('AUDIT_QUEUE_SIZE', '10000'))
+        self.batch_size = batch_size or int(os.getenv('AUDIT_BATCH_SIZE', '256'))
+        self.flush_interval = flush_interval or float(os.getenv('AUDIT_FLUSH_INTERVAL', '1.0'))
+        self.fsync = (fsync or os.getenv('AUDIT_FSYNC', 'interval')).lower()
+        self.fsync_interval = fsync_interval or float(os.getenv('AUDIT_FSYNC_INTERVAL', '5.0'))
+        self.block_timeout = block_timeout if block_timeout is not None else float(os.getenv('AUDIT_BLOCK_TIMEOUT', '0.05'))
+
+        if self.fsync not in FSYNC_POLICIES:
+            logger.warning(f"Unknown fsync policy '{self.fsync}', using 'interval'")
+            self.fsync = 'interval'
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        self._files: Dict[Path, Any] = {}
+        self._dirty: set = set()
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._listeners: List[Callable[[Path], Any]] = []
+
+        # Counters for monitoring
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.last_flush: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the background writer thread"""
+        with self._lock:
+            if self.running:
+                return
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def add_listener(self, callback: Callable[[Path], Any]):
+        """Call callback(path) on the writer thread after each batch appended to path"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def write(self, path: Path, line: str) -> bool:
+        """
+        Queue one line for appending to a file (thread-safe)
+
+        Returns:
+            True if queued, False if the queue was full and the line was dropped
+        """
+        if self._closed:
+            # Shutting down: write synchronously rather than lose the line
+            self._write_batch([(Path(path), line)])
+            self._sync_files(force=True)
+            self._close_files()
+            return True
+
+        if not self.running:
+            self.start()
+
+        try:
+            if self.block_timeout > 0:
+                self._queue.put((Path(path), line), timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait((Path(path), line))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Audit queue full, dropped {self.dropped} lines so far")
+            return False
+
+    def _run(self):
+        while True:
+            batch, markers, stop = self._collect()
+
+            if batch:
+                self._write_batch(batch)
+
+            if markers or stop:
+                # Explicit flush requests always reach the disk
+                self._sync_files(force=True)
+                for marker in markers:
+                    marker.set()
+            else:
+                self._sync_files()
+
+            if stop:
+                self._close_files()
+                return
+
+    def _collect(self) -> Tuple[List[Tuple[Path, str]], List[threading.Event], bool]:
+        """Wait for a batch: batch_size lines, flush_interval elapsed, or a marker"""
+        batch = []
+        markers = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            if isinstance(item, threading.Event):
+                markers.append(item)
+                break
+            if item is None:
+                return batch + self._drain_nowait(), markers, True
+            batch.append(item)
+
+        return batch, markers, False
+
+    def _drain_nowait(self) -> List[Tuple[Path, str]]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                items.append(item)
+
+    def _handle(self, path: Path):
+        handle = self._files.get(path)
+        if handle is None or handle.closed:
+            if len(self._files) >= MAX_OPEN_FILES:
+                self._close_files()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(path, 'a', encoding='utf-8')
+            self._files[path] = handle
+        return handle
+
+    def _write_batch(self, batch: List[Tuple[Path, str]]):
+        """Append a batch, one write() per file"""
+        grouped: Dict[Path, List[str]] = {}
+        for path, line in batch:
+            grouped.setdefault(path, []).append(line)
+
+        with self._lock:
+            for path, lines in grouped.items():
+                try:
+                    handle = self._handle(path)
+                    handle.write(''.join(line + '\n' for line in lines))
+                    handle.flush()
+                    self._dirty.add(path)
+                    self.written += len(lines)
+                except Exception as e:
+                    self.write_errors += 1
+                    logger.error(f"Failed to write {len(lines)} audit lines to {path}: {e}")
+
+            self.batches += 1
+            self.last_flush = datetime.now().isoformat()
+            listeners = list(self._listeners)
+
+        for path in grouped:
+            for callback in listeners:
+                try:
+                    callback(path)
+                except Exception as e:
+                    logger.warning(f"Audit writer listener failed for {path}: {e}")
+
+    def _sync_files(self, force: bool = False):
+        if not self._dirty or (self.fsync == 'never' and not force):
+            return
+        if self.fsync == 'interval' and not force and time.monotonic() - self._last_fsync < self.fsync_interval:
+            return
+
+        with self._lock:
+            for path in list(self._dirty):
+                handle = self._files.get(path)
+                if handle and not handle.closed:
+                    try:
+                        os.fsync(handle.fileno())
+                    except OSError as e:
+                        logger.warning(f"fsync failed for {path}: {e}")
+            self._dirty.clear()
+            self._last_fsync = time.monotonic()
+
+    def _close_files(self):
+        for path, handle in list(self._files.items()):
+            try:
+                handle.close()
+            except OSError:
+                pass
+        self._files.clear()
+
+    def flush(self, timeout: float = 10) -> bool:
+        """
+        Write and fsync everything queued so far
+
+        Returns:
+            True if the flush completed within the timeout
+        """
+        if not self.running:
+            return True
+
+        marker = threading.Event()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.wait(timeout)
+
+    def close(self, timeout: float = 10):
+        """Flush everything and stop the writer thread"""
+        if not self.running:
+            self._closed = True
+            return
+
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Audit queue still full at shutdown")
+        self._thread.join(timeout)
+
+        # Anything that raced in after the stop marker
+        leftovers = self._drain_nowait()
+        if leftovers:
+            self._write_batch(leftovers)
+            self._sync_files(force=True)
+            self._close_files()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and counters for monitoring"""
+        return {
+            'running': self.running,
+            'queued': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'write_errors': self.write_errors,
+            'fsync': self.fsync,
+            'last_flush': self.last_flush
+        }
+
+
+_writer: Optional[BufferedJSONLWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> BufferedJSONLWriter:
+    """Get the process-wide audit writer, flushed automatically at exit"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BufferedJSONLWriter()
+            _writer.start()
+            atexit.register(_writer.close)
+            _install_signal_flush()
+    return _writer
+
+
+def _install_signal_flush():
+    """
+    Flush the audit queue when the process is terminated
+
+    SIGTERM's default action kills the process without running atexit
+    handlers, so replace it with one that exits normally. Handlers that
+    were installed by the application are left alone.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    for signame in ('SIGTERM', 'SIGBREAK'):
+        signum = getattr(signal, signame, None)
+        if signum is None:
+            continue
+        try:
+            if signal.getsignal(signum) in (signal.SIG_DFL, None):
+                signal.signal(signum, _exit_on_signal)
+        except (ValueError, OSError):
+            continue
+
+
+def _exit_on_signal(signum, frame):
+    raise SystemExit(128 + signum)
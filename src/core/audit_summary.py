@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Audit Summary - Per-day summary sidecars for audit JSONL files
+Each audit_YYYYMMDD.jsonl gets an audit_YYYYMMDD.summary.json holding counts
+by action type, status and actor plus the byte offset it covers, so daily
+summaries and reports only read lines appended since the last update
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+SUMMARY_SUFFIX = '.summary.json'
+
+# Bytes read per chunk while catching a summary up with its log
+READ_CHUNK = 1024 * 1024
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    key = str(path)
+    with _locks_guard:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def is_audit_log(path: Path) -> bool:
+    """True for daily audit files (audit_YYYYMMDD.jsonl)"""
+    name = Path(path).name
+    return name.startswith('audit_') and name.endswith('.jsonl') and len(name) == len('audit_YYYYMMDD.jsonl')
+
+
+def summary_path(log_file: Path) -> Path:
+    log_file = Path(log_file)
+    return log_file.with_name(log_file.name[:-len('.jsonl')] + SUMMARY_SUFFIX)
+
+
+def _empty_summary(log_file: Path) -> Dict[str, Any]:
+    date_str = Path(log_file).name[len('audit_'):-len('.jsonl')]
+    try:
+        date = datetime.strptime(date_str, '%Y%m%d').strftime('%Y-%m-%d')
+    except ValueError:
+        date = date_str
+
+    return {
+        "date": date,
+        "offset": 0,
+        "total_actions": 0,
+        "actions_by_type": {},
+        "actions_by_status": {},
+        "actions_by_actor": {},
+        "errors": 0,
+        "first_timestamp": None,
+        "last_timestamp": None
+    }
+
+
+def _count(summary: Dict[str, Any], entry: Dict[str, Any]):
+    action_type = entry.get("action_type", "unknown")
+    status = entry.get("status", "unknown")
+    actor = entry.get("actor", "unknown")
+
+    summary["total_actions"] += 1
+    summary["actions_by_type"][action_type] = summary["actions_by_type"].get(action_type, 0) + 1
+    summary["actions_by_status"][status] = summary["actions_by_status"].get(status, 0) + 1
+    summary["actions_by_actor"][actor] = summary["actions_by_actor"].get(actor, 0) + 1
+
+    if action_type == "error" or status == "failed":
+        summary["errors"] += 1
+
+    timestamp = entry.get("timestamp")
+    if timestamp:
+        if not summary["first_timestamp"] or timestamp < summary["first_timestamp"]:
+            summary["first_timestamp"] = timestamp
+        if not summary["last_timestamp"] or timestamp > summary["last_timestamp"]:
+            summary["last_timestamp"] = timestamp
+
+
+def iter_lines(log_file: Path, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """
+    Stream complete lines from a JSONL file
+
+    Yields:
+        (offset after the line, raw line) - a trailing partial line is skipped
+    """
+    with open(log_file, 'rb') as f:
+        f.seek(offset)
+        position = offset
+        pending = b''
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                return
+            pending += chunk
+            lines = pending.split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                position += len(line) + 1
+                yield position, line
+
+
+def _load(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Rebuilding unreadable audit summary {path.name}: {e}")
+        return None
+
+
+def _save(path: Path, summary: Dict[str, Any]):
+    # Unique temp name: several processes may update the same sidecar
+    temp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(summary, f)
+    os.replace(temp, path)
+
+
+def update_summary(log_file: Path) -> Dict[str, Any]:
+    """
+    Bring a day's summary up to date with its log file
+
+    Only lines after the summary's recorded offset are read. Safe to call
+    from several processes: every sidecar written is consistent with its
+    own offset, so the worst case is re-reading a few lines later.
+
+    Returns:
+        The summary dict
+    """
+    log_file = Path(log_file)
+    sidecar = summary_path(log_file)
+
+    with _lock_for(sidecar):
+        summary = _load(sidecar) or _empty_summary(log_file)
+
+        try:
+            size = log_file.stat().st_size
+        except FileNotFoundError:
+            return summary
+
+        if size < summary.get("offset", 0):
+            # Log was truncated or replaced: recount from the start
+            summary = _empty_summary(log_file)
+        if size == summary["offset"]:
+            return summary
+
+        offset = summary["offset"]
+        for offset, line in iter_lines(log_file, summary["offset"]):
+            if not line.strip():
+                continue
+            try:
+                _count(summary, json.loads(line))
+            except ValueError:
+                logger.debug(f"Skipping malformed audit line in {log_file.name} at {offset}")
+
+        summary["offset"] = offset
+        summary["updated_at"] = datetime.now().isoformat()
+        try:
+            _save(sidecar, summary)
+        except OSError as e:
+            logger.warning(f"Could not save audit summary {sidecar.name}: {e}")
+
+        return summary
+
+
+def on_audit_write(path: Path):
+    """Audit writer listener: refresh the summary after each batch"""
+    if is_audit_log(path):
+        try:
+            update_summary(path)
+        except Exception as e:
+            logger.warning(f"Audit summary update failed for {Path(path).name}: {e}")
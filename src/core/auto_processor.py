@@ -10,7 +10,7 @@ import json
 import time
 import signal
 import re
-import asyncio
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -25,13 +25,6 @@ except ImportError:
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler
 
-try:
-    import yaml
-except ImportError:
-    print("Installing pyyaml...")
-    os.system("pip install pyyaml")
-    import yaml
-
 try:
     from dotenv import load_dotenv
 except ImportError:
@@ -42,6 +35,17 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from src.core.post_queue import PostWorkQueue
+from src.core.retry import RetryPolicy, is_retryable, retry_async, run_sync
+from src.core.retry_queue import RetryQueue
+from src.core.publish_ledger import PublishLedger, content_key, post_text, PUBLISHED
+from src.core.browser_pool import acquire_page, install_browser_pool, shutdown_browser_pool
+from src.core.vault_notes import load_note, parse_frontmatter, split_frontmatter
+from src.core.dashboard_model import ActivityFeed, get_dashboard_store
+from src.core.smtp_pool import RecipientRateLimited, close_smtp_sender, get_smtp_sender
+
 # Custom JSON encoder for datetime objects
 class DateTimeEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -64,11 +68,42 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Entries older versions appended to Dashboard.md as top-level sections
+LEGACY_DASHBOARD_ENTRY = re.compile(r'^## \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} - ')
+
+# Normalize file "type" values to platform names
+PLATFORM_TYPE_MAPPING = {
+    'linkedin_post': 'linkedin',
+    'linkedin_post_approval': 'linkedin',
+    'linkedin': 'linkedin',
+    'twitter_post': 'twitter',
+    'twitter': 'twitter',
+    'tweet': 'twitter',
+    'whatsapp': 'whatsapp',
+    'whatsapp_message': 'whatsapp',
+    'email': 'email',
+    'email_draft': 'email',
+    'instagram_post': 'instagram',
+    'instagram': 'instagram',
+    'insta': 'instagram',
+    'ig_post': 'instagram',
+    'instagram_story': 'instagram_story',
+    'ig_story': 'instagram_story',
+    'insta_story': 'instagram_story',
+    'facebook_post': 'facebook',
+    'fb_post': 'facebook',
+    'facebook': 'facebook',
+    'fb': 'facebook',
+}
+
+
 class PlatformPoster:
     """Handles actual posting to different platforms"""
 
     def __init__(self):
         self.vault_path = Path(os.getenv('VAULT_PATH', '.'))
+        # Retries for API platforms; backoff waits yield to other posts
+        self.retry_policy = RetryPolicy.from_env('POST_RETRY', max_attempts=3, base_delay=2, max_delay=60, deadline=300)
 
     async def post_to_linkedin(self, content: str, metadata: Dict) -> Dict[str, Any]:
         """Post content to LinkedIn using Playwright"""
@@ -144,21 +179,18 @@ class PlatformPoster:
     async def _linkedin_fallback(self, content: str, metadata: Dict) -> Dict[str, Any]:
         """Fallback LinkedIn posting using direct Playwright"""
         try:
-            from playwright.async_api import async_playwright
-
             cookies_path = os.getenv('LINKEDIN_COOKIES_PATH', 'linkedin_cookies.json')
+            session_path = os.getenv('LINKEDIN_SESSION_PATH', str(self.vault_path / 'linkedin_session'))
 
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=False)
-                context = await browser.new_context()
-
-                # Load cookies if available
-                if Path(cookies_path).exists():
+            lease = await acquire_page(session_path, headless=False)
+            context, page = lease.context, lease.page
+            try:
+                # Load cookies when the browser was just launched
+                if lease.fresh and Path(cookies_path).exists():
                     with open(cookies_path, 'r') as f:
                         cookies = json.load(f)
                         await context.add_cookies(cookies)
 
-                page = await context.new_page()
                 await page.goto('https://www.linkedin.com/feed/')
 
                 # Wait for page to load
@@ -181,15 +213,15 @@ class PlatformPoster:
                 cookies = await context.cookies()
                 with open(cookies_path, 'w') as f:
                     json.dump(cookies, f)
+            finally:
+                await lease.release()
 
-                await browser.close()
-
-                return {
-                    "success": True,
-                    "platform": "linkedin",
-                    "method": "playwright",
-                    "timestamp": datetime.now().isoformat()
-                }
+            return {
+                "success": True,
+                "platform": "linkedin",
+                "method": "playwright",
+                "timestamp": datetime.now().isoformat()
+            }
 
         except Exception as e:
             logger.error(f"LinkedIn Playwright posting failed: {e}")
@@ -198,21 +230,13 @@ class PlatformPoster:
     async def send_whatsapp(self, phone: str, message: str, metadata: Dict) -> Dict[str, Any]:
         """Send WhatsApp message using Playwright"""
         try:
-            from playwright.async_api import async_playwright
-
             # Use absolute path for session
             project_root = self.vault_path
             session_path = os.getenv('WHATSAPP_SESSION_PATH', str(project_root / 'whatsapp_session_v2'))
 
-            async with async_playwright() as p:
-                browser = await p.chromium.launch_persistent_context(
-                    session_path,
-                    headless=False,
-                    args=['--no-sandbox']
-                )
-
-                page = browser.pages[0] if browser.pages else await browser.new_page()
-
+            lease = await acquire_page(session_path, headless=False, args=['--no-sandbox'])
+            page = lease.page
+            try:
                 # Format phone number (remove spaces, dashes)
                 phone = str(phone)
                 phone_clean = re.sub(r'[\s\-\(\)]', '', phone)
@@ -235,8 +259,6 @@ class PlatformPoster:
 
                     logger.info(f"WhatsApp message sent to {phone}")
 
-                    await browser.close()
-
                     return {
                         "success": True,
                         "platform": "whatsapp",
@@ -245,15 +267,25 @@ class PlatformPoster:
                     }
                 except Exception as e:
                     logger.error(f"WhatsApp send button not found: {e}")
-                    await browser.close()
                     return {"success": False, "platform": "whatsapp", "error": str(e)}
+            finally:
+                await lease.release()
 
         except Exception as e:
             logger.error(f"WhatsApp sending failed: {e}")
             return {"success": False, "platform": "whatsapp", "error": str(e)}
 
     def post_to_twitter(self, content: str, metadata: Dict) -> Dict[str, Any]:
-        """Post tweet using Tweepy"""
+        """Post tweet using Tweepy (blocking; coroutines use post_to_twitter_async)"""
+        return run_sync(self.post_to_twitter_async(content, metadata))
+
+    def _log_retry(self, platform: str):
+        def on_retry(attempt: int, error: Exception, delay: float):
+            logger.warning(f"{platform} attempt {attempt} failed ({error}); retrying in {delay:.1f}s")
+        return on_retry
+
+    async def post_to_twitter_async(self, content: str, metadata: Dict) -> Dict[str, Any]:
+        """Post tweet using Tweepy, retrying rate limits and transient errors"""
         try:
             import tweepy
 
@@ -278,8 +310,12 @@ class PlatformPoster:
             if len(content) > 280:
                 content = content[:277] + "..."
 
-            # Post tweet
-            response = client.create_tweet(text=content)
+            # Post tweet (tweepy errors carry the response, so 429/5xx and
+            # Retry-After are honoured)
+            response = await retry_async(
+                client.create_tweet, text=content,
+                policy=self.retry_policy, retry_if=is_retryable, on_retry=self._log_retry('Twitter')
+            )
             tweet_id = response.data['id']
 
             logger.info(f"Tweet posted successfully: {tweet_id}")
@@ -300,25 +336,24 @@ class PlatformPoster:
             return {"success": False, "platform": "twitter", "error": str(e)}
 
     def send_email(self, to: str, subject: str, body: str, metadata: Dict) -> Dict[str, Any]:
-        """Send email using SMTP"""
+        """Send email using SMTP (blocking; coroutines use send_email_async)"""
+        return run_sync(self.send_email_async(to, subject, body, metadata))
+
+    async def send_email_async(self, to: str, subject: str, body: str, metadata: Dict) -> Dict[str, Any]:
+        """Send email using SMTP, batched with other queued email over one pooled session"""
         try:
-            import smtplib
             from email.mime.text import MIMEText
             from email.mime.multipart import MIMEMultipart
 
-            # Get SMTP credentials from environment
-            smtp_server = os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com')
-            smtp_port = int(os.getenv('EMAIL_SMTP_PORT', '587'))
-            username = os.getenv('EMAIL_USERNAME')
-            password = os.getenv('EMAIL_PASSWORD')
-
-            if not all([username, password]):
+            # Pooled, kept-alive SMTP sessions shared by all workers
+            sender = get_smtp_sender()
+            if sender is None:
                 raise ValueError("Email credentials not configured in .env")
 
             # Create message
             msg = MIMEMultipart('alternative')
             msg['Subject'] = subject
-            msg['From'] = username
+            msg['From'] = sender.username
             msg['To'] = to
 
             # Add body
@@ -327,11 +362,10 @@ class PlatformPoster:
             msg.attach(text_part)
             msg.attach(html_part)
 
-            # Send email
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                server.starttls()
-                server.login(username, password)
-                server.send_message(msg)
+            # Queued with other workers' emails and sent over one session; the
+            # sender reconnects after 421s and dropped sessions, and anything
+            # else fails the post and goes to the retry queue
+            await sender.send_async(msg)
 
             logger.info(f"Email sent to {to}")
 
@@ -343,6 +377,10 @@ class PlatformPoster:
                 "timestamp": datetime.now().isoformat()
             }
 
+        except RecipientRateLimited as e:
+            logger.warning(f"Email to {to} deferred: {e}")
+            return {"success": False, "platform": "email", "error": str(e),
+                    "retryable": True, "retry_after": e.retry_after}
         except Exception as e:
             logger.error(f"Email sending failed: {e}")
             return {"success": False, "platform": "email", "error": str(e)}
@@ -396,7 +434,10 @@ class PlatformPoster:
             ig = InstagramPlaywright()
 
             # Post the image
-            result = await ig.post_image(str(image_path_obj), caption)
+            try:
+                result = await ig.post_image(str(image_path_obj), caption)
+            finally:
+                await ig.close()
 
             if result.get('success'):
                 logger.info(f"Instagram post successful")
@@ -436,7 +477,10 @@ class PlatformPoster:
                 return {"success": False, "platform": "instagram_story", "error": f"Image not found: {image_path_obj}"}
 
             ig = InstagramPlaywright()
-            result = await ig.post_story(str(image_path_obj))
+            try:
+                result = await ig.post_story(str(image_path_obj))
+            finally:
+                await ig.close()
 
             if result.get('success'):
                 logger.info("Instagram story posted successfully")
@@ -467,12 +511,45 @@ class ApprovedFileHandler(FileSystemEventHandler):
         self.poster = PlatformPoster()
         self.processed_files = set()
 
+        # Failed posts are recorded here and replayed with backoff; permanent
+        # failures stay in Failed/ as dead letters
+        self.retry_queue = RetryQueue(vault_path)
+        self.retry_queue.recover_stale()
+
+        # Content already published (before a restart or by a replay) is not
+        # sent to the platform again
+        self.ledger = PublishLedger.for_vault(vault_path)
+
+        # Files are posted concurrently by a per-platform worker pool whose
+        # loop keeps browser contexts warm between posts
+        self.work_queue = PostWorkQueue(
+            self.process_file,
+            self.classify_file,
+            on_start=self._start_browser_pool,
+            on_stop=shutdown_browser_pool
+        )
+
         # Ensure directories exist
         self.done_folder.mkdir(exist_ok=True)
         self.failed_folder.mkdir(exist_ok=True)
         self.logs_folder.mkdir(exist_ok=True)
         self.approved_folder.mkdir(exist_ok=True)
 
+        # Dashboard.md shows the latest posts only; older entries go to
+        # dated files in Logs/Dashboard_Archive
+        self.activity_feed = ActivityFeed(
+            get_dashboard_store(self.dashboard_file),
+            '## 📤 Auto Processor Activity',
+            self.logs_folder / 'Dashboard_Archive'
+        )
+        try:
+            self.activity_feed.migrate(LEGACY_DASHBOARD_ENTRY)
+        except Exception as e:
+            logger.error(f"Failed to migrate dashboard activity entries: {e}")
+
+    async def _start_browser_pool(self):
+        install_browser_pool()
+
     def on_created(self, event):
         """Called when a file is created in the Approved folder"""
         if not event.is_directory and event.src_path.endswith('.md'):
@@ -480,9 +557,8 @@ class ApprovedFileHandler(FileSystemEventHandler):
             if str(file_path) not in self.processed_files:
                 logger.info(f"New file detected: {event.src_path}")
                 self.processed_files.add(str(file_path))
-                # Small delay to ensure file is fully written
-                time.sleep(1)
-                asyncio.run(self.process_file(file_path))
+                # The queue waits for the file to settle before processing it
+                self.work_queue.submit(file_path)
 
     def on_modified(self, event):
         """Called when a file is modified"""
@@ -497,111 +573,106 @@ class ApprovedFileHandler(FileSystemEventHandler):
                 return
 
             logger.info(f"Processing file: {file_path.name}")
-            content = file_path.read_text(encoding='utf-8')
+            note = load_note(file_path)
 
             # Extract metadata and content
-            metadata = self.extract_metadata(content)
-            post_content = self.extract_post_content(content)
-            file_type = metadata.get('type', '').lower()
+            metadata = note.frontmatter
+            post_content = self.extract_post_content(note.content)
+            file_type = str(metadata.get('type') or '').lower()
 
             logger.info(f"File type detected: {file_type}")
 
             # Route to appropriate platform
-            result = await self.route_to_platform(file_type, post_content, metadata)
+            result = await self.route_to_platform(file_type, post_content, metadata, source=file_path.name)
 
             if result.get('success'):
                 # Create success log and move to Done
                 self.create_log_entry(file_path, metadata, result, success=True)
                 dest_path = self.move_to_done(file_path)
                 self.update_dashboard(file_path.name, metadata, result, success=True)
+                self.retry_queue.resolve(file_path.name)
                 logger.info(f"Successfully processed and posted: {file_path.name}")
             else:
-                # Create failure log and move to Failed
+                # Create failure log, move to Failed and queue a retry
                 self.create_log_entry(file_path, metadata, result, success=False)
                 dest_path = self.move_to_failed(file_path)
                 self.update_dashboard(file_path.name, metadata, result, success=False)
+                self.retry_queue.record_failure(file_path.name, dest_path, result, platform=result.get('platform'))
                 logger.error(f"Failed to post: {file_path.name} - {result.get('error')}")
 
         except Exception as e:
             logger.error(f"Error processing {file_path.name}: {e}", exc_info=True)
-            self.move_to_failed(file_path)
+            dest_path = self.move_to_failed(file_path)
+            if dest_path.exists():
+                self.retry_queue.record_failure(file_path.name, dest_path, e)
+
+    def classify_file(self, file_path: Path) -> str:
+        """Get the platform a file will be posted to (used for queue routing)"""
+        if not file_path.exists():
+            return 'generic'
+
+        # Only the frontmatter is read here; the parse is cached for process_file
+        file_type = str(load_note(file_path).get('type') or '').lower()
+        return PLATFORM_TYPE_MAPPING.get(file_type, 'generic')
 
     def extract_metadata(self, content: str) -> Dict[str, Any]:
         """Extract YAML frontmatter metadata from file"""
-        metadata = {}
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                try:
-                    metadata = yaml.safe_load(parts[1]) or {}
-                except:
-                    pass
-        return metadata
+        return parse_frontmatter(content)
 
     def extract_post_content(self, content: str) -> str:
         """Extract the actual post content from the file"""
         # Remove YAML frontmatter
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                content = parts[2].strip()
-
-        # Try to extract content from specific sections
-        # Look for "## Post Content" or "## Message" sections
-        patterns = [
-            r'## Post Content\s*\n(.*?)(?=\n##|\Z)',
-            r'## Message\s*\n(.*?)(?=\n##|\Z)',
-            r'## Content\s*\n(.*?)(?=\n##|\Z)',
-            r'## Tweet\s*\n(.*?)(?=\n##|\Z)',
-            r'## Email Body\s*\n(.*?)(?=\n##|\Z)',
-            r'## Caption\s*\n(.*?)(?=\n##|\n---|\Z)',  # Instagram caption
-        ]
+        frontmatter, body = split_frontmatter(content)
+        return post_text(body if frontmatter is not None else content)
+
+    async def route_to_platform(self, file_type: str, content: str, metadata: Dict,
+                                source: str = None) -> Dict[str, Any]:
+        """Route content to appropriate platform based on file type, unless it was already published"""
+
+        platform = PLATFORM_TYPE_MAPPING.get(file_type, file_type)
+        if platform not in PLATFORM_TYPE_MAPPING.values():
+            return await self._post_to_platform(platform, file_type, content, metadata)
+
+        key = content_key(platform, content, metadata)
+        existing = self.ledger.begin(key, platform, source=source)
+        if existing:
+            if existing['status'] == PUBLISHED:
+                logger.info(f"[LEDGER] {source or 'Content'} was already published to {platform} "
+                            f"at {existing.get('published_at')}; skipping")
+                return {
+                    "success": True,
+                    "platform": platform,
+                    "duplicate": True,
+                    "post_id": existing.get('post_id'),
+                    "url": existing.get('url'),
+                    "note": "Already published"
+                }
+            return {
+                "success": False,
+                "platform": platform,
+                "error": f"Already being published (claimed by {existing.get('source') or 'another worker'})",
+                "retryable": True,
+                "retry_after": self.ledger.pending_ttl
+            }
 
-        for pattern in patterns:
-            match = re.search(pattern, content, re.DOTALL)
-            if match:
-                return match.group(1).strip()
-
-        # If no specific section found, return content without headers
-        lines = content.split('\n')
-        clean_lines = [l for l in lines if not l.startswith('#') and not l.startswith('-')]
-        return '\n'.join(clean_lines).strip()
-
-    async def route_to_platform(self, file_type: str, content: str, metadata: Dict) -> Dict[str, Any]:
-        """Route content to appropriate platform based on file type"""
-
-        # Normalize type names
-        type_mapping = {
-            'linkedin_post': 'linkedin',
-            'linkedin_post_approval': 'linkedin',
-            'linkedin': 'linkedin',
-            'twitter_post': 'twitter',
-            'twitter': 'twitter',
-            'tweet': 'twitter',
-            'whatsapp': 'whatsapp',
-            'whatsapp_message': 'whatsapp',
-            'email': 'email',
-            'email_draft': 'email',
-            'instagram_post': 'instagram',
-            'instagram': 'instagram',
-            'insta': 'instagram',
-            'ig_post': 'instagram',
-            'instagram_story': 'instagram_story',
-            'ig_story': 'instagram_story',
-            'insta_story': 'instagram_story',
-            'facebook_post': 'facebook',
-            'fb_post': 'facebook',
-            'facebook': 'facebook',
-            'fb': 'facebook',
-        }
+        try:
+            result = await self._post_to_platform(platform, file_type, content, metadata)
+        except BaseException:
+            self.ledger.abort(key)
+            raise
 
-        platform = type_mapping.get(file_type, file_type)
+        if result.get('success'):
+            self.ledger.complete(key, result)
+        else:
+            self.ledger.abort(key)
+        return result
 
+    async def _post_to_platform(self, platform: str, file_type: str, content: str, metadata: Dict) -> Dict[str, Any]:
         if platform == 'linkedin':
             return await self.poster.post_to_linkedin(content, metadata)
 
         elif platform == 'twitter':
-            return self.poster.post_to_twitter(content, metadata)
+            return await self.poster.post_to_twitter_async(content, metadata)
 
         elif platform == 'whatsapp':
             phone = metadata.get('phone') or metadata.get('to') or metadata.get('recipient')
@@ -614,7 +685,7 @@ class ApprovedFileHandler(FileSystemEventHandler):
             subject = metadata.get('subject', 'No Subject')
             if not to:
                 return {"success": False, "platform": "email", "error": "No recipient specified"}
-            return self.poster.send_email(to, subject, content, metadata)
+            return await self.poster.send_email_async(to, subject, content, metadata)
 
         elif platform == 'instagram':
             return await self.poster.post_to_instagram(content, metadata)
@@ -673,27 +744,25 @@ class ApprovedFileHandler(FileSystemEventHandler):
         return dest_path
 
     def update_dashboard(self, filename: str, metadata: Dict, result: Dict, success: bool):
-        """Update Dashboard.md with processing result"""
+        """Add the processing result to the dashboard's activity feed"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         status_icon = "" if success else ""
         platform = result.get('platform', 'unknown')
 
-        entry = f"""
-
-## {timestamp} - {status_icon} {platform.title()} {'Posted' if success else 'Failed'}
-
-**File**: {filename}
-**Platform**: {platform}
-**Status**: {'Successfully posted' if success else 'Failed to post'}
-**Type**: {metadata.get('type', 'unknown')}
-{f"**Error**: {result.get('error')}" if not success else ""}
-{f"**Post URL**: {result.get('url')}" if result.get('url') else ""}
+        lines = [
+            f"### {timestamp} - {status_icon} {platform.title()} {'Posted' if success else 'Failed'}",
+            f"**File**: {filename}",
+            f"**Platform**: {platform}",
+            f"**Status**: {'Successfully posted' if success else 'Failed to post'}",
+            f"**Type**: {metadata.get('type', 'unknown')}"
+        ]
+        if not success:
+            lines.append(f"**Error**: {result.get('error')}")
+        if result.get('url'):
+            lines.append(f"**Post URL**: {result.get('url')}")
 
----
-"""
         try:
-            with open(self.dashboard_file, 'a', encoding='utf-8') as f:
-                f.write(entry)
+            self.activity_feed.add('\n'.join(lines))
         except Exception as e:
             logger.error(f"Failed to update dashboard: {e}")
 
@@ -709,22 +778,60 @@ class ApprovedFileHandler(FileSystemEventHandler):
         logger.info(f"Found {len(existing_files)} existing files to process")
 
         for file_path in existing_files:
-            try:
-                logger.info(f"Processing existing file: {file_path.name}")
-                asyncio.run(self.process_file(file_path))
-                time.sleep(1)
-            except Exception as e:
-                logger.error(f"Error processing existing file {file_path.name}: {e}")
-
+            if str(file_path) in self.processed_files:
+                continue
+            logger.info(f"Queueing existing file: {file_path.name}")
+            self.processed_files.add(str(file_path))
+            self.work_queue.submit(file_path)
+
+    def replay_due_retries(self) -> int:
+        """
+        Move failed posts whose retry is due back to Approved and queue them
+
+        Returns:
+            Number of files requeued
+        """
+        replayed = 0
+        for item in self.retry_queue.claim_due():
+            failed_path = Path(item['path'])
+            if not failed_path.exists():
+                # Fixed or removed by hand; nothing left to retry
+                logger.info(f"[RETRY] {item['name']} is no longer in Failed/, dropping it")
+                self.retry_queue.resolve(item['name'])
+                continue
+
+            target = self.approved_folder / item['name']
+            if target.exists():
+                # A new version was approved meanwhile; try again later
+                self.retry_queue.release(item['name'], delay=self.retry_queue.base_delay)
+                continue
+
+            failed_path.rename(target)
+            # The path is marked as seen so the watcher does not queue it twice
+            self.processed_files.add(str(target))
+            logger.info(f"[RETRY] Replaying {item['name']} (attempt {item['attempts'] + 1})")
+            self.work_queue.submit(target)
+            replayed += 1
+
+        return replayed
+
+
+def run(stop_event: threading.Event = None, vault_path: str = None):
+    """
+    Run the auto processor until stop_event is set
+
+    Args:
+        stop_event: Event that ends the run (the supervisor passes one)
+        vault_path: Vault root (default: VAULT_PATH or the repository root)
+    """
+    stop_event = stop_event or threading.Event()
 
-def main():
-    """Main function - runs the auto processor"""
     logger.info("=" * 60)
     logger.info("AUTO PROCESSOR - Starting 24/7 Platform Poster")
     logger.info("=" * 60)
 
     # Set up vault path
-    vault_path_env = os.getenv('VAULT_PATH')
+    vault_path_env = vault_path or os.getenv('VAULT_PATH')
     if vault_path_env:
         vault_path = Path(vault_path_env).resolve()
     else:
@@ -738,43 +845,71 @@ def main():
     logger.info(f"Vault path: {vault_path}")
     logger.info(f"Monitoring: {approved_folder}")
 
-    # Create event handler
+    # Create event handler and start its worker pool
     event_handler = ApprovedFileHandler(vault_path)
+    event_handler.work_queue.start()
 
-    # Process any existing files first
+    # Queue any existing files first
     event_handler.process_existing_files()
 
     # Set up observer
     observer = Observer()
     observer.schedule(event_handler, str(approved_folder), recursive=False)
 
-    # Graceful shutdown handler
-    def signal_handler(sig, frame):
-        logger.info("\nShutting down Auto Processor...")
-        observer.stop()
-        observer.join()
-        logger.info("Auto Processor stopped gracefully")
-        sys.exit(0)
-
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-
     # Start watching
     observer.start()
     logger.info(f"Started monitoring: {approved_folder}")
     logger.info("Watching for .md files in Approved folder")
     logger.info("Supported types: linkedin_post, twitter_post, whatsapp, email, instagram_post, instagram_story")
-    logger.info("Press Ctrl+C to stop\n")
+
+    stats_interval = int(os.getenv('AUTO_PROCESSOR_STATS_INTERVAL', '60'))
+    retry_interval = int(os.getenv('RETRY_QUEUE_POLL_INTERVAL', '30'))
+    last_stats = time.time()
+    last_retry = 0.0
+    drain = True
 
     try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        signal_handler(signal.SIGINT, None)
+        while not stop_event.wait(1):
+            # Hand failed posts whose backoff has elapsed back to the workers
+            if time.time() - last_retry >= retry_interval:
+                last_retry = time.time()
+                event_handler.replay_due_retries()
+
+            # Periodically report queue depth so concurrency limits can be tuned
+            if time.time() - last_stats >= stats_interval:
+                last_stats = time.time()
+                if not event_handler.work_queue.is_idle():
+                    logger.info(f"Queue stats: {json.dumps(event_handler.work_queue.stats())}")
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
+        drain = False
+        raise
+    finally:
+        logger.info("Shutting down Auto Processor...")
         observer.stop()
         observer.join()
+        event_handler.work_queue.stop(drain=drain)
+        event_handler.retry_queue.close()
+        close_smtp_sender()
+        logger.info("Auto Processor stopped gracefully")
+
+
+def main():
+    """Main function - runs the auto processor"""
+    stop_event = threading.Event()
+
+    # Graceful shutdown handler
+    def signal_handler(sig, frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    logger.info("Press Ctrl+C to stop\n")
+    try:
+        run(stop_event)
+    except KeyboardInterrupt:
+        stop_event.set()
 
 
 if __name__ == "__main__":
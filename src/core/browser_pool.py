@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Browser Pool - Warm Playwright persistent contexts shared across posters
+Keeps one persistent Chromium context per session directory alive between
+posts, hands out pages on demand and recycles contexts that are worn out,
+bloated or idle
+"""
+
+import os
+import time
+import asyncio
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+# Pools are bound to the event loop that created them, because Playwright
+# objects cannot be used from any other loop.
+_pools: Dict[int, 'BrowserPool'] = {}
+
+
+class _WarmContext:
+    """A launched persistent context and its page bookkeeping"""
+
+    def __init__(self, session_path: str, context, launch_options: Dict[str, Any]):
+        self.session_path = session_path
+        self.context = context
+        self.launch_options = launch_options
+        self.launched_at = time.monotonic()
+        self.last_used = time.monotonic()
+        self.uses = 0
+        self.in_use = 0
+        self.free_pages: List[Any] = []
+        self.page_uses: Dict[int, int] = {}
+        self.closed = False
+
+        context.on('close', lambda _: setattr(self, 'closed', True))
+
+
+class BrowserLease:
+    """A page borrowed from a context; call release() when done"""
+
+    def __init__(self, context, page, fresh: bool, pool: 'BrowserPool' = None,
+                 warm: _WarmContext = None, playwright=None):
+        self.context = context
+        self.page = page
+        # True when the context was just launched (cookies need loading)
+        self.fresh = fresh
+        self._pool = pool
+        self._warm = warm
+        self._playwright = playwright
+        self._released = False
+
+    @property
+    def pooled(self) -> bool:
+        return self._pool is not None
+
+    async def release(self):
+        """Return the page to the pool, or close the one-off browser"""
+        if self._released:
+            return
+        self._released = True
+
+        if self._pool:
+            await self._pool.release(self._warm, self.page)
+            return
+
+        try:
+            await self.context.close()
+        finally:
+            if self._playwright:
+                await self._playwright.stop()
+
+
+class BrowserPool:
+    """Process-wide pool of warm persistent browser contexts"""
+
+    def __init__(
+        self,
+        max_uses: int = None,
+        max_page_uses: int = None,
+        idle_timeout: float = None,
+        max_memory_mb: float = None,
+        max_free_pages: int = 2
+    ):
+        """
+        Args:
+            max_uses: Relaunch a context after this many leases
+            max_page_uses: Close a page after this many leases
+            idle_timeout: Close contexts unused for this many seconds
+            max_memory_mb: Relaunch a context whose browser processes exceed this RSS
+            max_free_pages: Idle pages kept open per context
+        """
+        self.max_uses = max_uses or int(os.getenv('BROWSER_POOL_MAX_USES', '50'))
+        self.max_page_uses = max_page_uses or int(os.getenv('BROWSER_POOL_MAX_PAGE_USES', '10'))
+        self.idle_timeout = idle_timeout or float(os.getenv('BROWSER_POOL_IDLE_TIMEOUT', '600'))
+        self.max_memory_mb = max_memory_mb or float(os.getenv('BROWSER_POOL_MAX_MEMORY_MB', '1500'))
+        self.max_free_pages = max_free_pages
+
+        self.playwright = None
+        self.contexts: Dict[str, _WarmContext] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+        self.launches = 0
+        self.leases = 0
+
+    def _lock_for(self, session_path: str) -> asyncio.Lock:
+        if session_path not in self._locks:
+            self._locks[session_path] = asyncio.Lock()
+        return self._locks[session_path]
+
+    async def _ensure_playwright(self):
+        if not self.playwright:
+            from playwright.async_api import async_playwright
+            self.playwright = await async_playwright().start()
+
+    def start(self):
+        """Start the idle-context reaper on the running loop"""
+        if not self._reaper:
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_idle())
+
+    async def acquire(self, session_path: str, **launch_options) -> BrowserLease:
+        """
+        Borrow a page from the warm context for a session directory
+
+        Args:
+            session_path: Persistent profile directory (one context per directory)
+            **launch_options: Passed to launch_persistent_context on first launch
+
+        Returns:
+            BrowserLease holding the context and page
+        """
+        key = str(Path(session_path).resolve())
+
+        async with self._lock_for(key):
+            warm = self.contexts.get(key)
+            if warm and (warm.closed or (warm.in_use == 0 and self._needs_recycle(warm))):
+                await self._close_context(warm)
+                warm = None
+
+            fresh = False
+            if not warm:
+                await self._ensure_playwright()
+                Path(key).mkdir(parents=True, exist_ok=True)
+                context = await self.playwright.chromium.launch_persistent_context(key, **launch_options)
+                warm = _WarmContext(key, context, launch_options)
+                # The first page opened with the profile is free to use
+                warm.free_pages.extend(context.pages[:1])
+                self.contexts[key] = warm
+                self.launches += 1
+                fresh = True
+                logger.info(f"Launched warm browser context: {key}")
+
+            page = None
+            while warm.free_pages and page is None:
+                candidate = warm.free_pages.pop()
+                if not candidate.is_closed():
+                    page = candidate
+            if page is None:
+                page = await warm.context.new_page()
+
+            warm.uses += 1
+            warm.in_use += 1
+            warm.last_used = time.monotonic()
+            warm.page_uses[id(page)] = warm.page_uses.get(id(page), 0) + 1
+            self.leases += 1
+
+        return BrowserLease(warm.context, page, fresh, pool=self, warm=warm)
+
+    async def release(self, warm: _WarmContext, page):
+        """Return a borrowed page to its context"""
+        warm.in_use = max(0, warm.in_use - 1)
+        warm.last_used = time.monotonic()
+
+        if warm.closed:
+            return
+
+        try:
+            if not page.is_closed():
+                worn_out = warm.page_uses.get(id(page), 0) >= self.max_page_uses
+                if worn_out or len(warm.free_pages) >= self.max_free_pages:
+                    warm.page_uses.pop(id(page), None)
+                    await page.close()
+                else:
+                    # Drop the previous site's DOM and scripts while idle
+                    await page.goto('about:blank')
+                    warm.free_pages.append(page)
+        except Exception as e:
+            logger.warning(f"Failed to recycle page: {e}")
+
+        if warm.in_use == 0 and self._needs_recycle(warm):
+            async with self._lock_for(warm.session_path):
+                if warm.in_use == 0 and self.contexts.get(warm.session_path) is warm:
+                    await self._close_context(warm)
+
+    def _needs_recycle(self, warm: _WarmContext) -> bool:
+        if warm.uses >= self.max_uses:
+            logger.info(f"Recycling browser context after {warm.uses} uses: {warm.session_path}")
+            return True
+
+        memory_mb = self._context_memory_mb(warm.session_path)
+        if memory_mb and memory_mb > self.max_memory_mb:
+            logger.info(f"Recycling browser context using {memory_mb:.0f} MB: {warm.session_path}")
+            return True
+
+        return False
+
+    def _context_memory_mb(self, session_path: str) -> Optional[float]:
+        """Total RSS of the Chromium processes using a profile directory"""
+        if not psutil:
+            return None
+
+        total = 0
+        marker = f"--user-data-dir={session_path}"
+        for proc in psutil.process_iter(['cmdline', 'memory_info']):
+            try:
+                cmdline = proc.info.get('cmdline') or []
+                if any(arg == marker for arg in cmdline):
+                    total += proc.info['memory_info'].rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied, TypeError):
+                continue
+
+        return total / (1024 * 1024)
+
+    async def _close_context(self, warm: _WarmContext):
+        self.contexts.pop(warm.session_path, None)
+        try:
+            if not warm.closed:
+                await warm.context.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser context {warm.session_path}: {e}")
+        warm.closed = True
+
+    async def _reap_idle(self):
+        """Close contexts that have been idle longer than idle_timeout"""
+        interval = min(60, self.idle_timeout)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for warm in list(self.contexts.values()):
+                if warm.in_use == 0 and now - warm.last_used > self.idle_timeout:
+                    async with self._lock_for(warm.session_path):
+                        if warm.in_use == 0 and self.contexts.get(warm.session_path) is warm:
+                            logger.info(f"Closing idle browser context: {warm.session_path}")
+                            await self._close_context(warm)
+
+    async def shutdown(self):
+        """Close every context and stop Playwright"""
+        if self._reaper:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+
+        for warm in list(self.contexts.values()):
+            await self._close_context(warm)
+
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool usage for monitoring"""
+        now = time.monotonic()
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'launches': self.launches,
+            'leases': self.leases,
+            'contexts': {
+                path: {
+                    'uses': warm.uses,
+                    'in_use': warm.in_use,
+                    'free_pages': len(warm.free_pages),
+                    'idle_seconds': round(now - warm.last_used, 1),
+                    'age_seconds': round(now - warm.launched_at, 1),
+                    'memory_mb': self._context_memory_mb(path)
+                }
+                for path, warm in self.contexts.items()
+            }
+        }
+
+
+def install_browser_pool(**kwargs) -> BrowserPool:
+    """
+    Create the browser pool for the running event loop
+
+    Long-lived loops (auto processor, batch posting) call this once; posters
+    then reuse warm contexts instead of launching Chromium per post.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(id(loop))
+    if not pool:
+        pool = BrowserPool(**kwargs)
+        pool.start()
+        _pools[id(loop)] = pool
+    return pool
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    """Get the pool installed on the running loop, if any"""
+    try:
+        return _pools.get(id(asyncio.get_running_loop()))
+    except RuntimeError:
+        return None
+
+
+async def shutdown_browser_pool():
+    """Close the running loop's pool and all its browsers"""
+    pool = _pools.pop(id(asyncio.get_running_loop()), None)
+    if pool:
+        await pool.shutdown()
+
+
+async def acquire_page(session_path: str, **launch_options) -> BrowserLease:
+    """
+    Get a page for a persistent session directory
+
+    Uses the warm pool when one is installed on the running loop, otherwise
+    launches a one-off context that is closed on release().
+    """
+    pool = get_browser_pool()
+    if pool:
+        return await pool.acquire(session_path, **launch_options)
+
+    from playwright.async_api import async_playwright
+
+    playwright = await async_playwright().start()
+    try:
+        context = await playwright.chromium.launch_persistent_context(session_path, **launch_options)
+    except Exception:
+        await playwright.stop()
+        raise
+
+    page = context.pages[0] if context.pages else await context.new_page()
+    return BrowserLease(context, page, fresh=True, playwright=playwright)
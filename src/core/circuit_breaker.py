@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker Registry - In-memory circuit breakers with shared snapshots
+Keeps a closed/open/half-open state machine per component in memory so health
+checks are a dict lookup, and snapshots changed breakers to a small SQLite
+table in the background so other processes see circuits open and close
+"""
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Health status reported for each state (the names used by health reports)
+STATUS_HEALTHY = 'healthy'
+STATUS_DEGRADED = 'degraded'
+STATUS_FAILED = 'failed'
+STATUS_RECOVERING = 'recovering'
+
+
+@dataclass
+class CircuitBreaker:
+    """State machine for one component"""
+    name: str
+    failure_threshold: int = 5
+    recovery_timeout: float = 600.0
+    half_open_max_calls: int = 3
+
+    state: str = CLOSED
+    failures: int = 0
+    last_failure: Optional[str] = None
+    last_error: Optional[str] = None
+    opened_at: Optional[float] = None
+    # Wall-clock time of the last change; newer snapshots win across processes
+    changed_at: float = 0.0
+
+    # Half-open trial calls admitted and succeeded (this process only)
+    trial_calls: int = 0
+    trial_successes: int = 0
+    trial_started: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        if self.state == OPEN:
+            return STATUS_FAILED
+        if self.state == HALF_OPEN:
+            return STATUS_RECOVERING
+        if self.failures >= max(1, self.failure_threshold // 2):
+            return STATUS_DEGRADED
+        return STATUS_HEALTHY
+
+    def _half_open(self, now: float):
+        self.state = HALF_OPEN
+        self.trial_calls = 0
+        self.trial_successes = 0
+        self.trial_started = now
+        self.changed_at = now
+
+    def allow(self, now: float, reserve: bool = True) -> bool:
+        """
+        Whether a call may go ahead
+
+        Args:
+            reserve: Count the call as a half-open trial (pass False for a
+                plain health check that won't be followed by a call)
+        """
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN:
+            if self.opened_at is not None and now - self.opened_at < self.recovery_timeout:
+                return False
+            self._half_open(now)
+
+        # Half-open: admit a limited number of trial calls. Trials that never
+        # report back are written off after another recovery timeout.
+        if self.trial_started is not None and now - self.trial_started >= self.recovery_timeout:
+            self._half_open(now)
+        if self.trial_calls >= self.half_open_max_calls:
+            return False
+        if reserve:
+            self.trial_calls += 1
+        return True
+
+    def on_success(self, now: float):
+        if self.state == HALF_OPEN:
+            self.trial_successes += 1
+            if self.trial_successes >= self.half_open_max_calls:
+                self.state = CLOSED
+                self.failures = 0
+                self.opened_at = None
+                self.trial_started = None
+                self.changed_at = now
+            return
+
+        if self.state == CLOSED and self.failures:
+            # Gradual recovery: each success forgives one failure
+            self.failures -= 1
+            self.changed_at = now
+
+    def on_failure(self, now: float, error: str = None):
+        self.failures += 1
+        self.last_failure = datetime.fromtimestamp(now).isoformat()
+        self.last_error = error
+        self.changed_at = now
+
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = now
+            self.trial_started = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'state': self.state,
+            'failures': self.failures,
+            'last_failure': self.last_failure,
+            'last_error': self.last_error,
+            'opened_at': datetime.fromtimestamp(self.opened_at).isoformat() if self.opened_at else None
+        }
+
+
+class CircuitBreakerRegistry:
+    """Thread-safe set of circuit breakers snapshotted to SQLite"""
+
+    def __init__(
+        self,
+        db_path: Path = None,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 600.0,
+        half_open_max_calls: int = 3,
+        snapshot_interval: float = None,
+        on_transition: Callable[[str, str, str, CircuitBreaker], Any] = None,
+        legacy_file: Path = None
+    ):
+        """
+        Args:
+            db_path: SQLite file shared by every process (None keeps state in memory)
+            failure_threshold: Failures that open a circuit
+            recovery_timeout: Seconds a circuit stays open before trial calls
+            half_open_max_calls: Successful trial calls needed to close a circuit
+                (and the most trial calls admitted at once)
+            snapshot_interval: Seconds between background snapshots
+            on_transition: Called as (name, old_status, new_status, breaker)
+                whenever a breaker's health status changes
+            legacy_file: Old component_health JSON to import on first use
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.snapshot_interval = snapshot_interval or float(os.getenv('CIRCUIT_SNAPSHOT_INTERVAL', '5'))
+        self.on_transition = on_transition
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if self.db_path:
+            try:
+                self._open_db()
+                self._pull()
+                if not self._breakers and legacy_file:
+                    self._import_legacy(Path(legacy_file))
+            except sqlite3.Error as e:
+                logger.error(f"Circuit breaker store unavailable, keeping state in memory: {e}")
+                self._conn = None
+            self._start_snapshots()
+
+    # ------------------------------------------------------------------
+    # Hot path (memory only)
+    # ------------------------------------------------------------------
+
+    def _new(self, name: str) -> CircuitBreaker:
+        return CircuitBreaker(
+            name=name,
+            failure_threshold=self.failure_threshold,
+            recovery_timeout=self.recovery_timeout,
+            half_open_max_calls=self.half_open_max_calls
+        )
+
+    def register(self, names: Iterable[str]):
+        """Track components up front so reports list them while healthy"""
+        with self._lock:
+            for name in names:
+                if name not in self._breakers:
+                    self._breakers[name] = self._new(name)
+
+    def get(self, name: str) -> Optional[CircuitBreaker]:
+        return self._breakers.get(name)
+
+    def _update(self, name: str, change: Callable[[CircuitBreaker, float], Any], create: bool = True) -> Any:
+        """Apply a change to a breaker, tracking dirtiness and status transitions"""
+        now = time.time()
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                if not create:
+                    return None
+                breaker = self._breakers[name] = self._new(name)
+
+            old_status, old_changed = breaker.status, breaker.changed_at
+            result = change(breaker, now)
+            new_status = breaker.status
+            if breaker.changed_at != old_changed:
+                self._dirty.add(name)
+
+        if new_status != old_status:
+            if new_status == STATUS_FAILED:
+                # Let other processes know promptly
+                self._wake.set()
+            if self.on_transition:
+                try:
+                    self.on_transition(name, old_status, new_status, breaker)
+                except Exception as e:
+                    logger.warning(f"Circuit breaker transition hook failed for {name}: {e}")
+
+        return result
+
+    def allow_request(self, name: str) -> bool:
+        """Check a component before calling it, reserving a half-open trial slot"""
+        if name not in self._breakers:
+            return True
+        return self._update(name, lambda b, now: b.allow(now, reserve=True), create=False)
+
+    def is_available(self, name: str) -> bool:
+        """Health check without reserving a trial call"""
+        breaker = self._breakers.get(name)
+        if breaker is None or breaker.state == CLOSED:
+            return True
+        return self._update(name, lambda b, now: b.allow(now, reserve=False), create=False)
+
+    def record_success(self, name: str):
+        self._update(name, lambda b, now: b.on_success(now), create=False)
+
+    def record_failure(self, name: str, error: str = None):
+        self._update(name, lambda b, now: b.on_failure(now, error))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current state of every breaker as plain dicts"""
+        with self._lock:
+            return {name: breaker.to_dict() for name, breaker in self._breakers.items()}
+
+    # ------------------------------------------------------------------
+    # Persistence and cross-process sharing
+    # ------------------------------------------------------------------
+
+    def _open_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS breakers (
+                component TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                failures INTEGER NOT NULL,
+                last_failure TEXT,
+                last_error TEXT,
+                opened_at REAL,
+                updated_at REAL NOT NULL,
+                pid INTEGER
+            )
+        """)
+        self._conn.commit()
+
+    def _push(self):
+        """Write breakers changed since the last snapshot (newer rows win)"""
+        with self._lock:
+            names, self._dirty = self._dirty, set()
+            rows = [
+                (b.name, b.state, b.failures, b.last_failure, b.last_error, b.opened_at, b.changed_at, os.getpid())
+                for b in (self._breakers[name] for name in names)
+            ]
+        if not rows:
+            return
+
+        try:
+            with self._db_lock:
+                self._conn.executemany("""
+                    INSERT INTO breakers (component, state, failures, last_failure, last_error, opened_at, updated_at, pid)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(component) DO UPDATE SET
+                        state = excluded.state,
+                        failures = excluded.failures,
+                        last_failure = excluded.last_failure,
+                        last_error = excluded.last_error,
+                        opened_at = excluded.opened_at,
+                        updated_at = excluded.updated_at,
+                        pid = excluded.pid
+                    WHERE excluded.updated_at >= breakers.updated_at
+                """, rows)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Circuit breaker snapshot failed: {e}")
+            with self._lock:
+                self._dirty.update(names)
+
+    def _pull(self):
+        """Adopt breaker states that other processes changed more recently"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT component, state, failures, last_failure, last_error, opened_at, updated_at FROM breakers"
+            ).fetchall()
+
+        transitions = []
+        with self._lock:
+            for name, state, failures, last_failure, last_error, opened_at, updated_at in rows:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = self._breakers[name] = self._new(name)
+                elif name in self._dirty or updated_at <= breaker.changed_at:
+                    continue
+
+                old_status = breaker.status
+                if state != breaker.state:
+                    breaker.trial_calls = 0
+                    breaker.trial_successes = 0
+                    breaker.trial_started = updated_at if state == HALF_OPEN else None
+                breaker.state = state
+                breaker.failures = failures
+                breaker.last_failure = last_failure
+                breaker.last_error = last_error
+                breaker.opened_at = opened_at
+                breaker.changed_at = updated_at
+                if breaker.status != old_status:
+                    transitions.append((name, old_status, breaker.status, breaker))
+
+        for name, old_status, new_status, breaker in transitions:
+            logger.info(f"Circuit {name}: {old_status} -> {new_status} (from shared state)")
+
+    def _import_legacy(self, legacy_file: Path):
+        """Seed breakers from the old component_health JSON file"""
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                health = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not import legacy component health {legacy_file}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for name, entry in health.items():
+                breaker = self._new(name)
+                breaker.failures = entry.get('failures', 0)
+                breaker.last_failure = entry.get('last_failure')
+                status = entry.get('status')
+                if status == STATUS_FAILED:
+                    breaker.state = OPEN
+                    breaker.opened_at = (datetime.fromisoformat(breaker.last_failure).timestamp()
+                                         if breaker.last_failure else now)
+                elif status == STATUS_RECOVERING:
+                    breaker._half_open(now)
+                breaker.changed_at = now
+                self._breakers[name] = breaker
+                self._dirty.add(name)
+
+        logger.info(f"Imported {len(health)} component states from {legacy_file.name}")
+
+    def flush(self):
+        """Write pending changes and pick up other processes' changes now"""
+        if self._conn is None:
+            return
+        self._push()
+        try:
+            self._pull()
+        except sqlite3.Error as e:
+            logger.warning(f"Circuit breaker refresh failed: {e}")
+
+    def _start_snapshots(self):
+        self._thread = threading.Thread(target=self._snapshot_loop, name='circuit-breakers', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _snapshot_loop(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.snapshot_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Final snapshot and close the store"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wake.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        if self._conn is not None:
+            self._push()
+            with self._db_lock:
+                self._conn.close()
+            self._conn = None
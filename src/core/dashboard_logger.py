@@ -4,10 +4,229 @@ Dashboard Logger - Updates Dashboard.md with all platform activities
 Call this after any post/send action to keep dashboard current
 """
 
+import os
 import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+
+
+# Activities kept in the log and counted by get_stats()
+MAX_ENTRIES = int(os.getenv('DASHBOARD_LOG_MAX_ENTRIES', '1000'))
+
+# A write lock older than this is assumed to belong to a dead process
+COMPACTION_LOCK_STALE = 60
+
+# Seconds an append waits for another process's append or compaction
+WRITE_LOCK_TIMEOUT = float(os.getenv('DASHBOARD_LOG_LOCK_TIMEOUT', '10'))
+
+
+class ActivityRingLog:
+    """
+    Append-only JSONL log holding roughly the last max_entries activities
+
+    Appends are a single line write. Counters for the retained window are
+    updated incrementally by reading only what was appended since the last
+    read (by this or any other process). Once the file holds twice the
+    window it is compacted back to the window in a background thread;
+    appends and compaction share a lock file, so no line is written to a
+    file that is being replaced.
+    """
+
+    def __init__(self, path: Path, max_entries: int = None):
+        self.path = Path(path)
+        self.max_entries = max_entries or MAX_ENTRIES
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+
+        # Window state, caught up lazily from the file
+        self._entries: deque = deque()
+        self._offset = 0
+        self._file_id = None
+        self._lines = 0
+        self._success = 0
+        self._failed = 0
+        self._by_platform: Dict[str, int] = {}
+
+        self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """Convert the old rewrite-everything activity.json once"""
+        legacy = self.path.with_suffix('.json')
+        if not legacy.exists() or legacy == self.path:
+            return
+        try:
+            with open(legacy, 'r') as f:
+                entries = json.load(f)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for entry in entries[-self.max_entries:]:
+                    f.write(json.dumps(entry, default=str) + '\n')
+            legacy.rename(legacy.with_name(legacy.name + '.migrated'))
+        except Exception as e:
+            print(f"Failed to migrate {legacy.name}: {e}")
+
+    # -- window bookkeeping -------------------------------------------------
+
+    def _add(self, entry: Dict[str, Any]):
+        self._entries.append(entry)
+        self._count(entry, 1)
+        while len(self._entries) > self.max_entries:
+            self._count(self._entries.popleft(), -1)
+
+    def _count(self, entry: Dict[str, Any], delta: int):
+        status = entry.get('status')
+        if status == 'success':
+            self._success += delta
+        elif status == 'failed':
+            self._failed += delta
+
+        platform = entry.get('platform', 'unknown')
+        count = self._by_platform.get(platform, 0) + delta
+        if count:
+            self._by_platform[platform] = count
+        else:
+            self._by_platform.pop(platform, None)
+
+    def _reset(self):
+        self._entries.clear()
+        self._offset = 0
+        self._lines = 0
+        self._success = 0
+        self._failed = 0
+        self._by_platform = {}
+
+    def _catch_up(self):
+        """Read lines appended since the last read (must hold self._lock)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._reset()
+            self._file_id = None
+            return
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._offset:
+            # Replaced by a compaction in another process: rebuild the window
+            self._reset()
+            self._file_id = file_id
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        # Leave a partially written last line for the next read
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            self._lines += 1
+            try:
+                self._add(json.loads(line))
+            except ValueError:
+                continue
+        self._offset += end
+
+    # -- public API ---------------------------------------------------------
+
+    def append(self, entry: Dict[str, Any]):
+        """Append one activity (O(1) apart from occasional compaction)"""
+        line = json.dumps(entry, default=str) + '\n'
+        with self._lock:
+            with self._file_locked(WRITE_LOCK_TIMEOUT):
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            self._catch_up()
+
+            if self._lines >= self.max_entries * 2:
+                self._start_compaction()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._catch_up()
+            return {
+                'total': len(self._entries),
+                'success': self._success,
+                'failed': self._failed,
+                'by_platform': dict(self._by_platform)
+            }
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._catch_up()
+            return list(self._entries)[-limit:]
+
+    # -- compaction ---------------------------------------------------------
+
+    def _start_compaction(self):
+        if self._compactor and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name='activity-log-compactor', daemon=True)
+        self._compactor.start()
+
+    def _acquire_file_lock(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - self.lock_path.stat().st_mtime > COMPACTION_LOCK_STALE:
+                        self.lock_path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    @contextmanager
+    def _file_locked(self, timeout: float):
+        """
+        Exclusive across processes: held while a line is appended and while
+        the log is compacted
+
+        Raises:
+            TimeoutError if another process holds the lock for too long
+        """
+        if not self._acquire_file_lock(timeout):
+            raise TimeoutError(f"Activity log {self.path} is locked by another process")
+        try:
+            yield
+        finally:
+            self.lock_path.unlink(missing_ok=True)
+
+    def compact(self):
+        """Rewrite the log to the retained window (appends wait for it via the write lock)"""
+        temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with self._lock, self._file_locked(WRITE_LOCK_TIMEOUT):
+                self._catch_up()
+                if self._lines < self.max_entries * 2:
+                    return  # another process compacted it already
+
+                with open(temp, 'w', encoding='utf-8') as f:
+                    for entry in self._entries:
+                        f.write(json.dumps(entry, default=str) + '\n')
+                os.replace(temp, self.path)
+
+                stat = self.path.stat()
+                self._file_id = (stat.st_dev, stat.st_ino)
+                self._offset = stat.st_size
+                self._lines = len(self._entries)
+        except Exception as e:
+            print(f"Failed to compact activity log: {e}")
+        finally:
+            temp.unlink(missing_ok=True)
 
 
 class DashboardLogger:
@@ -16,8 +235,9 @@ class DashboardLogger:
     def __init__(self, vault_path: Path = None):
         self.vault_path = vault_path or Path(__file__).parent
         self.dashboard_file = self.vault_path / 'Activity_Log.md'
-        self.log_file = self.vault_path / 'Logs' / 'activity.json'
+        self.log_file = self.vault_path / 'Logs' / 'activity.jsonl'
         self.log_file.parent.mkdir(exist_ok=True)
+        self.activity_log = ActivityRingLog(self.log_file)
 
     def log_activity(
         self,
@@ -91,16 +311,9 @@ class DashboardLogger:
         details: Dict,
         url: str
     ):
-        """Log to JSON file"""
+        """Append to the JSONL activity log"""
         try:
-            # Load existing logs
-            logs = []
-            if self.log_file.exists():
-                with open(self.log_file, 'r') as f:
-                    logs = json.load(f)
-
-            # Add new entry
-            logs.append({
+            self.activity_log.append({
                 'timestamp': datetime.now().isoformat(),
                 'platform': platform,
                 'action': action,
@@ -108,14 +321,6 @@ class DashboardLogger:
                 'details': details,
                 'url': url
             })
-
-            # Keep last 1000 entries
-            logs = logs[-1000:]
-
-            # Save
-            with open(self.log_file, 'w') as f:
-                json.dump(logs, f, indent=2)
-
         except Exception as e:
             print(f"Failed to log JSON: {e}")
 
@@ -183,32 +388,16 @@ class DashboardLogger:
         )
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get activity statistics"""
+        """Get activity statistics (over the last max_entries activities)"""
         try:
-            if not self.log_file.exists():
-                return {'total': 0}
-
-            with open(self.log_file, 'r') as f:
-                logs = json.load(f)
-
-            stats = {
-                'total': len(logs),
-                'success': len([l for l in logs if l.get('status') == 'success']),
-                'failed': len([l for l in logs if l.get('status') == 'failed']),
-                'by_platform': {}
-            }
-
-            for log in logs:
-                platform = log.get('platform', 'unknown')
-                if platform not in stats['by_platform']:
-                    stats['by_platform'][platform] = 0
-                stats['by_platform'][platform] += 1
-
-            return stats
-
+            return self.activity_log.stats()
         except Exception as e:
             return {'error': str(e)}
 
+    def get_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recent activities, newest last"""
+        return self.activity_log.recent(limit)
+
 
 # Global instance
 logger = DashboardLogger()
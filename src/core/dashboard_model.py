@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Dashboard Model - Dashboard.md as structured sections with atomic rendering
+Parses the dashboard once into ordered '## ' sections, applies a batch of
+section deltas in memory, and writes the file (temp file + rename) only if
+the rendered content actually changed
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# A write lock older than this is assumed to belong to a dead process
+WRITE_LOCK_STALE = 30
+
+# Entries an activity feed keeps in the dashboard; older ones are archived
+FEED_MAX_ENTRIES = int(os.getenv('DASHBOARD_FEED_MAX_ENTRIES', '20'))
+
+# Entry headings start with their timestamp: '2026-01-31 09:15:00 - ...'
+_ENTRY_DATE = re.compile(r'^#+ (\d{4}-\d{2}-\d{2})[ T]\d{2}:\d{2}')
+
+
+def section_key(heading: str) -> str:
+    """Lookup key for a heading: '## 📊 Quick Stats' -> 'quick stats'"""
+    text = heading.lstrip('#')
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', '', text)).strip().lower()
+
+
+class DashboardDocument:
+    """A markdown document split into a preamble and ordered '## ' sections"""
+
+    def __init__(self, preamble: str = '', sections: List[Tuple[str, str]] = None):
+        self.preamble = preamble
+        # (heading line without newline, body text) in document order
+        self.sections: List[Tuple[str, str]] = list(sections or [])
+        self._positions = {section_key(heading): i for i, (heading, _) in enumerate(self.sections)}
+
+    @classmethod
+    def parse(cls, text: str) -> 'DashboardDocument':
+        preamble_lines: List[str] = []
+        sections: List[Tuple[str, str]] = []
+        heading = None
+        body: List[str] = []
+        in_fence = False
+
+        for line in text.splitlines(keepends=True):
+            if line.lstrip().startswith('```'):
+                in_fence = not in_fence
+            if not in_fence and line.startswith('## '):
+                if heading is not None:
+                    sections.append((heading, ''.join(body)))
+                heading, body = line.rstrip('\r\n'), []
+            elif heading is None:
+                preamble_lines.append(line)
+            else:
+                body.append(line)
+
+        if heading is not None:
+            sections.append((heading, ''.join(body)))
+        return cls(''.join(preamble_lines), sections)
+
+    def copy(self) -> 'DashboardDocument':
+        return DashboardDocument(self.preamble, self.sections)
+
+    def has(self, name: str) -> bool:
+        return section_key(name) in self._positions
+
+    def get(self, name: str) -> Optional[str]:
+        """Body of a section (by heading or key), or None"""
+        position = self._positions.get(section_key(name))
+        return self.sections[position][1] if position is not None else None
+
+    def set(self, name: str, body: str, heading: str = None, after: str = None):
+        """
+        Replace a section's body, adding the section if it is missing
+
+        Args:
+            name: Heading or key of the section
+            body: New body (a blank line is kept before the next section)
+            heading: Heading line for a new section (default '## ' + name)
+            after: Section to insert a new section after (default: at the end)
+        """
+        body = body.rstrip('\n') + '\n\n'
+        key = section_key(name)
+        position = self._positions.get(key)
+        if position is not None:
+            self.sections[position] = (self.sections[position][0], body)
+            return
+
+        heading = heading or (name if name.startswith('## ') else f"## {name}")
+        index = len(self.sections)
+        if after is not None and section_key(after) in self._positions:
+            index = self._positions[section_key(after)] + 1
+        if index == len(self.sections) and self.sections and not self.sections[-1][1].endswith('\n\n'):
+            last_heading, last_body = self.sections[-1]
+            self.sections[-1] = (last_heading, last_body.rstrip('\n') + '\n\n')
+        self.sections.insert(index, (heading, body))
+        self._positions = {section_key(h): i for i, (h, _) in enumerate(self.sections)}
+
+    def remove_where(self, predicate: Callable[[str], bool]) -> List[Tuple[str, str]]:
+        """Remove the sections whose heading matches predicate and return them in order"""
+        removed = [section for section in self.sections if predicate(section[0])]
+        if removed:
+            self.sections = [section for section in self.sections if not predicate(section[0])]
+            self._positions = {section_key(h): i for i, (h, _) in enumerate(self.sections)}
+        return removed
+
+    def edit(self, name: str, func: Callable[[str], str]):
+        """Replace a section's body with func(current body) (no-op if the section is missing)"""
+        current = self.get(name)
+        if current is not None:
+            self.set(name, func(current))
+
+    def render(self) -> str:
+        parts = [self.preamble]
+        for heading, body in self.sections:
+            parts.append(heading + '\n')
+            parts.append(body)
+        text = ''.join(parts)
+        return text.rstrip('\n') + '\n'
+
+
+class DashboardStore:
+    """
+    Reads and writes one Dashboard.md for every updater in the process
+
+    update() applies a batch of changes to the parsed document under a
+    thread lock and a cross-process lock file, then writes the result with
+    a temp file and os.replace() only if it differs from what is on disk.
+    """
+
+    def __init__(self, path: Path, initial_content: str = None):
+        self.path = Path(path)
+        self.initial_content = initial_content
+        self.lock_path = self.path.with_name(f".{self.path.name}.lock")
+        self._lock = threading.RLock()
+        self._cached: Optional[Tuple[int, int, str]] = None
+        self._document: Optional[DashboardDocument] = None
+        self.writes = 0
+        self.skipped = 0
+
+    def _read(self) -> Tuple[str, DashboardDocument]:
+        """Current text and parsed document (re-parsed only when the file changed)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            text = self.initial_content or ''
+            return text, DashboardDocument.parse(text)
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._cached is None or self._cached[:2] != signature:
+            text = self.path.read_text(encoding='utf-8')
+            self._cached = (*signature, text)
+            self._document = DashboardDocument.parse(text)
+        return self._cached[2], self._document.copy()
+
+    def load(self) -> DashboardDocument:
+        with self._lock:
+            return self._read()[1]
+
+    def _acquire_file_lock(self, timeout: float = 10) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - self.lock_path.stat().st_mtime > WRITE_LOCK_STALE:
+                        self.lock_path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def update(self, changes: Callable[[DashboardDocument], None] = None,
+               sections: Dict[str, str] = None, volatile: Iterable[str] = ()) -> bool:
+        """
+        Apply changes and write the dashboard if its content changed
+
+        Args:
+            changes: Called with the document to mutate it
+            sections: Section bodies to set (by heading or key)
+            volatile: Sections (e.g. a 'last checked' timestamp) whose change
+                alone does not justify rewriting the file
+
+        Returns:
+            True if the file was written
+        """
+        volatile_keys = {section_key(name) for name in volatile}
+
+        with self._lock:
+            locked = self._acquire_file_lock()
+            if not locked:
+                logger.warning(f"Timed out waiting for {self.lock_path.name}; writing anyway")
+            try:
+                text, document = self._read()
+                before = {section_key(h): b for h, b in document.sections if section_key(h) not in volatile_keys}
+                before_preamble = document.preamble
+
+                if changes:
+                    changes(document)
+                for name, body in (sections or {}).items():
+                    document.set(name, body)
+
+                after = {section_key(h): b for h, b in document.sections if section_key(h) not in volatile_keys}
+                rendered = document.render()
+                unchanged = rendered == text or (after == before and document.preamble == before_preamble)
+                if unchanged and self.path.exists():
+                    self.skipped += 1
+                    return False
+
+                temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                try:
+                    temp.write_text(rendered, encoding='utf-8')
+                    os.replace(temp, self.path)
+                finally:
+                    temp.unlink(missing_ok=True)
+                self.writes += 1
+
+                stat = self.path.stat()
+                self._cached = (stat.st_mtime_ns, stat.st_size, rendered)
+                self._document = document.copy()
+                return True
+            finally:
+                if locked:
+                    self.lock_path.unlink(missing_ok=True)
+
+
+class ActivityFeed:
+    """
+    Capped activity section of a dashboard, with dated archives for the rest
+
+    The section holds the newest max_entries entries ('### <timestamp> - ...'
+    sub-headings, newest first). Entries pushed out are appended to
+    <archive_dir>/activity_YYYY-MM-DD.md for their date, and index.json /
+    index.md list the archive files, so the dashboard stays the same size
+    however many files are processed.
+    """
+
+    def __init__(self, store: DashboardStore, section: str, archive_dir: Path, max_entries: int = None):
+        self.store = store
+        self.section = section
+        self.archive_dir = Path(archive_dir)
+        self.max_entries = max_entries or FEED_MAX_ENTRIES
+        self.index_path = self.archive_dir / 'index.json'
+
+    @staticmethod
+    def _split_entries(body: str) -> List[str]:
+        entries, current = [], []
+        for line in body.splitlines(keepends=True):
+            if line.startswith('### ') and current:
+                entries.append(''.join(current))
+                current = []
+            if current or line.startswith('### '):
+                current.append(line)
+        if current:
+            entries.append(''.join(current))
+        return [entry.strip('\n') + '\n' for entry in entries]
+
+    def _archive(self, entries: List[str]):
+        """Append entries (oldest first) to their dated archive files and update the index"""
+        if not entries:
+            return
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        by_date: Dict[str, List[str]] = {}
+        for entry in entries:
+            match = _ENTRY_DATE.match(entry)
+            date = match.group(1) if match else datetime.now().strftime('%Y-%m-%d')
+            by_date.setdefault(date, []).append(entry)
+
+        try:
+            index = json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            index = {}
+
+        for date, dated in by_date.items():
+            archive_file = self.archive_dir / f"activity_{date}.md"
+            new_file = not archive_file.exists()
+            with open(archive_file, 'a', encoding='utf-8') as f:
+                if new_file:
+                    f.write(f"# {self.section.lstrip('#').strip()} - {date}\n\n")
+                for entry in dated:
+                    f.write(entry + '\n')
+            info = index.setdefault(date, {'file': archive_file.name, 'entries': 0})
+            info['entries'] += len(dated)
+
+        temp = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps(index, indent=2, sort_keys=True), encoding='utf-8')
+        os.replace(temp, self.index_path)
+
+        lines = [f"# {self.section.lstrip('#').strip()} Archive\n\n"]
+        for date in sorted(index, reverse=True):
+            lines.append(f"- [[{index[date]['file'][:-3]}|{date}]] - {index[date]['entries']} entries\n")
+        temp = self.archive_dir / f".index.md.{os.getpid()}.tmp"
+        temp.write_text(''.join(lines), encoding='utf-8')
+        os.replace(temp, self.archive_dir / 'index.md')
+
+    def _trim(self, entries: List[str]) -> List[str]:
+        """Keep the newest max_entries (entries are newest first) and archive the rest"""
+        if len(entries) > self.max_entries:
+            self._archive(list(reversed(entries[self.max_entries:])))
+            entries = entries[:self.max_entries]
+        return entries
+
+    def add(self, entry: str) -> bool:
+        """
+        Add an entry ('### <timestamp> - title' followed by detail lines)
+
+        Returns:
+            True if the dashboard was written
+        """
+        def apply(document: DashboardDocument):
+            entries = self._split_entries(document.get(self.section) or '')
+            entries = self._trim([entry.strip('\n') + '\n'] + entries)
+            document.set(self.section, '\n'.join(entries))
+
+        return self.store.update(apply)
+
+    def migrate(self, legacy_heading: re.Pattern) -> int:
+        """
+        Move legacy top-level entry sections into the feed (one-time)
+
+        Older dashboards appended every entry as its own '## <timestamp>'
+        section. Those sections are removed; the newest max_entries become
+        feed entries and the rest go to the archive.
+
+        Returns:
+            Number of legacy entries moved
+        """
+        moved = []
+
+        def apply(document: DashboardDocument):
+            legacy = document.remove_where(lambda heading: bool(legacy_heading.match(heading)))
+            if not legacy:
+                return
+            converted = []
+            for heading, body in legacy:
+                # Drop the old '---' separators; headings separate entries now
+                detail = '\n'.join(line for line in body.strip('\n').splitlines() if line.strip() != '---')
+                converted.append('#' + heading + '\n' + detail.strip('\n') + '\n')
+            moved.extend(converted)
+
+            # Newest first by the timestamp each heading starts with
+            entries = self._split_entries(document.get(self.section) or '') + converted
+            entries.sort(key=lambda entry: entry.split(' - ', 1)[0].lstrip('# '), reverse=True)
+            entries = self._trim(entries)
+            document.set(self.section, '\n'.join(entries))
+
+        self.store.update(apply)
+        if moved:
+            logger.info(f"Moved {len(moved)} legacy activity entries out of {self.store.path.name}")
+        return len(moved)
+
+
+_stores: Dict[str, DashboardStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_dashboard_store(path, initial_content: str = None) -> DashboardStore:
+    """Shared store for a dashboard file, so writers in one process share its lock and cache"""
+    key = str(Path(path).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = DashboardStore(Path(path), initial_content)
+        elif initial_content and not store.initial_content:
+            store.initial_content = initial_content
+        return store
@@ -7,38 +7,44 @@ Ensures AI Employee continues operating even when components fail
 import os
 import sys
 import json
-import time
+import asyncio
 import logging
 from pathlib import Path
 from typing import Dict, Any, Callable, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import traceback
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent))
+# Add the project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-from audit_logger import AuditLogger
+from src.core.audit_logger import AuditLogger
+from src.core.circuit_breaker import CircuitBreakerRegistry, STATUS_DEGRADED, STATUS_FAILED, STATUS_HEALTHY
+from src.core.retry import RetryPolicy, retry_async, run_sync
 
 
 class ErrorRecoverySystem:
     """Handles errors and implements graceful degradation"""
 
-    def __init__(self):
-        self.vault_path = Path("C:\\Users\\LENOVO X1 YOGA\\Desktop\\hakathone zero\\AI_Employee_Vault")
+    DEFAULT_COMPONENTS = [
+        "gmail_watcher", "linkedin_watcher", "filesystem_watcher",
+        "email_mcp", "linkedin_mcp", "twitter_mcp", "instagram_mcp", "reddit_mcp", "whatsapp_mcp"
+    ]
+
+    def __init__(self, vault_path: str = None):
+        self.vault_path = Path(vault_path) if vault_path else Path("C:\\Users\\LENOVO X1 YOGA\\Desktop\\hakathone zero\\AI_Employee_Vault")
+        # Pre-registry JSON state, imported once into the breaker store
         self.state_file = self.vault_path / "state" / "error_recovery_state.json"
         self.state_file.parent.mkdir(exist_ok=True)
 
         self.logger = logging.getLogger(__name__)
         self.audit_logger = AuditLogger()
 
-        # Component health tracking
-        self.component_health = self._load_component_health()
-
         # Retry configuration
         self.retry_config = {
             "max_retries": 3,
             "base_delay": 5,  # seconds
-            "max_delay": 300  # 5 minutes
+            "max_delay": 300,  # 5 minutes
+            "deadline": None  # total seconds per call (None for no limit)
         }
 
         # Circuit breaker configuration
@@ -48,129 +54,70 @@ class ErrorRecoverySystem:
             "half_open_max_calls": 3
         }
 
-    def _load_component_health(self) -> Dict[str, Any]:
-        """Load component health state"""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.error(f"Failed to load component health: {e}")
-
-        # Default component health
-        return {
-            "gmail_watcher": {"status": "healthy", "failures": 0, "last_failure": None},
-            "linkedin_watcher": {"status": "healthy", "failures": 0, "last_failure": None},
-            "filesystem_watcher": {"status": "healthy", "failures": 0, "last_failure": None},
-            "email_mcp": {"status": "healthy", "failures": 0, "last_failure": None},
-            "linkedin_mcp": {"status": "healthy", "failures": 0, "last_failure": None},
-            "twitter_mcp": {"status": "healthy", "failures": 0, "last_failure": None},
-            "instagram_mcp": {"status": "healthy", "failures": 0, "last_failure": None},
-            "reddit_mcp": {"status": "healthy", "failures": 0, "last_failure": None},
-            "whatsapp_mcp": {"status": "healthy", "failures": 0, "last_failure": None}
-        }
-
-    def _save_component_health(self):
-        """Save component health state"""
-        try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.component_health, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Failed to save component health: {e}")
-
-    def is_component_healthy(self, component_name: str) -> bool:
-        """Check if component is healthy"""
-        if component_name not in self.component_health:
-            return True  # Assume healthy if not tracked
-
-        health = self.component_health[component_name]
-
-        if health["status"] == "healthy":
-            return True
-
-        if health["status"] == "degraded":
-            return True  # Still operational but with issues
-
-        if health["status"] == "failed":
-            # Check if recovery timeout has passed
-            if health["last_failure"]:
-                last_failure = datetime.fromisoformat(health["last_failure"])
-                if datetime.now() - last_failure > timedelta(seconds=self.circuit_breaker["recovery_timeout"]):
-                    # Try to recover
-                    health["status"] = "recovering"
-                    self._save_component_health()
-                    return True
-            return False
-
-        if health["status"] == "recovering":
-            # In half-open state, allow limited calls
-            return True
-
-        return False
-
-    def record_component_failure(self, component_name: str, error: str):
-        """Record a component failure"""
-        if component_name not in self.component_health:
-            self.component_health[component_name] = {
-                "status": "healthy",
-                "failures": 0,
-                "last_failure": None
-            }
-
-        health = self.component_health[component_name]
-        health["failures"] += 1
-        health["last_failure"] = datetime.now().isoformat()
-
-        # Update status based on failure count
-        if health["failures"] >= self.circuit_breaker["failure_threshold"]:
-            health["status"] = "failed"
+        # Component health tracking: in-memory breakers, snapshotted in the
+        # background to a SQLite table shared with other processes
+        self.breakers = CircuitBreakerRegistry(
+            db_path=os.getenv('CIRCUIT_BREAKER_DB') or self.vault_path / "state" / "circuit_breakers.sqlite",
+            failure_threshold=self.circuit_breaker["failure_threshold"],
+            recovery_timeout=self.circuit_breaker["recovery_timeout"],
+            half_open_max_calls=self.circuit_breaker["half_open_max_calls"],
+            on_transition=self._on_health_transition,
+            legacy_file=self.state_file
+        )
+        self.breakers.register(self.DEFAULT_COMPONENTS)
+
+    @property
+    def component_health(self) -> Dict[str, Any]:
+        """Snapshot of every component's health"""
+        return self.breakers.snapshot()
+
+    def _on_health_transition(self, component_name: str, old_status: str, new_status: str, breaker):
+        """Log and audit component status changes"""
+        if new_status == STATUS_FAILED:
             self.logger.critical(f"Component {component_name} marked as FAILED")
             self.audit_logger.log_error(
                 error_type="COMPONENT_FAILURE",
                 error_message=f"Component {component_name} exceeded failure threshold",
-                context={"component": component_name, "failure_count": health["failures"]}
+                context={"component": component_name, "failure_count": breaker.failures}
             )
-        elif health["failures"] >= self.circuit_breaker["failure_threshold"] // 2:
-            health["status"] = "degraded"
+        elif new_status == STATUS_DEGRADED and old_status == STATUS_HEALTHY:
             self.logger.warning(f"Component {component_name} marked as DEGRADED")
+        elif new_status == STATUS_HEALTHY:
+            self.logger.info(f"Component {component_name} recovered to HEALTHY")
+            self.audit_logger.log_action(
+                action_type="component_recovered",
+                actor="ErrorRecoverySystem",
+                details={"component": component_name}
+            )
+        else:
+            self.logger.info(f"Component {component_name}: {old_status} -> {new_status}")
 
-        self._save_component_health()
+    def is_component_healthy(self, component_name: str) -> bool:
+        """Check if component is healthy (in-memory; untracked components count as healthy)"""
+        return self.breakers.is_available(component_name)
+
+    def record_component_failure(self, component_name: str, error: str):
+        """Record a component failure"""
+        self.breakers.record_failure(component_name, error)
 
     def record_component_success(self, component_name: str):
         """Record a component success"""
-        if component_name not in self.component_health:
-            return
-
-        health = self.component_health[component_name]
-
-        # If component was recovering, check if it's fully recovered
-        if health["status"] == "recovering":
-            # This would track successful calls during recovery
-            pass
-
-        # Reset failure count on success
-        if health["status"] in ["failed", "degraded"]:
-            # Gradual recovery
-            health["failures"] = max(0, health["failures"] - 1)
-
-            if health["failures"] == 0:
-                health["status"] = "healthy"
-                self.logger.info(f"Component {component_name} recovered to HEALTHY")
-                self.audit_logger.log_action(
-                    action_type="component_recovered",
-                    actor="ErrorRecoverySystem",
-                    details={"component": component_name}
-                )
+        self.breakers.record_success(component_name)
 
-        self._save_component_health()
-
-    def with_retry(self, func: Callable, component_name: str, *args, **kwargs) -> Any:
+    async def with_retry_async(self, func: Callable, component_name: str, *args,
+                               deadline: float = None, **kwargs) -> Any:
         """
-        Execute a function with retry logic
+        Execute a function with retry logic, yielding to the event loop between attempts
+
+        Waits use full-jitter exponential backoff (longer if the error
+        carries a Retry-After hint) and stop early when the component's
+        circuit opens or the deadline budget runs out.
 
         Args:
-            func: Function to execute
+            func: Function or coroutine function to execute (plain functions
+                run in a worker thread)
             component_name: Name of component for health tracking
+            deadline: Total seconds for all attempts (defaults to retry_config)
             *args, **kwargs: Arguments for the function
 
         Returns:
@@ -179,22 +126,30 @@ class ErrorRecoverySystem:
         Raises:
             Exception if all retries fail
         """
-        if not self.is_component_healthy(component_name):
+        # Reserves a trial slot when the circuit is half-open
+        if not self.breakers.allow_request(component_name):
             error_msg = f"Component {component_name} is not healthy"
             self.logger.error(error_msg)
             raise Exception(error_msg)
 
-        last_exception = None
-
-        for attempt in range(self.retry_config["max_retries"]):
+        policy = RetryPolicy(
+            max_attempts=self.retry_config["max_retries"],
+            base_delay=self.retry_config["base_delay"],
+            max_delay=self.retry_config["max_delay"],
+            deadline=deadline if deadline is not None else self.retry_config.get("deadline")
+        )
+        attempts = 0
+
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
             try:
-                result = func(*args, **kwargs)
-                self.record_component_success(component_name)
-                return result
-
+                if asyncio.iscoroutinefunction(func):
+                    result = await func(*args, **kwargs)
+                else:
+                    result = await asyncio.to_thread(func, *args, **kwargs)
             except Exception as e:
-                last_exception = e
-                self.logger.warning(f"Attempt {attempt + 1} failed for {component_name}: {e}")
+                self.logger.warning(f"Attempt {attempts} failed for {component_name}: {e}")
 
                 # Record failure
                 self.record_component_failure(component_name, str(e))
@@ -204,26 +159,48 @@ class ErrorRecoverySystem:
                     error_type=f"{component_name}_ERROR",
                     error_message=str(e),
                     stack_trace=traceback.format_exc(),
-                    context={"attempt": attempt + 1, "component": component_name}
+                    context={"attempt": attempts, "component": component_name}
                 )
+                raise
 
-                # Calculate delay with exponential backoff
-                delay = min(
-                    self.retry_config["base_delay"] * (2 ** attempt),
-                    self.retry_config["max_delay"]
-                )
+            self.record_component_success(component_name)
+            return result
 
-                self.logger.info(f"Retrying in {delay} seconds...")
-                time.sleep(delay)
+        def on_retry(attempt_number: int, error: Exception, delay: float):
+            self.logger.info(f"Retrying {component_name} in {delay:.1f} seconds...")
 
-                # If component is now unhealthy, stop retrying
-                if not self.is_component_healthy(component_name):
-                    break
+        try:
+            # Any error is retried until the component's circuit opens
+            return await retry_async(
+                attempt, policy=policy,
+                retry_if=lambda e: self.is_component_healthy(component_name),
+                on_retry=on_retry
+            )
+        except Exception as e:
+            self.logger.error(f"All retries failed for {component_name}: {e}")
+            raise
 
-        # All retries failed
-        error_msg = f"All retries failed for {component_name}: {str(last_exception)}"
-        self.logger.error(error_msg)
-        raise last_exception
+    def with_retry(self, func: Callable, component_name: str, *args, **kwargs) -> Any:
+        """
+        Execute a function with retry logic (blocking)
+
+        Runs with_retry_async on the shared retry loop, so the backoff waits
+        of many callers don't each hold a sleeping thread. Coroutines should
+        await with_retry_async instead; calling this from an event loop
+        thread raises RuntimeError.
+
+        Args:
+            func: Function to execute
+            component_name: Name of component for health tracking
+            *args, **kwargs: Arguments for the function
+
+        Returns:
+            Function result
+
+        Raises:
+            Exception if all retries fail
+        """
+        return run_sync(self.with_retry_async(func, component_name, *args, **kwargs))
 
     def graceful_degradation(self, primary_func: Callable, backup_func: Callable,
                            component_name: str, *args, **kwargs) -> Any:
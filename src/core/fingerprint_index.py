@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Fingerprint Index - Shared record of messages already captured as action items
+Watchers and collectors claim a fingerprint (message-ID, tweet ID or content
+hash) before writing to Needs_Action, so a message seen again on the next
+polling cycle, or by another writer, does not become a second action file.
+A Bloom filter in front of the SQLite store answers "never seen" from memory.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_FILENAME = '.action_fingerprints.sqlite'
+
+# Keys the Bloom filter is sized for before it is rebuilt larger
+BLOOM_CAPACITY = int(os.getenv('ACTION_INDEX_CAPACITY', '100000'))
+BLOOM_ERROR_RATE = float(os.getenv('ACTION_INDEX_ERROR_RATE', '0.001'))
+
+# Fingerprints older than this are dropped when the index is opened (0 keeps all)
+RETENTION_DAYS = float(os.getenv('ACTION_INDEX_RETENTION_DAYS', '365'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    path TEXT,
+    first_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_seen ON fingerprints (first_seen);
+"""
+
+
+def fingerprint(kind: str, *parts: Any) -> str:
+    """
+    Index key for a message: kind plus its id, or a hash of identifying fields
+
+    A single part (a Message-ID or tweet ID) is used as is; several parts are
+    normalized (case and whitespace) and hashed.
+    """
+    values = [re.sub(r'\s+', ' ', str(part if part is not None else '')).strip() for part in parts]
+    if len(values) == 1 and values[0]:
+        return f"{kind}:{values[0]}"
+    payload = json.dumps([value.lower() for value in values], ensure_ascii=False)
+    return f"{kind}:sha256:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class BloomFilter:
+    """Fixed-size bit array with k hash positions per key (no false negatives)"""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.capacity = max(1, capacity)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing: position i = h1 + i * h2
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class FingerprintIndex:
+    """
+    SQLite store of captured fingerprints with a Bloom filter in front
+
+    The filter is loaded from the table when the index opens and then
+    catches up on rows other processes added (by row id) before each
+    lookup, so a miss is authoritative without querying by key. Hits are
+    confirmed against the table. claim() is an INSERT OR IGNORE, so two
+    writers racing for one message cannot both win.
+    """
+
+    def __init__(self, db_path, capacity: int = None, retention_days: float = None):
+        self.db_path = Path(db_path)
+        self.capacity = capacity or BLOOM_CAPACITY
+        self._lock = threading.RLock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+            retention = RETENTION_DAYS if retention_days is None else retention_days
+            if retention > 0:
+                self._conn.execute('DELETE FROM fingerprints WHERE first_seen < ?',
+                                   (time.time() - retention * 86400,))
+            self._conn.commit()
+            self._rebuild()
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_vault(cls, vault_path) -> 'FingerprintIndex':
+        """Index at ACTION_INDEX_DB or <vault>/.action_fingerprints.sqlite"""
+        return cls(os.getenv('ACTION_INDEX_DB') or Path(vault_path) / INDEX_FILENAME)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -- filter maintenance -------------------------------------------------
+
+    def _rebuild(self):
+        """Size a fresh filter for the stored keys and load them (must hold self._lock)"""
+        total = self._conn.execute('SELECT COUNT(*) FROM fingerprints').fetchone()[0]
+        while total * 2 > self.capacity:
+            self.capacity *= 2
+        self._bloom = BloomFilter(self.capacity)
+        self._last_id = 0
+        self._catch_up()
+
+    def _catch_up(self):
+        """Add rows written since the last read, by this or another process (must hold self._lock)"""
+        rows = self._conn.execute('SELECT id, key FROM fingerprints WHERE id > ? ORDER BY id',
+                                  (self._last_id,)).fetchall()
+        for row in rows:
+            self._bloom.add(row['key'])
+            self._last_id = row['id']
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild()
+
+    # -- lookups ------------------------------------------------------------
+
+    def _stored(self, key: str) -> Optional[sqlite3.Row]:
+        self._catch_up()
+        if key not in self._bloom:
+            return None
+        return self._conn.execute('SELECT * FROM fingerprints WHERE key = ?', (key,)).fetchone()
+
+    def seen(self, key: str) -> bool:
+        with self._lock:
+            return self._stored(key) is not None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The stored entry ('kind', 'path', 'first_seen') for a key, if any"""
+        with self._lock:
+            row = self._stored(key)
+        return dict(row) if row else None
+
+    def claim(self, key: str, path=None) -> bool:
+        """
+        Record a fingerprint before its action file is written
+
+        Returns:
+            True if the caller should write the file; False if the message
+            was already captured (by any writer)
+        """
+        with self._lock:
+            if self._stored(key) is not None:
+                self.hits += 1
+                return False
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO fingerprints (key, kind, path, first_seen) VALUES (?, ?, ?, ?)',
+                (key, key.split(':', 1)[0], str(path) if path else None, time.time())
+            )
+            self._conn.commit()
+            self._catch_up()
+            if cursor.rowcount == 0:
+                self.hits += 1
+                return False
+            self.misses += 1
+            return True
+
+    def release(self, key: str):
+        """Forget a claim whose action file could not be written, so it is captured next time"""
+        with self._lock:
+            self._conn.execute('DELETE FROM fingerprints WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._catch_up()
+            total = self._conn.execute('SELECT COUNT(*) FROM fingerprints').fetchone()[0]
+            return {'fingerprints': total, 'bloom_bits': self._bloom.size, 'bloom_hashes': self._bloom.hashes,
+                    'duplicates_skipped': self.hits, 'captured': self.misses}
+
+
+_indexes: Dict[Path, FingerprintIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_fingerprint_index(vault_path) -> FingerprintIndex:
+    """Process-wide index for a vault, shared by every Needs_Action writer"""
+    path = Path(os.getenv('ACTION_INDEX_DB') or Path(vault_path) / INDEX_FILENAME).resolve()
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = FingerprintIndex(path)
+        return index
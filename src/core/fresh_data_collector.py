@@ -9,20 +9,28 @@ Collects fresh data from ALL platforms:
 - Instagram (check status)
 - WhatsApp (check status)
 
-Run this to get latest data from everywhere.
+Run this to get latest data from everywhere. Sources run concurrently,
+each with its own timeout, so one slow platform does not hold up the rest.
 """
 
 import os
 import sys
 import json
-import imaplib
-import email
-from email.header import decode_header
+import time
+import asyncio
+import threading
+import concurrent.futures
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import logging
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.imap_sync import ImapSync, message_text, attachment_names
+from src.core.fingerprint_index import fingerprint, get_fingerprint_index
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -46,89 +54,47 @@ logger = logging.getLogger(__name__)
 # EMAIL COLLECTOR (Gmail IMAP)
 # ============================================================
 
-def fetch_gmail_emails(limit: int = 10) -> List[Dict]:
-    """Fetch latest emails from Gmail using IMAP"""
-    emails = []
+_email_sync: Optional[ImapSync] = None
 
-    imap_server = os.getenv('EMAIL_IMAP_SERVER', 'imap.gmail.com')
-    imap_port = int(os.getenv('EMAIL_IMAP_PORT', 993))
-    username = os.getenv('EMAIL_USERNAME')
-    password = os.getenv('EMAIL_PASSWORD')
 
-    if not username or not password:
-        logger.error("Email credentials not configured")
-        return emails
+def get_email_sync() -> Optional[ImapSync]:
+    """Incremental inbox reader for the collector (None without credentials)"""
+    global _email_sync
+    if _email_sync is None:
+        _email_sync = ImapSync.from_env(VAULT_PATH / '.imap_sync_fresh_data.json')
+    return _email_sync
 
-    try:
-        logger.info(f"Connecting to {imap_server}...")
-        mail = imaplib.IMAP4_SSL(imap_server, imap_port)
-        mail.login(username, password)
-        mail.select('INBOX')
-
-        # Search for recent emails (last 3 days)
-        date_since = (datetime.now() - timedelta(days=3)).strftime("%d-%b-%Y")
-        status, messages = mail.search(None, f'(SINCE "{date_since}")')
 
-        if status != 'OK':
-            logger.error("Failed to search emails")
-            return emails
+def fetch_gmail_emails(limit: int = None) -> List[Dict]:
+    """
+    Fetch emails that arrived since the last collection, oldest first
 
-        email_ids = messages[0].split()
-        logger.info(f"Found {len(email_ids)} emails from last 3 days")
+    Only headers and a short preview are downloaded; save_email_to_needs_action
+    fetches the full message. With a limit, the remaining emails are returned
+    by the next call.
+    """
+    emails = []
 
-        # Get latest emails
-        for email_id in email_ids[-limit:]:
-            try:
-                status, msg_data = mail.fetch(email_id, '(RFC822)')
-                if status != 'OK':
-                    continue
-
-                raw_email = msg_data[0][1]
-                msg = email.message_from_bytes(raw_email)
-
-                # Decode subject
-                subject = ""
-                if msg['Subject']:
-                    decoded = decode_header(msg['Subject'])
-                    subject = decoded[0][0]
-                    if isinstance(subject, bytes):
-                        subject = subject.decode(decoded[0][1] or 'utf-8', errors='ignore')
-
-                # Get sender
-                sender = msg['From'] or "Unknown"
-
-                # Get date
-                date_str = msg['Date'] or ""
-
-                # Get body
-                body = ""
-                if msg.is_multipart():
-                    for part in msg.walk():
-                        if part.get_content_type() == "text/plain":
-                            try:
-                                body = part.get_payload(decode=True).decode('utf-8', errors='ignore')
-                                break
-                            except:
-                                pass
-                else:
-                    try:
-                        body = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
-                    except:
-                        body = str(msg.get_payload())
-
-                emails.append({
-                    'id': email_id.decode(),
-                    'subject': subject,
-                    'from': sender,
-                    'date': date_str,
-                    'body': body[:500] if body else "",
-                    'priority': determine_priority(subject + " " + body)
-                })
+    sync = get_email_sync()
+    if sync is None:
+        logger.error("Email credentials not configured")
+        return emails
 
-            except Exception as e:
-                logger.error(f"Error processing email {email_id}: {e}")
+    try:
+        logger.info(f"Syncing {sync.key}...")
+        for message in sync.fetch_new(limit):
+            body = message.preview
+            emails.append({
+                'id': str(message.uid),
+                'uid': message.uid,
+                'message_id': message.message_id,
+                'subject': message.subject,
+                'from': message.sender or "Unknown",
+                'date': message.date,
+                'body': body[:500] if body else "",
+                'priority': determine_priority(message.subject + " " + body)
+            })
 
-        mail.logout()
         logger.info(f"Successfully fetched {len(emails)} emails")
 
     except Exception as e:
@@ -136,6 +102,15 @@ def fetch_gmail_emails(limit: int = 10) -> List[Dict]:
 
     return emails
 
+
+def mark_emails_collected(emails: List[Dict]):
+    """Move the inbox sync past emails the collector has dealt with"""
+    sync = get_email_sync()
+    if sync is not None:
+        for em in emails:
+            sync.mark_seen(em['uid'])
+
+
 def determine_priority(text: str) -> str:
     """Determine email priority based on keywords"""
     text = text.lower()
@@ -318,12 +293,42 @@ def check_whatsapp_status() -> Dict[str, Any]:
 # SAVE DATA TO NEEDS_ACTION
 # ============================================================
 
-def save_email_to_needs_action(email_data: Dict) -> Path:
-    """Save email to Needs_Action folder"""
+def email_fingerprint(email_data: Dict) -> str:
+    """Index key shared with the email watcher: Message-ID, else sender, subject and date"""
+    if email_data.get('message_id'):
+        return fingerprint('email', email_data['message_id'])
+    return fingerprint('email', email_data['from'], email_data['subject'], email_data['date'])
+
+
+def save_email_to_needs_action(email_data: Dict) -> Optional[Path]:
+    """Save email to Needs_Action folder (None if it was already captured)"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"EMAIL_{timestamp}_{email_data['id']}.md"
     filepath = NEEDS_ACTION / filename
 
+    index = get_fingerprint_index(VAULT_PATH)
+    key = email_fingerprint(email_data)
+    if not index.claim(key, filepath):
+        logger.info(f"Email already captured, skipping: {email_data['subject']}")
+        return None
+
+    # Only emails that become action items are downloaded in full
+    body = email_data['body']
+    attachments = []
+    sync = get_email_sync()
+    if sync is not None and email_data.get('uid') is not None:
+        try:
+            full = sync.fetch_full(email_data['uid'])
+            if full is not None:
+                body = message_text(full).strip() or body
+                attachments = attachment_names(full)
+        except Exception as e:
+            logger.warning(f"Could not fetch full email {email_data['id']}, saving preview: {e}")
+
+    attachments_section = ''
+    if attachments:
+        attachments_section = "\n## Attachments\n\n" + ''.join(f"- {name}\n" for name in attachments)
+
     content = f"""---
 type: email
 platform: gmail
@@ -341,22 +346,32 @@ fetched: {datetime.now().isoformat()}
 
 ## Content
 
-{email_data['body']}
-
+{body}
+{attachments_section}
 ---
 *Fetched by AI Employee*
 """
 
-    filepath.write_text(content, encoding='utf-8')
+    try:
+        filepath.write_text(content, encoding='utf-8')
+    except Exception:
+        index.release(key)
+        raise
     logger.info(f"Saved email: {filename}")
     return filepath
 
-def save_twitter_mention_to_needs_action(mention: Dict) -> Path:
-    """Save Twitter mention to Needs_Action folder"""
+def save_twitter_mention_to_needs_action(mention: Dict) -> Optional[Path]:
+    """Save Twitter mention to Needs_Action folder (None if it was already captured)"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"TWITTER_MENTION_{timestamp}_{mention['id']}.md"
     filepath = NEEDS_ACTION / filename
 
+    index = get_fingerprint_index(VAULT_PATH)
+    key = fingerprint('twitter_mention', mention['id'])
+    if not index.claim(key, filepath):
+        logger.info(f"Twitter mention {mention['id']} already captured, skipping")
+        return None
+
     content = f"""---
 type: twitter_mention
 platform: twitter
@@ -377,16 +392,197 @@ fetched: {datetime.now().isoformat()}
 *Fetched by AI Employee*
 """
 
-    filepath.write_text(content, encoding='utf-8')
+    try:
+        filepath.write_text(content, encoding='utf-8')
+    except Exception:
+        index.release(key)
+        raise
     logger.info(f"Saved Twitter mention: {filename}")
     return filepath
 
+# ============================================================
+# SOURCES
+# ============================================================
+
+# Seconds each source may take before the run reports it as timed out
+SOURCE_TIMEOUT = float(os.getenv('FRESH_DATA_TIMEOUT', '60'))
+
+# How long read-only results (session checks) are reused between runs
+CACHE_TTL = float(os.getenv('FRESH_DATA_CACHE_TTL', '300'))
+
+CACHE_FILE = VAULT_PATH / '.fresh_data_cache.json'
+
+
+@dataclass
+class DataSource:
+    """A platform the collector reads, run concurrently with the others"""
+    name: str
+    fetch: Callable[[], Dict[str, Any]]
+    timeout: float = SOURCE_TIMEOUT
+    # Seconds a result may be reused (0: always fetched, e.g. sources that save or consume data)
+    cache_ttl: float = 0
+
+
+class SourceCache:
+    """Last result of each cacheable source, kept in a JSON file between runs"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self._entries = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, name: str, ttl: float) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(result, age in seconds) if a result younger than ttl exists"""
+        entry = self._entries.get(name)
+        if not entry or ttl <= 0:
+            return None
+        age = time.time() - entry.get('stored', 0)
+        if age > ttl:
+            return None
+        return entry['data'], age
+
+    def put(self, name: str, data: Dict[str, Any]):
+        with self._lock:
+            self._entries[name] = {'stored': time.time(), 'data': data}
+            try:
+                temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+                temp.write_text(json.dumps(self._entries, indent=2, default=str), encoding='utf-8')
+                os.replace(temp, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save fresh data cache: {e}")
+
+
+def collect_emails() -> Dict[str, Any]:
+    """Fetch new emails and save the important ones to Needs_Action"""
+    result = {'status': 'pending', 'count': 0, 'saved': 0, 'saved_items': []}
+    try:
+        emails = fetch_gmail_emails()
+        result['count'] = len(emails)
+        if emails:
+            for em in emails:
+                # Save every high priority email, plus the first 3 others
+                if em['priority'] == 'high' or result['saved'] < 3:
+                    if save_email_to_needs_action(em) is None:
+                        result['duplicates'] = result.get('duplicates', 0) + 1
+                        continue
+                    result['saved'] += 1
+                    result['saved_items'].append({'subject': em['subject'], 'priority': em['priority']})
+            mark_emails_collected(emails)
+            result['status'] = 'success'
+        else:
+            result['status'] = 'no_data'
+    finally:
+        if get_email_sync() is not None:
+            get_email_sync().close()
+    return result
+
+
+def collect_twitter() -> Dict[str, Any]:
+    """Fetch Twitter data and save the latest mentions to Needs_Action"""
+    twitter_data = fetch_twitter_data()
+    twitter_data['saved_mentions'] = [mention['id'] for mention in twitter_data['mentions'][:3]
+                                      if save_twitter_mention_to_needs_action(mention) is not None]
+    return twitter_data
+
+
+def default_sources() -> List[DataSource]:
+    timeout = lambda name: float(os.getenv(f'FRESH_DATA_{name.upper()}_TIMEOUT', SOURCE_TIMEOUT))
+    return [
+        DataSource('email', collect_emails, timeout('email')),
+        # Saves new mentions to Needs_Action, so it is fetched every run
+        DataSource('twitter', collect_twitter, timeout('twitter')),
+        DataSource('linkedin', check_linkedin_status, timeout('linkedin'), cache_ttl=CACHE_TTL),
+        DataSource('instagram', check_instagram_status, timeout('instagram'), cache_ttl=CACHE_TTL),
+        DataSource('whatsapp', check_whatsapp_status, timeout('whatsapp'), cache_ttl=CACHE_TTL),
+    ]
+
+
+def _fetch_in_thread(source: DataSource) -> concurrent.futures.Future:
+    """
+    Run a source's fetch on its own daemon thread
+
+    Not a ThreadPoolExecutor: the interpreter joins executor workers at
+    exit, so a fetch that timed out would still hold the script open.
+    """
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def _run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(source.fetch())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=_run, name=f'fresh-data-{source.name}', daemon=True).start()
+    return future
+
+
+async def run_source(source: DataSource, cache: Optional[SourceCache]) -> Dict[str, Any]:
+    """
+    Run one source within its timeout
+
+    A result carrying an 'error' counts as a failure and is not cached.
+
+    Returns:
+        {'name', 'status' ('ok', 'cached', 'timeout' or 'error'), 'data',
+        'elapsed', 'error'}
+    """
+    report = {'name': source.name, 'status': 'ok', 'data': None, 'elapsed': 0.0, 'error': None}
+
+    cached = cache.get(source.name, source.cache_ttl) if cache else None
+    if cached is not None:
+        report['data'], age = cached
+        report['status'] = 'cached'
+        report['age'] = round(age, 1)
+        return report
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        report['data'] = await asyncio.wait_for(asyncio.wrap_future(_fetch_in_thread(source)), source.timeout)
+        error = report['data'].get('error') if isinstance(report['data'], dict) else None
+        if error:
+            # Sources that catch their own failures report them in the result
+            report['status'] = 'error'
+            report['error'] = str(error)
+            logger.warning(f"[COLLECT] {source.name} returned an error: {error}")
+        elif cache and source.cache_ttl > 0:
+            cache.put(source.name, report['data'])
+    except asyncio.TimeoutError:
+        # The fetch keeps running in its daemon thread; only this run stops waiting
+        report['status'] = 'timeout'
+        report['error'] = f"No result within {source.timeout:g}s"
+        logger.warning(f"[COLLECT] {source.name} timed out after {source.timeout:g}s")
+    except Exception as e:
+        report['status'] = 'error'
+        report['error'] = str(e)
+        logger.error(f"[COLLECT] {source.name} failed: {e}")
+    report['elapsed'] = round(loop.time() - started, 2)
+    return report
+
+
+async def collect_sources(sources: List[DataSource], use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Run sources concurrently; the wait is bounded by the slowest source's timeout"""
+    cache = SourceCache(CACHE_FILE) if use_cache else None
+    reports = await asyncio.gather(*(run_source(source, cache) for source in sources))
+    return {report['name']: report for report in reports}
+
 # ============================================================
 # MAIN COLLECTOR
 # ============================================================
 
-def collect_all_fresh_data() -> Dict[str, Any]:
-    """Collect fresh data from all platforms"""
+def _source_line(report: Dict[str, Any]) -> str:
+    if report['status'] == 'cached':
+        return f"  (cached {report['age']:.0f}s ago)"
+    return f"  ({report['status']} in {report['elapsed']:.2f}s)"
+
+
+async def collect_all_fresh_data_async(use_cache: bool = True) -> Dict[str, Any]:
+    """Collect fresh data from all platforms concurrently"""
 
     print("=" * 60)
     print("AI EMPLOYEE - FRESH DATA COLLECTOR")
@@ -394,89 +590,84 @@ def collect_all_fresh_data() -> Dict[str, Any]:
     print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
 
+    started = time.monotonic()
+    reports = await collect_sources(default_sources(), use_cache=use_cache)
+
     results = {
         'timestamp': datetime.now().isoformat(),
-        'email': {'status': 'pending', 'count': 0, 'saved': 0},
-        'twitter': {'status': 'pending'},
-        'linkedin': {'status': 'pending'},
-        'instagram': {'status': 'pending'},
-        'whatsapp': {'status': 'pending'}
+        'elapsed': round(time.monotonic() - started, 2),
+        'complete': all(report['status'] in ('ok', 'cached') for report in reports.values()),
+        'sources': {name: {key: value for key, value in report.items() if key != 'data'}
+                    for name, report in reports.items()}
     }
+    for name, report in reports.items():
+        results[name] = report['data'] if report['data'] is not None else \
+            {'status': report['status'], 'error': report['error']}
 
-    # 1. FETCH EMAILS
-    print("[EMAIL] FETCHING EMAILS...")
+    # 1. EMAILS
+    print("[EMAIL] FETCHING EMAILS..." + _source_line(reports['email']))
     print("-" * 40)
-    emails = fetch_gmail_emails(limit=10)
-    results['email']['count'] = len(emails)
-
-    if emails:
-        print(f"  Found {len(emails)} recent emails:")
-        saved_count = 0
-        for em in emails[:5]:  # Save top 5 to Needs_Action
-            print(f"  - {em['subject'][:50]}... [{em['priority']}]")
-            # Only save high priority or first 3
-            if em['priority'] == 'high' or saved_count < 3:
-                save_email_to_needs_action(em)
-                saved_count += 1
-        results['email']['saved'] = saved_count
-        results['email']['status'] = 'success'
+    email = results['email']
+    if reports['email']['data'] is None:
+        print(f"  Error: {email['error']}")
+    elif email['count']:
+        print(f"  Found {email['count']} new emails:")
+        for item in email['saved_items']:
+            print(f"  - {item['subject'][:50]}... [{item['priority']}]")
     else:
         print("  No new emails found")
-        results['email']['status'] = 'no_data'
 
-    # 2. FETCH TWITTER DATA
+    # 2. TWITTER
     print()
-    print("[TWITTER] FETCHING TWITTER DATA...")
+    print("[TWITTER] FETCHING TWITTER DATA..." + _source_line(reports['twitter']))
     print("-" * 40)
-    twitter_data = fetch_twitter_data()
-    results['twitter'] = twitter_data
-
-    if twitter_data['connected']:
+    twitter_data = results['twitter']
+    if twitter_data.get('connected'):
         print(f"  Connected as: @{twitter_data['username']}")
         print(f"  Mentions: {len(twitter_data['mentions'])}")
         print(f"  Timeline: {len(twitter_data['timeline'])} tweets")
-
-        # Save mentions to Needs_Action
-        for mention in twitter_data['mentions'][:3]:
-            save_twitter_mention_to_needs_action(mention)
-            print(f"  - Saved mention: {mention['text'][:50]}...")
+        if reports['twitter']['status'] == 'ok':
+            saved = set(twitter_data.get('saved_mentions', []))
+            for mention in twitter_data['mentions'][:3]:
+                if mention['id'] in saved:
+                    print(f"  - Saved mention: {mention['text'][:50]}...")
     else:
         print(f"  Error: {twitter_data.get('error', 'Unknown')}")
 
-    # 3. CHECK LINKEDIN
+    # 3. LINKEDIN
     print()
-    print("[LINKEDIN] CHECKING LINKEDIN...")
+    print("[LINKEDIN] CHECKING LINKEDIN..." + _source_line(reports['linkedin']))
     print("-" * 40)
-    linkedin_status = check_linkedin_status()
-    results['linkedin'] = linkedin_status
-
-    if linkedin_status['needs_login']:
+    linkedin_status = results['linkedin']
+    if 'needs_login' not in linkedin_status:
+        print(f"  Error: {linkedin_status['error']}")
+    elif linkedin_status['needs_login']:
         print("  Status: LOGIN REQUIRED")
         print("  Run: python linkedin_poster.py --login")
     else:
         print("  Status: SESSION ACTIVE")
 
-    # 4. CHECK INSTAGRAM
+    # 4. INSTAGRAM
     print()
-    print("[INSTAGRAM] CHECKING INSTAGRAM...")
+    print("[INSTAGRAM] CHECKING INSTAGRAM..." + _source_line(reports['instagram']))
     print("-" * 40)
-    instagram_status = check_instagram_status()
-    results['instagram'] = instagram_status
-
-    if instagram_status['needs_login']:
+    instagram_status = results['instagram']
+    if 'needs_login' not in instagram_status:
+        print(f"  Error: {instagram_status['error']}")
+    elif instagram_status['needs_login']:
         print(f"  Status: LOGIN REQUIRED")
         print(f"  Username: {instagram_status['username']}")
     else:
         print("  Status: SESSION ACTIVE")
 
-    # 5. CHECK WHATSAPP
+    # 5. WHATSAPP
     print()
-    print("[WHATSAPP] CHECKING WHATSAPP...")
+    print("[WHATSAPP] CHECKING WHATSAPP..." + _source_line(reports['whatsapp']))
     print("-" * 40)
-    whatsapp_status = check_whatsapp_status()
-    results['whatsapp'] = whatsapp_status
-
-    if whatsapp_status['needs_qr_scan']:
+    whatsapp_status = results['whatsapp']
+    if 'needs_qr_scan' not in whatsapp_status:
+        print(f"  Error: {whatsapp_status['error']}")
+    elif whatsapp_status['needs_qr_scan']:
         print("  Status: QR CODE SCAN REQUIRED")
     else:
         print("  Status: SESSION ACTIVE")
@@ -486,13 +677,17 @@ def collect_all_fresh_data() -> Dict[str, Any]:
     print("=" * 60)
     print("COLLECTION SUMMARY")
     print("=" * 60)
-    print(f"  Emails fetched: {results['email']['count']}")
-    print(f"  Emails saved to Needs_Action: {results['email']['saved']}")
+    print(f"  Emails fetched: {results['email'].get('count', 0)}")
+    print(f"  Emails saved to Needs_Action: {results['email'].get('saved', 0)}")
     print(f"  Twitter connected: {results['twitter'].get('connected', False)}")
     print(f"  Twitter mentions: {len(results['twitter'].get('mentions', []))}")
-    print(f"  LinkedIn ready: {not results['linkedin']['needs_login']}")
-    print(f"  Instagram ready: {not results['instagram']['needs_login']}")
-    print(f"  WhatsApp ready: {not results['whatsapp']['needs_qr_scan']}")
+    print(f"  LinkedIn ready: {not results['linkedin'].get('needs_login', True)}")
+    print(f"  Instagram ready: {not results['instagram'].get('needs_login', True)}")
+    print(f"  WhatsApp ready: {not results['whatsapp'].get('needs_qr_scan', True)}")
+    incomplete = [name for name, report in reports.items() if report['status'] not in ('ok', 'cached')]
+    if incomplete:
+        print(f"  Partial results - no data from: {', '.join(incomplete)}")
+    print(f"  Collected in {results['elapsed']:.2f}s")
     print("=" * 60)
 
     # Save results to log
@@ -502,9 +697,19 @@ def collect_all_fresh_data() -> Dict[str, Any]:
 
     return results
 
+
+def collect_all_fresh_data(use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Collect fresh data from all platforms (blocking wrapper)
+
+    Returns once every source has reported or timed out; a timed-out fetch
+    is left running on a daemon thread and does not delay exit.
+    """
+    return asyncio.run(collect_all_fresh_data_async(use_cache=use_cache))
+
 # ============================================================
 # ENTRY POINT
 # ============================================================
 
 if __name__ == "__main__":
-    collect_all_fresh_data()
+    collect_all_fresh_data(use_cache='--no-cache' not in sys.argv)
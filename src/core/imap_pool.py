@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+IMAP Pool - Long-lived authenticated IMAP connections and IDLE push
+Keeps a few logged-in connections with the mailbox selected, checks them
+with NOOP before reuse, reconnects with backoff after failures, and holds
+one connection in IDLE so new mail is reported within seconds
+"""
+
+import os
+import re
+import sys
+import time
+import select
+import imaplib
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.retry import backoff_delay
+from src.core.imap_sync import SOCKET_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+# Connections kept per pool (one is held by an IdleWatcher while it runs)
+POOL_SIZE = int(os.getenv('IMAP_POOL_SIZE', '2'))
+
+# A connection unused for this long is checked with NOOP before reuse
+HEALTHCHECK_AFTER = float(os.getenv('IMAP_POOL_HEALTHCHECK', '60'))
+
+# Connections are logged out and replaced after this many seconds
+MAX_CONNECTION_AGE = float(os.getenv('IMAP_POOL_MAX_AGE', str(12 * 3600)))
+
+# Reconnect backoff after failed logins (full jitter, doubling)
+RECONNECT_BASE_DELAY = float(os.getenv('IMAP_RECONNECT_BASE_DELAY', '5'))
+RECONNECT_MAX_DELAY = float(os.getenv('IMAP_RECONNECT_MAX_DELAY', '300'))
+
+# IDLE is restarted this often; RFC 2177 servers may drop it after 29 minutes
+IDLE_RENEW_SECONDS = float(os.getenv('IMAP_IDLE_RENEW', '1500'))
+
+_NEW_MAIL = re.compile(rb'^\* \d+ (EXISTS|RECENT)\b')
+
+
+class ImapPoolError(RuntimeError):
+    """No connection could be opened (or the pool is backing off after failures)"""
+
+
+class PooledConnection:
+    """A logged-in connection with its mailbox selected read-only"""
+
+    def __init__(self, imap: imaplib.IMAP4, uidvalidity: Optional[int], uidnext: Optional[int],
+                 exists: Optional[int] = None):
+        self.imap = imap
+        self.uidvalidity = uidvalidity
+        self.uidnext = uidnext
+        # Message count last seen by the poller (new mail only when it grows)
+        self.exists = exists
+        self.created = time.monotonic()
+        self.last_used = time.monotonic()
+
+    def logout(self):
+        try:
+            self.imap.logout()
+        except Exception:
+            pass
+
+
+def _response_int(imap: imaplib.IMAP4, code: str) -> Optional[int]:
+    _, data = imap.response(code)
+    try:
+        return int(data[-1]) if data and data[-1] is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ImapConnectionPool:
+    """
+    Small pool of authenticated IMAP connections to one mailbox
+
+    acquire() hands out an idle connection (NOOP-checked if it sat unused),
+    or logs in a new one while under the size limit, or waits for one to be
+    released. After a failed login the pool refuses to dial again until a
+    jittered, doubling backoff has passed, so an outage does not turn into
+    a login storm that gets the account locked.
+    """
+
+    def __init__(self, host: str, username: str, password: str, port: int = 993,
+                 mailbox: str = 'INBOX', size: int = None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.mailbox = mailbox
+        self.size = size or POOL_SIZE
+
+        self._idle: List[PooledConnection] = []
+        self._open_count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._failures = 0
+        self._retry_at = 0.0
+        self.logins = 0
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional['ImapConnectionPool']:
+        """Pool configured from EMAIL_* variables, or None without credentials"""
+        username = os.getenv('EMAIL_USERNAME')
+        password = os.getenv('EMAIL_PASSWORD')
+        if not username or not password:
+            return None
+        return cls(os.getenv('EMAIL_IMAP_SERVER', 'imap.gmail.com'), username, password,
+                   port=int(os.getenv('EMAIL_IMAP_PORT', 993)), **kwargs)
+
+    # -- opening ------------------------------------------------------------
+
+    def _open(self) -> PooledConnection:
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise ImapPoolError(f"IMAP reconnect to {self.host} backing off for {self._retry_at - now:.0f}s")
+
+        try:
+            imap = imaplib.IMAP4_SSL(self.host, self.port, timeout=SOCKET_TIMEOUT)
+            try:
+                imap.login(self.username, self.password)
+                status, _ = imap.select(self.mailbox, readonly=True)
+                if status != 'OK':
+                    raise ImapPoolError(f"Cannot select {self.mailbox}")
+            except Exception:
+                try:
+                    imap.logout()
+                except Exception:
+                    pass
+                raise
+        except Exception as e:
+            self._failures += 1
+            delay = backoff_delay(self._failures - 1, RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY)
+            self._retry_at = time.monotonic() + delay
+            logger.warning(f"[IMAP] Connecting to {self.host} failed ({e}); next attempt in {delay:.0f}s")
+            raise
+
+        self._failures = 0
+        self._retry_at = 0.0
+        self.logins += 1
+        logger.info(f"[IMAP] Logged in to {self.host} as {self.username} (login #{self.logins})")
+        return PooledConnection(imap, _response_int(imap, 'UIDVALIDITY'), _response_int(imap, 'UIDNEXT'),
+                                _response_int(imap, 'EXISTS'))
+
+    def _healthy(self, conn: PooledConnection) -> bool:
+        if time.monotonic() - conn.created > MAX_CONNECTION_AGE:
+            return False
+        if time.monotonic() - conn.last_used < HEALTHCHECK_AFTER:
+            return True
+        try:
+            return conn.imap.noop()[0] == 'OK'
+        except (imaplib.IMAP4.error, OSError):
+            return False
+
+    # -- lending ------------------------------------------------------------
+
+    def acquire(self, timeout: float = 30) -> PooledConnection:
+        """
+        Borrow a connection (release it when done)
+
+        Raises:
+            ImapPoolError if the pool is closed, backing off, or still full
+            after timeout seconds; login errors from imaplib
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise ImapPoolError("IMAP pool is closed")
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    if self._open_count < self.size:
+                        # Reserve the slot, then log in outside the lock
+                        self._open_count += 1
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise ImapPoolError(f"No IMAP connection free within {timeout:.0f}s")
+                        self._cond.wait(remaining)
+                        continue
+
+            if conn is not None:
+                if self._healthy(conn):
+                    conn.last_used = time.monotonic()
+                    return conn
+                self.discard(conn)
+                continue
+
+            try:
+                return self._open()
+            except Exception:
+                with self._cond:
+                    self._open_count -= 1
+                    self._cond.notify()
+                raise
+
+    def release(self, conn: PooledConnection):
+        """Return a connection for reuse"""
+        conn.last_used = time.monotonic()
+        with self._cond:
+            if self._closed:
+                self._open_count -= 1
+                conn.logout()
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def discard(self, conn: PooledConnection):
+        """Drop a connection that failed or is in an unknown state"""
+        conn.logout()
+        with self._cond:
+            self._open_count -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: float = 30):
+        """with pool.connection() as conn: ... (discarded if the block raises)"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            self.discard(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open_count -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.logout()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {'open': self._open_count, 'idle': len(self._idle), 'logins': self.logins,
+                    'failures': self._failures}
+
+
+class IdleWatcher:
+    """
+    Calls on_new_mail whenever the server reports new messages
+
+    Holds one pooled connection in IMAP IDLE (restarted every
+    IMAP_IDLE_RENEW seconds). Servers without IDLE are polled with NOOP
+    every poll_interval seconds instead. Dropped connections are replaced,
+    with the pool's backoff between failed logins.
+    """
+
+    def __init__(self, pool: ImapConnectionPool, on_new_mail: Callable[[], Any],
+                 renew: float = None, poll_interval: float = 60):
+        self.pool = pool
+        self.on_new_mail = on_new_mail
+        self.renew = renew or IDLE_RENEW_SECONDS
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='imap-idle', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                conn = self.pool.acquire()
+            except Exception as e:
+                failures += 1
+                delay = backoff_delay(failures - 1, RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY)
+                logger.warning(f"[IMAP] IDLE connection unavailable ({e}); retrying in {delay:.0f}s")
+                self._stop.wait(delay)
+                continue
+
+            try:
+                if 'IDLE' in conn.imap.capabilities:
+                    new_mail = self._idle(conn)
+                else:
+                    new_mail = self._poll(conn)
+                self.pool.release(conn)
+                failures = 0
+            except Exception as e:
+                logger.warning(f"[IMAP] IDLE connection lost: {e}")
+                self.pool.discard(conn)
+                continue
+
+            if new_mail:
+                try:
+                    self.on_new_mail()
+                except Exception as e:
+                    logger.error(f"[IMAP] New mail handler failed: {e}")
+
+    def _poll(self, conn: PooledConnection) -> bool:
+        self._stop.wait(self.poll_interval)
+        conn.imap.noop()
+        # response() also returns EXISTS counts collected earlier (by SELECT
+        # or while ImapSync used the connection), so compare with the last one
+        exists = _response_int(conn.imap, 'EXISTS')
+        if exists is None:
+            return False
+        grew = conn.exists is not None and exists > conn.exists
+        conn.exists = exists
+        return grew
+
+    def _idle(self, conn: PooledConnection) -> bool:
+        """
+        One IDLE round: ends on new mail, the renew deadline or stop()
+
+        Reads the socket directly with select() so the loop can notice stop()
+        within a second; imaplib's buffered reader is idle between commands.
+        """
+        imap = conn.imap
+        sock = imap.sock
+        # Waits below go through select(); the timeout bounds sends and any blocking read
+        sock.settimeout(SOCKET_TIMEOUT)
+        tag = imap._new_tag()
+        imap.send(tag + b' IDLE\r\n')
+
+        buffer = b''
+
+        def read_line(timeout: float) -> Optional[bytes]:
+            nonlocal buffer
+            while b'\r\n' not in buffer:
+                pending = getattr(sock, 'pending', None)
+                if not (pending and pending()):
+                    readable, _, _ = select.select([sock], [], [], timeout)
+                    if not readable:
+                        return None
+                chunk = sock.recv(4096)
+                if not chunk:
+                    raise imaplib.IMAP4.abort("connection closed during IDLE")
+                buffer += chunk
+            line, buffer = buffer.split(b'\r\n', 1)
+            return line
+
+        line = read_line(30)
+        if line is None or not line.startswith(b'+'):
+            raise imaplib.IMAP4.abort(f"IDLE refused: {line!r}")
+
+        new_mail = False
+        deadline = time.monotonic() + self.renew
+        while not new_mail and not self._stop.is_set() and time.monotonic() < deadline:
+            line = read_line(1.0)
+            if line is not None and _NEW_MAIL.match(line):
+                new_mail = True
+
+        imap.send(b'DONE\r\n')
+        while True:
+            line = read_line(30)
+            if line is None:
+                raise imaplib.IMAP4.abort("no reply to IDLE DONE")
+            if line.startswith(tag):
+                if not line[len(tag):].lstrip().startswith(b'OK'):
+                    raise imaplib.IMAP4.error(f"IDLE ended with {line!r}")
+                break
+            if _NEW_MAIL.match(line):
+                new_mail = True
+
+        conn.last_used = time.monotonic()
+        return new_mail
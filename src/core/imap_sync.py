@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+IMAP Sync - Incremental mailbox sync keyed by UIDVALIDITY and last seen UID
+Fetches only UIDs above the stored high-water mark, in batched UID FETCH
+ranges of headers plus a bounded slice of the body, and pulls complete
+messages on demand for the ones that turn into action items
+"""
+
+import os
+import re
+import json
+import email
+import imaplib
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from email.header import decode_header, make_header
+from email.message import Message
+from typing import Dict, Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# UIDs per UID FETCH command
+BATCH_SIZE = int(os.getenv('IMAP_SYNC_BATCH_SIZE', '100'))
+
+# Bytes of message text fetched with the headers for previews and triage
+PREVIEW_BYTES = int(os.getenv('IMAP_SYNC_PREVIEW_BYTES', '2048'))
+
+# On first sync (or after UIDVALIDITY changes) only mail this recent is fetched
+INITIAL_DAYS = int(os.getenv('IMAP_SYNC_INITIAL_DAYS', '3'))
+
+# Socket timeout for IMAP connections, so a hung server cannot block a caller forever
+SOCKET_TIMEOUT = float(os.getenv('IMAP_TIMEOUT', '60'))
+
+_FETCH_START = re.compile(rb'^\d+ \(')
+_SECTION = re.compile(rb'BODY\[(HEADER|TEXT|)\](?:<\d+>)? \{\d+\}$')
+_UID = re.compile(rb'UID (\d+)')
+_FLAGS = re.compile(rb'FLAGS \(([^)]*)\)')
+_INTERNALDATE = re.compile(rb'INTERNALDATE "([^"]+)"')
+
+
+class ImapSyncError(RuntimeError):
+    """The server rejected a command the sync depends on"""
+
+
+def decode_mime_header(value: Optional[str]) -> str:
+    """Decode an RFC 2047 encoded header to text"""
+    if not value:
+        return ''
+    try:
+        return str(make_header(decode_header(value)))
+    except Exception:
+        return str(value)
+
+
+def message_text(msg: Message) -> str:
+    """First text/plain part of a message (decoded leniently; may be truncated)"""
+    parts = msg.walk() if msg.is_multipart() else [msg]
+    for part in parts:
+        if part.get_content_type() == 'text/plain' and not part.get_filename():
+            try:
+                payload = part.get_payload(decode=True) or b''
+                return payload.decode(part.get_content_charset() or 'utf-8', errors='ignore')
+            except (LookupError, AssertionError):
+                return str(part.get_payload())
+    if not msg.is_multipart():
+        payload = msg.get_payload()
+        return payload if isinstance(payload, str) else ''
+    return ''
+
+
+def attachment_names(msg: Message) -> List[str]:
+    return [decode_mime_header(part.get_filename()) for part in msg.walk() if part.get_filename()]
+
+
+def uid_sets(uids: List[int], batch_size: int = BATCH_SIZE) -> List[str]:
+    """Split sorted UIDs into IMAP sequence sets ('3:7,9,12:14') of at most batch_size UIDs"""
+    sets = []
+    for start in range(0, len(uids), batch_size):
+        batch = uids[start:start + batch_size]
+        ranges = []
+        first = last = batch[0]
+        for uid in batch[1:]:
+            if uid == last + 1:
+                last = uid
+                continue
+            ranges.append(f"{first}:{last}" if last > first else str(first))
+            first = last = uid
+        ranges.append(f"{first}:{last}" if last > first else str(first))
+        sets.append(','.join(ranges))
+    return sets
+
+
+@dataclass
+class ImapMessage:
+    """A message as seen by the sync: headers and a bounded preview, full body on request"""
+    uid: int
+    mailbox: str
+    headers: Message
+    preview: str = ''
+    flags: List[str] = field(default_factory=list)
+    internal_date: Optional[str] = None
+
+    @property
+    def subject(self) -> str:
+        return decode_mime_header(self.headers.get('Subject'))
+
+    @property
+    def sender(self) -> str:
+        return decode_mime_header(self.headers.get('From'))
+
+    @property
+    def date(self) -> str:
+        return self.headers.get('Date') or ''
+
+    @property
+    def message_id(self) -> str:
+        return (self.headers.get('Message-ID') or '').strip()
+
+    @property
+    def seen(self) -> bool:
+        return '\\Seen' in self.flags
+
+
+class SyncState:
+    """Per-mailbox UIDVALIDITY, high-water UID and handled UIDs above it, persisted as JSON"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self._state = json.loads(self.path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                logger.warning(f"[IMAP] Ignoring unreadable sync state {self.path}: {e}")
+
+    def get(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._state.get(key, {}))
+
+    def set(self, key: str, uidvalidity: int, last_uid: int, handled: Iterable[int] = ()):
+        with self._lock:
+            self._state[key] = {
+                'uidvalidity': uidvalidity, 'last_uid': last_uid,
+                'handled': sorted(uid for uid in set(handled) if uid > last_uid),
+                'updated': datetime.now().isoformat()
+            }
+            self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps(self._state, indent=2), encoding='utf-8')
+        os.replace(temp, self.path)
+
+
+class ImapSync:
+    """
+    Incremental reader for one IMAP mailbox
+
+    fetch_new() returns messages above the stored high-water mark, oldest
+    first. mark_seen() records a message as handled and advances the mark
+    only up to the oldest fetched message that is still unhandled, so a
+    message that failed is returned again by the next sync even when later
+    ones succeeded. Nothing is
+    marked \\Seen on the server (all fetches use BODY.PEEK).
+
+    With a pool (src.core.imap_pool) the connection is borrowed for each
+    sync and returned by close(), so repeated syncs do not log in again.
+    """
+
+    def __init__(self, host: str, username: str, password: str, state_path: Path,
+                 port: int = 993, mailbox: str = 'INBOX', batch_size: int = None,
+                 preview_bytes: int = None, initial_days: int = None, pool=None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.mailbox = mailbox
+        self.batch_size = batch_size or BATCH_SIZE
+        self.preview_bytes = preview_bytes or PREVIEW_BYTES
+        self.initial_days = initial_days if initial_days is not None else INITIAL_DAYS
+        self.state = SyncState(state_path)
+        self.key = f"{username}@{host}/{mailbox}"
+
+        self.pool = pool
+        self._lease = None
+        self._conn: Optional[imaplib.IMAP4] = None
+        self._uidvalidity: Optional[int] = None
+        self._uidnext: Optional[int] = None
+        # Fetched by this sync and not yet passed to mark_seen()
+        self._unhandled: set = set()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, state_path: Path, **kwargs) -> Optional['ImapSync']:
+        """Sync configured from EMAIL_* variables, or None without credentials"""
+        username = os.getenv('EMAIL_USERNAME')
+        password = os.getenv('EMAIL_PASSWORD')
+        if not username or not password:
+            return None
+        return cls(os.getenv('EMAIL_IMAP_SERVER', 'imap.gmail.com'), username, password, state_path,
+                   port=int(os.getenv('EMAIL_IMAP_PORT', 993)), **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- connection ---------------------------------------------------------
+
+    def _connect(self) -> imaplib.IMAP4:
+        """Open (or reuse) the connection with the mailbox selected read-only"""
+        if self._conn is not None:
+            try:
+                self._conn.noop()
+                return self._conn
+            except (imaplib.IMAP4.error, OSError):
+                self._drop()
+
+        if self.pool is not None:
+            self._lease = self.pool.acquire()
+            self._conn = self._lease.imap
+            self._uidvalidity = self._lease.uidvalidity
+            self._uidnext = self._lease.uidnext
+            return self._conn
+
+        conn = imaplib.IMAP4_SSL(self.host, self.port, timeout=SOCKET_TIMEOUT)
+        try:
+            conn.login(self.username, self.password)
+            status, _ = conn.select(self.mailbox, readonly=True)
+            if status != 'OK':
+                raise ImapSyncError(f"Cannot select {self.mailbox}")
+        except Exception:
+            try:
+                conn.logout()
+            except Exception:
+                pass
+            raise
+
+        self._conn = conn
+        self._uidvalidity = self._response_int('UIDVALIDITY')
+        self._uidnext = self._response_int('UIDNEXT')
+        return conn
+
+    def _response_int(self, code: str) -> Optional[int]:
+        _, data = self._conn.response(code)
+        try:
+            return int(data[-1]) if data and data[-1] is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _drop(self):
+        """Abandon the connection (after an error, its state is unknown)"""
+        conn, self._conn = self._conn, None
+        lease, self._lease = self._lease, None
+        if lease is not None:
+            self.pool.discard(lease)
+        elif conn is not None:
+            try:
+                conn.logout()
+            except Exception:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._lease is not None:
+                lease, self._lease = self._lease, None
+                self._conn = None
+                self.pool.release(lease)
+                return
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+            self._drop()
+
+    def _uid(self, command: str, *args) -> List[Any]:
+        status, data = self._conn.uid(command, *args)
+        if status != 'OK':
+            raise ImapSyncError(f"UID {command} failed: {data}")
+        return data
+
+    # -- sync ---------------------------------------------------------------
+
+    def _pending_uids(self) -> List[int]:
+        """UIDs above the high-water mark, starting a baseline if there is none"""
+        stored = self.state.get(self.key)
+        if stored and stored.get('uidvalidity') == self._uidvalidity:
+            last_uid = int(stored['last_uid'])
+            handled = set(stored.get('handled', ()))
+            data = self._uid('SEARCH', None, f'UID {last_uid + 1}:*')
+            # "n:*" always matches the newest message, even when n is above it
+            return sorted(uid for uid in map(int, data[0].split()) if uid > last_uid and uid not in handled)
+
+        if stored:
+            logger.warning(f"[IMAP] UIDVALIDITY of {self.key} changed; resyncing the last {self.initial_days} day(s)")
+        self._unhandled.clear()
+        since = (datetime.now() - timedelta(days=self.initial_days)).strftime('%d-%b-%Y')
+        uids = sorted(map(int, self._uid('SEARCH', None, f'SINCE "{since}"')[0].split()))
+        if uids:
+            baseline = uids[0] - 1
+        else:
+            baseline = (self._uidnext - 1) if self._uidnext else 0
+        self.state.set(self.key, self._uidvalidity, baseline)
+        return uids
+
+    def fetch_new(self, limit: int = None) -> List[ImapMessage]:
+        """
+        Messages not yet marked seen by this sync, oldest first
+
+        Args:
+            limit: Return at most this many (the rest come back next time)
+        """
+        with self._lock:
+            self._connect()
+            try:
+                return self._fetch_new(limit)
+            except (imaplib.IMAP4.abort, OSError):
+                self._drop()
+                raise
+
+    def _fetch_new(self, limit: Optional[int]) -> List[ImapMessage]:
+        uids = self._pending_uids()
+        if limit is not None:
+            uids = uids[:limit]
+        if not uids:
+            return []
+        self._unhandled.update(uids)
+
+        spec = f'(UID FLAGS INTERNALDATE BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{self.preview_bytes}>)'
+        messages = []
+        for uid_set in uid_sets(uids, self.batch_size):
+            messages.extend(self._parse_fetch(self._uid('FETCH', uid_set, spec)))
+        logger.info(f"[IMAP] {self.key}: {len(messages)} new message(s) in "
+                    f"{len(uid_sets(uids, self.batch_size))} batch(es)")
+        return sorted(messages, key=lambda message: message.uid)
+
+    def _parse_fetch(self, data: Iterable[Any]) -> List[ImapMessage]:
+        """Turn imaplib's FETCH response into messages (items may come in any order)"""
+        records: List[Dict[str, Any]] = []
+        current = None
+        for item in data:
+            prefix = item[0] if isinstance(item, tuple) else item
+            if not isinstance(prefix, bytes):
+                continue
+            if _FETCH_START.match(prefix):
+                current = {'meta': b'', 'HEADER': b'', 'TEXT': b''}
+                records.append(current)
+            if current is None:
+                continue
+            current['meta'] += prefix
+            if isinstance(item, tuple):
+                section = _SECTION.search(prefix)
+                if section:
+                    current[section.group(1).decode() or 'TEXT'] = item[1] or b''
+
+        messages = []
+        for record in records:
+            uid = _UID.search(record['meta'])
+            if not uid:
+                continue
+            flags = _FLAGS.search(record['meta'])
+            internal_date = _INTERNALDATE.search(record['meta'])
+            headers = email.message_from_bytes(record['HEADER'])
+            # Headers carry the MIME boundaries, so the truncated text still parses into parts
+            partial = email.message_from_bytes(record['HEADER'] + record['TEXT'])
+            messages.append(ImapMessage(
+                uid=int(uid.group(1)), mailbox=self.mailbox, headers=headers,
+                preview=message_text(partial).strip(),
+                flags=flags.group(1).decode(errors='replace').split() if flags else [],
+                internal_date=internal_date.group(1).decode() if internal_date else None
+            ))
+        return messages
+
+    def fetch_full(self, uid: int) -> Optional[Message]:
+        """The complete message (body and attachments) for one UID"""
+        with self._lock:
+            self._connect()
+            try:
+                data = self._uid('FETCH', str(uid), '(BODY.PEEK[])')
+            except (imaplib.IMAP4.abort, OSError):
+                self._drop()
+                raise
+            for item in data:
+                if isinstance(item, tuple) and item[1]:
+                    return email.message_from_bytes(item[1])
+            return None
+
+    def mark_seen(self, uid: int):
+        """
+        Record a message as handled
+
+        The high-water mark moves up to just below the oldest message this
+        sync fetched and has not seen handled; handled UIDs above the mark
+        are stored so they are not fetched again.
+        """
+        with self._lock:
+            stored = self.state.get(self.key)
+            if self._uidvalidity is None:
+                return
+            last_uid = int(stored.get('last_uid', 0))
+            if uid <= last_uid:
+                return
+            self._unhandled.discard(uid)
+            handled = set(stored.get('handled', ())) | {uid}
+            if self._unhandled:
+                last_uid = max(last_uid, min(self._unhandled) - 1)
+            else:
+                last_uid = max(handled)
+            self.state.set(self.key, self._uidvalidity, last_uid, handled)
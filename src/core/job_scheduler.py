@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+Job Scheduler - Event-driven scheduler for periodic and timed jobs
+Keeps jobs in a heap ordered by due time and sleeps on an asyncio loop until
+exactly the next one is due, instead of polling every minute. Supports cron
+expressions, fixed intervals and one-off times, jitter, misfire policies,
+per-job concurrency limits and next-run state that survives restarts
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import asyncio
+import logging
+import threading
+import functools
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Longest single sleep; the loop re-reads the wall clock at least this often
+# so clock changes and suspend/resume can't delay a job indefinitely
+MAX_SLEEP = float(os.getenv('SCHEDULER_MAX_SLEEP', '300'))
+
+# Misfire policies for a job that is due later than planned:
+#   coalesce - run once, however many occurrences were missed
+#   skip     - drop the run when it is more than misfire_grace seconds late
+MISFIRE_POLICIES = ('coalesce', 'skip')
+
+
+# ----------------------------------------------------------------------
+# Triggers
+# ----------------------------------------------------------------------
+
+_CRON_ALIASES = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+_MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'])}
+_WEEKDAY_NAMES = {name: i for i, name in enumerate(['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'])}
+
+
+class CronExpression:
+    """
+    Standard 5-field cron expression: minute hour day-of-month month day-of-week
+
+    Fields accept *, numbers, ranges (1-5), steps (*/15, 9-17/2), lists
+    (8,12,16) and month/weekday names. Weekdays are 0-6 from Sunday (7 is
+    also Sunday). As in cron, when both day fields are restricted a day
+    matching either one fires.
+    """
+
+    _FIELDS = (('minute', 0, 59, None), ('hour', 0, 23, None), ('day', 1, 31, None),
+               ('month', 1, 12, _MONTH_NAMES), ('weekday', 0, 7, _WEEKDAY_NAMES))
+
+    def __init__(self, expr: str):
+        self.expr = expr.strip()
+        fields = _CRON_ALIASES.get(self.expr.lower(), self.expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {expr!r}")
+
+        parsed = []
+        for text, (name, low, high, names) in zip(fields, self._FIELDS):
+            parsed.append(self._parse_field(text, name, low, high, names))
+
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {0 if d == 7 else d for d in weekdays}
+        self._minute_list = sorted(self.minutes)
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse_field(text: str, name: str, low: int, high: int, names: Optional[Dict[str, int]]) -> set:
+        def value(token: str) -> int:
+            token = token.lower()
+            if names and token in names:
+                return names[token]
+            number = int(token)
+            if not low <= number <= high:
+                raise ValueError(f"Cron {name} value {number} outside {low}-{high}")
+            return number
+
+        values = set()
+        for part in text.split(','):
+            if not part:
+                raise ValueError(f"Empty cron {name} field in {text!r}")
+            base, _, step = part.partition('/')
+            step = int(step) if step else 1
+            if step < 1:
+                raise ValueError(f"Cron {name} step must be positive: {part!r}")
+
+            if base == '*':
+                start, end = low, high
+            elif '-' in base:
+                first, last = base.split('-', 1)
+                start, end = value(first), value(last)
+            else:
+                start = value(base)
+                # "5/15" means every 15 starting at 5
+                end = high if '/' in part else start
+
+            if start > end:
+                raise ValueError(f"Cron {name} range {part!r} is reversed")
+            values.update(range(start, end + 1, step))
+
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        cron_weekday = (moment.weekday() + 1) % 7
+        day_ok = moment.day in self.days
+        weekday_ok = cron_weekday in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after a moment"""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment.year + 5
+
+        while moment.year <= limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+                continue
+            minute = next((m for m in self._minute_list if m >= moment.minute), None)
+            if minute is None:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+                continue
+            return moment.replace(minute=minute)
+
+        raise ValueError(f"Cron expression {self.expr!r} never matches")
+
+    def __str__(self):
+        return self.expr
+
+
+class CronTrigger:
+    def __init__(self, expr: str):
+        self.cron = CronExpression(expr)
+
+    @property
+    def signature(self) -> str:
+        return f"cron:{self.cron}"
+
+    def first_fire(self, now: datetime) -> datetime:
+        return self.cron.next_after(now)
+
+    def next_fire(self, previous: datetime, now: datetime) -> Optional[datetime]:
+        return self.cron.next_after(max(previous, now))
+
+
+class IntervalTrigger:
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.interval = timedelta(seconds=seconds)
+
+    @property
+    def signature(self) -> str:
+        return f"every:{self.interval.total_seconds():g}"
+
+    def first_fire(self, now: datetime) -> datetime:
+        return now + self.interval
+
+    def next_fire(self, previous: datetime, now: datetime) -> Optional[datetime]:
+        # Stay on the original grid; missed slots are skipped, not replayed
+        following = previous + self.interval
+        if following <= now:
+            missed = (now - previous) // self.interval
+            following = previous + self.interval * (missed + 1)
+        return following
+
+
+class DateTrigger:
+    def __init__(self, run_at: datetime):
+        self.run_at = run_at
+
+    @property
+    def signature(self) -> str:
+        return f"at:{self.run_at.isoformat()}"
+
+    def first_fire(self, now: datetime) -> datetime:
+        return self.run_at
+
+    def next_fire(self, previous: datetime, now: datetime) -> Optional[datetime]:
+        return None
+
+
+# ----------------------------------------------------------------------
+# Jobs
+# ----------------------------------------------------------------------
+
+@dataclass
+class Job:
+    """A scheduled job and its run history"""
+    id: str
+    func: Callable
+    trigger: Any
+    args: Tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    description: str = ''
+    # Random delay of up to this many seconds added to each run
+    jitter: float = 0.0
+    misfire: str = 'coalesce'
+    # Seconds late a run may start under the 'skip' policy
+    misfire_grace: float = 60.0
+    # Runs of this job allowed at once; extra runs are skipped
+    max_instances: int = 1
+
+    next_run: Optional[datetime] = None
+    last_run: Optional[datetime] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    last_duration: Optional[float] = None
+    runs: int = 0
+    errors: int = 0
+    skipped: int = 0
+    running: int = 0
+    # Bumped whenever next_run changes, to discard stale heap entries
+    version: int = 0
+
+    def __str__(self):
+        next_run = self.next_run.strftime('%Y-%m-%d %H:%M:%S') if self.next_run else 'N/A'
+        return f"{self.id} [{self.trigger.signature}] next run {next_run}" + \
+            (f" - {self.description}" if self.description else '')
+
+
+class JobScheduler:
+    """Heap-based scheduler running jobs on an asyncio loop"""
+
+    def __init__(self, name: str = 'scheduler', state_path: Path = None,
+                 max_workers: int = None, shutdown_timeout: float = 30):
+        """
+        Args:
+            name: Used for the loop thread name and log messages
+            state_path: JSON file that keeps next-run times across restarts
+                (None keeps them in memory only)
+            max_workers: Threads for running plain (non-async) jobs
+            shutdown_timeout: Seconds stop() waits for running jobs
+        """
+        self.name = name
+        self.state_path = Path(state_path) if state_path else None
+        self.max_workers = max_workers or int(os.getenv('SCHEDULER_MAX_WORKERS', '4'))
+        self.shutdown_timeout = shutdown_timeout
+
+        self._jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._counter = 0
+        self._lock = threading.RLock()
+        self._state: Dict[str, Dict[str, Any]] = self._load_state()
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stop_event = threading.Event()
+        self._started = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running_tasks: set = set()
+
+    # ------------------------------------------------------------------
+    # Persisted state
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        if not self.state_path:
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('jobs', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable scheduler state {self.state_path}: {e}")
+            return {}
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+
+        with self._lock:
+            for job in self._jobs.values():
+                self._state[job.id] = {
+                    'trigger': job.trigger.signature,
+                    'next_run': job.next_run.isoformat() if job.next_run else None,
+                    'last_run': job.last_run.isoformat() if job.last_run else None,
+                    'last_status': job.last_status
+                }
+            data = {'updated_at': datetime.now().isoformat(), 'jobs': self._state}
+
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.state_path.with_name(f".{self.state_path.name}.{os.getpid()}.tmp")
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp, self.state_path)
+        except OSError as e:
+            logger.warning(f"Could not save scheduler state {self.state_path}: {e}")
+
+    def _restore(self, job: Job) -> Optional[datetime]:
+        """Persisted next run for a job whose trigger is unchanged"""
+        saved = self._state.get(job.id)
+        if not saved or saved.get('trigger') != job.trigger.signature:
+            return None
+
+        if saved.get('last_run'):
+            job.last_run = datetime.fromisoformat(saved['last_run'])
+        job.last_status = saved.get('last_status')
+        return datetime.fromisoformat(saved['next_run']) if saved.get('next_run') else None
+
+    # ------------------------------------------------------------------
+    # Adding and removing jobs
+    # ------------------------------------------------------------------
+
+    def add_job(self, job_id: str, func: Callable, *, cron: str = None, every: float = None,
+                at: datetime = None, args: Tuple = (), kwargs: Dict[str, Any] = None,
+                description: str = '', jitter: float = 0.0, misfire: str = 'coalesce',
+                misfire_grace: float = 60.0, max_instances: int = 1) -> Job:
+        """
+        Schedule a job (replacing any job with the same id)
+
+        Exactly one of cron, every or at must be given. func may be a plain
+        function (run on the worker pool) or a coroutine function (run on the
+        scheduler's loop).
+
+        Args:
+            job_id: Stable id; persisted state is matched on it
+            cron: Cron expression, e.g. "0 9 * * *" for 09:00 daily
+            every: Interval in seconds (first run one interval from now)
+            at: Run once at this time (not again once the state file records it)
+            jitter: Random delay of up to this many seconds per run
+            misfire: One of MISFIRE_POLICIES
+            misfire_grace: Lateness in seconds tolerated by the 'skip' policy
+            max_instances: Concurrent runs allowed for this job
+
+        Returns:
+            The Job
+        """
+        if sum(option is not None for option in (cron, every, at)) != 1:
+            raise ValueError("Give exactly one of cron, every or at")
+        if misfire not in MISFIRE_POLICIES:
+            raise ValueError(f"Unknown misfire policy {misfire!r}")
+
+        if cron is not None:
+            trigger = CronTrigger(cron)
+        elif every is not None:
+            trigger = IntervalTrigger(every.total_seconds() if isinstance(every, timedelta) else every)
+        else:
+            trigger = DateTrigger(at)
+
+        job = Job(
+            id=job_id, func=func, trigger=trigger, args=tuple(args), kwargs=kwargs or {},
+            description=description, jitter=jitter, misfire=misfire,
+            misfire_grace=misfire_grace, max_instances=max(1, max_instances)
+        )
+
+        with self._lock:
+            saved = self._state.get(job_id)
+            if saved and saved.get('completed') and saved.get('trigger') == trigger.signature:
+                self._restore(job)
+                logger.info(f"[{self.name}] Not scheduling {job_id}: it already ran at {trigger.run_at}")
+                return job
+
+            previous = self._jobs.get(job_id)
+            if previous:
+                job.version = previous.version + 1
+            next_run = self._restore(job) or trigger.first_fire(datetime.now())
+            self._jobs[job_id] = job
+            self._schedule(job, next_run)
+
+        self._wake()
+        return job
+
+    def remove_job(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            self._state.pop(job_id, None)
+        if job:
+            job.version += 1
+            self._save_state()
+        return job is not None
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        """Jobs ordered by next run"""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.next_run or datetime.max)
+
+    def _schedule(self, job: Job, next_run: Optional[datetime]):
+        """Set a job's next run and push it on the heap (lock held)"""
+        job.next_run = next_run
+        job.version += 1
+        if next_run is None:
+            return
+
+        due = next_run.timestamp()
+        if job.jitter > 0:
+            due += random.uniform(0, job.jitter)
+        self._counter += 1
+        heapq.heappush(self._heap, (due, self._counter, job.id, job.version))
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def _wake(self):
+        """Make the loop recompute its sleep (thread-safe)"""
+        loop = self.loop
+        if loop is not None and self._wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass
+
+    def _seconds_until_due(self) -> float:
+        with self._lock:
+            while self._heap:
+                due, _, job_id, version = self._heap[0]
+                job = self._jobs.get(job_id)
+                if job is not None and job.version == version:
+                    return due - time.time()
+                heapq.heappop(self._heap)
+        return MAX_SLEEP
+
+    def _fire_due(self):
+        now_ts = time.time()
+        now = datetime.fromtimestamp(now_ts)
+        fired = False
+
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now_ts:
+                _, _, job_id, version = heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+                if job is None or job.version != version:
+                    continue
+                self._dispatch(job, now)
+                fired = True
+
+        if fired:
+            # Persist before the jobs finish so a restart can't run them twice
+            self._save_state()
+
+    def _dispatch(self, job: Job, now: datetime):
+        """Advance a due job and start it unless a policy says otherwise (lock held)"""
+        scheduled = job.next_run
+        late = (now - scheduled).total_seconds()
+
+        start = True
+        if job.misfire == 'skip' and late > job.misfire_grace:
+            job.skipped += 1
+            job.last_status = 'missed'
+            start = False
+            logger.warning(f"[{self.name}] Skipping {job.id}: {late:.0f}s late (grace {job.misfire_grace:.0f}s)")
+        elif job.running >= job.max_instances:
+            job.skipped += 1
+            start = False
+            logger.warning(f"[{self.name}] Skipping {job.id}: {job.running} run(s) still in progress")
+
+        following = job.trigger.next_fire(scheduled, now)
+        if following is None:
+            self._jobs.pop(job.id, None)
+        self._schedule(job, following)
+
+        if start:
+            if late > 1:
+                logger.info(f"[{self.name}] Running {job.id} ({late:.0f}s late)")
+            self._start(job, now)
+
+        if following is None:
+            # Keep a completed marker so a one-shot job is not run again after a restart
+            self._state[job.id] = {
+                'trigger': job.trigger.signature,
+                'next_run': None,
+                'last_run': job.last_run.isoformat() if job.last_run else None,
+                'last_status': job.last_status,
+                'completed': True
+            }
+
+    def _start(self, job: Job, now: datetime):
+        job.running += 1
+        job.last_run = now
+        started = time.monotonic()
+
+        if asyncio.iscoroutinefunction(job.func):
+            task = self.loop.create_task(job.func(*job.args, **job.kwargs))
+        else:
+            task = asyncio.ensure_future(self.loop.run_in_executor(
+                self._executor, functools.partial(job.func, *job.args, **job.kwargs)
+            ))
+
+        self._running_tasks.add(task)
+        task.add_done_callback(functools.partial(self._finished, job, started))
+
+    def _finished(self, job: Job, started: float, task: asyncio.Future):
+        self._running_tasks.discard(task)
+        elapsed = time.monotonic() - started
+
+        with self._lock:
+            job.running -= 1
+            job.runs += 1
+            job.last_duration = round(elapsed, 3)
+            if task.cancelled():
+                job.last_status = 'cancelled'
+            elif task.exception() is not None:
+                error = task.exception()
+                job.errors += 1
+                job.last_status = 'failed'
+                job.last_error = f"{type(error).__name__}: {error}"
+                logger.error(f"[{self.name}] Job {job.id} failed after {elapsed:.1f}s: {error}")
+            else:
+                job.last_status = 'success'
+                logger.debug(f"[{self.name}] Job {job.id} finished in {elapsed:.1f}s")
+
+            completed = self._state.get(job.id)
+            if job.id not in self._jobs and completed and completed.get('completed'):
+                completed['last_status'] = job.last_status
+
+        self._save_state()
+
+    async def _main(self):
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix=f"{self.name}-job")
+
+        stop_waiter = asyncio.ensure_future(asyncio.to_thread(self._stop_event.wait))
+        stop_waiter.add_done_callback(lambda _: self._wakeup.set())
+        self._started.set()
+
+        while not self._stop_event.is_set():
+            delay = self._seconds_until_due()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            self._fire_due()
+
+        if self._running_tasks:
+            logger.info(f"[{self.name}] Waiting for {len(self._running_tasks)} running job(s)...")
+            await asyncio.wait(self._running_tasks, timeout=self.shutdown_timeout)
+        await stop_waiter
+
+    def run(self, stop_event: threading.Event = None):
+        """
+        Run the scheduler in the calling thread until stop_event is set
+
+        Args:
+            stop_event: Event that ends the loop (stop() sets it too)
+        """
+        if stop_event is not None:
+            self._stop_event = stop_event
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        logger.info(f"[{self.name}] Scheduler running with {len(self._jobs)} job(s)")
+        try:
+            self.loop.run_until_complete(self._main())
+        finally:
+            self._stop_event.set()
+            self._save_state()
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+            self.loop = None
+            self._wakeup = None
+            self._started.clear()
+            logger.info(f"[{self.name}] Scheduler stopped")
+
+    def start(self):
+        """Run the scheduler on a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self._thread.start()
+        self._started.wait(5)
+
+    def stop(self, timeout: float = None):
+        """Stop the loop, waiting for running jobs up to shutdown_timeout"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout if timeout is not None else self.shutdown_timeout + 5)
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None and not self._stop_event.is_set()
+
+    def status(self) -> Dict[str, Any]:
+        """Job schedule and history for status reports"""
+        jobs = []
+        for job in self.jobs():
+            jobs.append({
+                'job': job.id,
+                'description': job.description,
+                'trigger': job.trigger.signature,
+                'next_run': job.next_run.strftime('%Y-%m-%d %H:%M:%S') if job.next_run else 'N/A',
+                'last_run': job.last_run.strftime('%Y-%m-%d %H:%M:%S') if job.last_run else None,
+                'last_status': job.last_status,
+                'last_duration': job.last_duration,
+                'running': job.running,
+                'runs': job.runs,
+                'errors': job.errors,
+                'skipped': job.skipped
+            })
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'running': self.running,
+            'jobs': jobs
+        }
+
+
+def daily_cron(at: str) -> str:
+    """Cron expression for a daily "HH:MM" time"""
+    hour, minute = at.split(':')
+    return f"{int(minute)} {int(hour)} * * *"
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Post Work Queue - Bounded, per-platform concurrent processing of approved files
+Runs a long-lived asyncio event loop in a background thread and drains queued
+files through one worker pool per platform
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Default number of simultaneous posts per platform. API platforms can run
+# several at once; browser-based platforms share one Chromium session each.
+DEFAULT_PLATFORM_LIMITS = {
+    'twitter': 4,
+    'email': 4,
+    'linkedin': 1,
+    'facebook': 1,
+    'instagram': 1,
+    'instagram_story': 1,
+    'whatsapp': 1,
+    'generic': 2,
+}
+
+
+def parse_platform_limits(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parse a limits override such as "twitter=8,linkedin=2"
+
+    Args:
+        spec: Comma separated platform=limit pairs (usually from the environment)
+
+    Returns:
+        Dict of platform -> limit, merged over DEFAULT_PLATFORM_LIMITS
+    """
+    limits = dict(DEFAULT_PLATFORM_LIMITS)
+    if not spec:
+        return limits
+
+    for pair in spec.split(','):
+        if '=' not in pair:
+            continue
+        platform, value = pair.split('=', 1)
+        try:
+            limits[platform.strip().lower()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"Ignoring invalid concurrency limit: {pair}")
+
+    return limits
+
+
+class PostWorkQueue:
+    """Bounded work queue with a separate worker pool per platform"""
+
+    def __init__(
+        self,
+        process: Callable[[Path], Awaitable[Any]],
+        classify: Callable[[Path], str],
+        limits: Dict[str, int] = None,
+        maxsize: int = None,
+        settle_delay: float = 1.0,
+        on_start: Callable[[], Awaitable[Any]] = None,
+        on_stop: Callable[[], Awaitable[Any]] = None
+    ):
+        """
+        Args:
+            process: Coroutine function that processes one file
+            classify: Function returning the platform name for a file
+            limits: Max concurrent items per platform (unknown platforms use 'generic')
+            maxsize: Max items waiting per queue before submit() blocks
+            settle_delay: Seconds to wait after a file appears before processing it
+            on_start: Coroutine function run on the loop before workers start
+            on_stop: Coroutine function run on the loop after workers stop
+        """
+        self.process = process
+        self.classify = classify
+        self.limits = limits or parse_platform_limits(os.getenv('AUTO_PROCESSOR_CONCURRENCY'))
+        self.limits.setdefault('generic', 1)
+        self.maxsize = maxsize or int(os.getenv('AUTO_PROCESSOR_QUEUE_SIZE', '500'))
+        self.settle_delay = settle_delay
+        self.on_start = on_start
+        self.on_stop = on_stop
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+        self._intake: Optional[asyncio.Queue] = None
+        self._platform_queues: Dict[str, asyncio.Queue] = {}
+        self._tasks = []
+
+        # Counters (only mutated on the event loop thread)
+        self.in_flight: Dict[str, int] = {platform: 0 for platform in self.limits}
+        self.processed = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the event loop thread and worker pools"""
+        with self._lock:
+            if self.running:
+                return
+
+            self._started.clear()
+            self._thread = threading.Thread(target=self._run_loop, name='post-work-queue', daemon=True)
+            self._thread.start()
+
+        self._started.wait()
+        logger.info(f"Post work queue started (limits: {self.limits}, maxsize: {self.maxsize})")
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        if self.on_start:
+            try:
+                self.loop.run_until_complete(self.on_start())
+            except Exception as e:
+                logger.error(f"Post work queue start hook failed: {e}", exc_info=True)
+
+        self._intake = asyncio.Queue(maxsize=self.maxsize)
+        self._platform_queues = {
+            platform: asyncio.Queue(maxsize=self.maxsize) for platform in self.limits
+        }
+
+        self._tasks = [self.loop.create_task(self._dispatcher())]
+        for platform, limit in self.limits.items():
+            for _ in range(limit):
+                self._tasks.append(self.loop.create_task(self._worker(platform)))
+
+        self.loop.call_soon(self._started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def submit(self, file_path: Path, timeout: float = None) -> bool:
+        """
+        Queue a file for processing (thread-safe)
+
+        Blocks while the intake queue is full so watchdog bursts apply
+        backpressure instead of growing memory without bound.
+
+        Returns:
+            True if the file was queued
+        """
+        if not self.running:
+            self.start()
+
+        item = (Path(file_path), self.loop.time() + self.settle_delay)
+        future = asyncio.run_coroutine_threadsafe(self._intake.put(item), self.loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception as e:
+            future.cancel()
+            logger.error(f"Failed to queue {file_path}: {e}")
+            return False
+
+    async def _dispatcher(self):
+        """Move files from the intake queue to their platform queue"""
+        while True:
+            file_path, ready_at = await self._intake.get()
+            try:
+                # Give the writer time to finish the file without blocking other work
+                delay = ready_at - self.loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                try:
+                    platform = await asyncio.to_thread(self.classify, file_path)
+                except Exception as e:
+                    logger.warning(f"Could not classify {file_path.name}: {e}")
+                    platform = 'generic'
+
+                if platform not in self._platform_queues:
+                    platform = 'generic'
+
+                await self._platform_queues[platform].put(file_path)
+            finally:
+                self._intake.task_done()
+
+    async def _worker(self, platform: str):
+        """Process files for a single platform, one at a time"""
+        queue = self._platform_queues[platform]
+        while True:
+            file_path = await queue.get()
+            self.in_flight[platform] += 1
+            try:
+                await self.process(file_path)
+                self.processed += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Worker error on {file_path.name} ({platform}): {e}", exc_info=True)
+            finally:
+                self.in_flight[platform] -= 1
+                queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth, in-flight counts and limits"""
+        if not self.running:
+            return {
+                'running': False,
+                'queued': 0,
+                'in_flight': 0,
+                'limits': dict(self.limits),
+                'processed': self.processed,
+                'errors': self.errors
+            }
+
+        queued_by_platform = {p: q.qsize() for p, q in self._platform_queues.items()}
+        return {
+            'running': True,
+            'timestamp': datetime.now().isoformat(),
+            'intake': self._intake.qsize(),
+            'queued': self._intake.qsize() + sum(queued_by_platform.values()),
+            'queued_by_platform': queued_by_platform,
+            'in_flight': sum(self.in_flight.values()),
+            'in_flight_by_platform': dict(self.in_flight),
+            'limits': dict(self.limits),
+            'processed': self.processed,
+            'errors': self.errors
+        }
+
+    def is_idle(self) -> bool:
+        stats = self.stats()
+        return stats['queued'] == 0 and stats['in_flight'] == 0
+
+    async def _drain(self):
+        await self._intake.join()
+        for queue in self._platform_queues.values():
+            await queue.join()
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        Wait until every queued file has been processed
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        if not self.running:
+            return True
+
+        future = asyncio.run_coroutine_threadsafe(self._drain(), self.loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            future.cancel()
+            return False
+
+    def stop(self, drain: bool = True, timeout: float = 30):
+        """
+        Stop the workers and the event loop
+
+        Args:
+            drain: Wait for queued files to finish first
+            timeout: Max seconds to wait for draining
+        """
+        if not self.running:
+            return
+
+        if drain and not self.join(timeout):
+            logger.warning("Post work queue did not drain before timeout, cancelling workers")
+
+        async def _cancel():
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            if self.on_stop:
+                try:
+                    await self.on_stop()
+                except Exception as e:
+                    logger.error(f"Post work queue stop hook failed: {e}", exc_info=True)
+            self.loop.stop()
+
+        asyncio.run_coroutine_threadsafe(_cancel(), self.loop)
+        self._thread.join(timeout=10)
+        logger.info(f"Post work queue stopped ({self.processed} processed, {self.errors} errors)")
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Publish Ledger - Content-hash keyed record of what has been published where
+Consulted before every platform call so a restart, a replayed retry or a
+rescan of Done/ never posts the same content to the same target twice
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+LEDGER_FILENAME = '.publish_ledger.jsonl'
+
+PENDING = 'pending'
+PUBLISHED = 'published'
+ABORTED = 'aborted'
+
+# A pending entry older than this belongs to a call that crashed midway;
+# the content may be published again after it expires
+PENDING_TTL = float(os.getenv('PUBLISH_LEDGER_PENDING_TTL', '900'))
+
+# Published entries older than this are dropped at compaction
+RETENTION_DAYS = float(os.getenv('PUBLISH_LEDGER_RETENTION_DAYS', '365'))
+
+# Compaction runs once the file holds this many lines and twice the live entries
+COMPACT_MIN_LINES = 1000
+
+# A write lock older than this is assumed to belong to a dead process
+WRITE_LOCK_STALE = 60
+
+# Seconds to wait for another process's write lock
+WRITE_LOCK_TIMEOUT = float(os.getenv('PUBLISH_LEDGER_LOCK_TIMEOUT', '10'))
+
+# Metadata that decides who receives a post (same text to another recipient is not a duplicate)
+TARGET_FIELDS = ('to', 'recipient', 'email', 'phone', 'subject', 'image_path', 'image', 'media')
+
+# Result keys that carry the platform's id for a post
+POST_ID_FIELDS = ('post_id', 'tweet_id', 'message_id', 'id')
+
+
+# Note sections holding the text that is actually posted, in order of preference
+POST_SECTION_PATTERNS = [
+    re.compile(r'## Post Content\s*\n(.*?)(?=\n##|\Z)', re.DOTALL),
+    re.compile(r'## Message\s*\n(.*?)(?=\n##|\Z)', re.DOTALL),
+    re.compile(r'## Content\s*\n(.*?)(?=\n##|\Z)', re.DOTALL),
+    re.compile(r'## Tweet\s*\n(.*?)(?=\n##|\Z)', re.DOTALL),
+    re.compile(r'## Email Body\s*\n(.*?)(?=\n##|\Z)', re.DOTALL),
+    re.compile(r'## Caption\s*\n(.*?)(?=\n##|\n---|\Z)', re.DOTALL),  # Instagram caption
+]
+
+
+def post_text(body: str) -> str:
+    """The post text of a note body: its post section, or the body without headers and list lines"""
+    body = body.strip()
+    for pattern in POST_SECTION_PATTERNS:
+        match = pattern.search(body)
+        if match:
+            return match.group(1).strip()
+    lines = body.split('\n')
+    return '\n'.join(line for line in lines if not line.startswith('#') and not line.startswith('-')).strip()
+
+
+def ledger_content(note) -> str:
+    """
+    Text a note's ledger key is computed from
+
+    Every publisher keys on this, so a note posted by one is recognised by
+    the others however much of the note they send.
+    """
+    return post_text(note.body)
+
+
+def content_key(platform: str, content: str, metadata: Dict[str, Any] = None) -> str:
+    """
+    Ledger key for a post: sha256 of platform, target and normalized text
+
+    Whitespace differences do not change the key.
+    """
+    metadata = metadata or {}
+    target = {field: str(metadata[field]) for field in TARGET_FIELDS if metadata.get(field)}
+    text = re.sub(r'\s+', ' ', content or '').strip()
+    payload = json.dumps([platform, target, text], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PublishLedger:
+    """
+    Append-only JSONL ledger with an in-memory index by content key
+
+    Lookups are a dict access after reading any lines other processes
+    appended since the last read. Each key's latest line wins; superseded
+    and expired lines are removed by compaction.
+    """
+
+    def __init__(self, path: Path, pending_ttl: float = None):
+        self.path = Path(path)
+        self.pending_ttl = pending_ttl if pending_ttl is not None else PENDING_TTL
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self._lock = threading.RLock()
+
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._offset = 0
+        self._file_id = None
+        self._lines = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def for_vault(cls, vault_path: Path) -> 'PublishLedger':
+        """Ledger at PUBLISH_LEDGER_PATH or <vault>/.publish_ledger.jsonl"""
+        return cls(Path(os.getenv('PUBLISH_LEDGER_PATH') or Path(vault_path) / LEDGER_FILENAME))
+
+    def _catch_up(self):
+        """Read lines appended since the last read (must hold self._lock)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._index.clear()
+            self._offset = self._lines = 0
+            self._file_id = None
+            return
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._offset:
+            # Replaced by a compaction in another process: rebuild the index
+            self._index.clear()
+            self._offset = self._lines = 0
+            self._file_id = file_id
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        # Leave a partially written last line for the next read
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            self._lines += 1
+            try:
+                entry = json.loads(line)
+                self._index[entry['key']] = entry
+            except (ValueError, KeyError, TypeError):
+                continue
+        self._offset += end
+
+    def _append(self, entry: Dict[str, Any]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, default=str) + '\n')
+        self._catch_up()
+
+    # -- public API ---------------------------------------------------------
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Latest ledger entry for a key, or None"""
+        with self._lock:
+            self._catch_up()
+            entry = self._index.get(key)
+            return dict(entry) if entry else None
+
+    def begin(self, key: str, platform: str, source: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Claim a key before calling the platform
+
+        Returns:
+            None if the caller may publish (a pending entry is recorded), or
+            the blocking entry: a published one, or a pending one from a call
+            that is still in flight
+        """
+        with self._lock, self._file_locked():
+            self._catch_up()
+            entry = self._index.get(key)
+            if entry:
+                if entry['status'] == PUBLISHED:
+                    return dict(entry)
+                if entry['status'] == PENDING:
+                    if time.time() - entry['ts'] < self.pending_ttl:
+                        return dict(entry)
+                    logger.warning(f"[LEDGER] Abandoned publish of {entry.get('source') or key[:12]} "
+                                   f"on {platform} expired; publishing again")
+
+            self._append({
+                'key': key, 'status': PENDING, 'platform': platform,
+                'source': source, 'pid': os.getpid(), 'ts': time.time()
+            })
+            return None
+
+    def complete(self, key: str, result: Dict[str, Any]):
+        """Record a successful publish with the platform's post id and URL"""
+        with self._lock:
+            with self._file_locked():
+                self._catch_up()
+                previous = self._index.get(key, {})
+                post_id = next((result[field] for field in POST_ID_FIELDS if result.get(field)), None)
+                self._append({
+                    'key': key, 'status': PUBLISHED,
+                    'platform': result.get('platform') or previous.get('platform'),
+                    'source': previous.get('source'),
+                    'post_id': post_id, 'url': result.get('url'),
+                    'published_at': datetime.now().isoformat(), 'ts': time.time()
+                })
+            if self._lines >= max(COMPACT_MIN_LINES, len(self._index) * 2):
+                self.compact()
+
+    def abort(self, key: str):
+        """Release a pending claim after a failed call so it can be retried"""
+        with self._lock, self._file_locked():
+            self._catch_up()
+            entry = self._index.get(key)
+            if entry and entry['status'] == PENDING:
+                self._append({'key': key, 'status': ABORTED, 'ts': time.time()})
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._catch_up()
+            counts = {PUBLISHED: 0, PENDING: 0}
+            for entry in self._index.values():
+                if entry['status'] in counts:
+                    counts[entry['status']] += 1
+            counts['lines'] = self._lines
+            return counts
+
+    # -- compaction ---------------------------------------------------------
+
+    def _acquire_file_lock(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - self.lock_path.stat().st_mtime > WRITE_LOCK_STALE:
+                        self.lock_path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.02)
+
+    @contextmanager
+    def _file_locked(self, timeout: float = None):
+        """
+        Exclusive across processes: held while an entry is checked and
+        appended, and while the ledger is compacted
+
+        Raises:
+            TimeoutError if another process holds the lock for too long
+        """
+        if not self._acquire_file_lock(WRITE_LOCK_TIMEOUT if timeout is None else timeout):
+            raise TimeoutError(f"Publish ledger {self.path} is locked by another process")
+        try:
+            yield
+        finally:
+            self.lock_path.unlink(missing_ok=True)
+
+    def _live_entries(self):
+        cutoff = time.time() - RETENTION_DAYS * 86400
+        for entry in self._index.values():
+            if entry['status'] == PUBLISHED and entry['ts'] >= cutoff:
+                yield entry
+            elif entry['status'] == PENDING:
+                yield entry
+
+    def compact(self):
+        """Rewrite the ledger to one line per live key (appends wait for it via the write lock)"""
+        temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with self._lock, self._file_locked():
+                self._catch_up()
+                with open(temp, 'w', encoding='utf-8') as f:
+                    for entry in self._live_entries():
+                        f.write(json.dumps(entry, default=str) + '\n')
+                os.replace(temp, self.path)
+
+                self._file_id = None
+                self._catch_up()
+                logger.info(f"[LEDGER] Compacted publish ledger to {self._lines} entries")
+        except Exception as e:
+            logger.error(f"Failed to compact publish ledger: {e}")
+        finally:
+            temp.unlink(missing_ok=True)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Retry Executor - Asyncio retries with jittered backoff and deadline budgets
+Waits between attempts with asyncio.sleep so a flaky API yields to other work
+instead of blocking a thread, honours Retry-After hints, and gives up when a
+call's total time budget runs out. Sync code uses the same logic through a
+shared background event loop (retry_sync / run_sync).
+"""
+
+import os
+import random
+import smtplib
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Exception class names (anywhere in the MRO) from optional HTTP libraries
+# that mean "try again": requests, httpx, aiohttp, urllib3
+_TRANSIENT_NAMES = {
+    'ConnectionError', 'ConnectTimeout', 'ReadTimeout', 'Timeout', 'TimeoutException',
+    'ClientConnectionError', 'ServerDisconnectedError', 'ProtocolError', 'RemoteDisconnected'
+}
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how long to retry a call"""
+    max_attempts: int = 3
+    # Full jitter: each wait is uniform(0, min(max_delay, base_delay * 2**n))
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    # Total seconds for all attempts and waits (None for no limit)
+    deadline: Optional[float] = None
+    # Seconds allowed for a single attempt (None for no limit)
+    attempt_timeout: Optional[float] = None
+    # Longest server-requested (Retry-After) wait that is honoured
+    max_retry_after: float = 900.0
+
+    @classmethod
+    def from_env(cls, prefix: str, **defaults) -> 'RetryPolicy':
+        """Build a policy from PREFIX_MAX_ATTEMPTS, PREFIX_BASE_DELAY, PREFIX_MAX_DELAY and PREFIX_DEADLINE"""
+        policy = cls(**defaults)
+        for name, convert in (('max_attempts', int), ('base_delay', float),
+                              ('max_delay', float), ('deadline', float)):
+            value = os.getenv(f"{prefix}_{name.upper()}")
+            if value:
+                try:
+                    setattr(policy, name, convert(value))
+                except ValueError:
+                    logger.warning(f"Ignoring invalid {prefix}_{name.upper()}={value!r}")
+        return policy
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff for a 0-based retry number"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    response = getattr(error, 'response', None)
+    for source in (response, error):
+        if source is None:
+            continue
+        for attr in ('status_code', 'status'):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Server-requested wait from an error, if any
+
+    Looks at a retry_after attribute and at Retry-After headers on the error
+    or its response (seconds or an HTTP date).
+    """
+    value = getattr(error, 'retry_after', None)
+    if value is None:
+        for source in (getattr(error, 'response', None), error):
+            headers = getattr(source, 'headers', None)
+            if headers:
+                try:
+                    value = headers.get('Retry-After') or headers.get('retry-after')
+                except AttributeError:
+                    value = None
+            if value is not None:
+                break
+
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(str(value))
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Default classifier: timeouts, dropped connections, 408/429/5xx and SMTP 4xx"""
+    if isinstance(error, asyncio.CancelledError):
+        return False
+
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, (ConnectionError, TimeoutError, smtplib.SMTPServerDisconnected)):
+        return True
+
+    status = _status_code(error)
+    if status is not None:
+        return status in (408, 429) or status >= 500
+
+    return any(cls.__name__ in _TRANSIENT_NAMES for cls in type(error).__mro__)
+
+
+async def retry_async(
+    func: Callable[..., Any],
+    *args,
+    policy: RetryPolicy = None,
+    retry_if: Callable[[BaseException], bool] = is_retryable,
+    on_retry: Callable[[int, BaseException, float], Any] = None,
+    **kwargs
+) -> Any:
+    """
+    Call func until it succeeds, retries run out or the deadline passes
+
+    func may be a coroutine function or a plain function; plain functions run
+    in a worker thread for each attempt. Cancelling the awaiting task stops
+    the retries at once (a plain function already running in its thread
+    finishes in the background).
+
+    Args:
+        func: Callable to run
+        policy: Attempts, backoff and deadline (RetryPolicy() by default)
+        retry_if: Decides whether an exception is worth another attempt
+        on_retry: Called as (attempt_number, error, delay) before each wait
+
+    Returns:
+        func's result
+
+    Raises:
+        The last exception once retries are exhausted, the error is not
+        retryable, or the next wait would overrun the deadline
+    """
+    policy = policy or RetryPolicy()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.deadline if policy.deadline else None
+    attempt = 0
+
+    while True:
+        timeout = policy.attempt_timeout
+        if deadline is not None:
+            remaining = deadline - loop.time()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        if asyncio.iscoroutinefunction(func):
+            call = func(*args, **kwargs)
+        else:
+            call = asyncio.to_thread(func, *args, **kwargs)
+
+        try:
+            if timeout is None:
+                return await call
+            return await asyncio.wait_for(call, timeout=max(timeout, 0.001))
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            attempt += 1
+            if attempt >= policy.max_attempts or not retry_if(error):
+                raise
+
+            delay = backoff_delay(attempt - 1, policy.base_delay, policy.max_delay)
+            hint = retry_after_seconds(error)
+            if hint is not None:
+                delay = max(delay, min(hint, policy.max_retry_after))
+
+            if deadline is not None and loop.time() + delay >= deadline:
+                logger.warning(f"Retry budget of {policy.deadline:.0f}s exhausted after {attempt} attempt(s)")
+                raise
+
+            if on_retry:
+                on_retry(attempt, error, delay)
+            await asyncio.sleep(delay)
+
+
+# ----------------------------------------------------------------------
+# Thread bridge for sync callers
+# ----------------------------------------------------------------------
+
+_bridge_loop: Optional[asyncio.AbstractEventLoop] = None
+_bridge_lock = threading.Lock()
+
+
+def _get_bridge_loop() -> asyncio.AbstractEventLoop:
+    global _bridge_loop
+    with _bridge_lock:
+        if _bridge_loop is None or _bridge_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            threading.Thread(target=_run, name='retry-bridge', daemon=True).start()
+            ready.wait()
+            _bridge_loop = loop
+        return _bridge_loop
+
+
+def run_sync(coro: Awaitable, timeout: float = None, cancel_event: threading.Event = None) -> Any:
+    """
+    Run a coroutine on the shared background loop and wait for its result
+
+    Many threads can wait at once; their backoff sleeps share one loop
+    instead of each holding a sleeping thread inside the retry logic.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait before cancelling it
+        cancel_event: Event that cancels it when set
+
+    Raises:
+        RuntimeError if called from a thread that is running an event loop
+        (await the coroutine there instead)
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("run_sync() called from a running event loop; await the coroutine instead")
+
+    future = asyncio.run_coroutine_threadsafe(coro, _get_bridge_loop())
+    try:
+        if cancel_event is None:
+            return future.result(timeout)
+
+        # Poll with wait(), not result(timeout): on 3.11+ a TimeoutError raised
+        # by the coroutine is the same class as result()'s own timeout
+        waited = 0.0
+        while not concurrent.futures.wait([future], 0.25).done:
+            waited += 0.25
+            if cancel_event.is_set():
+                future.cancel()
+                raise concurrent.futures.CancelledError()
+            if timeout is not None and waited >= timeout:
+                raise concurrent.futures.TimeoutError()
+        return future.result()
+    except BaseException:
+        # Timeout, cancel or KeyboardInterrupt: stop the retries too
+        future.cancel()
+        raise
+
+
+def retry_sync(func: Callable[..., Any], *args, policy: RetryPolicy = None,
+               retry_if: Callable[[BaseException], bool] = is_retryable,
+               on_retry: Callable[[int, BaseException, float], Any] = None,
+               cancel_event: threading.Event = None, **kwargs) -> Any:
+    """Blocking version of retry_async for sync code (see run_sync)"""
+    return run_sync(
+        retry_async(func, *args, policy=policy, retry_if=retry_if, on_retry=on_retry, **kwargs),
+        cancel_event=cancel_event
+    )
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Retry Queue - Durable retry and dead-letter queue for failed posts
+Records every post that lands in Failed/ in a SQLite table with its error
+class and next attempt time, hands transient failures back to the posting
+pipeline with backoff, and parks permanent ones in a dead-letter view
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.retry import is_retryable, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+
+QUEUE_FILENAME = '.retry_queue.sqlite'
+
+PENDING = 'pending'
+RETRYING = 'retrying'
+DEAD = 'dead'
+
+# Failure classes
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+
+# Error text that will not go away by retrying (missing data or config)
+PERMANENT_MARKERS = (
+    'not configured', 'not installed', 'not specified', 'no phone number', 'no recipient',
+    'invalid', 'unauthorized', 'forbidden', 'duplicate', 'not found', '401', '403'
+)
+# Error text worth retrying (outages, throttling, flaky sessions)
+TRANSIENT_MARKERS = (
+    'timeout', 'timed out', 'rate limit', 'too many requests', '429', 'temporar',
+    'connection', 'network', 'unavailable', '500', '502', '503', '504', 'try again'
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS retry_items (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    platform TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    error_class TEXT,
+    next_attempt REAL,
+    first_failed REAL NOT NULL,
+    last_failed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_retry_due ON retry_items (status, next_attempt);
+CREATE VIEW IF NOT EXISTS dead_letters AS
+    SELECT name, path, platform, attempts, error, error_class,
+           datetime(first_failed, 'unixepoch', 'localtime') AS first_failed,
+           datetime(last_failed, 'unixepoch', 'localtime') AS last_failed
+    FROM retry_items WHERE status = 'dead';
+"""
+
+
+def classify_failure(error: Any) -> str:
+    """
+    Decide whether a failure is worth retrying
+
+    Args:
+        error: The exception raised, or the failed result dict from a poster
+            (a 'retryable' key in the result overrides the text heuristics)
+
+    Returns:
+        TRANSIENT or PERMANENT
+    """
+    if isinstance(error, BaseException):
+        if is_retryable(error):
+            return TRANSIENT
+        text = f"{type(error).__name__}: {error}"
+    elif isinstance(error, dict):
+        if 'retryable' in error:
+            return TRANSIENT if error['retryable'] else PERMANENT
+        text = str(error.get('error') or '')
+    else:
+        text = str(error or '')
+
+    lowered = text.lower()
+    if any(marker in lowered for marker in TRANSIENT_MARKERS):
+        return TRANSIENT
+    if any(marker in lowered for marker in PERMANENT_MARKERS):
+        return PERMANENT
+    # Unknown errors get the benefit of the doubt, within max_attempts
+    return TRANSIENT
+
+
+class RetryQueue:
+    """SQLite-backed queue of failed posts awaiting another attempt"""
+
+    def __init__(self, vault_path, db_path=None, max_attempts: int = None,
+                 base_delay: float = None, max_delay: float = None):
+        """
+        Args:
+            vault_path: Vault root directory
+            db_path: Queue file (default: RETRY_QUEUE_DB or <vault>/.retry_queue.sqlite)
+            max_attempts: Failures before an item is dead-lettered
+            base_delay: Seconds before the first retry (doubles per attempt)
+            max_delay: Longest wait between retries
+        """
+        self.vault_path = Path(vault_path).resolve()
+        self.db_path = Path(db_path or os.getenv('RETRY_QUEUE_DB') or self.vault_path / QUEUE_FILENAME)
+        self.max_attempts = max_attempts or int(os.getenv('RETRY_QUEUE_MAX_ATTEMPTS', '5'))
+        self.base_delay = base_delay or float(os.getenv('RETRY_QUEUE_BASE_DELAY', '60'))
+        self.max_delay = max_delay or float(os.getenv('RETRY_QUEUE_MAX_DELAY', '3600'))
+        self._lock = threading.RLock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _delay(self, attempts: int) -> float:
+        # Equal jitter: at least half the exponential step, so retries of a
+        # burst of failures spread out without firing immediately
+        step = min(self.max_delay, self.base_delay * (2 ** max(0, attempts - 1)))
+        return step / 2 + random.uniform(0, step / 2)
+
+    def record_failure(self, name: str, failed_path: Path, error: Any, platform: str = None) -> Dict[str, Any]:
+        """
+        Record a failed post (call after moving it to Failed/)
+
+        Args:
+            name: The file's name in Approved/ (the queue key)
+            failed_path: Where the file now is
+            error: Exception or failed result dict
+            platform: Target platform
+
+        Returns:
+            The item's row as a dict
+        """
+        error_class = classify_failure(error)
+        if isinstance(error, dict):
+            message = str(error.get('error') or 'unknown error')
+            hint = error.get('retry_after')
+        else:
+            message = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+            hint = retry_after_seconds(error) if isinstance(error, BaseException) else None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT attempts, platform, first_failed FROM retry_items WHERE name = ?',
+                                     (name,)).fetchone()
+            attempts = (row['attempts'] if row else 0) + 1
+            first_failed = row['first_failed'] if row else now
+            platform = platform or (row['platform'] if row else None)
+
+            if error_class == PERMANENT or attempts >= self.max_attempts:
+                status, next_attempt = DEAD, None
+            else:
+                delay = self._delay(attempts)
+                if hint:
+                    delay = max(delay, float(hint))
+                status, next_attempt = PENDING, now + delay
+
+            self._conn.execute("""
+                INSERT OR REPLACE INTO retry_items
+                    (name, path, platform, status, attempts, error, error_class, next_attempt, first_failed, last_failed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (name, str(failed_path), platform, status, attempts, message[:2000], error_class,
+                  next_attempt, first_failed, now))
+            self._conn.commit()
+
+        if status == DEAD:
+            logger.warning(f"[DEAD LETTER] {name}: {error_class} failure after {attempts} attempt(s) - {message}")
+        else:
+            logger.info(f"[RETRY] {name} will be retried in {next_attempt - now:.0f}s (attempt {attempts + 1}/{self.max_attempts})")
+
+        return self.get(name)
+
+    def resolve(self, name: str) -> bool:
+        """Forget an item once it has been posted"""
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM retry_items WHERE name = ?', (name,))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def claim_due(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Take items whose next attempt is due, marking them as retrying
+
+        Returns:
+            Row dicts, oldest due first
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT * FROM retry_items
+                WHERE status = ? AND next_attempt <= ?
+                ORDER BY next_attempt LIMIT ?
+            """, (PENDING, time.time(), limit)).fetchall()
+            if rows:
+                self._conn.executemany('UPDATE retry_items SET status = ? WHERE name = ?',
+                                       [(RETRYING, row['name']) for row in rows])
+                self._conn.commit()
+        return [dict(row) for row in rows]
+
+    def release(self, name: str, delay: float = 0):
+        """Put a claimed item back to pending (e.g. it could not be replayed yet)"""
+        with self._lock:
+            self._conn.execute('UPDATE retry_items SET status = ?, next_attempt = ? WHERE name = ?',
+                               (PENDING, time.time() + delay, name))
+            self._conn.commit()
+
+    def defer(self, name: str, seconds: float) -> bool:
+        """Push an item's next attempt back (e.g. the platform asked to wait)"""
+        with self._lock:
+            cursor = self._conn.execute("""
+                UPDATE retry_items SET next_attempt = MAX(COALESCE(next_attempt, 0), ?)
+                WHERE name = ? AND status = ?
+            """, (time.time() + seconds, name, PENDING))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def defer_platform(self, platform: str, seconds: float) -> int:
+        """Push back every pending item for a platform (e.g. it is rate limiting us)"""
+        with self._lock:
+            cursor = self._conn.execute("""
+                UPDATE retry_items SET next_attempt = MAX(COALESCE(next_attempt, 0), ?)
+                WHERE platform = ? AND status = ?
+            """, (time.time() + seconds, platform, PENDING))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def requeue(self, name: str = None) -> int:
+        """Move dead letters (one, or all when name is None) back to pending, with fresh attempts"""
+        with self._lock:
+            query = 'UPDATE retry_items SET status = ?, attempts = 0, next_attempt = ? WHERE status = ?'
+            params = [PENDING, time.time(), DEAD]
+            if name:
+                query += ' AND name = ?'
+                params.append(name)
+            cursor = self._conn.execute(query, params)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def recover_stale(self):
+        """Return items left 'retrying' by a crashed process to pending"""
+        with self._lock:
+            self._conn.execute('UPDATE retry_items SET status = ?, next_attempt = ? WHERE status = ?',
+                               (PENDING, time.time(), RETRYING))
+            self._conn.commit()
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM retry_items WHERE name = ?', (name,)).fetchone()
+        return dict(row) if row else None
+
+    def items(self, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute('SELECT * FROM retry_items WHERE status = ? ORDER BY last_failed DESC LIMIT ?',
+                                          (status, limit)).fetchall()
+            else:
+                rows = self._conn.execute('SELECT * FROM retry_items ORDER BY last_failed DESC LIMIT ?',
+                                          (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Permanently failed items (the dead_letters view)"""
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM dead_letters ORDER BY last_failed DESC LIMIT ?', (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute('SELECT status, COUNT(*) FROM retry_items GROUP BY status').fetchall())
+            next_due = self._conn.execute('SELECT MIN(next_attempt) FROM retry_items WHERE status = ?',
+                                          (PENDING,)).fetchone()[0]
+        return {
+            'pending': counts.get(PENDING, 0),
+            'retrying': counts.get(RETRYING, 0),
+            'dead': counts.get(DEAD, 0),
+            'next_due': datetime.fromtimestamp(next_due).isoformat() if next_due else None
+        }
+
+
+def main():
+    """CLI for inspecting the retry queue and its dead letters"""
+    parser = argparse.ArgumentParser(description='Failed post retry queue')
+    parser.add_argument('action', choices=['stats', 'list', 'dead', 'requeue'], help='What to do')
+    parser.add_argument('--vault', default=os.getenv('VAULT_PATH', '.'), help='Vault path')
+    parser.add_argument('--name', help='Item to requeue (default: every dead letter)')
+    parser.add_argument('--limit', type=int, default=50, help='Max items to list')
+    args = parser.parse_args()
+
+    queue = RetryQueue(args.vault)
+
+    if args.action == 'stats':
+        print(json.dumps(queue.stats(), indent=2))
+    elif args.action == 'list':
+        for item in queue.items(limit=args.limit):
+            due = datetime.fromtimestamp(item['next_attempt']).strftime('%Y-%m-%d %H:%M:%S') if item['next_attempt'] else '-'
+            print(f"{item['status']:<9} {item['attempts']:>2}x  next {due}  {item['name']}  ({item['error']})")
+    elif args.action == 'dead':
+        for item in queue.dead_letters(limit=args.limit):
+            print(f"{item['last_failed']}  {item['error_class']:<9} {item['attempts']:>2}x  {item['name']}  ({item['error']})")
+    elif args.action == 'requeue':
+        count = queue.requeue(args.name)
+        print(f"Requeued {count} item(s)")
+
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -28,7 +28,6 @@ import sys
 import json
 import time
 import random
-import smtplib
 import asyncio
 from pathlib import Path
 from datetime import datetime
@@ -44,6 +43,13 @@ try:
 except ImportError:
     pass
 
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from src.core.browser_pool import acquire_page, install_browser_pool, shutdown_browser_pool
+from src.core.vault_notes import load_note
+from src.core.publish_ledger import PublishLedger, content_key, ledger_content, PUBLISHED
+from src.core.smtp_pool import close_smtp_sender, get_smtp_sender
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
@@ -59,6 +65,9 @@ SENT_TEST_FOLDER = VAULT_PATH / "Sent_Test"
 LOGS_FOLDER.mkdir(exist_ok=True)
 SENT_TEST_FOLDER.mkdir(exist_ok=True)
 
+# Shared with the auto processor: content already published is never re-sent
+LEDGER = PublishLedger.for_vault(VAULT_PATH)
+
 # Logging setup
 logging.basicConfig(
     level=logging.INFO,
@@ -132,23 +141,14 @@ def detect_platform(filename: str) -> str:
 def extract_content(filepath: Path) -> Dict[str, Any]:
     """Extract content from markdown file"""
     try:
-        content = filepath.read_text(encoding='utf-8')
-
-        # Extract metadata if present (YAML frontmatter)
-        metadata = {}
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                try:
-                    import yaml
-                    metadata = yaml.safe_load(parts[1]) or {}
-                    content = parts[2].strip()
-                except:
-                    pass
+        # Metadata from YAML frontmatter (cached until the file changes)
+        note = load_note(filepath)
 
         return {
-            'content': content.strip(),
-            'metadata': metadata,
+            'content': note.body.strip(),
+            # Keyed like the auto processor keys the same note
+            'ledger_content': ledger_content(note),
+            'metadata': note.frontmatter,
             'filename': filepath.name,
             'platform': detect_platform(filepath.name)
         }
@@ -185,28 +185,25 @@ async def post_to_linkedin(content: str, metadata: Dict) -> Dict[str, Any]:
         return result
 
     try:
-        from playwright.async_api import async_playwright
-
         session_path = os.getenv('LINKEDIN_SESSION_PATH', './linkedin_session')
         cookies_path = os.getenv('LINKEDIN_COOKIES_PATH', './linkedin_cookies.json')
 
-        async with async_playwright() as p:
-            # Launch visible browser
-            context = await p.chromium.launch_persistent_context(
-                session_path,
-                headless=False,  # VISIBLE BROWSER
-                args=[
-                    '--no-sandbox',
-                    '--disable-blink-features=AutomationControlled'
-                ],
-                viewport={'width': 1280, 'height': 900},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
-
-            page = context.pages[0] if context.pages else await context.new_page()
-
-            # Load cookies if available
-            if Path(cookies_path).exists():
+        # Launch visible browser (reuses the warm context when pooled)
+        lease = await acquire_page(
+            session_path,
+            headless=False,  # VISIBLE BROWSER
+            args=[
+                '--no-sandbox',
+                '--disable-blink-features=AutomationControlled'
+            ],
+            viewport={'width': 1280, 'height': 900},
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        )
+        context, page = lease.context, lease.page
+
+        try:
+            # Load cookies if the browser was just launched
+            if lease.fresh and Path(cookies_path).exists():
                 with open(cookies_path, 'r') as f:
                     cookies = json.load(f)
                     await context.add_cookies(cookies)
@@ -220,7 +217,6 @@ async def post_to_linkedin(content: str, metadata: Dict) -> Dict[str, Any]:
             if not login_check:
                 logger.error("Not logged into LinkedIn - please login manually first")
                 result['error'] = 'Not logged in'
-                await context.close()
                 return result
 
             # Random wait (human-like)
@@ -249,11 +245,11 @@ async def post_to_linkedin(content: str, metadata: Dict) -> Dict[str, Any]:
             with open(cookies_path, 'w') as f:
                 json.dump(cookies, f, indent=2)
 
-            await context.close()
-
             result['status'] = 'SUCCESS'
             result['message'] = 'Posted to LinkedIn'
             logger.info("LinkedIn post SUCCESS")
+        finally:
+            await lease.release()
 
     except Exception as e:
         logger.error(f"LinkedIn post FAILED: {e}")
@@ -285,22 +281,19 @@ async def post_to_instagram(content: str, metadata: Dict) -> Dict[str, Any]:
         return result
 
     try:
-        from playwright.async_api import async_playwright
-
         session_path = os.getenv('INSTAGRAM_SESSION_PATH', './instagram_session')
 
-        async with async_playwright() as p:
-            # Launch visible browser with mobile viewport
-            context = await p.chromium.launch_persistent_context(
-                session_path,
-                headless=False,
-                args=['--no-sandbox', '--disable-blink-features=AutomationControlled'],
-                viewport={'width': 430, 'height': 932},
-                user_agent='Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15'
-            )
-
-            page = context.pages[0] if context.pages else await context.new_page()
+        # Launch visible browser with mobile viewport (reuses the warm context when pooled)
+        lease = await acquire_page(
+            session_path,
+            headless=False,
+            args=['--no-sandbox', '--disable-blink-features=AutomationControlled'],
+            viewport={'width': 430, 'height': 932},
+            user_agent='Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15'
+        )
+        page = lease.page
 
+        try:
             await page.goto('https://www.instagram.com/', wait_until='domcontentloaded')
             await page.wait_for_timeout(random.randint(3000, 5000))
 
@@ -309,7 +302,6 @@ async def post_to_instagram(content: str, metadata: Dict) -> Dict[str, Any]:
             if login_form:
                 logger.error("Not logged into Instagram - please login manually first")
                 result['error'] = 'Not logged in'
-                await context.close()
                 return result
 
             # Instagram requires images for posts
@@ -317,8 +309,8 @@ async def post_to_instagram(content: str, metadata: Dict) -> Dict[str, Any]:
             logger.warning("Instagram text-only posts not supported. Need image_path in metadata.")
             result['status'] = 'SKIPPED'
             result['message'] = 'Instagram requires image - text-only not supported'
-
-            await context.close()
+        finally:
+            await lease.release()
 
     except Exception as e:
         logger.error(f"Instagram post FAILED: {e}")
@@ -423,19 +415,12 @@ async def send_whatsapp(content: str, metadata: Dict) -> Dict[str, Any]:
         return result
 
     try:
-        from playwright.async_api import async_playwright
-
         session_path = os.getenv('WHATSAPP_SESSION_PATH', './whatsapp_session')
 
-        async with async_playwright() as p:
-            context = await p.chromium.launch_persistent_context(
-                session_path,
-                headless=False,
-                args=['--no-sandbox']
-            )
-
-            page = context.pages[0] if context.pages else await context.new_page()
+        lease = await acquire_page(session_path, headless=False, args=['--no-sandbox'])
+        page = lease.page
 
+        try:
             # Clean phone number
             phone_clean = re.sub(r'[\s\-\(\)]', '', phone)
             if not phone_clean.startswith('+'):
@@ -450,7 +435,6 @@ async def send_whatsapp(content: str, metadata: Dict) -> Dict[str, Any]:
             if qr_code:
                 logger.warning("WhatsApp QR code login required. Please scan with your phone.")
                 result['error'] = 'QR code login required'
-                await context.close()
                 return result
 
             # Wait for message input
@@ -481,8 +465,8 @@ async def send_whatsapp(content: str, metadata: Dict) -> Dict[str, Any]:
 
             except Exception as e:
                 result['error'] = f'Message send failed: {e}'
-
-            await context.close()
+        finally:
+            await lease.release()
 
     except Exception as e:
         logger.error(f"WhatsApp FAILED: {e}")
@@ -520,28 +504,22 @@ async def send_email(content: str, metadata: Dict) -> Dict[str, Any]:
         return result
 
     try:
-        smtp_server = os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com')
-        smtp_port = int(os.getenv('EMAIL_SMTP_PORT', 587))
-        username = os.getenv('EMAIL_USERNAME')
-        password = os.getenv('EMAIL_PASSWORD')
+        sender = get_smtp_sender()
         from_name = os.getenv('EMAIL_FROM_NAME', 'AI Employee')
 
-        if not all([username, password]):
+        if sender is None:
             result['error'] = 'Email credentials not configured'
             return result
 
         # Create message
         msg = MIMEMultipart()
-        msg['From'] = f"{from_name} <{username}>"
+        msg['From'] = f"{from_name} <{sender.username}>"
         msg['To'] = to_addr
         msg['Subject'] = subject
         msg.attach(MIMEText(content, 'plain'))
 
-        # Send
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(username, password)
-            server.send_message(msg)
+        # Queued for the sender's kept-alive pooled session
+        await sender.send_async(msg)
 
         result['status'] = 'SUCCESS'
         result['to'] = to_addr
@@ -578,17 +556,8 @@ def scan_done_folder() -> Dict[str, List[Dict]]:
 
     return items
 
-async def process_single_item(item: Dict) -> Dict[str, Any]:
-    """
-    Process a SINGLE item - attempt ONCE, no retries.
-    """
-    platform = item['platform']
-    content = item['content']
-    metadata = item.get('metadata', {})
-    filename = item['filename']
-
-    logger.info(f"Processing: {filename} ({platform})")
-
+async def post_to_platform(platform: str, content: str, metadata: Dict, filename: str) -> Dict[str, Any]:
+    """Call the poster for a platform"""
     result = None
 
     if platform == 'linkedin':
@@ -608,6 +577,48 @@ async def process_single_item(item: Dict) -> Dict[str, Any]:
         logger.warning(f"Unknown platform for {filename}")
         result = {'platform': 'unknown', 'status': 'SKIPPED'}
 
+    return result
+
+async def process_single_item(item: Dict) -> Dict[str, Any]:
+    """
+    Process a SINGLE item - attempt ONCE, no retries.
+    Items already in the publish ledger are skipped without a platform call.
+    """
+    platform = item['platform']
+    content = item['content']
+    metadata = item.get('metadata', {})
+    filename = item['filename']
+
+    logger.info(f"Processing: {filename} ({platform})")
+
+    # Test runs are not recorded, so switching to live mode still posts
+    key = None
+    if not TEST_MODE and platform in ('linkedin', 'instagram', 'twitter', 'whatsapp', 'email'):
+        key = content_key(platform, item.get('ledger_content', content), metadata)
+        existing = LEDGER.begin(key, platform, source=filename)
+        if existing:
+            if existing['status'] == PUBLISHED:
+                logger.info(f"Already published to {platform} at {existing.get('published_at')}: {filename}")
+                message = 'Already published'
+            else:
+                logger.info(f"Being published by another run: {filename}")
+                message = 'Publish already in progress'
+            return {'platform': platform, 'status': 'SKIPPED', 'message': message,
+                    'url': existing.get('url'), 'filename': filename}
+
+    try:
+        result = await post_to_platform(platform, content, metadata, filename)
+    except BaseException:
+        if key:
+            LEDGER.abort(key)
+        raise
+
+    if key:
+        if result.get('status') == 'SUCCESS':
+            LEDGER.complete(key, result)
+        else:
+            LEDGER.abort(key)
+
     result['filename'] = filename
 
     # Log result
@@ -667,17 +678,23 @@ async def run_test_posting():
 
     results = []
 
-    # Process each platform (one item each for testing)
-    for platform, files in items.items():
-        if files and platform != 'unknown':
-            # Take first item only for test
-            item = files[0]
-            result = await process_single_item(item)
-            results.append(result)
-
-            # Log
-            status_icon = "✅" if 'SUCCESS' in result.get('status', '') else "❌"
-            print(f"  {status_icon} {item['filename']}: {result.get('status', 'UNKNOWN')}")
+    # Keep browsers warm across items instead of relaunching per post
+    install_browser_pool()
+    try:
+        # Process each platform (one item each for testing)
+        for platform, files in items.items():
+            if files and platform != 'unknown':
+                # Take first item only for test
+                item = files[0]
+                result = await process_single_item(item)
+                results.append(result)
+
+                # Log
+                status_icon = "✅" if 'SUCCESS' in result.get('status', '') else "❌"
+                print(f"  {status_icon} {item['filename']}: {result.get('status', 'UNKNOWN')}")
+    finally:
+        await shutdown_browser_pool()
+        close_smtp_sender()
 
     print("\n" + "=" * 60)
     print("RESULTS SUMMARY:")
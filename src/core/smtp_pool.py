@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+SMTP Pool - Kept-alive authenticated SMTP sessions for outgoing mail
+Reuses logged-in connections across messages (NOOP-checked after idling,
+recycled by age and message count), sends queued messages over one session,
+limits how often each recipient is mailed, and reconnects on 421 replies,
+dropped connections and timeouts
+"""
+
+import os
+import sys
+import asyncio
+import time
+import queue
+import socket
+import smtplib
+import logging
+import threading
+import concurrent.futures
+from collections import deque
+from pathlib import Path
+from contextlib import contextmanager
+from email.message import Message
+from email.utils import getaddresses
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.retry import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+# Sessions kept per pool (concurrent senders beyond this wait for one)
+POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '2'))
+
+# A session unused for this long is checked with NOOP before reuse
+HEALTHCHECK_AFTER = float(os.getenv('SMTP_POOL_HEALTHCHECK', '30'))
+
+# Sessions are closed and replaced after this many seconds or messages
+MAX_SESSION_AGE = float(os.getenv('SMTP_POOL_MAX_AGE', '600'))
+MAX_MESSAGES_PER_SESSION = int(os.getenv('SMTP_POOL_MAX_MESSAGES', '100'))
+
+# Reconnects per message after 421 / dropped connection / timeout
+RECONNECT_ATTEMPTS = int(os.getenv('SMTP_RECONNECT_ATTEMPTS', '3'))
+RECONNECT_BASE_DELAY = float(os.getenv('SMTP_RECONNECT_BASE_DELAY', '2'))
+RECONNECT_MAX_DELAY = float(os.getenv('SMTP_RECONNECT_MAX_DELAY', '60'))
+
+# Per-recipient limit: at most RECIPIENT_LIMIT messages per RECIPIENT_WINDOW seconds (0 disables)
+RECIPIENT_LIMIT = int(os.getenv('SMTP_RECIPIENT_LIMIT', '20'))
+RECIPIENT_WINDOW = float(os.getenv('SMTP_RECIPIENT_WINDOW', '3600'))
+
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '60'))
+
+# Seconds the delivery thread waits for more queued messages before sending a batch
+BATCH_LINGER = float(os.getenv('SMTP_BATCH_LINGER', '0.05'))
+
+# Seconds close() waits for queued messages to be sent
+OUTBOX_CLOSE_TIMEOUT = float(os.getenv('SMTP_OUTBOX_CLOSE_TIMEOUT', '120'))
+
+
+class SmtpPoolError(RuntimeError):
+    """No session could be opened (or the pool is backing off after failures)"""
+
+
+class RecipientRateLimited(smtplib.SMTPException):
+    """A recipient has had its share of messages for now; retry_after says when to try again"""
+
+    def __init__(self, recipient: str, retry_after: float):
+        super().__init__(f"Rate limit for {recipient} reached; retry in {retry_after:.0f}s")
+        self.recipient = recipient
+        self.retry_after = retry_after
+
+
+class RecipientRateLimiter:
+    """Sliding-window count of messages sent to each address"""
+
+    def __init__(self, limit: int = None, window: float = None):
+        self.limit = RECIPIENT_LIMIT if limit is None else limit
+        self.window = window or RECIPIENT_WINDOW
+        self._sent: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, stamps: deque, now: float):
+        while stamps and stamps[0] <= now - self.window:
+            stamps.popleft()
+
+    def check(self, recipients: Iterable[str]) -> Tuple[Optional[str], float]:
+        """(first limited recipient, seconds until it frees up) or (None, 0)"""
+        if self.limit <= 0:
+            return None, 0.0
+        now = time.monotonic()
+        with self._lock:
+            for recipient in recipients:
+                stamps = self._sent.get(recipient)
+                if stamps is None:
+                    continue
+                self._expire(stamps, now)
+                if len(stamps) >= self.limit:
+                    return recipient, stamps[0] + self.window - now
+        return None, 0.0
+
+    def record(self, recipients: Iterable[str]):
+        if self.limit <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for recipient in recipients:
+                stamps = self._sent.setdefault(recipient, deque())
+                self._expire(stamps, now)
+                stamps.append(now)
+
+
+def message_recipients(msg: Message) -> List[str]:
+    """Lowercased To/Cc/Bcc addresses of a message"""
+    fields = [value for header in ('To', 'Cc', 'Bcc') for value in msg.get_all(header, [])]
+    return [address.lower() for _, address in getaddresses(fields) if address]
+
+
+def _needs_reconnect(error: BaseException) -> bool:
+    """421 (service closing), a dropped connection or a timeout"""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(code == 421 for code, _ in error.recipients.values())
+    return isinstance(error, (smtplib.SMTPServerDisconnected, socket.timeout, TimeoutError, ConnectionError))
+
+
+class SmtpSession:
+    """A logged-in SMTP connection"""
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.created = time.monotonic()
+        self.last_used = time.monotonic()
+        self.messages = 0
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class SmtpConnectionPool:
+    """
+    Small pool of authenticated SMTP sessions to one server
+
+    acquire() hands out an idle session (NOOP-checked if it sat unused), or
+    logs in a new one while under the size limit, or waits for one to be
+    released. After a failed login the pool refuses to dial again until a
+    jittered, doubling backoff has passed.
+    """
+
+    def __init__(self, host: str, username: str, password: str, port: int = 587,
+                 size: int = None, timeout: float = None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size or POOL_SIZE
+        self.timeout = timeout or SMTP_TIMEOUT
+
+        self._idle: List[SmtpSession] = []
+        self._open_count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._failures = 0
+        self._retry_at = 0.0
+        self.logins = 0
+
+    # -- opening ------------------------------------------------------------
+
+    def _open(self) -> SmtpSession:
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise SmtpPoolError(f"SMTP reconnect to {self.host} backing off for {self._retry_at - now:.0f}s")
+
+        try:
+            if self.port == 465:
+                smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+            else:
+                smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.port != 465:
+                    smtp.starttls()
+                smtp.login(self.username, self.password)
+            except Exception:
+                try:
+                    smtp.close()
+                except Exception:
+                    pass
+                raise
+        except Exception as e:
+            self._failures += 1
+            delay = backoff_delay(self._failures - 1, RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY)
+            self._retry_at = time.monotonic() + delay
+            logger.warning(f"[SMTP] Connecting to {self.host} failed ({e}); next attempt in {delay:.0f}s")
+            raise
+
+        self._failures = 0
+        self._retry_at = 0.0
+        self.logins += 1
+        logger.info(f"[SMTP] Logged in to {self.host} as {self.username} (login #{self.logins})")
+        return SmtpSession(smtp)
+
+    def _healthy(self, session: SmtpSession) -> bool:
+        if time.monotonic() - session.created > MAX_SESSION_AGE:
+            return False
+        if session.messages >= MAX_MESSAGES_PER_SESSION:
+            return False
+        if time.monotonic() - session.last_used < HEALTHCHECK_AFTER:
+            return True
+        try:
+            return session.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    # -- lending ------------------------------------------------------------
+
+    def acquire(self, timeout: float = 60) -> SmtpSession:
+        """
+        Borrow a session (release it when done)
+
+        Raises:
+            SmtpPoolError if the pool is closed, backing off, or still full
+            after timeout seconds; login errors from smtplib
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise SmtpPoolError("SMTP pool is closed")
+                session = self._idle.pop() if self._idle else None
+                if session is None:
+                    if self._open_count < self.size:
+                        # Reserve the slot, then log in outside the lock
+                        self._open_count += 1
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise SmtpPoolError(f"No SMTP session free within {timeout:.0f}s")
+                        self._cond.wait(remaining)
+                        continue
+
+            if session is not None:
+                if self._healthy(session):
+                    session.last_used = time.monotonic()
+                    return session
+                self.discard(session)
+                continue
+
+            try:
+                return self._open()
+            except Exception:
+                with self._cond:
+                    self._open_count -= 1
+                    self._cond.notify()
+                raise
+
+    def release(self, session: SmtpSession):
+        """Return a session for reuse"""
+        session.last_used = time.monotonic()
+        with self._cond:
+            if self._closed:
+                self._open_count -= 1
+                session.close()
+                return
+            self._idle.append(session)
+            self._cond.notify()
+
+    def discard(self, session: SmtpSession):
+        """Drop a session that failed or is in an unknown state"""
+        session.close()
+        with self._cond:
+            self._open_count -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout: float = 60):
+        """with pool.session() as session: ... (discarded if the block raises)"""
+        session = self.acquire(timeout)
+        try:
+            yield session
+        except BaseException:
+            self.discard(session)
+            raise
+        else:
+            self.release(session)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open_count -= len(idle)
+            self._cond.notify_all()
+        for session in idle:
+            session.close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {'open': self._open_count, 'idle': len(self._idle), 'logins': self.logins,
+                    'failures': self._failures}
+
+
+class SmtpSender:
+    """
+    Sends messages over pooled sessions
+
+    send_batch() delivers many messages over a single borrowed session
+    (replaced transparently when it reaches its message cap or drops).
+    submit() and send() queue single messages for a delivery thread that
+    sends whatever has queued up as one batch, so concurrent senders share
+    a session. All paths enforce the per-recipient rate limit and reconnect
+    with backoff after 421 replies, dropped connections and timeouts; that
+    is the only retry layer, other failures are returned to the caller.
+    """
+
+    def __init__(self, pool: SmtpConnectionPool, rate_limiter: RecipientRateLimiter = None,
+                 reconnect_attempts: int = None):
+        self.pool = pool
+        self.rate_limiter = rate_limiter or RecipientRateLimiter()
+        self.reconnect_attempts = RECONNECT_ATTEMPTS if reconnect_attempts is None else reconnect_attempts
+
+        self._outbox: queue.Queue = queue.Queue()
+        self._outbox_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional['SmtpSender']:
+        """Sender configured from EMAIL_* variables, or None without credentials"""
+        username = os.getenv('EMAIL_USERNAME')
+        password = os.getenv('EMAIL_PASSWORD')
+        if not username or not password:
+            return None
+        pool = SmtpConnectionPool(os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com'), username, password,
+                                  port=int(os.getenv('EMAIL_SMTP_PORT', '587')))
+        return cls(pool, **kwargs)
+
+    @property
+    def username(self) -> str:
+        return self.pool.username
+
+    def _check_rate(self, recipients: List[str]):
+        limited, wait = self.rate_limiter.check(recipients)
+        if limited:
+            raise RecipientRateLimited(limited, wait)
+
+    def _deliver(self, session: Optional[SmtpSession], msg: Message,
+                 recipients: List[str]) -> SmtpSession:
+        """
+        Send msg, borrowing or replacing the session as needed
+
+        Returns the session the message went out on (still borrowed). On an
+        error the session has been released or discarded and the error is
+        raised.
+        """
+        attempt = 0
+        while True:
+            if session is None:
+                session = self.pool.acquire()
+            elif not self.pool._healthy(session):
+                self.pool.discard(session)
+                session = self.pool.acquire()
+
+            try:
+                session.smtp.send_message(msg, to_addrs=recipients or None)
+            except Exception as e:
+                reconnect = _needs_reconnect(e)
+                if not reconnect and isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                    # A refused message; smtplib has reset the session, which stays usable
+                    self.pool.release(session)
+                    raise
+                self.pool.discard(session)
+                session = None
+                if not reconnect or attempt >= self.reconnect_attempts:
+                    raise
+                delay = backoff_delay(attempt, RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY)
+                attempt += 1
+                logger.warning(f"[SMTP] Session lost while sending ({e}); reconnecting in {delay:.1f}s "
+                               f"(attempt {attempt}/{self.reconnect_attempts})")
+                time.sleep(delay)
+                continue
+
+            session.messages += 1
+            session.last_used = time.monotonic()
+            self.rate_limiter.record(recipients)
+            return session
+
+    def _send_each(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """Send messages over one borrowed session; returns None or the error for each"""
+        errors: List[Optional[Exception]] = []
+        session = None
+        try:
+            for msg in messages:
+                recipients = message_recipients(msg)
+                try:
+                    self._check_rate(recipients)
+                    session = self._deliver(session, msg, recipients)
+                    errors.append(None)
+                except RecipientRateLimited as e:
+                    errors.append(e)
+                except Exception as e:
+                    logger.error(f"[SMTP] Sending to {msg.get('To')} failed: {e}")
+                    errors.append(e)
+                    session = None
+        finally:
+            if session is not None:
+                self.pool.release(session)
+        return errors
+
+    def send_batch(self, messages: Iterable[Message]) -> List[Dict[str, Any]]:
+        """
+        Send messages over one session
+
+        A failed or rate-limited message does not stop the rest.
+
+        Returns:
+            One {'success', 'to', 'subject', ...} dict per message, in order;
+            failures carry 'error', and rate-limited ones 'retryable' and
+            'retry_after' as RetryQueue expects
+        """
+        messages = list(messages)
+        results = []
+        for msg, error in zip(messages, self._send_each(messages)):
+            result = {'success': error is None, 'to': msg.get('To'), 'subject': msg.get('Subject')}
+            if error is not None:
+                result['error'] = str(error)
+            if isinstance(error, RecipientRateLimited):
+                result.update(retryable=True, retry_after=error.retry_after)
+            results.append(result)
+
+        sent = sum(1 for result in results if result['success'])
+        logger.info(f"[SMTP] Batch sent {sent}/{len(results)} message(s); {self.pool.logins} login(s) so far")
+        return results
+
+    # -- outbox -------------------------------------------------------------
+
+    def submit(self, msg: Message) -> concurrent.futures.Future:
+        """
+        Queue a message for the delivery thread
+
+        Messages queued while a batch is being sent go out together in the
+        next one, over one session. The future resolves to None once the
+        message is accepted, or raises its error (RecipientRateLimited
+        carries retry_after).
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._outbox_lock:
+            if self._closed:
+                raise SmtpPoolError("SMTP sender is closed")
+            self._outbox.put((msg, future))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._deliver_queued, name='smtp-outbox', daemon=True)
+                self._worker.start()
+        return future
+
+    def send(self, msg: Message):
+        """
+        Send one message (through the outbox) and wait for it
+
+        Raises:
+            RecipientRateLimited (with retry_after) if a recipient is over its
+            limit; smtplib errors once reconnects are used up
+        """
+        self.submit(msg).result()
+
+    async def send_async(self, msg: Message):
+        """send() for coroutines: await the queued message without blocking the loop"""
+        await asyncio.wrap_future(self.submit(msg))
+
+    def _deliver_queued(self):
+        while True:
+            item = self._outbox.get()
+            if item is None:
+                return
+            batch = [item]
+            # Let concurrent senders add to this batch, then take what is waiting
+            time.sleep(BATCH_LINGER)
+            while len(batch) < MAX_MESSAGES_PER_SESSION:
+                try:
+                    item = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._outbox.put(None)
+                    break
+                batch.append(item)
+
+            pending = [(msg, future) for msg, future in batch if future.set_running_or_notify_cancel()]
+            try:
+                errors = self._send_each([msg for msg, _ in pending])
+            except Exception as e:
+                errors = [e] * len(pending)
+            for (_, future), error in zip(pending, errors):
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+            if len(pending) > 1:
+                sent = sum(1 for error in errors if error is None)
+                logger.info(f"[SMTP] Outbox sent {sent}/{len(pending)} queued message(s) in one batch")
+
+    def close(self):
+        """Send what is queued, then log out the pooled sessions"""
+        with self._outbox_lock:
+            self._closed = True
+            worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._outbox.put(None)
+            worker.join(OUTBOX_CLOSE_TIMEOUT)
+        self.pool.close()
+
+
+_shared_sender: Optional[SmtpSender] = None
+_shared_lock = threading.Lock()
+
+
+def get_smtp_sender() -> Optional[SmtpSender]:
+    """Process-wide sender from EMAIL_* variables (None without credentials)"""
+    global _shared_sender
+    with _shared_lock:
+        if _shared_sender is None:
+            _shared_sender = SmtpSender.from_env()
+        return _shared_sender
+
+
+def close_smtp_sender():
+    global _shared_sender
+    with _shared_lock:
+        if _shared_sender is not None:
+            _shared_sender.close()
+            _shared_sender = None
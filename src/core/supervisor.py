@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Component Supervisor - Runs AI Employee components inside one process
+Imports components as modules and runs them in supervised threads (or
+isolated processes when asked), restarting crashed ones with backoff, and
+runs one-off checks on a shared worker pool instead of a new interpreter
+"""
+
+import os
+import time
+import logging
+import importlib
+import threading
+import multiprocessing
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_entry(entry: str) -> Callable:
+    """Import 'package.module:function' and return the function"""
+    module_name, _, attr = entry.partition(':')
+    if not attr:
+        raise ValueError(f"Entry must look like 'module:function', got {entry!r}")
+
+    target = importlib.import_module(module_name)
+    for part in attr.split('.'):
+        target = getattr(target, part)
+    return target
+
+
+def _run_entry(entry: str, kwargs: Dict[str, Any], stop_event=None):
+    """Process target: import and call an entry (module level so it pickles)"""
+    target = resolve_entry(entry)
+    if stop_event is not None:
+        kwargs = dict(kwargs, stop_event=stop_event)
+    return target(**kwargs)
+
+
+@dataclass
+class ComponentSpec:
+    """A long-running component and how to supervise it"""
+    name: str
+    # 'package.module:function'; called with **kwargs plus stop_event, and
+    # expected to return once stop_event is set
+    entry: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    # Run in its own process (crash isolation) instead of a thread
+    isolate: bool = False
+    # 'always', 'on-failure' or 'never'
+    restart: str = 'always'
+    backoff_initial: float = 1.0
+    backoff_max: float = 300.0
+    # A run that lasted this long resets the backoff
+    healthy_after: float = 60.0
+
+
+class _Component:
+    """Runtime state for one supervised component"""
+
+    def __init__(self, spec: ComponentSpec):
+        self.spec = spec
+        self.stop_event = None
+        self.runner = None
+        self.started_at: Optional[float] = None
+        self.next_start: float = 0.0
+        self.backoff = spec.backoff_initial
+        self.restarts = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.failed = False
+
+    @property
+    def alive(self) -> bool:
+        return self.runner is not None and self.runner.is_alive()
+
+
+class Supervisor:
+    """Starts, watches and restarts components in this process"""
+
+    def __init__(self, task_workers: int = None, poll_interval: float = 1.0):
+        """
+        Args:
+            task_workers: Threads available for one-off tasks (run_task)
+            poll_interval: Seconds between health checks of components
+        """
+        self.poll_interval = poll_interval
+        self.components: Dict[str, _Component] = {}
+        self.executor = ThreadPoolExecutor(
+            max_workers=task_workers or int(os.getenv('SUPERVISOR_TASK_WORKERS', '4')),
+            thread_name_prefix='supervisor-task'
+        )
+        self._tasks: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Long-running components
+    # ------------------------------------------------------------------
+
+    def add(self, spec: ComponentSpec, start: bool = True):
+        """Register a component (and start it unless start=False)"""
+        with self._lock:
+            component = _Component(spec)
+            self.components[spec.name] = component
+            if start:
+                self._start_component(component)
+        self._ensure_monitor()
+
+    def _start_component(self, component: _Component):
+        spec = component.spec
+        component.started_at = time.monotonic()
+        component.failed = False
+
+        if spec.isolate:
+            ctx = multiprocessing.get_context('spawn')
+            component.stop_event = ctx.Event()
+            component.runner = ctx.Process(
+                target=_run_entry,
+                args=(spec.entry, spec.kwargs, component.stop_event),
+                name=f"component-{spec.name}",
+                daemon=True
+            )
+        else:
+            component.stop_event = threading.Event()
+            component.runner = threading.Thread(
+                target=self._run_thread,
+                args=(component,),
+                name=f"component-{spec.name}",
+                daemon=True
+            )
+
+        component.runner.start()
+        logger.info(f"[OK] Started {spec.name} ({'process' if spec.isolate else 'thread'})")
+
+    def _run_thread(self, component: _Component):
+        spec = component.spec
+        try:
+            _run_entry(spec.entry, spec.kwargs, component.stop_event)
+        except Exception as e:
+            component.failed = True
+            component.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"[FAIL] {spec.name} crashed: {e}", exc_info=True)
+        except SystemExit as e:
+            # Components written as scripts may call sys.exit()
+            component.failed = bool(e.code)
+            component.last_error = f"SystemExit({e.code})" if e.code else None
+
+    def _ensure_monitor(self):
+        if self._monitor and self._monitor.is_alive():
+            return
+        self._stopping.clear()
+        self._monitor = threading.Thread(target=self._watch, name='supervisor', daemon=True)
+        self._monitor.start()
+
+    def _watch(self):
+        while not self._stopping.wait(self.poll_interval):
+            with self._lock:
+                for component in self.components.values():
+                    self._check(component)
+
+    def _check(self, component: _Component):
+        """Schedule or perform a restart for a component that exited"""
+        spec = component.spec
+        if component.runner is None or component.alive:
+            return
+
+        now = time.monotonic()
+        if component.started_at is not None:
+            # Just noticed the exit
+            if spec.isolate:
+                component.failed = component.runner.exitcode not in (0, None)
+                if component.failed:
+                    component.last_error = f"exit code {component.runner.exitcode}"
+
+            ran_for = now - component.started_at
+            component.started_at = None
+            if component.failed:
+                component.failures += 1
+
+            wants_restart = spec.restart == 'always' or (spec.restart == 'on-failure' and component.failed)
+            if not wants_restart:
+                logger.info(f"[STOP] {spec.name} exited and will not be restarted")
+                component.runner = None
+                return
+
+            if ran_for >= spec.healthy_after:
+                component.backoff = spec.backoff_initial
+            component.next_start = now + component.backoff
+            logger.warning(f"[RESTART] {spec.name} exited after {ran_for:.0f}s; "
+                           f"restarting in {component.backoff:.1f}s")
+            component.backoff = min(component.backoff * 2, spec.backoff_max)
+            return
+
+        if now >= component.next_start:
+            component.restarts += 1
+            self._start_component(component)
+
+    def stop_component(self, name: str, timeout: float = 15):
+        """Ask a component to stop and wait for it"""
+        with self._lock:
+            component = self.components.get(name)
+            if not component or component.runner is None:
+                return
+            component.spec.restart = 'never'
+            runner = component.runner
+
+        component.stop_event.set()
+        runner.join(timeout)
+        if runner.is_alive():
+            if component.spec.isolate:
+                runner.terminate()
+            else:
+                logger.warning(f"{name} did not stop within {timeout}s")
+
+    # ------------------------------------------------------------------
+    # One-off tasks (scheduled checks)
+    # ------------------------------------------------------------------
+
+    def run_task(self, name: str, entry: str, timeout: float = 300, isolate: bool = False,
+                 **kwargs) -> Optional[Future]:
+        """
+        Run an entry once on the worker pool
+
+        A task whose previous run is still going is skipped rather than
+        piling up. Isolated tasks run in a child process that is killed at
+        the timeout; thread tasks can only be reported as overdue.
+
+        Returns:
+            Future with the entry's return value, or None if skipped
+        """
+        with self._lock:
+            previous = self._tasks.get(name)
+            if previous and not previous.done():
+                logger.warning(f"[SKIP] {name} is still running from the last schedule")
+                return None
+
+            if isolate:
+                future = self.executor.submit(self._run_isolated, name, entry, kwargs, timeout)
+            else:
+                future = self.executor.submit(_run_entry, entry, kwargs)
+            self._tasks[name] = future
+
+        started = time.monotonic()
+
+        def _done(f: Future):
+            elapsed = time.monotonic() - started
+            error = f.exception()
+            if error:
+                logger.error(f"[FAIL] {name} failed after {elapsed:.1f}s: {error}")
+            elif elapsed > timeout:
+                logger.warning(f"[SLOW] {name} took {elapsed:.0f}s (timeout {timeout}s)")
+            else:
+                logger.info(f"[OK] {name} completed in {elapsed:.1f}s")
+
+        future.add_done_callback(_done)
+        return future
+
+    def _run_isolated(self, name: str, entry: str, kwargs: Dict[str, Any], timeout: float):
+        ctx = multiprocessing.get_context('spawn')
+        process = ctx.Process(target=_run_entry, args=(entry, kwargs), name=f"task-{name}", daemon=True)
+        process.start()
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join(5)
+            raise TimeoutError(f"{name} timed out after {timeout}s")
+        if process.exitcode:
+            raise RuntimeError(f"{name} exited with code {process.exitcode}")
+
+    # ------------------------------------------------------------------
+    # Lifecycle and status
+    # ------------------------------------------------------------------
+
+    def stop(self, timeout: float = 15):
+        """Stop every component and the task pool"""
+        self._stopping.set()
+        if self._monitor:
+            self._monitor.join(timeout=5)
+
+        with self._lock:
+            components = list(self.components.values())
+            for component in components:
+                component.spec.restart = 'never'
+                if component.stop_event is not None:
+                    component.stop_event.set()
+
+        deadline = time.monotonic() + timeout
+        for component in components:
+            if component.runner is None:
+                continue
+            component.runner.join(max(0.1, deadline - time.monotonic()))
+            if component.runner.is_alive():
+                if component.spec.isolate:
+                    component.runner.terminate()
+                else:
+                    logger.warning(f"{component.spec.name} still running at shutdown")
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("[OK] Supervisor stopped")
+
+    def is_running(self, name: str) -> bool:
+        component = self.components.get(name)
+        return bool(component and component.alive)
+
+    def status(self) -> Dict[str, Any]:
+        """Per-component state for status reports"""
+        now = time.monotonic()
+        components = {}
+        for name, component in self.components.items():
+            components[name] = {
+                'running': component.alive,
+                'mode': 'process' if component.spec.isolate else 'thread',
+                'uptime_seconds': round(now - component.started_at, 1) if component.alive and component.started_at else 0,
+                'restarts': component.restarts,
+                'failures': component.failures,
+                'last_error': component.last_error,
+                'restart_in': round(max(0.0, component.next_start - now), 1) if not component.alive and component.runner else None
+            }
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'components': components,
+            'tasks_running': [name for name, future in self._tasks.items() if not future.done()]
+        }
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Vault Git Sync - Incremental, batched git sync driven by filesystem events
+Tracks changed vault paths from a watchdog feed, stages only those paths
+through one `git update-index --stdin` call per batch, commits with plumbing
+(write-tree / commit-tree / update-ref) after a debounce window, and pushes
+in a background thread so sync work scales with the number of changes
+"""
+
+import os
+import time
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Set
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds without new changes before pending changes are committed
+DEBOUNCE_SECONDS = float(os.getenv('VAULT_SYNC_DEBOUNCE', '10'))
+
+# Longest a change waits for a commit while edits keep arriving
+MAX_DELAY_SECONDS = float(os.getenv('VAULT_SYNC_MAX_DELAY', '120'))
+
+# Paths passed to one `git update-index` call
+BATCH_SIZE = int(os.getenv('VAULT_SYNC_BATCH_SIZE', '500'))
+
+# Seconds between polls of `git status` when watchdog is not installed
+POLL_INTERVAL = float(os.getenv('VAULT_SYNC_POLL_INTERVAL', '60'))
+
+
+class GitError(RuntimeError):
+    """A git command failed"""
+
+
+class GitRepo:
+    """Thin wrapper over the git plumbing commands the sync engine needs"""
+
+    def __init__(self, path: Path, branch: str = 'main'):
+        self.path = Path(path)
+        self.branch = branch
+        self._remote_url: Optional[str] = None
+
+    def git(self, *args: str, input: bytes = None, check: bool = True) -> subprocess.CompletedProcess:
+        result = subprocess.run(['git', *args], cwd=self.path, input=input, capture_output=True)
+        if check and result.returncode != 0:
+            raise GitError(f"git {' '.join(args)} failed: {result.stderr.decode(errors='replace').strip()}")
+        return result
+
+    def head(self) -> Optional[str]:
+        """Commit HEAD points to, or None on an unborn branch"""
+        result = self.git('rev-parse', '-q', '--verify', 'HEAD^{commit}', check=False)
+        return result.stdout.decode().strip() or None
+
+    def stage(self, paths: Iterable[str], batch_size: int = BATCH_SIZE) -> int:
+        """
+        Stage the given relative paths (additions, edits and deletions)
+
+        Each batch is a single `git update-index` process reading
+        NUL-separated paths from stdin; missing files are removed from the
+        index and untracked missing files are ignored.
+        """
+        paths = list(paths)
+        for start in range(0, len(paths), batch_size):
+            batch = paths[start:start + batch_size]
+            payload = b''.join(p.encode('utf-8') + b'\0' for p in batch)
+            self.git('update-index', '--add', '--remove', '-z', '--stdin', input=payload)
+        return len(paths)
+
+    def changed_paths(self) -> List[str]:
+        """Paths git reports as changed or untracked (one `git status` call)"""
+        output = self.git('status', '--porcelain', '-z', '--untracked-files=all').stdout.decode('utf-8', errors='replace')
+        paths = []
+        entries = iter(output.split('\0'))
+        for entry in entries:
+            if len(entry) < 4:
+                continue
+            status, path = entry[:2], entry[3:]
+            paths.append(path)
+            if 'R' in status or 'C' in status:
+                # Renames are followed by their source path
+                source = next(entries, '')
+                if source:
+                    paths.append(source)
+        return paths
+
+    def commit(self, message: str) -> Optional[str]:
+        """
+        Commit the index without running porcelain `git commit`
+
+        Returns:
+            The new commit id, or None if the index matches HEAD
+        """
+        tree = self.git('write-tree').stdout.decode().strip()
+        parent = self.head()
+        if parent:
+            parent_tree = self.git('rev-parse', f'{parent}^{{tree}}').stdout.decode().strip()
+            if parent_tree == tree:
+                return None
+
+        args = ['commit-tree', tree, '-m', message]
+        if parent:
+            args += ['-p', parent]
+        commit = self.git(*args).stdout.decode().strip()
+        self.git('update-ref', '-m', f'vault sync: {message}', 'HEAD', commit, *([parent] if parent else []))
+        return commit
+
+    def ensure_remote(self, url: str):
+        """Point origin at url (once per process)"""
+        if self._remote_url == url:
+            return
+        if self.git('remote', 'set-url', 'origin', url, check=False).returncode != 0:
+            self.git('remote', 'add', 'origin', url)
+        self._remote_url = url
+
+    def push(self):
+        self.git('push', '-u', 'origin', f'HEAD:refs/heads/{self.branch}')
+
+    def pull(self):
+        self.git('fetch', 'origin', self.branch)
+        self.git('merge', f'origin/{self.branch}')
+
+
+class _SyncEventHandler(FileSystemEventHandler):
+    """Feeds watchdog events into a SyncEngine"""
+
+    def __init__(self, engine: 'SyncEngine'):
+        self.engine = engine
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.engine.record(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.engine.record(event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.engine.record(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.engine.record(event.src_path)
+            self.engine.record(event.dest_path)
+
+
+class SyncEngine:
+    """
+    Debounced commit-and-push loop over a set of changed vault paths
+
+    Changes are collected with record() (from watchdog, or from `git status`
+    polls when watchdog is not installed). Once no change has arrived for
+    the debounce window, or the oldest change has waited max_delay, the
+    safe paths are staged in batches and committed. Pushes run on their own
+    thread; commits made while a push is running are sent by the next push.
+    """
+
+    def __init__(self, repo: GitRepo, is_safe: Callable[[Path], bool],
+                 remote_url: str = None, debounce: float = None, max_delay: float = None):
+        self.repo = repo
+        self.is_safe = is_safe
+        self.remote_url = remote_url
+        self.debounce = debounce if debounce is not None else DEBOUNCE_SECONDS
+        self.max_delay = max_delay if max_delay is not None else MAX_DELAY_SECONDS
+
+        self._pending: Set[str] = set()
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+        self._cond = threading.Condition()
+        self._commit_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.observer = None
+
+        self._push_wanted = False
+        self._push_lock = threading.Lock()
+        self._pusher: Optional[threading.Thread] = None
+        self.last_commit: Optional[str] = None
+        self.last_push: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    # -- change tracking ----------------------------------------------------
+
+    def _relative(self, path) -> Optional[str]:
+        try:
+            relative = Path(path).resolve().relative_to(self.repo.path.resolve())
+        except ValueError:
+            return None
+        if not relative.parts or relative.parts[0] == '.git':
+            return None
+        return relative.as_posix()
+
+    def record(self, path):
+        """Note that a vault path (absolute or vault-relative) changed"""
+        relative = self._relative(self.repo.path / path if not Path(path).is_absolute() else path)
+        if relative is None:
+            return
+        with self._cond:
+            now = time.monotonic()
+            self._pending.add(relative)
+            self._last_change = now
+            if self._first_change is None:
+                self._first_change = now
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _take_pending(self) -> List[str]:
+        with self._cond:
+            paths = sorted(self._pending)
+            self._pending.clear()
+            self._first_change = self._last_change = None
+        return paths
+
+    def _stageable(self, paths: List[str]) -> List[str]:
+        """Changed paths that may be synced: safe files, and deletions"""
+        stageable = []
+        for relative in paths:
+            full = self.repo.path / relative
+            if full.is_dir():
+                continue
+            if not full.exists() or self.is_safe(full):
+                stageable.append(relative)
+        return stageable
+
+    # -- commit / push ------------------------------------------------------
+
+    def commit_pending(self, message: str = None) -> Optional[str]:
+        """Stage and commit everything recorded so far (returns the commit id or None)"""
+        with self._commit_lock:
+            paths = self._stageable(self._take_pending())
+            if not paths:
+                return None
+            try:
+                self.repo.stage(paths)
+                commit = self.repo.commit(message or f"Vault sync update {datetime.now().isoformat()}")
+            except GitError as e:
+                self.last_error = str(e)
+                logger.error(f"Vault sync commit failed: {e}")
+                # Keep the paths so the next round retries them
+                for relative in paths:
+                    self.record(relative)
+                return None
+
+            if commit:
+                self.last_commit = commit
+                logger.info(f"Vault sync committed {len(paths)} path(s): {commit[:10]}")
+            return commit
+
+    def push(self) -> bool:
+        """Push HEAD now, in this thread"""
+        if not self.remote_url:
+            return False
+        try:
+            self.repo.ensure_remote(self.remote_url)
+            head = self.repo.head()
+            if head and head == self.last_push:
+                return True
+            self.repo.push()
+            self.last_push = head
+            logger.info(f"Vault pushed to {self.remote_url}: {head[:10] if head else 'empty'}")
+            return True
+        except GitError as e:
+            self.last_error = str(e)
+            logger.error(f"Vault push failed: {e}")
+            return False
+
+    def request_push(self):
+        """Push in the background (coalesces with a push already running)"""
+        if not self.remote_url:
+            return
+        with self._push_lock:
+            self._push_wanted = True
+            if self._pusher is None:
+                self._pusher = threading.Thread(target=self._push_loop, name='vault-sync-push', daemon=True)
+                self._pusher.start()
+
+    def _push_loop(self):
+        while True:
+            with self._push_lock:
+                if not self._push_wanted:
+                    self._pusher = None
+                    return
+                self._push_wanted = False
+            if not self.push():
+                # Retry on the next commit rather than hammering the remote
+                with self._push_lock:
+                    self._pusher = None
+                return
+
+    # -- background loop ----------------------------------------------------
+
+    def start(self, watch: bool = True):
+        """Follow filesystem events (or poll git status) and commit/push in the background"""
+        if watch and Observer is not None:
+            self.observer = Observer()
+            self.observer.schedule(_SyncEventHandler(self), str(self.repo.path), recursive=True)
+            self.observer.start()
+        elif watch:
+            logger.warning("watchdog not installed; vault sync will poll git status")
+
+        # Pick up anything that changed while nothing was watching
+        for relative in self.repo.changed_paths():
+            self.record(relative)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='vault-sync', daemon=True)
+        self._thread.start()
+        logger.info(f"Vault sync started for {self.repo.path}")
+
+    def _due(self, now: float) -> Optional[float]:
+        """Seconds until pending changes should be committed (must hold self._cond)"""
+        if self._last_change is None:
+            return None
+        return max(0.0, min(self._last_change + self.debounce, self._first_change + self.max_delay) - now)
+
+    def _run(self):
+        last_poll = time.monotonic()
+        while not self._stop.is_set():
+            with self._cond:
+                wait = self._due(time.monotonic())
+                if self.observer is None:
+                    poll_wait = max(0.0, last_poll + POLL_INTERVAL - time.monotonic())
+                    wait = poll_wait if wait is None else min(wait, poll_wait)
+                if wait is None or wait > 0:
+                    self._cond.wait(timeout=wait if wait is not None else 5)
+                    if self._stop.is_set():
+                        break
+
+            if self.observer is None and time.monotonic() - last_poll >= POLL_INTERVAL:
+                last_poll = time.monotonic()
+                try:
+                    for relative in self.repo.changed_paths():
+                        self.record(relative)
+                except GitError as e:
+                    logger.error(f"Vault sync poll failed: {e}")
+
+            with self._cond:
+                wait = self._due(time.monotonic())
+            if wait is not None and wait <= 0:
+                if self.commit_pending():
+                    self.request_push()
+
+    def stop(self, flush: bool = True):
+        """Stop watching, committing whatever is pending first"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self.observer:
+            self.observer.stop()
+            self.observer.join(timeout=10)
+            self.observer = None
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        pusher = self._pusher
+        if pusher:
+            pusher.join(timeout=60)
+        if flush and self.commit_pending():
+            self.push()
+        logger.info("Vault sync stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Vault Index - Persistent SQLite index of vault notes
+Keeps path, folder, type, platform, timestamps and frontmatter for every note
+in the workflow folders so dashboards and briefings can count and filter with
+a query instead of walking directories and re-reading files
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core import vault_notes
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_FILENAME = '.vault_index.sqlite'
+
+# Folders (relative to the vault root) whose files are indexed. Only files
+# directly inside each folder are indexed, matching the old glob() scans.
+DEFAULT_FOLDERS = [
+    'Inbox',
+    'Needs_Action',
+    'Pending_Approval',
+    'Approved',
+    'Rejected',
+    'Done',
+    'Failed',
+    'Plans',
+    'Tasks/Active',
+]
+
+# Words that mark a note as urgent (used by the bottleneck reports)
+URGENT_KEYWORDS = ('urgent', 'asap')
+
+# An indexer heartbeat newer than this means the index is being kept live
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_STALE_AFTER = HEARTBEAT_INTERVAL * 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    type TEXT,
+    platform TEXT,
+    priority TEXT,
+    status TEXT,
+    urgent INTEGER NOT NULL DEFAULT 0,
+    created TEXT,
+    mtime REAL NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    frontmatter TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes (folder, ext);
+CREATE INDEX IF NOT EXISTS idx_notes_folder_mtime ON notes (folder, mtime);
+CREATE INDEX IF NOT EXISTS idx_notes_folder_type ON notes (folder, type);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns that query()/count() accept as equality filters
+_FILTER_COLUMNS = {'type', 'platform', 'priority', 'status', 'urgent', 'name', 'ext'}
+
+
+def _folders_from_env() -> List[str]:
+    spec = os.getenv('VAULT_INDEX_FOLDERS')
+    if not spec:
+        return list(DEFAULT_FOLDERS)
+    return [folder.strip().strip('/') for folder in spec.split(',') if folder.strip()]
+
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class VaultIndex:
+    """SQLite index of the notes in the vault's workflow folders"""
+
+    def __init__(self, vault_path, db_path=None, folders: List[str] = None):
+        """
+        Args:
+            vault_path: Vault root directory
+            db_path: Index file (default: VAULT_INDEX_DB or <vault>/.vault_index.sqlite)
+            folders: Folders to index, relative to the vault root
+        """
+        self.vault_path = Path(vault_path).resolve()
+        self.db_path = Path(db_path or os.getenv('VAULT_INDEX_DB') or self.vault_path / INDEX_FILENAME)
+        self.folders = folders or _folders_from_env()
+        self._lock = threading.RLock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _relative(self, path) -> Optional[str]:
+        """Vault-relative posix path of an indexable file, or None"""
+        try:
+            relative = Path(path).resolve().relative_to(self.vault_path)
+        except (ValueError, OSError):
+            return None
+
+        folder = relative.parent.as_posix()
+        if folder not in self.folders or relative.name.startswith('.'):
+            return None
+        return relative.as_posix()
+
+    def _build_row(self, relative: str, stat: os.stat_result) -> tuple:
+        path = self.vault_path / relative
+        folder, name = relative.rsplit('/', 1)
+        ext = path.suffix.lower()
+
+        frontmatter = {}
+        urgent = False
+        if ext == '.md':
+            try:
+                note = vault_notes.load_note(path)
+                frontmatter = note.frontmatter
+                lower = note.content.lower()
+                urgent = any(keyword in lower for keyword in URGENT_KEYWORDS)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.debug(f"Could not read {relative}: {e}")
+
+        created = frontmatter.get('created') or frontmatter.get('timestamp') or frontmatter.get('received')
+        return (
+            relative,
+            folder,
+            name,
+            ext,
+            _as_text(frontmatter.get('type')),
+            _as_text(frontmatter.get('platform')),
+            _as_text(frontmatter.get('priority')),
+            _as_text(frontmatter.get('status')),
+            int(urgent),
+            _as_text(created),
+            stat.st_mtime,
+            stat.st_mtime_ns,
+            stat.st_size,
+            json.dumps(frontmatter, default=str),
+            time.time()
+        )
+
+    def _upsert(self, rows: Iterable[tuple]):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO notes (path, folder, name, ext, type, platform, priority, status, "
+            "urgent, created, mtime, mtime_ns, size, frontmatter, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def update_path(self, path) -> bool:
+        """
+        Index (or re-index) one file, or drop it if it no longer exists
+
+        Returns:
+            True if the path belongs to an indexed folder
+        """
+        relative = self._relative(path)
+        if relative is None:
+            return False
+
+        try:
+            stat = (self.vault_path / relative).stat()
+        except FileNotFoundError:
+            self.remove_path(path)
+            return True
+
+        row = self._build_row(relative, stat)
+        with self._lock:
+            self._upsert([row])
+            self._conn.commit()
+        return True
+
+    def remove_path(self, path) -> bool:
+        """Drop one file from the index"""
+        relative = self._relative(path)
+        if relative is None:
+            return False
+
+        with self._lock:
+            self._conn.execute("DELETE FROM notes WHERE path = ?", (relative,))
+            self._conn.commit()
+        return True
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Reconcile the index with the filesystem
+
+        Only stat()s files; notes are re-read only when their mtime or size
+        changed since they were indexed.
+
+        Returns:
+            Counts of added, updated and removed entries
+        """
+        started = time.time()
+        added = updated = removed = 0
+
+        with self._lock:
+            known = {
+                row['path']: (row['mtime_ns'], row['size'])
+                for row in self._conn.execute("SELECT path, mtime_ns, size FROM notes")
+            }
+
+        seen = set()
+        changed = []
+        for folder in self.folders:
+            directory = self.vault_path / folder
+            if not directory.is_dir():
+                continue
+
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or not entry.is_file():
+                        continue
+
+                    relative = f"{folder}/{entry.name}"
+                    seen.add(relative)
+                    stat = entry.stat()
+                    previous = known.get(relative)
+                    if previous == (stat.st_mtime_ns, stat.st_size):
+                        continue
+
+                    changed.append(self._build_row(relative, stat))
+                    if previous is None:
+                        added += 1
+                    else:
+                        updated += 1
+
+        missing = [(path,) for path in known if path not in seen]
+        removed = len(missing)
+
+        with self._lock:
+            self._upsert(changed)
+            self._conn.executemany("DELETE FROM notes WHERE path = ?", missing)
+            self._set_meta('last_sync', str(time.time()))
+            self._conn.commit()
+
+        if added or updated or removed:
+            logger.info(f"Vault index synced in {time.time() - started:.2f}s "
+                        f"({added} added, {updated} updated, {removed} removed)")
+
+        return {'added': added, 'updated': updated, 'removed': removed}
+
+    def _set_meta(self, key: str, value: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def heartbeat(self):
+        """Record that a live indexer is keeping this index current"""
+        with self._lock:
+            self._set_meta('indexer_heartbeat', str(time.time()))
+            self._conn.commit()
+
+    def is_live(self) -> bool:
+        """True if an indexer process updated the heartbeat recently"""
+        value = self._get_meta('indexer_heartbeat')
+        return bool(value) and time.time() - float(value) < HEARTBEAT_STALE_AFTER
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _where(self, folder: Optional[str], prefix: Optional[str], modified_after: Any,
+               modified_before: Any, filters: Dict[str, Any]) -> tuple:
+        clauses = []
+        params = []
+
+        if folder is not None:
+            clauses.append("folder = ?")
+            params.append(folder)
+        if prefix:
+            # GLOB is case sensitive like Path.glob on POSIX
+            clauses.append("name GLOB ?")
+            params.append(prefix.replace('[', '[[]') + '*')
+        if modified_after is not None:
+            clauses.append("mtime >= ?")
+            params.append(_timestamp(modified_after))
+        if modified_before is not None:
+            clauses.append("mtime <= ?")
+            params.append(_timestamp(modified_before))
+
+        for column, value in filters.items():
+            if column not in _FILTER_COLUMNS:
+                raise ValueError(f"Unknown vault index filter: {column}")
+            if value is None:
+                continue
+            if column == 'urgent':
+                value = int(bool(value))
+            clauses.append(f"{column} = ?")
+            params.append(value)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, params
+
+    def count(self, folder: str = None, prefix: str = None, modified_after: Any = None,
+              modified_before: Any = None, **filters) -> int:
+        """
+        Count indexed files
+
+        Args:
+            folder: Vault-relative folder (e.g. 'Done', 'Tasks/Active')
+            prefix: Only names starting with this prefix (e.g. 'EMAIL_')
+            modified_after: datetime or epoch seconds (inclusive)
+            modified_before: datetime or epoch seconds (inclusive)
+            **filters: Equality filters on type, platform, priority, status,
+                urgent, name or ext (e.g. ext='.md')
+        """
+        where, params = self._where(folder, prefix, modified_after, modified_before, filters)
+        with self._lock:
+            row = self._conn.execute(f"SELECT COUNT(*) FROM notes{where}", params).fetchone()
+        return row[0]
+
+    def counts(self, folders: Iterable[str], **filters) -> Dict[str, int]:
+        """Count files in several folders with one query"""
+        folders = list(folders)
+        where, params = self._where(None, None, None, None, filters)
+        placeholders = ', '.join('?' for _ in folders)
+        where = f"{where} AND" if where else ' WHERE'
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT folder, COUNT(*) FROM notes{where} folder IN ({placeholders}) GROUP BY folder",
+                params + folders
+            ).fetchall()
+
+        result = {folder: 0 for folder in folders}
+        result.update({row[0]: row[1] for row in rows})
+        return result
+
+    def query(self, folder: str = None, prefix: str = None, modified_after: Any = None,
+              modified_before: Any = None, order_by: str = 'mtime', descending: bool = True,
+              limit: int = None, **filters) -> List[Dict[str, Any]]:
+        """
+        Get indexed notes as dicts (frontmatter decoded)
+
+        Takes the same filters as count(), plus ordering and a limit.
+        """
+        if order_by not in ('mtime', 'name', 'path', 'created'):
+            raise ValueError(f"Cannot order vault index by {order_by}")
+
+        where, params = self._where(folder, prefix, modified_after, modified_before, filters)
+        sql = f"SELECT * FROM notes{where} ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        notes = []
+        for row in rows:
+            note = dict(row)
+            note['frontmatter'] = json.loads(note['frontmatter'] or '{}')
+            notes.append(note)
+        return notes
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and freshness for monitoring"""
+        last_sync = self._get_meta('last_sync')
+        return {
+            'db_path': str(self.db_path),
+            'notes': self.count(),
+            'folders': self.counts(self.folders),
+            'live': self.is_live(),
+            'last_sync': datetime.fromtimestamp(float(last_sync)).isoformat() if last_sync else None
+        }
+
+
+class _IndexEventHandler(FileSystemEventHandler):
+    """Applies watchdog events to a VaultIndex"""
+
+    def __init__(self, index: VaultIndex):
+        self.index = index
+
+    def _apply(self, action, path):
+        try:
+            action(path)
+        except Exception as e:
+            logger.warning(f"Vault index update failed for {path}: {e}")
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._apply(self.index.update_path, event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._apply(self.index.update_path, event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self._apply(self.index.remove_path, event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._apply(self.index.remove_path, event.src_path)
+            self._apply(self.index.update_path, event.dest_path)
+
+
+class VaultIndexer:
+    """Keeps a VaultIndex current from filesystem events"""
+
+    def __init__(self, index: VaultIndex, resync_interval: float = None):
+        """
+        Args:
+            index: Index to maintain
+            resync_interval: Seconds between full reconciliations, which catch
+                events missed while nothing was watching (and replace the
+                watcher entirely when watchdog is not installed)
+        """
+        self.index = index
+        self.resync_interval = resync_interval or float(os.getenv('VAULT_INDEX_RESYNC_INTERVAL', '900'))
+        self.observer = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Sync once, then follow filesystem events in the background"""
+        self.index.sync()
+
+        if Observer is not None:
+            self.observer = Observer()
+            handler = _IndexEventHandler(self.index)
+            for folder in self.index.folders:
+                directory = self.index.vault_path / folder
+                if directory.is_dir():
+                    self.observer.schedule(handler, str(directory), recursive=False)
+            self.observer.start()
+        else:
+            logger.warning("watchdog not installed; vault index will refresh by polling")
+            self.resync_interval = min(self.resync_interval, HEARTBEAT_INTERVAL)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='vault-indexer', daemon=True)
+        self._thread.start()
+        logger.info(f"Vault indexer started: {self.index.db_path}")
+
+    def _run(self):
+        last_sync = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.index.heartbeat()
+                if time.monotonic() - last_sync >= self.resync_interval:
+                    self.index.sync()
+                    last_sync = time.monotonic()
+            except Exception as e:
+                logger.error(f"Vault indexer error: {e}", exc_info=True)
+            self._stop.wait(HEARTBEAT_INTERVAL)
+
+    def stop(self):
+        self._stop.set()
+        if self.observer:
+            self.observer.stop()
+            self.observer.join(timeout=10)
+            self.observer = None
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        logger.info("Vault indexer stopped")
+
+
+_indexes: Dict[str, VaultIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vault_index(vault_path, refresh: bool = True) -> VaultIndex:
+    """
+    Get the shared index for a vault
+
+    When no indexer is keeping the index live (e.g. a one-off script run),
+    it is reconciled with the filesystem first; that only stat()s files and
+    re-reads the ones that changed.
+
+    Args:
+        vault_path: Vault root directory
+        refresh: Sync the index if no live indexer is running
+    """
+    key = str(Path(vault_path).resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = VaultIndex(key)
+            _indexes[key] = index
+
+    if refresh and not index.is_live():
+        index.sync()
+    return index
+
+
+def main():
+    """Build the index and optionally keep it live"""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Vault index')
+    parser.add_argument('vault_path', nargs='?', default=os.getcwd(), help='Path to the vault directory')
+    parser.add_argument('--watch', action='store_true', help='Keep the index updated until interrupted')
+    parser.add_argument('--stats', action='store_true', help='Print index statistics')
+    args = parser.parse_args()
+
+    index = VaultIndex(args.vault_path)
+
+    if args.watch:
+        indexer = VaultIndexer(index)
+        indexer.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            indexer.stop()
+    else:
+        result = index.sync()
+        print(f"Indexed vault: {result}")
+
+    if args.stats:
+        print(json.dumps(index.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
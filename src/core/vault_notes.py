@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Vault Notes - Shared, cached parser for markdown notes with YAML frontmatter
+Used by the processors, posters, skills and briefing scripts so each note's
+frontmatter is parsed once per change instead of once per reader
+"""
+
+import os
+import re
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import yaml
+from yaml.constructor import SafeConstructor
+from yaml.nodes import ScalarNode
+from yaml.resolver import Resolver
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_SIZE = int(os.getenv('VAULT_NOTE_CACHE_SIZE', '4096'))
+
+# A flat "key: value" line that needs no YAML scanner. Anything else
+# (nesting, lists, block scalars, anchors, comments) falls back to yaml.
+_FLAT_LINE = re.compile(r'^([A-Za-z_](?:[\w\-. ]*[\w\-.])?):(?:[ \t]+(.*?))?[ \t]*$')
+_UNSAFE_START = set('[]{}&*!|>%@`#,?\'"')
+_QUOTED = re.compile(r'^(?:"([^"\\]*)"|\'([^\']*)\')$')
+
+_resolver = Resolver()
+_constructor = SafeConstructor()
+_STR_TAG = 'tag:yaml.org,2002:str'
+
+
+def _fast_scalar(value: str) -> Tuple[bool, Any]:
+    """
+    Convert a plain scalar exactly as yaml.safe_load would
+
+    Returns:
+        (ok, value) - ok is False when the value needs the full YAML parser
+    """
+    if value == '':
+        return True, None
+
+    quoted = _QUOTED.match(value)
+    if quoted:
+        return True, quoted.group(1) if quoted.group(1) is not None else quoted.group(2)
+
+    if value[0] in _UNSAFE_START or ': ' in value or ' #' in value or value.endswith(':'):
+        return False, None
+    if value.startswith('- ') or value == '-':
+        return False, None
+
+    tag = _resolver.resolve(ScalarNode, value, (True, False))
+    if tag == _STR_TAG:
+        return True, value
+
+    try:
+        return True, _constructor.yaml_constructors[tag](_constructor, ScalarNode(tag, value))
+    except Exception:
+        return False, None
+
+
+def _parse_flat(text: str) -> Optional[Dict[str, Any]]:
+    """Parse frontmatter made only of flat key: value lines, or return None"""
+    metadata = {}
+    for line in text.split('\n'):
+        line = line.rstrip('\r')
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        if line[0] in ' \t':
+            return None
+
+        match = _FLAT_LINE.match(line)
+        if not match:
+            return None
+
+        ok, value = _fast_scalar(match.group(2) or '')
+        if not ok:
+            return None
+        metadata[match.group(1)] = value
+
+    return metadata
+
+
+def load_frontmatter_text(text: str) -> Dict[str, Any]:
+    """
+    Parse a frontmatter block (the text between the --- lines)
+
+    Flat key: value blocks use a fast path; everything else goes through
+    yaml.safe_load. Invalid YAML raises yaml.YAMLError.
+    """
+    metadata = _parse_flat(text)
+    if metadata is not None:
+        return metadata
+
+    data = yaml.safe_load(text)
+    return data if isinstance(data, dict) else {}
+
+
+def split_frontmatter(content: str) -> Tuple[Optional[str], str]:
+    """
+    Split a note into frontmatter text and body
+
+    Returns:
+        (frontmatter_text, body) - frontmatter_text is None when the note has none
+    """
+    if not content.startswith('---'):
+        return None, content
+
+    first_newline = content.find('\n')
+    if first_newline == -1 or content[:first_newline].strip() != '---':
+        return None, content
+
+    position = first_newline + 1
+    while position <= len(content):
+        end = content.find('\n', position)
+        line_end = len(content) if end == -1 else end
+        if content[position:line_end].strip() == '---':
+            body_start = len(content) if end == -1 else end + 1
+            return content[first_newline + 1:position], content[body_start:]
+        if end == -1:
+            break
+        position = end + 1
+
+    return None, content
+
+
+class _LRUCache:
+    """Small thread-safe LRU cache"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Frontmatter text -> parsed dict, and resolved path -> VaultNote
+_text_cache = _LRUCache(CACHE_SIZE)
+_note_cache = _LRUCache(CACHE_SIZE)
+
+
+def parse_frontmatter(content: str, strict: bool = False) -> Dict[str, Any]:
+    """
+    Get the frontmatter of a note's content as a dict
+
+    Args:
+        content: Full note text
+        strict: Raise yaml.YAMLError on invalid YAML instead of returning {}
+
+    Returns:
+        Frontmatter dict ({} when the note has none)
+    """
+    text, _ = split_frontmatter(content)
+    if text is None:
+        return {}
+
+    cached = _text_cache.get(text)
+    if cached is not None:
+        return dict(cached)
+
+    try:
+        metadata = load_frontmatter_text(text)
+    except yaml.YAMLError:
+        if strict:
+            raise
+        logger.debug("Invalid YAML frontmatter", exc_info=True)
+        return {}
+
+    _text_cache.put(text, metadata)
+    return dict(metadata)
+
+
+def parse_note(content: str) -> Tuple[Dict[str, Any], str]:
+    """Get (frontmatter, body) from a note's content"""
+    _, body = split_frontmatter(content)
+    return parse_frontmatter(content), body
+
+
+def _decode(data: bytes, encoding: str) -> str:
+    """Decode like Path.read_text() does (universal newlines)"""
+    return data.decode(encoding, errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+
+class VaultNote:
+    """A parsed vault note; the body is only read from disk when accessed"""
+
+    def __init__(self, path: Path, frontmatter: Dict[str, Any], has_frontmatter: bool,
+                 body_offset: int, mtime_ns: int, size: int, encoding: str = 'utf-8'):
+        self.path = path
+        self._frontmatter = frontmatter
+        self.has_frontmatter = has_frontmatter
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.encoding = encoding
+        self._body_offset = body_offset
+        self._head = None
+        self._body = None
+
+    @property
+    def frontmatter(self) -> Dict[str, Any]:
+        # Copy so callers can't corrupt the cached note
+        return dict(self._frontmatter)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._frontmatter.get(key, default)
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    @property
+    def body(self) -> str:
+        """Note text after the frontmatter"""
+        if self._body is None:
+            with open(self.path, 'rb') as f:
+                f.seek(self._body_offset)
+                self._body = _decode(f.read(), self.encoding)
+        return self._body
+
+    @property
+    def content(self) -> str:
+        """Full note text, frontmatter included"""
+        if self._head is None:
+            with open(self.path, 'rb') as f:
+                self._head = _decode(f.read(self._body_offset), self.encoding)
+        return self._head + self.body
+
+
+def _read_note(path: Path, stat: os.stat_result, encoding: str) -> VaultNote:
+    """Read only the frontmatter block of a note from disk"""
+    with open(path, 'rb') as f:
+        first = f.readline()
+        if first.rstrip(b'\r\n').strip() != b'---':
+            return VaultNote(path, {}, False, 0, stat.st_mtime_ns, stat.st_size, encoding)
+
+        lines = []
+        while True:
+            line = f.readline()
+            if not line:
+                # Unterminated frontmatter: treat the whole file as body
+                return VaultNote(path, {}, False, 0, stat.st_mtime_ns, stat.st_size, encoding)
+            if line.strip() == b'---':
+                break
+            lines.append(line)
+
+        body_offset = f.tell()
+
+    text = _decode(b''.join(lines), encoding)
+    cached = _text_cache.get(text)
+    if cached is None:
+        try:
+            cached = load_frontmatter_text(text)
+        except yaml.YAMLError as e:
+            logger.warning(f"Invalid YAML frontmatter in {path.name}: {e}")
+            cached = {}
+        _text_cache.put(text, cached)
+
+    return VaultNote(path, cached, True, body_offset, stat.st_mtime_ns, stat.st_size, encoding)
+
+
+def load_note(path, encoding: str = 'utf-8') -> VaultNote:
+    """
+    Load a note, reusing the cached parse while the file is unchanged
+
+    The cache is keyed by path and validated against mtime and size, so
+    repeated scans only stat() unchanged notes.
+
+    Raises:
+        FileNotFoundError if the note does not exist
+    """
+    path = Path(path)
+    stat = path.stat()
+    key = str(path.resolve())
+
+    note = _note_cache.get(key)
+    if note and note.mtime_ns == stat.st_mtime_ns and note.size == stat.st_size:
+        return note
+
+    note = _read_note(path, stat, encoding)
+    _note_cache.put(key, note)
+    return note
+
+
+def invalidate(path):
+    """Drop a note from the cache (e.g. after moving or rewriting it)"""
+    _note_cache.pop(str(Path(path).resolve()))
+
+
+def clear_cache():
+    _text_cache.clear()
+    _note_cache.clear()
+
+
+def cache_info() -> Dict[str, Any]:
+    """Cache statistics for monitoring"""
+    return {
+        'notes': len(_note_cache),
+        'note_hits': _note_cache.hits,
+        'note_misses': _note_cache.misses,
+        'frontmatter_blocks': len(_text_cache),
+        'frontmatter_hits': _text_cache.hits,
+        'frontmatter_misses': _text_cache.misses,
+        'max_size': CACHE_SIZE
+    }
@@ -5,20 +5,48 @@ Implements secure synchronization between cloud and local vaults
 """
 
 import os
+import re
+import sys
 import json
+import heapq
 import shutil
+import fnmatch
 import subprocess
+import threading
 import time
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.vault_git_sync import GitError, GitRepo, SyncEngine
+from src.core.vault_notes import load_note
+from src.core.dashboard_model import DashboardDocument, get_dashboard_store
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Seconds a claim stays valid without a heartbeat
+CLAIM_LEASE_SECONDS = float(os.getenv('CLAIM_LEASE_SECONDS', '900'))
+
+# Frontmatter priority -> rank (lower is claimed first)
+PRIORITY_RANKS = {'critical': 0, 'urgent': 0, 'high': 1, 'medium': 2, 'normal': 2, 'low': 3}
+DEFAULT_PRIORITY_RANK = 2
+
+LEASE_SUFFIX = '.lease'
+
+
 class VaultSyncManager:
     """Manages secure synchronization between cloud and local vaults"""
 
@@ -50,7 +78,11 @@ class VaultSyncManager:
             "*.tmp",
             "*.temp",
             "temp/",
-            "cache/"
+            "cache/",
+
+            # Local state and caches (fetched account data, IMAP sync marks)
+            ".fresh_data_cache.json",
+            ".imap_sync_*.json"
         ]
 
         # Safe file extensions to sync
@@ -59,9 +91,19 @@ class VaultSyncManager:
             '.png', '.jpg', '.jpeg', '.gif', '.svg', '.csv', '.xlsx'
         }
 
+        # Rules are compiled once; is_safe_to_sync runs for every changed path
+        wildcard = [fnmatch.translate(rule) for rule in self.gitignore_rules if '*' in rule]
+        self._wildcard_rules = re.compile('|'.join(wildcard)) if wildcard else None
+        self._prefix_rules = tuple(rule.rstrip('/*') for rule in self.gitignore_rules if '*' not in rule)
+
         # Initialize git if not already
         self._init_git()
 
+        # Changed paths are staged and committed incrementally; pushes run
+        # in the background once watching has started
+        self.repo = GitRepo(self.vault_path, branch=os.getenv('VAULT_SYNC_BRANCH', 'main'))
+        self.engine = SyncEngine(self.repo, self.is_safe_to_sync, remote_url=remote_repo)
+
     def _init_git(self):
         """Initialize git repository in vault if not present"""
         git_dir = self.vault_path / '.git'
@@ -95,6 +137,18 @@ class VaultSyncManager:
 
         logger.info(".gitignore created with security rules")
 
+    def start_watching(self):
+        """Commit changes as they happen (debounced) and push them in the background"""
+        self.engine.start()
+
+    def stop_watching(self):
+        """Stop watching, committing and pushing whatever is still pending"""
+        self.engine.stop()
+
+    def record_change(self, file_path):
+        """Report a changed path to the sync engine (for writers outside the watcher)"""
+        self.engine.record(file_path)
+
     def sync_to_remote(self) -> bool:
         """Sync vault changes to remote repository"""
         if not self.remote_repo:
@@ -102,44 +156,23 @@ class VaultSyncManager:
             return False
 
         try:
-            # Add all allowed files
-            subprocess.run(['git', 'add', '.'], cwd=self.vault_path, check=True)
-
-            # Check for changes
-            result = subprocess.run(['git', 'status', '--porcelain'],
-                                  cwd=self.vault_path,
-                                  capture_output=True,
-                                  text=True)
+            # Without a watcher, one `git status` call finds what changed
+            if not self.engine.running:
+                for path in self.repo.changed_paths():
+                    self.engine.record(path)
 
-            if not result.stdout.strip():
-                logger.info("No changes to sync")
-                return True
+            self.engine.last_error = None
+            self.engine.commit_pending()
+            if self.engine.last_error:
+                return False
 
-            # Commit changes
-            commit_msg = f"Vault sync update {datetime.now().isoformat()}"
-            subprocess.run(['git', 'commit', '-m', commit_msg],
-                          cwd=self.vault_path,
-                          check=True)
-
-            # Add remote if not already added
-            try:
-                subprocess.run(['git', 'remote', 'set-url', 'origin', self.remote_repo],
-                              cwd=self.vault_path,
-                              check=True)
-            except subprocess.CalledProcessError:
-                subprocess.run(['git', 'remote', 'add', 'origin', self.remote_repo],
-                              cwd=self.vault_path,
-                              check=True)
-
-            # Push to remote
-            subprocess.run(['git', 'push', '-u', 'origin', 'main'],
-                          cwd=self.vault_path,
-                          check=True)
+            if not self.engine.push():
+                return False
 
             logger.info(f"Successfully synced vault to remote: {self.remote_repo}")
             return True
 
-        except subprocess.CalledProcessError as e:
+        except GitError as e:
             logger.error(f"Failed to sync to remote: {e}")
             return False
         except Exception as e:
@@ -153,24 +186,15 @@ class VaultSyncManager:
             return False
 
         try:
-            # Add remote if not already added
-            try:
-                subprocess.run(['git', 'remote', 'set-url', 'origin', self.remote_repo],
-                              cwd=self.vault_path,
-                              check=True)
-            except subprocess.CalledProcessError:
-                subprocess.run(['git', 'remote', 'add', 'origin', self.remote_repo],
-                              cwd=self.vault_path,
-                              check=True)
+            self.repo.ensure_remote(self.remote_repo)
 
             # Fetch and merge changes
-            subprocess.run(['git', 'fetch', 'origin'], cwd=self.vault_path, check=True)
-            subprocess.run(['git', 'merge', 'origin/main'], cwd=self.vault_path, check=True)
+            self.repo.pull()
 
             logger.info(f"Successfully synced vault from remote: {self.remote_repo}")
             return True
 
-        except subprocess.CalledProcessError as e:
+        except GitError as e:
             logger.error(f"Failed to sync from remote: {e}")
             return False
         except Exception as e:
@@ -186,52 +210,50 @@ class VaultSyncManager:
         # Check against gitignore patterns
         file_str = str(file_path.relative_to(self.vault_path)).replace('\\', '/')
 
-        for pattern in self.gitignore_rules:
-            if '*' in pattern:
-                # Handle wildcard patterns
-                import fnmatch
-                if fnmatch.fnmatch(file_str, pattern):
-                    return False
-            else:
-                # Handle exact matches
-                if file_str == pattern or file_str.startswith(pattern.rstrip('/*')):
-                    return False
+        if self._wildcard_rules and self._wildcard_rules.match(file_str):
+            return False
+        if file_str.startswith(self._prefix_rules):
+            return False
 
         return True
 
+    def _vault_files(self) -> Iterator[Path]:
+        """Every file in the vault outside .git (one directory walk)"""
+        for root, dirs, files in os.walk(self.vault_path):
+            if root == str(self.vault_path):
+                dirs[:] = [d for d in dirs if d != '.git']
+            for name in files:
+                yield Path(root) / name
+
     def get_syncable_files(self) -> List[Path]:
         """Get list of files that are safe to sync"""
-        syncable_files = []
-
-        for file_path in self.vault_path.rglob('*'):
-            if file_path.is_file() and self.is_safe_to_sync(file_path):
-                syncable_files.append(file_path)
-
-        return syncable_files
+        return [file_path for file_path in self._vault_files() if self.is_safe_to_sync(file_path)]
 
     def validate_sync_security(self) -> Dict[str, Any]:
         """Validate that sync configuration is secure"""
         issues = []
+        unsafe = set()
+        syncable_count = 0
 
         # Check for sensitive files that might be accidentally included
-        for file_path in self.vault_path.rglob('*'):
-            if file_path.is_file() and not self.is_safe_to_sync(file_path):
+        for file_path in self._vault_files():
+            if self.is_safe_to_sync(file_path):
+                syncable_count += 1
+            else:
+                unsafe.add(file_path)
                 issues.append(f"Potentially unsafe file: {file_path}")
 
         # Check git status
         try:
-            result = subprocess.run(['git', 'status', '--porcelain'],
+            result = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard', '-z'],
                                   cwd=self.vault_path,
                                   capture_output=True,
                                   text=True)
 
             # Check for untracked files that might be sensitive
-            for line in result.stdout.split('\n'):
-                if line.startswith('??'):  # Untracked file
-                    file_name = line[3:].strip()
-                    full_path = self.vault_path / file_name
-                    if full_path.is_file() and not self.is_safe_to_sync(full_path):
-                        issues.append(f"Untracked sensitive file: {full_path}")
+            for file_name in result.stdout.split('\0'):
+                if file_name and self.vault_path / file_name in unsafe:
+                    issues.append(f"Untracked sensitive file: {self.vault_path / file_name}")
 
         except Exception as e:
             issues.append(f"Could not validate git status: {e}")
@@ -239,23 +261,185 @@ class VaultSyncManager:
         return {
             'is_secure': len(issues) == 0,
             'issues': issues,
-            'syncable_files_count': len(self.get_syncable_files())
+            'syncable_files_count': syncable_count
         }
 
 
-class ClaimByMoveRule:
-    """Implements the claim-by-move rule to prevent double-work"""
+class _TaskEventHandler(FileSystemEventHandler):
+    """Keeps a ClaimByMoveRule's task index current from Needs_Action events"""
 
-    def __init__(self, vault_path: str):
+    def __init__(self, rule: 'ClaimByMoveRule'):
+        self.rule = rule
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.rule._index_add(Path(event.src_path))
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.rule._index_discard(Path(event.src_path).name)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.rule._index_discard(Path(event.src_path).name)
+            if Path(event.dest_path).parent == self.rule.needs_action:
+                self.rule._index_add(Path(event.dest_path))
+
+
+class ClaimByMoveRule:
+    """
+    Implements the claim-by-move rule to prevent double-work
+
+    A claim is an atomic rename from Needs_Action/ into In_Progress/<agent>/,
+    preceded by a lease file (<task>.lease) holding the agent and expiry.
+    Agents extend their lease with heartbeat(); reclaim_expired() moves
+    tasks whose lease ran out back to Needs_Action/. Unclaimed tasks are
+    kept in an in-memory priority index (priority, then oldest first), so
+    claim_next() does not glob the folder; a lost rename race just moves
+    on to the next candidate.
+    """
+
+    def __init__(self, vault_path: str, lease_seconds: float = None):
         self.vault_path = Path(vault_path)
         self.needs_action = self.vault_path / 'Needs_Action'
         self.in_progress = self.vault_path / 'In_Progress'
+        self.lease_seconds = lease_seconds or CLAIM_LEASE_SECONDS
 
         # Create required directories
         self.needs_action.mkdir(exist_ok=True)
         self.in_progress.mkdir(exist_ok=True)
 
-    def claim_task(self, task_file: Path, agent_name: str) -> Path:
+        # name -> sort key, plus a heap of (sort key, name) with lazy deletion
+        self._tasks: Dict[str, Tuple] = {}
+        self._heap: List[Tuple] = []
+        self._index_lock = threading.RLock()
+        self._index_mtime_ns: Optional[int] = None
+        self.observer = None
+
+    # -- priority index -----------------------------------------------------
+
+    def _sort_key(self, task_file: Path) -> Tuple:
+        try:
+            stat = task_file.stat()
+            priority = load_note(task_file).get('priority')
+        except (OSError, ValueError):
+            return None
+        if isinstance(priority, (int, float)):
+            rank = int(priority)
+        else:
+            rank = PRIORITY_RANKS.get(str(priority or '').strip().lower(), DEFAULT_PRIORITY_RANK)
+        return (rank, stat.st_mtime, task_file.name)
+
+    def _index_add(self, task_file: Path):
+        if task_file.suffix != '.md':
+            return
+        key = self._sort_key(task_file)
+        if key is None:
+            return
+        with self._index_lock:
+            self._tasks[task_file.name] = key
+            heapq.heappush(self._heap, key)
+
+    def _index_discard(self, name: str):
+        with self._index_lock:
+            self._tasks.pop(name, None)
+
+    def _refresh_index(self):
+        """Rescan Needs_Action only if it changed and no watcher is keeping the index current"""
+        if self.observer is not None:
+            return
+        try:
+            mtime_ns = self.needs_action.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        with self._index_lock:
+            if mtime_ns == self._index_mtime_ns:
+                return
+            self._index_mtime_ns = mtime_ns
+
+            names = set()
+            with os.scandir(self.needs_action) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith('.md'):
+                        names.add(entry.name)
+                        if entry.name not in self._tasks:
+                            self._index_add(Path(entry.path))
+            for name in set(self._tasks) - names:
+                del self._tasks[name]
+
+            # Drop dead heap entries once they outnumber the live ones
+            if len(self._heap) > 2 * len(self._tasks) + 64:
+                self._heap = list(self._tasks.values())
+                heapq.heapify(self._heap)
+
+    def _pop_candidate(self) -> Optional[str]:
+        """Take the next unclaimed task name off the heap (skipping stale entries)"""
+        with self._index_lock:
+            while self._heap:
+                key = heapq.heappop(self._heap)
+                if self._tasks.get(key[2]) == key:
+                    return key[2]
+        return None
+
+    def start_watching(self):
+        """Keep the task index current from filesystem events instead of directory rescans"""
+        if Observer is None:
+            logger.warning("watchdog not installed; task index will rescan Needs_Action when it changes")
+            return
+        self._index_mtime_ns = None
+        self._refresh_index()
+        self.observer = Observer()
+        self.observer.schedule(_TaskEventHandler(self), str(self.needs_action), recursive=False)
+        self.observer.start()
+
+    def stop_watching(self):
+        if self.observer:
+            self.observer.stop()
+            self.observer.join(timeout=10)
+            self.observer = None
+
+    # -- leases -------------------------------------------------------------
+
+    def _lease_path(self, claimed_file: Path) -> Path:
+        return claimed_file.with_name(claimed_file.name + LEASE_SUFFIX)
+
+    def _write_lease(self, lease_path: Path, agent_name: str, task_name: str, lease_seconds: float,
+                     claimed_at: str = None):
+        now = time.time()
+        lease = {
+            'agent': agent_name,
+            'task': task_name,
+            'claimed_at': claimed_at or datetime.now().isoformat(),
+            'heartbeat_at': datetime.now().isoformat(),
+            'expires_at': now + lease_seconds
+        }
+        temp = lease_path.with_name(f".{lease_path.name}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps(lease))
+        os.replace(temp, lease_path)
+
+    def get_lease(self, claimed_file: Path) -> Optional[Dict[str, Any]]:
+        """
+        Lease for a claimed task
+
+        Claims without a lease file (made before leases existed, or by a
+        process that crashed mid-claim) expire lease_seconds after the file
+        was last touched.
+        """
+        try:
+            return json.loads(self._lease_path(claimed_file).read_text())
+        except (FileNotFoundError, ValueError):
+            pass
+        try:
+            stat = claimed_file.stat()
+        except FileNotFoundError:
+            return None
+        return {
+            'agent': claimed_file.parent.name,
+            'task': claimed_file.name,
+            'expires_at': max(stat.st_mtime, stat.st_ctime) + self.lease_seconds
+        }
+
+    def claim_task(self, task_file: Path, agent_name: str, lease_seconds: float = None) -> Path:
         """
         Claim a task by moving it to the agent's in-progress folder
         Returns the new location if successful, None if already claimed
@@ -264,20 +448,120 @@ class ClaimByMoveRule:
         agent_progress.mkdir(exist_ok=True)
 
         destination = agent_progress / task_file.name
+        lease_path = self._lease_path(destination)
+        if destination.exists():
+            logger.warning(f"Agent {agent_name} already holds a task named {task_file.name}")
+            return None
 
         try:
+            # The lease goes first so a crash right after the rename still
+            # leaves an expiring claim
+            self._write_lease(lease_path, agent_name, task_file.name, lease_seconds or self.lease_seconds)
             # Attempt to move the file atomically
-            shutil.move(str(task_file), str(destination))
+            os.rename(task_file, destination)
+            self._index_discard(task_file.name)
             logger.info(f"Agent {agent_name} claimed task: {task_file.name}")
             return destination
         except FileNotFoundError:
             # File was already moved by another agent
+            lease_path.unlink(missing_ok=True)
+            self._index_discard(task_file.name)
             logger.warning(f"Task {task_file.name} already claimed by another agent")
             return None
         except Exception as e:
+            lease_path.unlink(missing_ok=True)
             logger.error(f"Error claiming task {task_file.name}: {e}")
             return None
 
+    def claim_next(self, agent_name: str, lease_seconds: float = None) -> Optional[Path]:
+        """Claim the highest-priority, oldest unclaimed task (None if there is none)"""
+        self._refresh_index()
+        skipped = []
+        try:
+            while True:
+                name = self._pop_candidate()
+                if name is None:
+                    return None
+                task_file = self.needs_action / name
+                claimed = self.claim_task(task_file, agent_name, lease_seconds)
+                if claimed:
+                    return claimed
+                if task_file.exists():
+                    # Still unclaimed (e.g. the agent holds one with the same name)
+                    skipped.append(self._tasks.get(name))
+        finally:
+            with self._index_lock:
+                for key in skipped:
+                    if key is not None:
+                        heapq.heappush(self._heap, key)
+
+    def heartbeat(self, claimed_file: Path, agent_name: str, lease_seconds: float = None) -> bool:
+        """
+        Extend an agent's lease on a claimed task
+
+        Returns:
+            False if the task is no longer held by the agent (its lease
+            expired and it was reclaimed); the agent should stop working on it
+        """
+        lease = self.get_lease(claimed_file)
+        if not claimed_file.exists() or not lease or lease.get('agent') != agent_name:
+            logger.warning(f"Agent {agent_name} lost its claim on {claimed_file.name}")
+            return False
+        self._write_lease(self._lease_path(claimed_file), agent_name, claimed_file.name,
+                          lease_seconds or self.lease_seconds, claimed_at=lease.get('claimed_at'))
+        return True
+
+    def start_heartbeat(self, claimed_file: Path, agent_name: str, interval: float = None) -> threading.Event:
+        """
+        Renew a lease from a background thread until the returned event is set
+
+        The thread stops by itself once the claim is lost.
+        """
+        stop = threading.Event()
+        interval = interval or self.lease_seconds / 3
+
+        def _beat():
+            while not stop.wait(interval):
+                if not self.heartbeat(claimed_file, agent_name):
+                    break
+
+        threading.Thread(target=_beat, name=f"lease-{claimed_file.name}", daemon=True).start()
+        return stop
+
+    def reclaim_expired(self) -> List[Path]:
+        """Move tasks whose lease expired back to Needs_Action"""
+        reclaimed = []
+        now = time.time()
+
+        for agent_progress in self.in_progress.iterdir():
+            if not agent_progress.is_dir():
+                continue
+            for claimed_file in agent_progress.glob('*.md'):
+                lease = self.get_lease(claimed_file)
+                if not lease or lease.get('expires_at', 0) > now:
+                    continue
+
+                destination = self.needs_action / claimed_file.name
+                if destination.exists():
+                    logger.warning(f"Cannot reclaim {claimed_file.name}: a task with that name is waiting")
+                    continue
+                try:
+                    os.rename(claimed_file, destination)
+                except FileNotFoundError:
+                    continue  # released or reclaimed meanwhile
+                self._lease_path(claimed_file).unlink(missing_ok=True)
+                self._index_add(destination)
+                reclaimed.append(destination)
+                logger.warning(f"Reclaimed {claimed_file.name} from {lease.get('agent')} (lease expired)")
+
+            # Leases left by claims that crashed before their rename
+            for lease_path in agent_progress.glob(f'*.md{LEASE_SUFFIX}'):
+                claimed_file = lease_path.with_name(lease_path.name[:-len(LEASE_SUFFIX)])
+                if not claimed_file.exists() and now - lease_path.stat().st_mtime > self.lease_seconds:
+                    lease_path.unlink(missing_ok=True)
+
+        return reclaimed
+
     def release_task(self, task_file: Path, destination_folder: str) -> Path:
         """Release a completed task to the specified destination folder"""
         dest_path = self.vault_path / destination_folder
@@ -287,6 +571,9 @@ class ClaimByMoveRule:
 
         try:
             shutil.move(str(task_file), str(final_destination))
+            self._lease_path(task_file).unlink(missing_ok=True)
+            if dest_path == self.needs_action:
+                self._index_add(final_destination)
             logger.info(f"Task released to {destination_folder}: {task_file.name}")
             return final_destination
         except Exception as e:
@@ -294,11 +581,11 @@ class ClaimByMoveRule:
             return task_file
 
     def get_available_tasks(self) -> List[Path]:
-        """Get list of unclaimed tasks in Needs_Action"""
-        tasks = []
-        for file_path in self.needs_action.glob('*.md'):
-            tasks.append(file_path)
-        return tasks
+        """Get list of unclaimed tasks in Needs_Action, in claim order"""
+        self._refresh_index()
+        with self._index_lock:
+            ordered = sorted(self._tasks.values())
+        return [self.needs_action / key[2] for key in ordered]
 
 
 class DashboardUpdater:
@@ -308,6 +595,8 @@ class DashboardUpdater:
         self.vault_path = Path(vault_path)
         self.dashboard_path = self.vault_path / 'Dashboard.md'
         self.updates_path = self.vault_path / 'Updates'
+        # Parsed dashboard shared with other writers in this process
+        self.store = get_dashboard_store(self.dashboard_path)
 
         # Create updates directory
         self.updates_path.mkdir(exist_ok=True)
@@ -335,96 +624,67 @@ class DashboardUpdater:
 ## Recent Activity
 - System initialized
 """
-            self.dashboard_path.write_text(initial_content)
+            self.store.initial_content = initial_content
+            self.store.update()
             logger.info("Initial dashboard created")
 
-    def merge_updates_from_cloud(self):
-        """Merge updates from cloud into local dashboard (Local responsibility)"""
+    def merge_updates_from_cloud(self) -> int:
+        """
+        Merge updates from cloud into local dashboard (Local responsibility)
+
+        All queued updates are applied to the parsed dashboard in one pass
+        (oldest first) and Dashboard.md is written once, only if it changed.
+
+        Returns:
+            Number of updates merged
+        """
         if not self.dashboard_path.exists():
             self.create_initial_dashboard()
 
-        # Read current dashboard
-        dashboard_content = self.dashboard_path.read_text()
-
-        # Process each update file from cloud
-        for update_file in self.updates_path.glob('*.json'):
+        updates = []
+        update_files = sorted(self.updates_path.glob('*.json'), key=lambda f: (f.stat().st_mtime, f.name))
+        for update_file in update_files:
             try:
-                update_data = json.loads(update_file.read_text())
+                updates.append((update_file, json.loads(update_file.read_text())))
+            except Exception as e:
+                logger.error(f"Error processing update {update_file.name}: {e}")
 
-                # Apply update to dashboard content
-                updated_content = self._apply_update_to_dashboard(dashboard_content, update_data)
+        if not updates:
+            return 0
 
-                # Write updated dashboard
-                self.dashboard_path.write_text(updated_content)
+        def apply_all(document: DashboardDocument):
+            for update_file, update_data in updates:
+                self._apply_update_to_dashboard(document, update_data)
+            document.set('Last Updated', datetime.now().isoformat())
 
-                # Mark update as processed by moving to processed directory
-                processed_dir = self.updates_path / 'Processed'
-                processed_dir.mkdir(exist_ok=True)
-                shutil.move(str(update_file), processed_dir / update_file.name)
+        self.store.update(apply_all, volatile=['Last Updated'])
 
-                logger.info(f"Merged update from cloud: {update_file.name}")
+        # Mark updates as processed by moving to processed directory
+        processed_dir = self.updates_path / 'Processed'
+        processed_dir.mkdir(exist_ok=True)
+        for update_file, _ in updates:
+            shutil.move(str(update_file), processed_dir / update_file.name)
+            logger.info(f"Merged update from cloud: {update_file.name}")
 
-            except Exception as e:
-                logger.error(f"Error processing update {update_file.name}: {e}")
-
-    def _apply_update_to_dashboard(self, dashboard_content: str, update_data: Dict[str, Any]) -> str:
-        """Apply a specific update to the dashboard content"""
-        import re
+        return len(updates)
 
+    def _apply_update_to_dashboard(self, document: DashboardDocument, update_data: Dict[str, Any]):
+        """Apply a specific update to the parsed dashboard"""
         # Update bank balance if provided
         if 'bank_balance' in update_data:
-            dashboard_content = re.sub(
+            document.edit('Bank Balance', lambda body: re.sub(
                 r'\*\*Current:\*\* \$[\d,\.]+',
-                f"**Current:** ${update_data['bank_balance']}",
-                dashboard_content
-            )
+                lambda _: f"**Current:** ${update_data['bank_balance']}",
+                body
+            ))
 
         # Update pending messages if provided
         if 'pending_messages' in update_data:
-            messages_section = "## Pending Messages\n"
-            for msg in update_data['pending_messages']:
-                messages_section += f"- {msg}\n"
-
-            # Replace the pending messages section
-            pattern = r'## Pending Messages\n.*?(?=## |\Z)'
-            dashboard_content = re.sub(
-                pattern,
-                messages_section,
-                dashboard_content,
-                flags=re.DOTALL
-            )
-
-        # Add recent activity if provided
+            document.set('Pending Messages', ''.join(f"- {msg}\n" for msg in update_data['pending_messages']))
+
+        # Replace (or add) the recent activity section if provided
         if 'recent_activity' in update_data:
-            activity_section = "## Recent Activity\n"
-            for activity in update_data['recent_activity']:
-                activity_section += f"- {activity}\n"
-
-            # Append to recent activity section
-            if "## Recent Activity" in dashboard_content:
-                # Replace existing section
-                pattern = r'## Recent Activity\n.*?(?=## |\Z)'
-                dashboard_content = re.sub(
-                    pattern,
-                    activity_section,
-                    dashboard_content,
-                    flags=re.DOTALL
-                )
-            else:
-                # Add new section at the end
-                dashboard_content += f"\n{activity_section}"
-
-        # Update last updated timestamp
-        last_updated_section = f"## Last Updated\n{datetime.now().isoformat()}\n"
-        pattern = r'## Last Updated\n.*?(?=## |\Z)'
-        dashboard_content = re.sub(
-            pattern,
-            last_updated_section,
-            dashboard_content,
-            flags=re.DOTALL
-        )
-
-        return dashboard_content
+            document.set('Recent Activity', ''.join(f"- {activity}\n" for activity in update_data['recent_activity']))
 
     def write_update_for_cloud(self, update_data: Dict[str, Any]):
         """Write an update that cloud can process (when local needs to communicate with cloud)"""
@@ -8,20 +8,19 @@ import os
 import sys
 import time
 import signal
-import subprocess
+import asyncio
+import threading
 import logging
 import json
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List
-import threading
 
-try:
-    import schedule
-except ImportError:
-    print("Installing schedule...")
-    os.system("pip install schedule")
-    import schedule
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.vault_index import VaultIndex, VaultIndexer
+from src.core.supervisor import ComponentSpec, Supervisor
+from src.core.job_scheduler import JobScheduler, daily_cron
 
 # Configure logging
 logging.basicConfig(
@@ -55,11 +54,25 @@ class WorkflowOrchestrator:
             'whatsapp_watcher': False,
             'email_watcher': False,
             'content_generator': False,
-            'ceo_briefing': False
+            'ceo_briefing': False,
+            'vault_indexer': False
+        }
+
+        # In-process component supervisor; components listed in
+        # ORCHESTRATOR_ISOLATE (comma separated) run in their own process
+        self.supervisor = Supervisor()
+        self.isolated_components = {
+            name.strip() for name in os.getenv('ORCHESTRATOR_ISOLATE', '').split(',') if name.strip()
         }
 
-        # Thread tracking
-        self.threads = {}
+        # Periodic checks; sleeps until the next one is due and keeps
+        # next-run times across restarts
+        self.scheduler = JobScheduler('orchestrator', state_path=self.vault_path / 'Logs' / 'orchestrator_schedule.json')
+        self._stop_event = threading.Event()
+
+        # Vault index shared by status reports; kept live by start_vault_indexer()
+        self.vault_index = VaultIndex(self.vault_path)
+        self.vault_indexer = None
 
         logger.info("=" * 70)
         logger.info("AI EMPLOYEE WORKFLOW ORCHESTRATOR - MASTER COORDINATOR")
@@ -86,207 +99,107 @@ class WorkflowOrchestrator:
 
         logger.info("[OK] Directory structure verified")
 
+    def start_vault_indexer(self):
+        """Start the watchdog-driven vault indexer"""
+        try:
+            self.vault_indexer = VaultIndexer(self.vault_index)
+            self.vault_indexer.start()
+            self.component_status['vault_indexer'] = True
+            logger.info("[OK] Vault indexer started")
+        except Exception as e:
+            logger.error(f"[FAIL] Vault indexer failed: {e}", exc_info=True)
+
+    def _start_component(self, name: str, label: str, entry: str, **kwargs):
+        """Start a long-running component under the supervisor"""
+        isolate = name in self.isolated_components
+        logger.info(f"[OK] Starting {label}...")
+        self.supervisor.add(ComponentSpec(name=name, entry=entry, kwargs=kwargs, isolate=isolate))
+        self.component_status[name] = True
+        logger.info(f"[OK] {label} started in-process ({'isolated process' if isolate else 'thread'})")
+
     def start_auto_processor(self):
-        """Start the auto processor in a separate thread"""
-        def run_processor():
-            try:
-                processor_script = self.vault_path / 'src' / 'core' / 'auto_processor.py'
-                if processor_script.exists():
-                    logger.info("[OK] Starting Auto Processor...")
-                    subprocess.run(
-                        ['python', str(processor_script)],
-                        check=True,
-                        cwd=str(self.vault_path)
-                    )
-                else:
-                    logger.error("[FAIL] auto_processor.py not found!")
-            except Exception as e:
-                logger.error(f"[FAIL] Auto processor failed: {e}", exc_info=True)
-
-        thread = threading.Thread(target=run_processor, daemon=True)
-        thread.start()
-        self.threads['auto_processor'] = thread
-        self.component_status['auto_processor'] = True
-        logger.info("[OK] Auto Processor started in background thread")
+        """Start the auto processor under the supervisor"""
+        self._start_component(
+            'auto_processor', 'Auto Processor', 'src.core.auto_processor:run',
+            vault_path=str(self.vault_path)
+        )
 
     def start_smart_scheduler(self):
-        """Start the smart scheduler in a separate thread"""
-        def run_scheduler():
-            try:
-                scheduler_script = self.vault_path / 'src' / 'schedulers' / 'smart_scheduler.py'
-                if scheduler_script.exists():
-                    logger.info("[OK] Starting Smart Scheduler...")
-                    subprocess.run(
-                        ['python', str(scheduler_script), str(self.vault_path)],
-                        check=True,
-                        cwd=str(self.vault_path)
-                    )
-                else:
-                    logger.error("[FAIL] smart_scheduler.py not found!")
-            except Exception as e:
-                logger.error(f"[FAIL] Smart scheduler failed: {e}", exc_info=True)
-
-        thread = threading.Thread(target=run_scheduler, daemon=True)
-        thread.start()
-        self.threads['smart_scheduler'] = thread
-        self.component_status['smart_scheduler'] = True
-        logger.info("[OK] Smart Scheduler started in background thread")
+        """Start the smart scheduler under the supervisor"""
+        self._start_component(
+            'smart_scheduler', 'Smart Scheduler', 'src.schedulers.smart_scheduler:run',
+            vault_path=str(self.vault_path)
+        )
 
     def start_whatsapp_watcher(self):
-        """Start the WhatsApp watcher in a separate thread"""
-        def run_watcher():
-            try:
-                watcher_script = self.vault_path / 'src' / 'platforms' / 'whatsapp' / 'whatsapp_watcher.py'
-                if watcher_script.exists():
-                    logger.info("[OK] Starting WhatsApp Watcher...")
-                    subprocess.run(
-                        ['python', str(watcher_script)],
-                        check=True,
-                        cwd=str(self.vault_path)
-                    )
-                else:
-                    logger.error("[FAIL] whatsapp_watcher.py not found!")
-            except Exception as e:
-                logger.error(f"[FAIL] WhatsApp watcher failed: {e}", exc_info=True)
-
-        thread = threading.Thread(target=run_watcher, daemon=True)
-        thread.start()
-        self.threads['whatsapp_watcher'] = thread
-        self.component_status['whatsapp_watcher'] = True
-        logger.info("[OK] WhatsApp Watcher started in background thread")
+        """Start the WhatsApp watcher under the supervisor"""
+        self._start_component(
+            'whatsapp_watcher', 'WhatsApp Watcher', 'src.platforms.whatsapp.whatsapp_watcher:run',
+            vault_path=str(self.vault_path)
+        )
 
     def start_email_watcher(self):
-        """Start the Email watcher in a separate thread"""
-        def run_watcher():
-            try:
-                watcher_script = self.vault_path / 'src' / 'platforms' / 'email' / 'email_watcher.py'
-                if watcher_script.exists():
-                    logger.info("[OK] Starting Email Watcher...")
-                    subprocess.run(
-                        ['python', str(watcher_script), '--vault', str(self.vault_path)],
-                        check=True,
-                        cwd=str(self.vault_path)
-                    )
-                else:
-                    logger.error("[FAIL] email_watcher.py not found!")
-            except Exception as e:
-                logger.error(f"[FAIL] Email watcher failed: {e}", exc_info=True)
-
-        thread = threading.Thread(target=run_watcher, daemon=True)
-        thread.start()
-        self.threads['email_watcher'] = thread
-        self.component_status['email_watcher'] = True
-        logger.info("[OK] Email Watcher started in background thread")
+        """Start the Email watcher under the supervisor"""
+        self._start_component(
+            'email_watcher', 'Email Watcher', 'src.platforms.email.email_watcher:run',
+            vault_path=str(self.vault_path)
+        )
 
     def start_periodic_watchers(self):
-        """Start periodic watcher checks using schedule library"""
+        """Schedule periodic watcher checks"""
         logger.info("[INFO] Setting up periodic watcher schedules...")
 
-        # Twitter watcher every 3 hours
-        def twitter_check():
-            logger.info("[SCHEDULE] Running Twitter watcher check...")
-            try:
-                result = subprocess.run(
-                    ['python', 'src/platforms/twitter/watcher.py', '--once'],
-                    capture_output=True,
-                    text=True,
-                    cwd=str(self.vault_path),
-                    timeout=300
+        def task(name: str, label: str, entry: str, **kwargs):
+            # Runs on the supervisor's worker pool; modules are imported once.
+            # Awaiting the result keeps the job "running" until the check ends,
+            # so its concurrency limit applies.
+            async def run():
+                logger.info(f"[SCHEDULE] Running {label}...")
+                future = self.supervisor.run_task(
+                    name, entry, timeout=300,
+                    isolate=name in self.isolated_components, **kwargs
                 )
-                if result.returncode == 0:
-                    logger.info("[OK] Twitter watcher completed")
-                else:
-                    logger.error(f"[FAIL] Twitter watcher error: {result.stderr}")
-            except Exception as e:
-                logger.error(f"[FAIL] Twitter watcher exception: {e}")
-
-        schedule.every(3).hours.do(twitter_check)
+                if future is not None:
+                    await asyncio.wrap_future(future)
+            return run
+
+        # Watchers get a little jitter so checks that line up (e.g. every
+        # 6 hours) don't all open browsers at the same moment
+
+        # Twitter watcher every 3 hours
+        self.scheduler.add_job('twitter_watcher', task('twitter_watcher', 'Twitter watcher check', 'src.platforms.twitter.watcher:run_once'),
+                               every=3 * 3600, jitter=60)
         logger.info("[OK] Twitter watcher: Every 3 hours")
 
         # LinkedIn watcher every 6 hours
-        def linkedin_check():
-            logger.info("[SCHEDULE] Running LinkedIn watcher check...")
-            try:
-                result = subprocess.run(
-                    ['python', 'src/platforms/linkedin/linkedin_watcher.py', '--once'],
-                    capture_output=True,
-                    text=True,
-                    cwd=str(self.vault_path),
-                    timeout=300
-                )
-                if result.returncode == 0:
-                    logger.info("[OK] LinkedIn watcher completed")
-                else:
-                    logger.error(f"[FAIL] LinkedIn watcher error: {result.stderr}")
-            except Exception as e:
-                logger.error(f"[FAIL] LinkedIn watcher exception: {e}")
-
-        schedule.every(6).hours.do(linkedin_check)
+        self.scheduler.add_job('linkedin_watcher', task('linkedin_watcher', 'LinkedIn watcher check', 'src.platforms.linkedin.linkedin_watcher:run_once'),
+                               every=6 * 3600, jitter=60)
         logger.info("[OK] LinkedIn watcher: Every 6 hours")
 
-        # Content generation daily at 9 AM
-        def content_generation():
-            logger.info("[SCHEDULE] Running content generation...")
-            try:
-                result = subprocess.run(
-                    ['python', 'src/platforms/reddit/reddit_content_generator.py', '--type', 'batch', '--count', '3'],
-                    capture_output=True,
-                    text=True,
-                    cwd=str(self.vault_path),
-                    timeout=300
-                )
-                if result.returncode == 0:
-                    logger.info("[OK] Content generation completed")
-                else:
-                    logger.error(f"[FAIL] Content generation error: {result.stderr}")
-            except Exception as e:
-                logger.error(f"[FAIL] Content generation exception: {e}")
-
         # WhatsApp watcher every 2 hours
-        def whatsapp_check():
-            logger.info("[SCHEDULE] Running WhatsApp watcher check...")
-            try:
-                result = subprocess.run(
-                    ['python', 'src/platforms/whatsapp/whatsapp_watcher.py', '--once'],
-                    capture_output=True,
-                    text=True,
-                    cwd=str(self.vault_path),
-                    timeout=300
-                )
-                if result.returncode == 0:
-                    logger.info("[OK] WhatsApp watcher completed")
-                else:
-                    logger.error(f"[FAIL] WhatsApp watcher error: {result.stderr}")
-            except Exception as e:
-                logger.error(f"[FAIL] WhatsApp watcher exception: {e}")
-
-        schedule.every(2).hours.do(whatsapp_check)
+        self.scheduler.add_job('whatsapp_check', task(
+            'whatsapp_check', 'WhatsApp watcher check', 'src.platforms.whatsapp.whatsapp_watcher:run_once',
+            vault_path=str(self.vault_path)
+        ), every=2 * 3600, jitter=60)
         logger.info("[OK] WhatsApp watcher: Every 2 hours")
 
         # Email watcher every 1 hour
-        def email_check():
-            logger.info("[SCHEDULE] Running Email watcher check...")
-            try:
-                result = subprocess.run(
-                    ['python', 'src/platforms/email/email_watcher.py', '--once'],
-                    capture_output=True,
-                    text=True,
-                    cwd=str(self.vault_path),
-                    timeout=300
-                )
-                if result.returncode == 0:
-                    logger.info("[OK] Email watcher completed")
-                else:
-                    logger.error(f"[FAIL] Email watcher error: {result.stderr}")
-            except Exception as e:
-                logger.error(f"[FAIL] Email watcher exception: {e}")
-
-        schedule.every().hour.do(email_check)
+        self.scheduler.add_job('email_check', task(
+            'email_check', 'Email watcher check', 'src.platforms.email.email_watcher:run_once',
+            vault_path=str(self.vault_path)
+        ), every=3600, jitter=60)
         logger.info("[OK] Email watcher: Every hour")
 
-        schedule.every().day.at("09:00").do(content_generation)
+        # Content generation daily at 9 AM (skipped if the system was down past 10)
+        self.scheduler.add_job('content_generation', task(
+            'content_generation', 'content generation', 'src.platforms.reddit.reddit_content_generator:generate_batch',
+            vault_path=str(self.vault_path), count=3
+        ), cron=daily_cron("09:00"), misfire='skip', misfire_grace=3600)
         logger.info("[OK] Content generation: Daily at 9:00 AM")
 
+        # System status report on the hour
+        self.scheduler.add_job('system_status', self.generate_system_status, cron='0 * * * *')
+
     def run_health_check(self):
         """Run system health check"""
         logger.info("[HEALTH CHECK] Running system diagnostics...")
@@ -332,27 +245,26 @@ class WorkflowOrchestrator:
         """Generate current system status report"""
         logger.info("[STATUS] Generating system status...")
 
+        supervisor_status = self.supervisor.status()
+        for name, component in supervisor_status['components'].items():
+            self.component_status[name] = component['running']
+
         status = {
             'timestamp': datetime.now().isoformat(),
             'uptime': 'Running since ' + datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'components': self.component_status.copy(),
-            'active_threads': len(self.threads),
-            'scheduled_tasks': len(schedule.jobs),
-            'next_run_times': []
+            'active_components': sum(1 for c in supervisor_status['components'].values() if c['running']),
+            'supervisor': supervisor_status,
+            'scheduled_tasks': len(self.scheduler.jobs()),
+            'next_run_times': self.scheduler.status()['jobs']
         }
 
-        # Get next run times for scheduled tasks
-        for job in schedule.jobs:
-            status['next_run_times'].append({
-                'job': str(job),
-                'next_run': job.next_run.strftime('%Y-%m-%d %H:%M:%S') if job.next_run else 'N/A'
-            })
-
-        # Count files in key directories
-        for folder_name in ['Needs_Action', 'Pending_Approval', 'Approved', 'Done']:
-            folder = self.vault_path / folder_name
-            if folder.exists():
-                count = len(list(folder.glob("*.md")))
+        # Count files in key directories (from the vault index)
+        if not self.vault_index.is_live():
+            self.vault_index.sync()
+        folder_counts = self.vault_index.counts(['Needs_Action', 'Pending_Approval', 'Approved', 'Done'], ext='.md')
+        for folder_name, count in folder_counts.items():
+            if (self.vault_path / folder_name).exists():
                 status[f'{folder_name.lower()}_count'] = count
 
         # Save status report
@@ -383,6 +295,8 @@ class WorkflowOrchestrator:
         # Start all components
         logger.info("Starting system components...")
 
+        self.start_vault_indexer()
+
         self.start_auto_processor()
         time.sleep(2)  # Give processor time to start
 
@@ -412,20 +326,14 @@ class WorkflowOrchestrator:
         logger.info(f"Smart Scheduler: {'Running' if self.component_status['smart_scheduler'] else 'Failed'}")
         logger.info(f"(WhatsApp) WhatsApp Watcher: {'Running' if self.component_status['whatsapp_watcher'] else 'Failed'}")
         logger.info(f"(Email) Email Watcher: {'Running' if self.component_status['email_watcher'] else 'Failed'}")
-        logger.info(f"Active Threads: {len(self.threads)}")
-        logger.info(f"Scheduled Tasks: {len(schedule.jobs)}")
+        logger.info(f"Supervised Components: {len(self.supervisor.components)}")
+        logger.info(f"Scheduled Tasks: {len(self.scheduler.jobs())}")
 
         # Setup graceful shutdown
         def signal_handler(sig, frame):
             logger.info("\n[STOP] Shutting down AI Employee System...")
             logger.info("This may take a few seconds...")
-
-            # Generate final status
-            final_status = self.generate_system_status()
-
-            logger.info(f"[OK] System stopped. Final status logged.")
-            logger.info("=" * 70)
-            sys.exit(0)
+            self._stop_event.set()
 
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
@@ -434,21 +342,30 @@ class WorkflowOrchestrator:
         logger.info("[CLOCK]  System will run continuously, executing tasks at scheduled times")
         logger.info("=" * 70 + "\n")
 
-        # Main loop
+        # Main loop: sleeps until the next scheduled job is due
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-
-                # Periodic status generation (every hour)
-                if datetime.now().minute == 0:
-                    self.generate_system_status()
-
+            self.scheduler.run(self._stop_event)
         except KeyboardInterrupt:
             signal_handler(signal.SIGINT, None)
         except Exception as e:
             logger.error(f"[CRITICAL] CRITICAL ERROR: {e}", exc_info=True)
-            logger.info("System will attempt to continue running...")
+
+        self.shutdown()
+
+    def shutdown(self):
+        """Stop the scheduler and all components, logging a final status"""
+        self._stop_event.set()
+
+        # Generate final status
+        self.generate_system_status()
+
+        self.supervisor.stop()
+
+        if self.vault_indexer:
+            self.vault_indexer.stop()
+
+        logger.info(f"[OK] System stopped. Final status logged.")
+        logger.info("=" * 70)
 
 
 def main():
@@ -12,6 +12,10 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.vault_index import VaultIndex, get_vault_index
+
 
 class CEOBriefingGenerator:
     """Generates weekly CEO briefing reports"""
@@ -20,6 +24,14 @@ class CEOBriefingGenerator:
         self.vault_path = Path("C:\\Users\\LENOVO X1 YOGA\\OneDrive\\Desktop\\hakathone zero\\AI_Employee_vault")
         self.reports_path = self.vault_path / "Reports"
         self.reports_path.mkdir(exist_ok=True)
+        self._vault_index = None
+
+    @property
+    def vault_index(self) -> VaultIndex:
+        """Vault index, synced on first use when no indexer is running"""
+        if self._vault_index is None:
+            self._vault_index = get_vault_index(self.vault_path)
+        return self._vault_index
 
     def collect_weekly_data(self, start_date: datetime = None) -> Dict[str, Any]:
         """Collect data from all sources for the week"""
@@ -172,11 +184,9 @@ class CEOBriefingGenerator:
 
     def _get_pending_items(self) -> Dict[str, Any]:
         """Get pending items requiring attention"""
-        needs_action = self.vault_path / "Needs_Action"
-        pending_approval = self.vault_path / "Pending_Approval"
-
-        needs_action_count = len(list(needs_action.glob("*.md"))) if needs_action.exists() else 0
-        pending_approval_count = len(list(pending_approval.glob("*.md"))) if pending_approval.exists() else 0
+        counts = self.vault_index.counts(["Needs_Action", "Pending_Approval"], ext=".md")
+        needs_action_count = counts["Needs_Action"]
+        pending_approval_count = counts["Pending_Approval"]
 
         return {
             "needs_action": needs_action_count,
@@ -217,7 +227,7 @@ class CEOBriefingGenerator:
 
         pending_approval = self.vault_path / "Pending_Approval"
         if pending_approval.exists():
-            approval_count = len(list(pending_approval.glob("*.md")))
+            approval_count = self.vault_index.count("Pending_Approval", ext=".md")
             if approval_count > 5:
                 bottlenecks.append({
                     "area": "Approval Workflow",
@@ -228,11 +238,7 @@ class CEOBriefingGenerator:
 
         needs_action = self.vault_path / "Needs_Action"
         if needs_action.exists():
-            urgent_count = 0
-            for file in needs_action.glob("*.md"):
-                content = file.read_text().lower()
-                if "urgent" in content or "asap" in content:
-                    urgent_count += 1
+            urgent_count = self.vault_index.count("Needs_Action", ext=".md", urgent=True)
 
             if urgent_count > 3:
                 bottlenecks.append({
@@ -5,10 +5,17 @@ import os
 import json
 import datetime
 import re
+import sys
 import time
 from enum import Enum
 from typing import Dict, List, Optional, Any, Tuple
 from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.vault_index import VaultIndex, get_vault_index
+from src.core.dashboard_model import DashboardStore, get_dashboard_store
 
 class SystemStatus(Enum):
     GREEN = "🟢"
@@ -27,6 +34,7 @@ class DashboardUpdater:
         self.LOGS_PATH = "Logs"
         self.UPDATE_INTERVAL = 60  # seconds
         self.MAX_ACTIVITY_LOG_ENTRIES = 10
+        self._vault_index = None
 
         # Initialize dashboard if it doesn't exist
         self.initialize_dashboard_if_needed()
@@ -71,6 +79,13 @@ class DashboardUpdater:
             with open(self.DASHBOARD_PATH, 'w', encoding='utf-8') as f:
                 f.write(default_dashboard)
 
+    @property
+    def vault_index(self) -> VaultIndex:
+        """Index of the vault in the working directory (replaces folder listing)"""
+        if self._vault_index is None:
+            self._vault_index = get_vault_index(os.getcwd())
+        return self._vault_index
+
     def collect_system_metrics(self) -> Dict[str, Any]:
         """
         Collect current system metrics from all data collection points
@@ -96,12 +111,7 @@ class DashboardUpdater:
         """Get current unread email count"""
         # This would typically connect to email API to get actual count
         # For simulation, we'll look for email files in Needs_Action
-        needs_action_path = "Needs_Action"
-        if not os.path.exists(needs_action_path):
-            return 0
-
-        email_files = [f for f in os.listdir(needs_action_path) if f.startswith("EMAIL_")]
-        return len(email_files)
+        return self.vault_index.count("Needs_Action", prefix="EMAIL_")
 
     def get_unread_whatsapp_count(self) -> int:
         """Get unread WhatsApp messages count"""
@@ -120,26 +130,15 @@ class DashboardUpdater:
 
     def get_tasks_needs_action_count(self) -> int:
         """Get count of tasks in Needs_Action folder"""
-        needs_action_path = "Needs_Action"
-        if not os.path.exists(needs_action_path):
-            return 0
-
-        return len(os.listdir(needs_action_path))
+        return self.vault_index.count("Needs_Action")
 
     def get_tasks_done_count(self) -> int:
         """Get count of completed tasks in Done folder"""
-        done_path = "Done"
-        if not os.path.exists(done_path):
-            return 0
-
-        return len(os.listdir(done_path))
+        return self.vault_index.count("Done")
 
     def get_total_monitored_count(self) -> int:
         """Get total count of all processed items"""
-        total = 0
-        for folder in ["Inbox", "Needs_Action", "Done"]:
-            if os.path.exists(folder):
-                total += len(os.listdir(folder))
+        total = sum(self.vault_index.counts(["Inbox", "Needs_Action", "Done"]).values())
 
         # Add log entries as proxy for monitored items
         if os.path.exists(self.LOGS_PATH):
@@ -167,11 +166,7 @@ class DashboardUpdater:
 
     def get_inbox_count(self) -> int:
         """Get count of items in Inbox folder"""
-        inbox_path = "Inbox"
-        if not os.path.exists(inbox_path):
-            return 0
-
-        return len(os.listdir(inbox_path))
+        return self.vault_index.count("Inbox")
 
     def get_recent_activities(self) -> List[str]:
         """Get recent activity log entries"""
@@ -188,10 +183,13 @@ class DashboardUpdater:
                     recent_lines = [line for line in lines if line.strip()][-self.MAX_ACTIVITY_LOG_ENTRIES:]
                     for line in recent_lines[-3:]:  # Take up to 3 recent activities
                         if line.strip():
-                            # Clean up the log entry for display
+                            # Clean up the log entry for display, keeping its own time
+                            # so an unchanged log renders the same dashboard
+                            logged_at = re.match(r'^\d{4}-\d{2}-\d{2} (\d{2}:\d{2}:\d{2})', line)
                             clean_line = re.sub(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} - \w+ - ', '', line)
                             if clean_line:
-                                activities.append(f"- {datetime.datetime.now().strftime('%H:%M:%S')}: {clean_line}")
+                                shown_at = logged_at.group(1) if logged_at else datetime.datetime.now().strftime('%H:%M:%S')
+                                activities.append(f"- {shown_at}: {clean_line}")
 
         # Limit to max entries
         return activities[-self.MAX_ACTIVITY_LOG_ENTRIES:]
@@ -278,60 +276,47 @@ class DashboardUpdater:
 
         return formatted_data
 
-    def update_dashboard_sections(self, formatted_data: Dict[str, str]):
+    @property
+    def dashboard_store(self) -> DashboardStore:
+        """Shared parsed Dashboard.md (one lock and one atomic write per refresh)"""
+        return get_dashboard_store(self.DASHBOARD_PATH)
+
+    def update_dashboard_sections(self, formatted_data: Dict[str, str]) -> bool:
         """
         Update appropriate dashboard sections with new data
-        """
-        # Read current dashboard
-        with open(self.DASHBOARD_PATH, 'r', encoding='utf-8') as f:
-            dashboard_content = f.read()
-
-        # Update Quick Stats section
-        dashboard_content = self.replace_section_content(
-            dashboard_content,
-            r'(## 📊 Quick Stats\n)(.*?)(\n\n|$)',
-            f"## 📊 Quick Stats\n{formatted_data['pending_emails']}\n{formatted_data['unread_whatsapp']}\n{formatted_data['tasks_needs_action']}\n{formatted_data['tasks_completed']}\n{formatted_data['total_monitored']}\n"
-        )
-
-        # Update System Status section
-        dashboard_content = self.replace_section_content(
-            dashboard_content,
-            r'(## 📈 System Status\n)(.*?)(\n\n|$)',
-            f"## 📈 System Status\n{formatted_data['email_status']}\n{formatted_data['whatsapp_status']}\n{formatted_data['inbox_status']}\n{formatted_data['workflow_progress']}\n"
-        )
-
-        # Update Recent Activity Log section
-        dashboard_content = self.replace_section_content(
-            dashboard_content,
-            r'(## 📅 Recent Activity Log\n)(.*?)(\n\n|$)',
-            f"## 📅 Recent Activity Log\n{formatted_data['recent_activity']}\n"
-        )
 
-        # Update Important Notifications section
-        dashboard_content = self.replace_section_content(
-            dashboard_content,
-            r'(## ⚠️ Important Notifications\n)(.*?)(\n\n|$)',
-            f"## ⚠️ Important Notifications\n{formatted_data['important_notifications']}\n"
-        )
+        All sections are replaced in one pass over the parsed dashboard, and
+        the file is rewritten only if something other than the last-check
+        time changed.
 
-        # Update Workflow Status section
-        dashboard_content = self.replace_section_content(
-            dashboard_content,
-            r'(## 🔄 Workflow Status\n)(.*?)(\n\n|$)',
-            f"## 🔄 Workflow Status\n{formatted_data['workflow_status']}\n"
-        )
+        Returns:
+            True if Dashboard.md was written
+        """
+        sections = {
+            '## 📊 Quick Stats': '\n'.join([
+                formatted_data['pending_emails'],
+                formatted_data['unread_whatsapp'],
+                formatted_data['tasks_needs_action'],
+                formatted_data['tasks_completed'],
+                formatted_data['total_monitored']
+            ]),
+            '## 📈 System Status': '\n'.join([
+                formatted_data['email_status'],
+                formatted_data['whatsapp_status'],
+                formatted_data['inbox_status'],
+                formatted_data['workflow_progress']
+            ]),
+            '## 📅 Recent Activity Log': formatted_data['recent_activity'],
+            '## ⚠️ Important Notifications': formatted_data['important_notifications'],
+            '## 🔄 Workflow Status': formatted_data['workflow_status'],
+            '## 🛠️ System Configuration': formatted_data['system_config']
+        }
 
-        # Update System Configuration section
-        dashboard_content = self.replace_section_content(
-            dashboard_content,
-            r'(## 🛠️ System Configuration\n)(.*?)(\n\n|$)',
-            f"## 🛠️ System Configuration\n{formatted_data['system_config']}\n"
+        return self.dashboard_store.update(
+            sections=sections,
+            volatile=['## 🛠️ System Configuration']
         )
 
-        # Write updated dashboard
-        with open(self.DASHBOARD_PATH, 'w', encoding='utf-8') as f:
-            f.write(dashboard_content)
-
     def replace_section_content(self, content: str, pattern: str, replacement: str) -> str:
         """
         Replace content in a specific section using regex
@@ -9,14 +9,18 @@ import sys
 import json
 import logging
 import time
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
-import imaplib
-import email
-from email.header import decode_header
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core.imap_sync import ImapSync
+from src.core.imap_pool import ImapConnectionPool, IdleWatcher
+from src.core.fingerprint_index import fingerprint, get_fingerprint_index
+
 # Load env vars
 load_dotenv()
 # from generated_email_handler import EmailHandler
@@ -24,6 +28,9 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Hold an IMAP IDLE connection in run_continuous so new mail is handled within seconds
+IDLE_ENABLED = os.getenv('EMAIL_IDLE', '1') != '0'
+
 
 class EmailWatcher:
     """Watches email for business opportunities and important messages"""
@@ -33,6 +40,13 @@ class EmailWatcher:
         self.needs_action = self.vault_path / 'Needs_Action'
         self.logs_folder = self.vault_path / 'Logs'
         # self.email_handler = EmailHandler()
+        # Logged-in IMAP connections kept between checks, and the incremental
+        # inbox reader on top of them (None without EMAIL_USERNAME/EMAIL_PASSWORD)
+        self.imap_pool = ImapConnectionPool.from_env()
+        self.imap_sync = ImapSync.from_env(self.vault_path / '.imap_sync_email_watcher.json', pool=self.imap_pool)
+        self._new_mail = threading.Event()
+        # Messages already captured in Needs_Action (shared with the other writers)
+        self.fingerprints = get_fingerprint_index(self.vault_path)
 
         # Initialize email monitoring
         self._initialize_monitoring()
@@ -99,90 +113,58 @@ class EmailWatcher:
         return emails
 
     def check_new_incoming_emails(self) -> List[Dict[str, Any]]:
-        """Check for new incoming emails using IMAP"""
+        """
+        Check for new incoming emails using IMAP
+
+        Returns every message that arrived since the last handled one (see
+        _mark_handled), fetched as headers plus a short preview.
+        """
         emails = []
 
         try:
             logger.info("Checking for new incoming emails...")
-            
-            username = os.getenv("EMAIL_USERNAME")
-            password = os.getenv("EMAIL_PASSWORD")
-            imap_server = os.getenv("EMAIL_IMAP_SERVER", "imap.gmail.com")
-            
-            if not username or not password:
+
+            if self.imap_sync is None:
                 logger.warning("Email credentials not set. Skipping check.")
                 return []
 
-            # Connect to IMAP
-            mail = imaplib.IMAP4_SSL(imap_server)
-            mail.login(username, password)
-            mail.select("inbox")
-            
-            # Search for unseen emails
-            status, messages = mail.search(None, "UNSEEN")
-            email_ids = messages[0].split()
-            
-            if not email_ids:
+            messages = self.imap_sync.fetch_new()
+            if not messages:
                 logger.info("No new emails.")
                 return []
-                
-            logger.info(f"Found {len(email_ids)} new emails. Processing last 10...")
-            
-            # Process new emails (limit to last 10 to avoid overload)
-            recent_email_ids = email_ids[-10:] if len(email_ids) > 10 else email_ids
-            
-            for e_id in recent_email_ids:
-                try:
-                    status, msg_data = mail.fetch(e_id, "(RFC822)")
-                    for response_part in msg_data:
-                        if isinstance(response_part, tuple):
-                            msg = email.message_from_bytes(response_part[1])
-                            
-                            # Decode subject
-                            subject, encoding = decode_header(msg["Subject"])[0]
-                            if isinstance(subject, bytes):
-                                subject = subject.decode(encoding if encoding else "utf-8")
-                                
-                            sender = msg.get("From")
-                            
-                            # Get body
-                            body = ""
-                            if msg.is_multipart():
-                                for part in msg.walk():
-                                    if part.get_content_type() == "text/plain":
-                                        try:
-                                            body = part.get_payload(decode=True).decode()
-                                        except:
-                                            pass
-                            else:
-                                try:
-                                    body = msg.get_payload(decode=True).decode()
-                                except:
-                                    pass
-                                    
-                            priority = self._determine_priority(subject + " " + body)
-                            
-                            emails.append({
-                                'platform': 'email',
-                                'type': 'incoming_message',
-                                'sender': sender,
-                                'subject': subject,
-                                'body': body[:500] + "..." if len(body) > 500 else body,
-                                'timestamp': datetime.now().isoformat(),
-                                'priority': priority
-                            })
-                            
-                except Exception as e:
-                    logger.error(f"Error processing email {e_id}: {e}")
-                    
-            mail.close()
-            mail.logout()
+
+            logger.info(f"Found {len(messages)} new emails.")
+
+            for message in messages:
+                body = message.preview
+                priority = self._determine_priority(message.subject + " " + body)
+
+                emails.append({
+                    'platform': 'email',
+                    'type': 'incoming_message',
+                    'uid': message.uid,
+                    'message_id': message.message_id,
+                    'sender': message.sender,
+                    'subject': message.subject,
+                    'date': message.date,
+                    'body': body[:500] + "..." if len(body) > 500 else body,
+                    'timestamp': datetime.now().isoformat(),
+                    'priority': priority
+                })
 
         except Exception as e:
             logger.error(f"Error checking new incoming emails: {e}")
+        finally:
+            if self.imap_sync is not None:
+                self.imap_sync.close()
 
         return emails
 
+    def _mark_handled(self, item: Dict[str, Any]):
+        """Move the inbox sync past an incoming email once its action file exists"""
+        if self.imap_sync is not None and item.get('uid') is not None:
+            self.imap_sync.mark_seen(item['uid'])
+
     def search_business_opportunities(self, keywords: List[str] = None) -> List[Dict[str, Any]]:
         """Search for email business opportunities"""
         opportunities = []
@@ -241,17 +223,38 @@ class EmailWatcher:
         else:
             return 'medium'
 
+    def _fingerprint(self, item: Dict[str, Any]) -> str:
+        """Index key: the Message-ID of an incoming email, else its sender and subject"""
+        if item['type'] == 'incoming_message':
+            if item.get('message_id'):
+                return fingerprint('email', item['message_id'])
+            return fingerprint('email', item.get('sender'), item.get('subject'), item.get('date'))
+        return fingerprint('email', item['type'], item.get('sender'), item.get('subject'))
+
     def create_action_file(self, item: Dict[str, Any]) -> Path:
-        """Create action file in Needs_Action folder"""
+        """Create action file in Needs_Action folder (None if the email was already captured)"""
+        key = None
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             platform = item['platform']
             message_type = item['type']
 
             # Create filename with platform prefix
-            filename = f"EMAIL_{timestamp}_{message_type.replace(' ', '_').replace('-', '_')}.md"
+            filename = f"EMAIL_{timestamp}_{message_type.replace(' ', '_').replace('-', '_')}"
+            if item.get('uid') is not None:
+                # Several messages from one sync land in the same second
+                filename += f"_{item['uid']}"
+            filename += ".md"
             filepath = self.needs_action / filename
 
+            key = self._fingerprint(item)
+            if not self.fingerprints.claim(key, filepath):
+                logger.info(f"Email already captured, skipping: {item.get('subject')}")
+                # A duplicate incoming email needs no further handling
+                self._mark_handled(item)
+                key = None
+                return None
+
             content = self._generate_email_content(item)
             filepath.write_text(content, encoding='utf-8')
             logger.info(f"Created email action file: {filepath}")
@@ -259,6 +262,8 @@ class EmailWatcher:
 
         except Exception as e:
             logger.error(f"Error creating email action file: {e}")
+            if key:
+                self.fingerprints.release(key)
             return None
 
     def _generate_email_content(self, item: Dict[str, Any]) -> str:
@@ -328,36 +333,81 @@ status: pending
 
         return content
 
-    def run_continuous(self, check_interval: int = 300):
-        """Run watcher continuously"""
+    def run_continuous(self, check_interval: int = 300, stop_event: threading.Event = None):
+        """
+        Run watcher continuously
+
+        Besides the full check every check_interval seconds, new mail
+        reported over IMAP IDLE is turned into action files as it arrives.
+
+        Args:
+            check_interval: Seconds between checks
+            stop_event: Event that ends the loop (used when supervised in-process)
+        """
         logger.info(f"Starting Email watcher (interval: {check_interval}s)")
+        stop_event = stop_event or threading.Event()
 
-        while True:
-            try:
-                # Check for email activity
-                needs_action_emails = self.check_needs_action_emails()
-                for email in needs_action_emails:
-                    self.create_action_file(email)
-
-                new_emails = self.check_new_incoming_emails()
-                for email in new_emails:
-                    self.create_action_file(email)
-
-                # Check for business opportunities periodically
-                if datetime.now().minute % 10 == 0:  # Every 10 minutes
-                    opportunities = self.search_business_opportunities()
-                    for opportunity in opportunities:
-                        self.create_action_file(opportunity)
-
-                logger.info("Email check complete, sleeping...")
-                time.sleep(check_interval)
-
-            except KeyboardInterrupt:
-                logger.info("Email watcher stopped by user")
-                break
-            except Exception as e:
-                logger.error(f"Error in Email watcher: {e}")
-                time.sleep(60)
+        idle_watcher = None
+        if IDLE_ENABLED and self.imap_pool is not None:
+            idle_watcher = IdleWatcher(self.imap_pool, self._new_mail.set)
+            idle_watcher.start()
+            logger.info("Listening for new mail with IMAP IDLE")
+
+        try:
+            while not stop_event.is_set():
+                try:
+                    # Check for email activity
+                    needs_action_emails = self.check_needs_action_emails()
+                    for email in needs_action_emails:
+                        self.create_action_file(email)
+
+                    self._process_incoming_emails()
+
+                    # Check for business opportunities periodically
+                    if datetime.now().minute % 10 == 0:  # Every 10 minutes
+                        opportunities = self.search_business_opportunities()
+                        for opportunity in opportunities:
+                            self.create_action_file(opportunity)
+
+                    logger.info("Email check complete, sleeping...")
+                    self._wait_for_mail(stop_event, check_interval)
+
+                except KeyboardInterrupt:
+                    logger.info("Email watcher stopped by user")
+                    break
+                except Exception as e:
+                    logger.error(f"Error in Email watcher: {e}")
+                    stop_event.wait(60)
+        finally:
+            if idle_watcher is not None:
+                idle_watcher.stop()
+            self.close()
+
+    def close(self):
+        """Log out the pooled IMAP connections"""
+        if self.imap_pool is not None:
+            self.imap_pool.close()
+
+    def _process_incoming_emails(self) -> int:
+        """Create action files for new incoming emails; returns how many"""
+        created = 0
+        for email in self.check_new_incoming_emails():
+            if self.create_action_file(email):
+                self._mark_handled(email)
+                created += 1
+        return created
+
+    def _wait_for_mail(self, stop_event: threading.Event, timeout: float):
+        """Sleep until the next full check, handling IDLE new-mail notices meanwhile"""
+        deadline = time.monotonic() + timeout
+        while not stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self._new_mail.wait(min(remaining, 1.0)):
+                self._new_mail.clear()
+                created = self._process_incoming_emails()
+                logger.info(f"New mail pushed by server: created {created} action file(s)")
 
     def run_once(self):
         """Run a single check"""
@@ -393,6 +443,7 @@ status: pending
                 filepath = self.create_action_file(item)
                 if filepath:
                     files_created.append(str(filepath))
+                    self._mark_handled(item)
 
             logger.info(f"Created {len(files_created)} email action files")
             return files_created
@@ -402,6 +453,20 @@ status: pending
             return []
 
 
+def run(vault_path: str = None, stop_event: threading.Event = None, check_interval: int = 300):
+    """Supervisor entry point: watch continuously until stop_event is set"""
+    EmailWatcher(vault_path or os.getcwd()).run_continuous(check_interval, stop_event)
+
+
+def run_once(vault_path: str = None):
+    """Supervisor entry point: run a single check"""
+    watcher = EmailWatcher(vault_path or os.getcwd())
+    try:
+        return watcher.run_once()
+    finally:
+        watcher.close()
+
+
 def main():
     """Main entry point"""
     import argparse
@@ -418,6 +483,7 @@ def main():
 
     if args.once:
         result = watcher.run_once()
+        watcher.close()
         print(json.dumps(result, indent=2))
     else:
         watcher.run_continuous()
@@ -27,6 +27,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+sys.path.insert(0, str(Path(__file__).parents[3]))
+
+from src.core.browser_pool import acquire_page
+
 
 class InstagramPlaywright:
     """Instagram automation using Playwright - no API required"""
@@ -35,25 +39,20 @@ class InstagramPlaywright:
         self.session_path = os.getenv('INSTAGRAM_SESSION_PATH', str(Path(__file__).parent / 'instagram_session_v2'))
         self.username = os.getenv('INSTAGRAM_USERNAME')
         self.password = os.getenv('INSTAGRAM_PASSWORD')
-        self.playwright = None
         self.context = None
         self.page = None
+        self.lease = None
 
         Path(self.session_path).mkdir(parents=True, exist_ok=True)
 
     async def initialize(self, headless: bool = False):
-        """Initialize browser with persistent context"""
+        """Initialize browser with persistent context (warm from the browser pool if installed)"""
         try:
             if self.page and self.context:
                 return True
 
-            from playwright.async_api import async_playwright
-
-            if not self.playwright:
-                self.playwright = await async_playwright().start()
-
             # Use exact config from successful debug_playwright_minimal.py
-            self.context = await self.playwright.chromium.launch_persistent_context(
+            self.lease = await acquire_page(
                 self.session_path,
                 headless=headless,
                 args=[
@@ -64,9 +63,9 @@ class InstagramPlaywright:
                 no_viewport=True,
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             )
+            self.context = self.lease.context
+            self.page = self.lease.page
 
-            self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
-            
             logger.info("Browser initialized")
             return True
 
@@ -75,7 +74,19 @@ class InstagramPlaywright:
             await self.close()
             return False
 
-# ... (omitted close/check_login methods) ...
+    async def close(self):
+        """Release the page (closes the browser unless pooled)"""
+        try:
+            if self.lease:
+                await self.lease.release()
+        except Exception as e:
+            logger.error(f"Error closing browser: {e}")
+        finally:
+            self.lease = None
+            self.context = None
+            self.page = None
+
+# ... (omitted check_login methods) ...
 
     async def login(self, username: str = None, password: str = None) -> Dict[str, Any]:
         """Login to Instagram"""
@@ -26,6 +26,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+sys.path.insert(0, str(Path(__file__).parents[3]))
+
+from src.core.browser_pool import acquire_page
+
 
 class LinkedInPoster:
     """LinkedIn Poster using Playwright automation"""
@@ -39,19 +43,16 @@ class LinkedInPoster:
         self.browser = None
         self.context = None
         self.page = None
+        self.lease = None
 
         # Ensure directories exist
         Path(self.session_path).mkdir(parents=True, exist_ok=True)
 
     async def _init_browser(self, headless: bool = False):
-        """Initialize browser with persistent context"""
+        """Initialize browser with persistent context (warm from the browser pool if installed)"""
         try:
-            from playwright.async_api import async_playwright
-
-            self.playwright = await async_playwright().start()
-
             # Use persistent context for maintaining session
-            self.context = await self.playwright.chromium.launch_persistent_context(
+            self.lease = await acquire_page(
                 self.session_path,
                 headless=headless,
                 args=[
@@ -63,11 +64,12 @@ class LinkedInPoster:
                 viewport={'width': 1280, 'height': 900},
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             )
+            self.context = self.lease.context
+            self.page = self.lease.page
 
-            self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
-
-            # Load cookies if available
-            await self._load_cookies()
+            # Load cookies if the browser was just launched
+            if self.lease.fresh:
+                await self._load_cookies()
 
             logger.info("Browser initialized successfully")
             return True
@@ -77,17 +79,21 @@ class LinkedInPoster:
             return False
 
     async def _close_browser(self):
-        """Close browser and save cookies"""
+        """Save cookies and release the page (closes the browser unless pooled)"""
         try:
+            if not self.lease:
+                return
+
             # Save cookies before closing
             await self._save_cookies()
 
-            if self.context:
-                await self.context.close()
-            if hasattr(self, 'playwright') and self.playwright:
-                await self.playwright.stop()
+            await self.lease.release()
         except Exception as e:
             logger.error(f"Error closing browser: {e}")
+        finally:
+            self.lease = None
+            self.context = None
+            self.page = None
 
     async def _load_cookies(self):
         """Load saved cookies"""
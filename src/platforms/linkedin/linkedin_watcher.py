@@ -623,6 +623,11 @@ Posted via AI Employee System
         return post_result
 
 
+def run_once() -> Dict[str, Any]:
+    """Supervisor entry point: run one monitoring cycle"""
+    return LinkedInWatcher().run_linkedin_monitoring_cycle()
+
+
 # Example usage
 if __name__ == "__main__":
     # Initialize the LinkedIn watcher
@@ -526,6 +526,12 @@ character_count: {comment['character_count']}
             return None
 
 
+def generate_batch(vault_path: str = None, count: int = 3) -> List[str]:
+    """Supervisor entry point: generate and save a batch of posts"""
+    generator = RedditContentGenerator(vault_path)
+    return [str(generator.save_post(post)) for post in generator.generate_weekly_posts(count)]
+
+
 def main():
     """Main entry point"""
     import argparse
@@ -9,10 +9,15 @@ import sys
 import json
 import logging
 import time
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from src.core.fingerprint_index import fingerprint, get_fingerprint_index
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -24,6 +29,8 @@ class WhatsAppWatcher:
         self.vault_path = Path(vault_path)
         self.needs_action = self.vault_path / 'Needs_Action'
         self.logs_folder = self.vault_path / 'Logs'
+        # Messages already captured in Needs_Action (shared with the other writers)
+        self.fingerprints = get_fingerprint_index(self.vault_path)
 
         # Initialize WhatsApp MCP connection
         self.mcp_client = None
@@ -146,7 +153,8 @@ class WhatsAppWatcher:
             return 'medium'
 
     def create_action_file(self, item: Dict[str, Any]) -> Path:
-        """Create action file in Needs_Action folder"""
+        """Create action file in Needs_Action folder (None if the message was already captured)"""
+        key = None
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             platform = item['platform']
@@ -156,6 +164,17 @@ class WhatsAppWatcher:
             filename = f"WHATSAPP_{timestamp}_{message_type.replace(' ', '_').replace('-', '_')}.md"
             filepath = self.needs_action / filename
 
+            # The source file identifies a pending message; the timestamp can't
+            # (it falls back to the polling time when the file has none)
+            if item.get('filename'):
+                key = fingerprint('whatsapp', item['filename'])
+            else:
+                key = fingerprint('whatsapp', message_type, item.get('phone'), item.get('message'))
+            if not self.fingerprints.claim(key, filepath):
+                logger.info(f"WhatsApp message already captured, skipping: {item.get('phone')}")
+                key = None
+                return None
+
             content = self._generate_whatsapp_content(item)
             filepath.write_text(content)
             logger.info(f"Created WhatsApp action file: {filepath}")
@@ -163,6 +182,8 @@ class WhatsAppWatcher:
 
         except Exception as e:
             logger.error(f"Error creating WhatsApp action file: {e}")
+            if key:
+                self.fingerprints.release(key)
             return None
 
     def _generate_whatsapp_content(self, item: Dict[str, Any]) -> str:
@@ -231,11 +252,18 @@ status: pending
 
         return content
 
-    def run_continuous(self, check_interval: int = 300):
-        """Run watcher continuously"""
+    def run_continuous(self, check_interval: int = 300, stop_event: threading.Event = None):
+        """
+        Run watcher continuously
+
+        Args:
+            check_interval: Seconds between checks
+            stop_event: Event that ends the loop (used when supervised in-process)
+        """
         logger.info(f"Starting WhatsApp watcher (interval: {check_interval}s)")
+        stop_event = stop_event or threading.Event()
 
-        while True:
+        while not stop_event.is_set():
             try:
                 # Check for WhatsApp activity
                 pending_msgs = self.check_pending_messages()
@@ -253,14 +281,14 @@ status: pending
                         self.create_action_file(opportunity)
 
                 logger.info("WhatsApp check complete, sleeping...")
-                time.sleep(check_interval)
+                stop_event.wait(check_interval)
 
             except KeyboardInterrupt:
                 logger.info("WhatsApp watcher stopped by user")
                 break
             except Exception as e:
                 logger.error(f"Error in WhatsApp watcher: {e}")
-                time.sleep(60)
+                stop_event.wait(60)
 
     def run_once(self):
         """Run a single check"""
@@ -305,6 +333,16 @@ status: pending
             return []
 
 
+def run(vault_path: str = None, stop_event: threading.Event = None, check_interval: int = 300):
+    """Supervisor entry point: watch continuously until stop_event is set"""
+    WhatsAppWatcher(vault_path or os.getcwd()).run_continuous(check_interval, stop_event)
+
+
+def run_once(vault_path: str = None):
+    """Supervisor entry point: run a single check"""
+    return WhatsAppWatcher(vault_path or os.getcwd()).run_once()
+
+
 def main():
     """Main entry point"""
     import argparse
@@ -4,15 +4,17 @@ Manages automated tasks and periodic execution of various components
 """
 import os
 import sys
-import time
 import threading
-import schedule
 import datetime
 from pathlib import Path
 import subprocess
 import logging
 from datetime import datetime as dt
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.job_scheduler import JobScheduler
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,13 +38,15 @@ class AIEmployeeScheduler:
 
     def __init__(self):
         self.running = False
-        self.jobs = []
+        self.stop_event = threading.Event()
 
         # Create necessary directories
         os.makedirs('Logs', exist_ok=True)
         os.makedirs('Plans', exist_ok=True)
         os.makedirs('Scheduled_Tasks', exist_ok=True)
 
+        self.scheduler = JobScheduler('ai-employee-scheduler', state_path=Path('Logs') / 'ai_employee_schedule.json')
+
     def run_gmail_monitor(self):
         """Run the Gmail monitoring script"""
         try:
@@ -178,43 +182,43 @@ class AIEmployeeScheduler:
 
     def setup_schedule(self):
         """Setup the scheduling jobs"""
-        # Daily tasks
-        schedule.every().hour.do(self.update_dashboard)  # Update dashboard hourly
-        schedule.every(2).hours.do(self.run_health_check)  # Health check every 2 hours
+        # Recurring tasks
+        self.scheduler.add_job('update_dashboard', self.update_dashboard, every=3600)  # Update dashboard hourly
+        self.scheduler.add_job('health_check', self.run_health_check, every=2 * 3600)  # Health check every 2 hours
 
         # Specific times
-        schedule.every().day.at("08:00").do(self.run_gmail_monitor)  # Morning email check
-        schedule.every().day.at("08:15").do(self.run_whatsapp_monitor)  # Morning WhatsApp check
-        schedule.every().day.at("08:30").do(self.run_linkedin_monitor)  # Morning LinkedIn check
-        schedule.every().day.at("09:00").do(self.generate_plans)  # Morning plan generation
-        schedule.every().day.at("12:00").do(self.run_gmail_monitor)  # Midday email check
-        schedule.every().day.at("12:15").do(self.run_whatsapp_monitor)  # Midday WhatsApp check
-        schedule.every().day.at("16:00").do(self.run_gmail_monitor)  # Evening email check
-        schedule.every().day.at("16:15").do(self.run_whatsapp_monitor)  # Evening WhatsApp check
-        schedule.every().day.at("18:00").do(self.update_dashboard)  # Evening dashboard update
+        self.scheduler.add_job('gmail_monitor', self.run_gmail_monitor, cron='0 8,12,16 * * *')  # Morning, midday and evening email checks
+        self.scheduler.add_job('whatsapp_monitor', self.run_whatsapp_monitor, cron='15 8,12,16 * * *')  # Morning, midday and evening WhatsApp checks
+        self.scheduler.add_job('linkedin_monitor_morning', self.run_linkedin_monitor, cron='30 8 * * *')  # Morning LinkedIn check
+        self.scheduler.add_job('generate_plans', self.generate_plans, cron='0 9 * * *',
+                               misfire='skip', misfire_grace=3600)  # Morning plan generation
+        self.scheduler.add_job('evening_dashboard', self.update_dashboard, cron='0 18 * * *')  # Evening dashboard update
 
         # Every 30 minutes during business hours
-        schedule.every(30).minutes.between("09:00", "17:00").do(self.run_linkedin_monitor)
+        self.scheduler.add_job('linkedin_monitor', self.run_linkedin_monitor, cron='*/30 9-16 * * *',
+                               misfire='skip', misfire_grace=300)
 
         logger.info("Schedule setup completed")
         logger.info("Jobs scheduled:")
-        for job in schedule.jobs:
+        for job in self.scheduler.jobs():
             logger.info(f"  - {job}")
 
     def run_scheduler(self):
         """Main scheduler loop"""
         self.setup_schedule()
         self.running = True
+        self.stop_event.clear()
 
         logger.info("AI Employee Scheduler started")
 
-        while self.running:
-            schedule.run_pending()
-            time.sleep(30)  # Check every 30 seconds
+        # Sleeps until the next job is due instead of checking every 30 seconds
+        self.scheduler.run(self.stop_event)
+        self.running = False
 
     def stop_scheduler(self):
         """Stop the scheduler"""
         self.running = False
+        self.stop_event.set()
         logger.info("AI Employee Scheduler stopped")
 
 
@@ -6,8 +6,8 @@ Runs periodic tasks automatically without human intervention
 
 import os
 import sys
-import time
 import signal
+import threading
 import json
 import subprocess
 from pathlib import Path
@@ -15,12 +15,9 @@ from datetime import datetime
 from typing import Dict, Any, List
 import logging
 
-try:
-    import schedule
-except ImportError:
-    print("Installing schedule...")
-    os.system("pip install schedule")
-    import schedule
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.job_scheduler import JobScheduler, daily_cron
 
 # Configure logging
 logging.basicConfig(
@@ -42,6 +39,14 @@ class SmartScheduler:
         self.logs_folder = self.vault_path / 'Logs'
         self.logs_folder.mkdir(exist_ok=True)
 
+        # Own job list, so running in-process next to other schedulers
+        # doesn't mix jobs. Next-run times persist so a restart doesn't
+        # repeat the day's runs.
+        self.scheduler = JobScheduler('smart-scheduler', state_path=self.logs_folder / 'scheduler_state.json')
+
+        # Created on the first email tick and kept so IMAP logins are reused
+        self._email_watcher = None
+
         # Schedule configuration
         self.config = {
             'needs_action_check': {
@@ -310,28 +315,23 @@ class SmartScheduler:
             self.log_task_execution('whatsapp_watcher', 'failed', {'error': str(e)})
 
     def run_email_watcher(self):
-        """Run Email watcher for business opportunities"""
+        """
+        Run Email watcher for business opportunities
+
+        Runs in-process with one EmailWatcher kept for the scheduler's
+        lifetime, so its pooled IMAP connection is reused between ticks
+        instead of logging in again each time.
+        """
         logger.info("[TASK] Running Email watcher...")
 
         try:
-            watcher_script = self.vault_path / 'src' / 'platforms' / 'email' / 'email_watcher.py'
-
-            if watcher_script.exists():
-                result = subprocess.run(
-                    ['python', str(watcher_script), '--once'],
-                    capture_output=True,
-                    text=True,
-                    timeout=300
-                )
+            if self._email_watcher is None:
+                from src.platforms.email.email_watcher import EmailWatcher
+                self._email_watcher = EmailWatcher(str(self.vault_path))
 
-                if result.returncode == 0:
-                    logger.info("  [SUCCESS] Email watcher completed")
-                    self.log_task_execution('email_watcher', 'success')
-                else:
-                    logger.error(f"  [FAILED] Email watcher failed: {result.stderr}")
-                    self.log_task_execution('email_watcher', 'failed', {'error': result.stderr})
-            else:
-                logger.warning("  email_watcher.py not found")
+            files_created = self._email_watcher.run_once()
+            logger.info(f"  [SUCCESS] Email watcher completed ({len(files_created)} action files)")
+            self.log_task_execution('email_watcher', 'success', {'files_created': len(files_created)})
 
         except Exception as e:
             logger.error(f"  [ERROR] Error in email_watcher: {e}", exc_info=True)
@@ -439,45 +439,57 @@ class SmartScheduler:
         test_time = "01:10"
 
         # LinkedIn Check
-        schedule.every().day.at(test_time).do(self.run_linkedin_watcher)
+        self.scheduler.add_job('test_linkedin_watcher', self.run_linkedin_watcher,
+                               cron=daily_cron(test_time), misfire='skip', misfire_grace=3600)
         logger.info(f"  [TEST] Scheduled: LinkedIn watcher at {test_time}")
 
         # Facebook Check
-        schedule.every().day.at(test_time).do(self.run_facebook_check)
+        self.scheduler.add_job('test_facebook_check', self.run_facebook_check,
+                               cron=daily_cron(test_time), misfire='skip', misfire_grace=3600)
         logger.info(f"  [TEST] Scheduled: Facebook check at {test_time}")
 
         # WhatsApp Check
-        schedule.every().day.at(test_time).do(self.run_whatsapp_watcher)
+        self.scheduler.add_job('test_whatsapp_watcher', self.run_whatsapp_watcher,
+                               cron=daily_cron(test_time), misfire='skip', misfire_grace=3600)
         logger.info(f"  [TEST] Scheduled: WhatsApp watcher at {test_time}")
 
         # Email Check
-        schedule.every().day.at(test_time).do(self.run_email_watcher)
+        self.scheduler.add_job('test_email_watcher', self.run_email_watcher,
+                               cron=daily_cron(test_time), misfire='skip', misfire_grace=3600)
         logger.info(f"  [TEST] Scheduled: Email watcher at {test_time}")
         
         # ----------------------------------------
 
         # Every hour: Check Needs_Action
-        schedule.every(self.config['needs_action_check']['interval_hours']).hours.do(
-            self.check_needs_action
+        self.scheduler.add_job(
+            'check_needs_action', self.check_needs_action,
+            every=self.config['needs_action_check']['interval_hours'] * 3600,
+            description=self.config['needs_action_check']['description']
         )
         logger.info("  [OK] Scheduled: Check Needs_Action (every hour)")
 
-        # Daily 9 AM: WhatsApp update
-        schedule.every().day.at(self.config['daily_whatsapp_update']['time']).do(
-            self.run_daily_whatsapp_update
+        # Daily 9 AM: WhatsApp update (a late start within 2 hours still sends it)
+        self.scheduler.add_job(
+            'daily_whatsapp_update', self.run_daily_whatsapp_update,
+            cron=daily_cron(self.config['daily_whatsapp_update']['time']),
+            misfire='skip', misfire_grace=7200,
+            description=self.config['daily_whatsapp_update']['description']
         )
         logger.info(f"  [OK] Scheduled: Daily WhatsApp update (daily at {self.config['daily_whatsapp_update']['time']})")
 
-    def run_pending(self):
-        """Run any pending scheduled tasks"""
-        schedule.run_pending()
+    def run_continuous(self, stop_event: threading.Event = None):
+        """
+        Run scheduler continuously
 
-    def run_continuous(self):
-        """Run scheduler continuously"""
+        Args:
+            stop_event: Event that ends the loop (used when supervised in-process)
+        """
         logger.info("=" * 60)
         logger.info("SMART SCHEDULER - Starting Automated Task Orchestration")
         logger.info("=" * 60)
 
+        stop_event = stop_event or threading.Event()
+
         # Set up all schedules
         self.setup_schedules()
 
@@ -485,26 +497,39 @@ class SmartScheduler:
         logger.info("\nRunning initial task check...")
         self.check_needs_action()
 
-        # Set up graceful shutdown
+        # Set up graceful shutdown (signals can only be handled on the main thread)
         def signal_handler(sig, frame):
             logger.info("\n[STOP] Shutting down Smart Scheduler...")
-            logger.info("[OK] Smart Scheduler stopped gracefully")
-            sys.exit(0)
+            stop_event.set()
 
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, signal_handler)
+            signal.signal(signal.SIGTERM, signal_handler)
+            logger.info("Press Ctrl+C to stop\n")
 
         logger.info("\n[SCHEDULER] Running. Tasks will execute at scheduled times.")
-        logger.info("Press Ctrl+C to stop\n")
+
+        for job in self.scheduler.jobs():
+            logger.info(f"  - {job}")
 
         try:
-            while True:
-                self.run_pending()
-                time.sleep(60)  # Check every minute
+            # Sleeps until the next job is due rather than polling
+            self.scheduler.run(stop_event)
         except KeyboardInterrupt:
             signal_handler(signal.SIGINT, None)
         except Exception as e:
             logger.error(f"Unexpected error: {e}", exc_info=True)
+            raise
+        finally:
+            if self._email_watcher is not None:
+                self._email_watcher.close()
+
+        logger.info("[OK] Smart Scheduler stopped gracefully")
+
+
+def run(vault_path: str = None, stop_event: threading.Event = None):
+    """Supervisor entry point: run the scheduler until stop_event is set"""
+    SmartScheduler(vault_path).run_continuous(stop_event)
 
 
 def main():